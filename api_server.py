@@ -5,88 +5,41 @@ Tento server poskytuje endpointy pre ChatGPT GPT aby mohol čítať finančné d
 """
 
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import requests
 import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import os
 
+from turso_client import ResultSet, Row, to_jsonable, turso_query, turso_query_concurrent
+import turso_replica
+from fulltext import RANK_CONDITION, RANK_JOIN, match_query
+from query_filters import EPOCH_SINCE, amount_cents, month_label
+
 load_dotenv()
 
+
+class JSONProvider(DefaultJSONProvider):
+    """jsonify serializuje aj ResultSet / Row z turso_client (len pôvodné názvy stĺpcov)"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (ResultSet, Row)):
+            return to_jsonable(o)
+        return DefaultJSONProvider.default(o)
+
+
 app = Flask(__name__)
+app.json = JSONProvider(app)
+
+# Voliteľná lokálna read replika (TURSO_REPLICA_PATH)
+turso_replica.install()
 CORS(app)  # Povoliť CORS pre OpenAI GPT
 
 # API kľúč pre autentifikáciu (vygeneruj si vlastný)
 API_KEY = os.getenv("API_KEY", "tvoj-tajny-api-key-123456")
 
-# Turso konfigurácia
-TURSO_DATABASE_URL = os.getenv("TURSO_DATABASE_URL")
-TURSO_AUTH_TOKEN = os.getenv("TURSO_AUTH_TOKEN")
-
-
-def turso_query(sql: str):
-    """Vykonanie SQL query v Turso databáze cez HTTP API"""
-    try:
-        # Extract base URL without protocol prefix
-        if not TURSO_DATABASE_URL or not TURSO_AUTH_TOKEN:
-            return {"success": False, "error": "Turso configuration missing"}
-        
-        # Convert libsql:// to https://
-        url = TURSO_DATABASE_URL.replace("libsql://", "https://")
-        
-        response = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {TURSO_AUTH_TOKEN}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "statements": [sql]
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if data and len(data) > 0:
-                result = data[0]
-                
-                if "results" in result and "rows" in result["results"]:
-                    rows = result["results"]["rows"]
-                    columns = result["results"]["columns"]
-                    
-                    # Convert rows to list of dictionaries
-                    parsed_data = []
-                    for row in rows:
-                        row_dict = {}
-                        for i, col_name in enumerate(columns):
-                            # Handle nested value structure
-                            if isinstance(row[i], dict) and "value" in row[i]:
-                                value = row[i]["value"]
-                                # Convert string numbers to actual numbers
-                                if isinstance(value, str) and value.replace('.', '', 1).replace('-', '', 1).isdigit():
-                                    value = float(value) if '.' in value else int(value)
-                                row_dict[col_name] = value
-                                # Also add lowercase version for compatibility
-                                row_dict[col_name.lower()] = value
-                            else:
-                                row_dict[col_name] = row[i]
-                                row_dict[col_name.lower()] = row[i]
-                        parsed_data.append(row_dict)
-                    
-                    return {"success": True, "data": parsed_data}
-                else:
-                    return {"success": True, "data": []}
-            else:
-                return {"success": False, "error": "Invalid response format"}
-        else:
-            return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
-    
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
 
 def verify_api_key():
     """Overenie API kľúča"""
@@ -100,10 +53,14 @@ def verify_api_key():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    response = {
         "status": "ok",
         "timestamp": datetime.now().isoformat()
-    })
+    }
+    replica = turso_replica.get_replica()
+    if replica is not None:
+        response["replica"] = replica.stats()
+    return jsonify(response)
 
 
 @app.route('/api/transactions/summary', methods=['GET'])
@@ -114,23 +71,27 @@ def get_transactions_summary():
         return jsonify({"error": "Unauthorized"}), 401
     
     # Získanie parametrov
-    days = request.args.get('days', '30')
-    account_id = request.args.get('account_id', '')
+    days = request.args.get('days', 30, type=int)
+    account_id = request.args.get('account_id', type=int)
     
-    account_filter = f"AND AccountID = {account_id}" if account_id else ""
+    args = [f"-{days} days"]
+    account_filter = ""
+    if account_id:
+        account_filter = "AND AccountID = ?"
+        args.append(account_id)
     
     sql = f"""
     SELECT 
         COUNT(*) as total_count,
-        SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END) as total_expenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as total_income,
-        AVG(CASE WHEN Amount < 0 THEN Amount ELSE NULL END) as avg_expense
+        SUM(CASE WHEN AmountCents < 0 THEN AmountCents ELSE 0 END) / 100.0 as total_expenses,
+        SUM(CASE WHEN AmountCents > 0 THEN AmountCents ELSE 0 END) / 100.0 as total_income,
+        AVG(CASE WHEN AmountCents < 0 THEN AmountCents ELSE NULL END) / 100.0 as avg_expense
     FROM Transactions
-    WHERE TransactionDate >= datetime('now', '-{days} days')
+    WHERE TxEpoch >= {EPOCH_SINCE}
     {account_filter};
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, args)
     
     if result["success"] and result["data"]:
         return jsonify({
@@ -148,9 +109,9 @@ def get_recent_transactions():
     if not verify_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    limit = request.args.get('limit', '10')
+    limit = request.args.get('limit', 10, type=int)
     
-    sql = f"""
+    sql = """
     SELECT 
         TransactionDate,
         Amount,
@@ -159,11 +120,11 @@ def get_recent_transactions():
         Description,
         PaymentMethod
     FROM Transactions
-    ORDER BY TransactionDate DESC
-    LIMIT {limit};
+    ORDER BY TxEpoch DESC, TransactionID DESC
+    LIMIT ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [limit])
     
     if result["success"]:
         return jsonify({
@@ -180,23 +141,23 @@ def get_transactions_by_category():
     if not verify_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    days = request.args.get('days', '30')
+    days = request.args.get('days', 30, type=int)
     
     sql = f"""
     SELECT 
         c.CategoryName,
         COUNT(t.TransactionID) as transaction_count,
-        SUM(t.Amount) as total_amount,
-        AVG(t.Amount) as avg_amount
+        SUM(t.AmountCents) / 100.0 as total_amount,
+        AVG(t.AmountCents) / 100.0 as avg_amount
     FROM Transactions t
     LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-    WHERE t.TransactionDate >= datetime('now', '-{days} days')
-        AND t.Amount < 0
+    WHERE t.TxEpoch >= {EPOCH_SINCE}
+        AND t.AmountCents < 0
     GROUP BY c.CategoryName
     ORDER BY total_amount ASC;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [f"-{days} days"])
     
     if result["success"]:
         return jsonify({
@@ -214,25 +175,25 @@ def get_top_merchants():
     if not verify_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    limit = request.args.get('limit', '10')
-    days = request.args.get('days', '30')
+    limit = request.args.get('limit', 10, type=int)
+    days = request.args.get('days', 30, type=int)
     
     sql = f"""
     SELECT 
         MerchantName,
         COUNT(*) as transaction_count,
-        SUM(Amount) as total_spent,
-        AVG(Amount) as avg_spent
+        SUM(AmountCents) / 100.0 as total_spent,
+        AVG(AmountCents) / 100.0 as avg_spent
     FROM Transactions
-    WHERE TransactionDate >= datetime('now', '-{days} days')
-        AND Amount < 0
+    WHERE TxEpoch >= {EPOCH_SINCE}
+        AND AmountCents < 0
         AND MerchantName IS NOT NULL
     GROUP BY MerchantName
     ORDER BY total_spent ASC
-    LIMIT {limit};
+    LIMIT ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [f"-{days} days", limit])
     
     if result["success"]:
         return jsonify({
@@ -250,21 +211,21 @@ def get_monthly_stats():
     if not verify_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    months = request.args.get('months', '6')
+    months = request.args.get('months', 6, type=int)
     
     sql = f"""
     SELECT 
-        strftime('%Y-%m', TransactionDate) as month,
+        {month_label('TxDay')} as month,
         COUNT(*) as transaction_count,
-        SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END) as expenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as income
+        SUM(CASE WHEN AmountCents < 0 THEN AmountCents ELSE 0 END) / 100.0 as expenses,
+        SUM(CASE WHEN AmountCents > 0 THEN AmountCents ELSE 0 END) / 100.0 as income
     FROM Transactions
-    WHERE TransactionDate >= datetime('now', '-{months} months')
-    GROUP BY month
+    WHERE TxEpoch >= {EPOCH_SINCE}
+    GROUP BY TxDay / 100
     ORDER BY month DESC;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [f"-{months} months"])
     
     if result["success"]:
         return jsonify({
@@ -283,19 +244,30 @@ def search_transactions():
         return jsonify({"error": "Unauthorized"}), 401
     
     merchant = request.args.get('merchant', '')
-    min_amount = request.args.get('min_amount', '')
-    max_amount = request.args.get('max_amount', '')
-    account_id = request.args.get('account_id', '')
+    min_amount = request.args.get('min_amount', type=float)
+    max_amount = request.args.get('max_amount', type=float)
+    account_id = request.args.get('account_id', type=int)
     
     conditions = []
-    if merchant:
-        conditions.append(f"MerchantName LIKE '%{merchant}%'")
-    if min_amount:
-        conditions.append(f"Amount >= {min_amount}")
-    if max_amount:
-        conditions.append(f"Amount <= {max_amount}")
+    args = []
+    join = ""
+    order_by = "t.TxEpoch DESC, t.TransactionID DESC"
+    # Fulltext (obchodník, popis, info pre príjemcu, účel) zoradený podľa relevancie
+    query = match_query(merchant)
+    if query is not None:
+        join = RANK_JOIN
+        conditions.append(RANK_CONDITION)
+        args.append(query)
+        order_by = "f.rank, t.TxEpoch DESC"
+    if min_amount is not None:
+        conditions.append("t.AmountCents >= ?")
+        args.append(amount_cents(min_amount))
+    if max_amount is not None:
+        conditions.append("t.AmountCents <= ?")
+        args.append(amount_cents(max_amount))
     if account_id:
-        conditions.append(f"AccountID = {account_id}")
+        conditions.append("t.AccountID = ?")
+        args.append(account_id)
     
     where_clause = " AND ".join(conditions) if conditions else "1=1"
     
@@ -309,14 +281,15 @@ def search_transactions():
         COALESCE(c.Name, 'Nezaradené') as CategoryName,
         COALESCE(a.AccountName, 'Nepriradený') as AccountName
     FROM Transactions t
+    {join}
     LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
     LEFT JOIN Accounts a ON t.AccountID = a.AccountID
     WHERE {where_clause}
-    ORDER BY t.TransactionDate DESC
+    ORDER BY {order_by}
     LIMIT 50;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, args)
     
     if result["success"]:
         return jsonify({
@@ -364,10 +337,11 @@ def get_account_summary(account_id):
     if not verify_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    days = request.args.get('days', '30')
+    days = request.args.get('days', 30, type=int)
+    since = f"-{days} days"
     
     # Info o účte
-    account_sql = f"""
+    account_sql = """
     SELECT 
         AccountID,
         IBAN,
@@ -375,48 +349,49 @@ def get_account_summary(account_id):
         BankName,
         AccountType
     FROM Accounts
-    WHERE AccountID = {account_id} AND IsActive = 1;
+    WHERE AccountID = ? AND IsActive = 1;
     """
     
-    account_result = turso_query(account_sql)
-    
-    if not account_result["success"] or not account_result["data"]:
-        return jsonify({"error": "Account not found"}), 404
-    
     # Štatistiky transakcií
     stats_sql = f"""
     SELECT 
         COUNT(*) as total_count,
-        SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END) as total_expenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as total_income,
-        AVG(CASE WHEN Amount < 0 THEN Amount ELSE NULL END) as avg_expense,
+        SUM(CASE WHEN AmountCents < 0 THEN AmountCents ELSE 0 END) / 100.0 as total_expenses,
+        SUM(CASE WHEN AmountCents > 0 THEN AmountCents ELSE 0 END) / 100.0 as total_income,
+        AVG(CASE WHEN AmountCents < 0 THEN AmountCents ELSE NULL END) / 100.0 as avg_expense,
         MIN(TransactionDate) as first_transaction,
         MAX(TransactionDate) as last_transaction
     FROM Transactions
-    WHERE AccountID = {account_id}
-        AND TransactionDate >= datetime('now', '-{days} days');
+    WHERE AccountID = ?
+        AND TxEpoch >= {EPOCH_SINCE};
     """
     
-    stats_result = turso_query(stats_sql)
-    
     # Top kategórie
     categories_sql = f"""
     SELECT 
         c.Name as category_name,
         c.Icon as category_icon,
         COUNT(t.TransactionID) as transaction_count,
-        SUM(t.Amount) as total_amount
+        SUM(t.AmountCents) / 100.0 as total_amount
     FROM Transactions t
     LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-    WHERE t.AccountID = {account_id}
-        AND t.TransactionDate >= datetime('now', '-{days} days')
-        AND t.Amount < 0
+    WHERE t.AccountID = ?
+        AND t.TxEpoch >= {EPOCH_SINCE}
+        AND t.AmountCents < 0
     GROUP BY c.CategoryID
     ORDER BY total_amount ASC
     LIMIT 5;
     """
     
-    categories_result = turso_query(categories_sql)
+    # Všetky 3 queries súbežne
+    account_result, stats_result, categories_result = turso_query_concurrent([
+        (account_sql, [account_id]),
+        (stats_sql, [account_id, since]),
+        (categories_sql, [account_id, since])
+    ])
+    
+    if not account_result["success"] or not account_result["data"]:
+        return jsonify({"error": "Account not found"}), 404
     
     return jsonify({
         "account": account_result["data"][0] if account_result["data"] else {},
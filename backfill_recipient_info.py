@@ -1,101 +1,45 @@
 #!/usr/bin/env python3
 """
 Backfill RecipientInfo and CounterpartyPurpose for old transactions
-Extract from RawEmailData
+Extract from raw B-mails stored in RawEmails
 """
 
-import os
-import re
-import requests
 from dotenv import load_dotenv
 
-load_dotenv()
-
-TURSO_DATABASE_URL = os.getenv('TURSO_DATABASE_URL', '')
-TURSO_AUTH_TOKEN = os.getenv('TURSO_AUTH_TOKEN', '')
+import bmail_parser
+import raw_emails
+from turso_client import turso_query as shared_turso_query
 
-if TURSO_DATABASE_URL.startswith('libsql://'):
-    TURSO_HTTP_URL = TURSO_DATABASE_URL.replace('libsql://', 'https://')
-else:
-    TURSO_HTTP_URL = TURSO_DATABASE_URL
+load_dotenv()
 
-def turso_query(sql: str):
+def turso_query(sql: str, args=None):
     """Execute SQL query in Turso"""
-    response = requests.post(
-        f"{TURSO_HTTP_URL}/v2/pipeline",
-        headers={
-            "Authorization": f"Bearer {TURSO_AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        },
-        json={
-            "requests": [{"type": "execute", "stmt": {"sql": sql}}]
-        },
-        timeout=10
-    )
-    
-    if response.status_code == 200:
-        result = response.json()
-        if result.get('results') and len(result['results']) > 0:
-            response_obj = result['results'][0]['response']
-            if response_obj.get('type') == 'error':
-                print(f"❌ Error: {response_obj.get('error', {}).get('message')}")
-                return None
-            
-            query_result = response_obj.get('result', {})
-            columns = [col['name'] for col in query_result.get('cols', [])]
-            rows = query_result.get('rows', [])
-            
-            data = []
-            for row in rows:
-                row_dict = {}
-                for i, col_name in enumerate(columns):
-                    cell = row[i]
-                    if isinstance(cell, dict) and 'value' in cell:
-                        value = cell['value']
-                        if cell.get('type') == 'integer':
-                            row_dict[col_name] = int(value) if value is not None else None
-                        elif cell.get('type') == 'real':
-                            row_dict[col_name] = float(value) if value is not None else None
-                        else:
-                            row_dict[col_name] = value
-                    else:
-                        row_dict[col_name] = cell
-                data.append(row_dict)
-            
-            return data
-    return None
+    result = shared_turso_query(sql, args)
+    if not result["success"]:
+        print(f"❌ Error: {result.get('error')}")
+        return None
+    return result["data"]
 
 def extract_from_email(email_body: str):
     """Extract RecipientInfo and CounterpartyPurpose from B-mail"""
     if not email_body:
         return None, None
     
-    # Extract "Informacia pre prijemcu:"
-    recipient_info = None
-    recipient_match = re.search(r'Informacia pre prijemcu:\s*(.+?)(?:\n|$)', email_body, re.IGNORECASE)
-    if recipient_match:
-        recipient_info = recipient_match.group(1).strip()
-    
-    # Extract "Ucel protistrany:"
-    counterparty_purpose = None
-    purpose_match = re.search(r'Ucel protistrany:\s*(.+?)(?:\n|$)', email_body, re.IGNORECASE)
-    if purpose_match:
-        counterparty_purpose = purpose_match.group(1).strip()
-    
-    return recipient_info, counterparty_purpose
+    # "Informacia pre prijemcu:" and "Ucel protistrany:" in one pass
+    fields = bmail_parser.extract_fields(email_body)
+    return fields.get('recipient_info') or None, fields.get('counterparty_purpose') or None
 
 def main():
     print("🔧 Backfilling RecipientInfo and CounterpartyPurpose...")
     print("=" * 60)
     
-    # Get all transactions with RawEmailData but missing RecipientInfo
+    # Get all transactions with a stored raw email but missing RecipientInfo
     sql = """
-    SELECT TransactionID, RawEmailData 
-    FROM Transactions 
-    WHERE RawEmailData IS NOT NULL 
-      AND RawEmailData != ''
-      AND (RecipientInfo IS NULL OR RecipientInfo = '')
-    ORDER BY TransactionID DESC
+    SELECT t.TransactionID
+    FROM Transactions t
+    JOIN RawEmails r ON r.TransactionID = t.TransactionID
+    WHERE (t.RecipientInfo IS NULL OR t.RecipientInfo = '')
+    ORDER BY t.TransactionID DESC
     LIMIT 100;
     """
     
@@ -107,12 +51,15 @@ def main():
     
     print(f"📊 Found {len(transactions)} transactions to update\n")
     
+    # Raw emails are loaded (and decompressed) only for this batch
+    emails = raw_emails.load_many(tx['TransactionID'] for tx in transactions)
+    
     updated = 0
     skipped = 0
     
     for tx in transactions:
         tx_id = tx.get('TransactionID')
-        raw_email = tx.get('RawEmailData')
+        raw_email = emails.get(tx_id)
         
         # Extract info from email
         recipient_info, counterparty_purpose = extract_from_email(raw_email)
@@ -124,12 +71,13 @@ def main():
         
         # Build update query
         updates = []
+        args = []
         if recipient_info:
-            escaped_info = recipient_info.replace("'", "''")
-            updates.append(f"RecipientInfo = '{escaped_info}'")
+            updates.append("RecipientInfo = ?")
+            args.append(recipient_info)
         if counterparty_purpose:
-            escaped_purpose = counterparty_purpose.replace("'", "''")
-            updates.append(f"CounterpartyPurpose = '{escaped_purpose}'")
+            updates.append("CounterpartyPurpose = ?")
+            args.append(counterparty_purpose)
         
         if not updates:
             skipped += 1
@@ -138,10 +86,10 @@ def main():
         update_sql = f"""
         UPDATE Transactions 
         SET {', '.join(updates)}
-        WHERE TransactionID = {tx_id};
+        WHERE TransactionID = ?;
         """
         
-        result = turso_query(update_sql)
+        result = turso_query(update_sql, args + [tx_id])
         
         if result is not None:
             print(f"✅ ID={tx_id}: Updated")
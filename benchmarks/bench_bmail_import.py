@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: historický import B-mailov - po správe vs. bmail_import
+
+Vygeneruje mbox s N B-mailmi (časť s HTML alternatívou, každá desiata
+správa newsletter) a importuje ho do lokálneho Hrana stubu so simulovanou
+latenciou siete (`--latency-ms`):
+
+- po správe: email.message_from_bytes + BMailParser + worker.save_transaction
+  (jeden request na B-mail, ako keby sa archív prehral cez workera)
+- bmail_import v jednom procese a v process poole (`--workers`, bloky
+  mboxu po `--block-mb`)
+
+Na konci overí, že opakovaný import nič nevloží a že každá transakcia má
+uložený B-mail v RawEmails.
+
+    python benchmarks/bench_bmail_import.py --messages 5000 --latency-ms 20
+"""
+
+import argparse
+import contextlib
+import email
+import io
+import os
+import sys
+import tempfile
+import time
+from email.message import EmailMessage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import start_stub  # noqa: E402
+import imap_stub  # noqa: E402
+
+IBAN = 'SK8911000000002933213912'
+
+
+def newsletter(index):
+    message = EmailMessage()
+    message['From'] = 'Obchod <news@example.com>'
+    message['Subject'] = f'Novinky {index}'
+    message.set_content('Zľavy tohto týždňa.\nFrom now on: doprava zdarma.\n')
+    return message.as_bytes()
+
+
+def write_mbox(path, count):
+    with open(path, 'wb') as f:
+        for index in range(count):
+            sender = 'news@example.com' if index % 10 == 0 else 'b-mail@tatrabanka.sk'
+            raw = newsletter(index) if index % 10 == 0 else imap_stub.bmail(index, html=index % 3 == 0)
+            raw = raw.replace(b'\r\n', b'\n')
+            f.write(b'From ' + sender.encode() + b' Mon Nov  3 13:01:00 2025\n')
+            f.write(raw.replace(b'\nFrom ', b'\n>From ').rstrip(b'\n') + b'\n\n')
+
+
+def per_message(path, limit):
+    """Pôvodná cesta - každý B-mail samostatne cez worker.save_transaction"""
+    import bmail_import
+    import imap_fetch
+    import worker
+
+    saved = 0
+    with open(path, 'rb') as f:
+        data = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for raw in bmail_import._mbox_messages(data, 0, len(data)):
+            transaction = worker.BMailParser.parse_transaction(imap_fetch.message_body(email.message_from_bytes(raw)))
+            if transaction and worker.save_transaction(transaction):
+                saved += 1
+                if saved >= limit:
+                    break
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--baseline', type=int, default=500, help='koľko B-mailov uložiť po jednom')
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, help='procesy pre paralelný import (default BMAIL_IMPORT_WORKERS)')
+    parser.add_argument('--block-mb', type=float, default=1.0, help='veľkosť bloku mboxu pre jeden proces')
+    args = parser.parse_args()
+    os.environ['BMAIL_IMPORT_BLOCK_BYTES'] = str(int(args.block_mb * 1024 * 1024))
+
+    server, stub, url = start_stub(latency_ms=args.latency_ms)
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+
+    from migrate import apply_sqlite
+    import bmail_import
+
+    apply_sqlite(stub.conn)
+    stub.conn.execute("INSERT INTO Accounts (IBAN, AccountName) VALUES (?, 'Osobný')", [IBAN])
+    stub.conn.commit()
+
+    workdir = tempfile.mkdtemp(prefix='bench_bmail_import_')
+    mbox = os.path.join(workdir, 'Tatra.mbox')
+    write_mbox(mbox, args.messages)
+    size_mb = os.path.getsize(mbox) / 1024 / 1024
+    print(f"🧪 mbox {args.messages} správ ({size_mb:.1f} MB), latencia {args.latency_ms} ms na request\n")
+
+    def reset():
+        stub.conn.execute("DELETE FROM RawEmails")
+        stub.conn.execute("DELETE FROM Transactions")
+        stub.conn.commit()
+
+    start = time.perf_counter()
+    saved = per_message(mbox, args.baseline)
+    single_rate = saved / (time.perf_counter() - start)
+    print(f"{'po správe':<16}{single_rate:>10.0f} B-mailov/s   (prvých {saved}, 1 request na B-mail)")
+
+    results = []
+    for workers in sorted({1, args.workers or bmail_import.BMAIL_IMPORT_WORKERS}):
+        reset()
+        stats = bmail_import.import_archives([mbox], workers, checkpoint_path=None, progress=False)
+        rate = stats.parsed / stats.seconds
+        results.append(stats)
+        print(f"{f'import {workers} proc.':<16}{rate:>10.0f} B-mailov/s{stats.messages_per_second:>8.0f} správ/s"
+              f"{stats.megabytes_per_second:>7.1f} MB/s{stats.requests:>6} requestov   ({rate / single_rate:.0f}x)")
+
+    again = bmail_import.import_archives([mbox], checkpoint_path=None, progress=False)
+    count = stub.conn.execute("SELECT COUNT(*) FROM Transactions").fetchone()[0]
+    raw = stub.conn.execute("SELECT COUNT(*) FROM RawEmails").fetchone()[0]
+    print(f"\nOpakovaný import: vložených {again.inserted}, duplicít {again.duplicates}; "
+          f"transakcií {count}, RawEmails {raw}")
+    assert again.inserted == 0 and count == results[-1].parsed == raw, (again, count, raw)
+
+    os.remove(mbox)
+    os.rmdir(workdir)
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
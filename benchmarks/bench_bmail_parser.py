@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parsovanie B-mailov - pôvodné regexy vs. bmail_parser
+
+Korpus B-mailov v skutočnom formáte Tatra banky (platby kartou, prijaté
+a odoslané prevody s poľami protistrany, trvalé príkazy, sumy s medzerou
+ako oddeľovačom tisícov, CRLF konce riadkov z webhooku, dlhá pätička)
+a bežných emailov, ktoré B-mail nie sú.
+
+- pôvodne: re.search s regexom v argumente na každé pole + strptime
+  (kópia z workera / webhooku - hlavný riadok, popis a tri polia protistrany)
+- bmail_parser: predkompilovaný vzor, všetky polia jedným prechodom tela,
+  dátum bez strptime
+
+Meria B-mailov za sekundu a overí, že oba parsery vrátia rovnaké údaje.
+
+    python benchmarks/bench_bmail_parser.py --emails 20000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bmail_parser  # noqa: E402
+
+IBAN = 'SK8911000000002933213912'
+MERCHANTS = ['BOLT.EUD', 'LIDL SK.', 'KAUFLAND-1120.', 'SHELL 4521.', 'TESCO STORES.', 'DM DROGERIE.', 'WOLT.COM']
+COUNTERPARTIES = ['Slovenský plynárenský priemysel', 'Jana Nováková', 'SPP a.s.', 'Orange Slovensko a.s.']
+FOOTER = ('\nTato sprava bola vygenerovana automaticky, prosim neodpovedajte na nu.\n'
+          'Tatra banka, a.s., Hodzovo namestie 3, 811 06 Bratislava 1, www.tatrabanka.sk\n') * 3
+NEWSLETTER = ('Dobrý deň,\n\nposielame Vám prehľad noviniek za mesiac {month}.\n'
+              'Zľava 20 % platí do 30.11.2025 na všetky produkty.\n' + FOOTER)
+
+
+def sk_amount(amount):
+    whole, cents = f"{amount:.2f}".split('.')
+    return (f"{int(whole):,}".replace(',', ' ') if len(whole) > 3 else whole) + ',' + cents
+
+
+def bmail_body(rnd, when):
+    kind = rnd.random()
+    amount = round(rnd.uniform(1, 60) if kind < 0.7 else rnd.uniform(20, 2500), 2)
+    direction = 'zvyseny' if 0.7 <= kind < 0.85 else 'znizeny'
+    lines = [
+        f"{when.day}.{when.month}.{when.year} {when.strftime('%H:%M')} bol zostatok Vasho uctu "
+        f"{IBAN} {direction} o {sk_amount(amount)} EUR.",
+        f"uctovny zostatok:                               {sk_amount(rnd.uniform(100, 9000))} EUR",
+        f"disponibilny zostatok:                          {sk_amount(rnd.uniform(100, 9000))} EUR",
+    ]
+    if kind < 0.7:
+        merchant = rnd.choice(MERCHANTS)
+        lines.append(f"Popis transakcie: Platba kartou 4405**{rnd.randrange(1000, 9999)}, "
+                     f"{merchant}{rnd.choice(['EUD', 'SVK', 'CZE'])}{rnd.randrange(10 ** 9, 10 ** 10)}.")
+    elif kind < 0.85:
+        lines += [
+            "Popis transakcie: Prevod v prospech uctu",
+            f"Ucet protistrany: {rnd.choice(COUNTERPARTIES)}",
+            f"Ucel protistrany: Faktura {rnd.randrange(10 ** 6)}",
+            f"Informacia pre prijemcu: /VS{rnd.randrange(10 ** 8)}/SS/KS0308",
+        ]
+    else:
+        lines += [
+            "Popis transakcie: Trvaly prikaz",
+            f"Ucet protistrany: {rnd.choice(COUNTERPARTIES)}",
+            f"Informacia pre prijemcu: najom {when.month}/{when.year}",
+        ]
+    body = "\n".join(lines) + "\n" + FOOTER
+    return body.replace("\n", "\r\n") if rnd.random() < 0.3 else body
+
+
+def corpus(count, seed=1):
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    bodies = []
+    for index in range(count):
+        when = start + timedelta(minutes=rnd.randrange(60 * 24 * 700))
+        bodies.append(NEWSLETTER.format(month=when.month) if index % 10 == 0 else bmail_body(rnd, when))
+    return bodies
+
+
+def legacy_parse(email_body):
+    """Pôvodné parsovanie (worker.BMailParser + polia protistrany z webhooku)"""
+    main_match = re.search(
+        r'(\d{1,2}\.\d{1,2}\.\d{4})\s+(\d{1,2}:\d{2})\s+bol zostatok.*?'
+        r'(SK\d+)\s+(znizeny|zvyseny)\s+o\s+([\d\s,]+)\s*EUR',
+        email_body
+    )
+    if not main_match:
+        return None
+    transaction = {
+        'date': datetime.strptime(f"{main_match.group(1)} {main_match.group(2)}", "%d.%m.%Y %H:%M"),
+        'iban': main_match.group(3),
+    }
+    amount = float(main_match.group(5).replace(',', '.').replace(' ', ''))
+    transaction['amount'] = -amount if main_match.group(4) == 'znizeny' else amount
+
+    desc_match = re.search(r'Popis transakcie:\s*(.+?)(?:\n|$)', email_body)
+    if desc_match:
+        description = desc_match.group(1).strip()
+        transaction['description'] = description
+        if 'Platba kartou' in description:
+            transaction['payment_method'] = 'Card'
+            merchant_match = re.search(r',\s*([A-Z0-9\.\-]+)', description)
+            if merchant_match:
+                merchant_raw = merchant_match.group(1).strip('.')
+                merchant = re.sub(r'\.?[A-Z]{3}\d+$', '', merchant_raw)
+                transaction['merchant'] = merchant if merchant else merchant_raw
+            else:
+                transaction['merchant'] = 'Unknown'
+        elif 'Prevod' in description or 'Prikaz' in description:
+            transaction['payment_method'] = 'Transfer'
+            transaction['merchant'] = description
+        else:
+            transaction['payment_method'] = 'Other'
+            transaction['merchant'] = description
+
+    for key, label in (('counterparty_name', 'Ucet protistrany'), ('counterparty_purpose', 'Ucel protistrany'),
+                       ('recipient_info', 'Informacia pre prijemcu')):
+        match = re.search(label + r':\s*(.+?)(?:\n|$)', email_body, re.IGNORECASE)
+        transaction[key] = match.group(1).strip() if match else ''
+    transaction['transaction_type'] = 'Debit' if transaction['amount'] < 0 else 'Credit'
+    transaction['raw_email'] = email_body
+    return transaction
+
+
+def measure(parse, bodies, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(body) for body in bodies]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emails', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = corpus(args.emails)
+    size_mb = sum(len(body) for body in bodies) / 1024 / 1024
+    print(f"🧪 {len(bodies)} emailov ({size_mb:.1f} MB), najlepší z {args.repeat} behov\n")
+
+    reference, legacy_s = measure(legacy_parse, bodies, args.repeat)
+    results, parser_s = measure(bmail_parser.parse_transaction, bodies, args.repeat)
+    print(f"{'pôvodne':<14}{legacy_s:>8.3f} s{len(bodies) / legacy_s:>12.0f} emailov/s")
+    print(f"{'bmail_parser':<14}{parser_s:>8.3f} s{len(bodies) / parser_s:>12.0f} emailov/s   "
+          f"({legacy_s / parser_s:.1f}x)")
+
+    ok = results == reference
+    transactions = sum(1 for result in results if result)
+    print(f"\n{'✅' if ok else '❌'} rovnaké výsledky ({transactions} transakcií, "
+          f"{len(bodies) - transactions} iných emailov)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
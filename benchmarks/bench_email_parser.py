@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: email_parser.parse_bmail_notification - pred a po rýchlej ceste
+
+Korpus B-mail notifikácií (ako ich posiela Logic App do Azure Function
+process_email_notification) v dvoch podobách - plain text a HTML
+(tabuľka, štýly, logo, pätička):
+
+- pôvodne: nový EmailParser s html2text na každé volanie, html2text aj
+  BeautifulSoup strom pre každé telo (aj plain text)
+- teraz: zdieľaný parser, plain text bez prevodu, HTML cez lxml
+  (a pre porovnanie cez html2text, ak lxml nie je nainštalované)
+
+Meria čas parsovania na email a porovná extrahované údaje.
+
+    python benchmarks/bench_email_parser.py --emails 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import email_parser  # noqa: E402
+
+MONTHS = ['januára', 'februára', 'marca', 'apríla', 'mája', 'júna', 'júla', 'augusta',
+          'septembra', 'októbra', 'novembra', 'decembra']
+MERCHANTS = ['KAUFLAND 1120, PO, LEVO', 'Dr.Max 039, PO Levocska', 'ROXOR S R O', 'TESCO Bratislava',
+             'U Kocmundu Biely kriz', 'LIDL SK, BRATISLAVA']
+FIELDS = ('merchant_name', 'amount', 'currency', 'transaction_date', 'account_number', 'iban',
+          'payment_method', 'co2_footprint', 'variable_symbol', 'constant_symbol', 'specific_symbol')
+
+
+def notification_lines(rnd, when):
+    lines = [
+        f"{when.day}. {MONTHS[when.month - 1]} {when.year}",
+        rnd.choice(MERCHANTS),
+        f"Platba kartou 4405**{rnd.randrange(1000, 9999)}",
+        f"{rnd.uniform(0.5, 150):.2f} EUR".replace('.', ','),
+        f"{rnd.uniform(0.1, 40):.2f} kg CO2e".replace('.', ','),
+    ]
+    if rnd.random() < 0.3:
+        lines += [f"Variabilný symbol: {rnd.randrange(10 ** 9)}", "Konštantný symbol: 0308"]
+    return lines
+
+
+def as_html(lines):
+    rows = ''.join(f'<tr><td style="padding:4px;font-family:Arial">{line}</td></tr>\n' for line in lines)
+    footer = '<p style="font-size:10px;color:#999">Tato sprava bola vygenerovana automaticky. Neodpovedajte na nu.</p>\n'
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<style>body{font-family:Arial;color:#333} td{font-size:14px}</style></head><body>\n'
+        f'<img src="data:image/png;base64,{"iVBORw0KGgo" * 200}" alt="Tatra banka">\n'
+        f'<table cellpadding="0" cellspacing="0">{rows}</table>\n{footer * 10}</body></html>\n'
+    )
+
+
+def corpus(count, seed=1):
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    texts, htmls = [], []
+    for _ in range(count):
+        lines = notification_lines(rnd, start + timedelta(days=rnd.randrange(700)))
+        texts.append('\n'.join(lines) + '\n')
+        htmls.append(as_html(lines))
+    return texts, htmls
+
+
+def legacy_parse(body):
+    """Pôvodná cesta: nový parser a html2text na volanie, html2text + BeautifulSoup pre každé telo"""
+    import html2text
+    from bs4 import BeautifulSoup
+
+    parser = email_parser.EmailParser()
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    text = converter.handle(body)
+    BeautifulSoup(body, 'html.parser')
+    transaction = parser.parse_email(text, is_html=False)
+    return transaction and {field: getattr(transaction, field) for field in FIELDS}
+
+
+def current_parse(body):
+    transaction = email_parser.get_parser().parse_email(body)
+    return transaction and {field: getattr(transaction, field) for field in FIELDS}
+
+
+def measure(parse, bodies):
+    start = time.perf_counter()
+    results = [parse(body) for body in bodies]
+    return results, (time.perf_counter() - start) / len(bodies) * 1e6
+
+
+def same(a, b):
+    """Počet emailov so zhodnou sumou, IBAN, VS a kartou (dátum zvlášť - pôvodne sa často nenašiel)"""
+    return sum(1 for x, y in zip(a, b) if x and y and x['amount'] == y['amount'] and x['iban'] == y['iban']
+               and x['variable_symbol'] == y['variable_symbol'] and x['account_number'] == y['account_number'])
+
+
+def dated(results):
+    """Počet emailov, v ktorých sa našiel dátum (inak parser dosadí now())"""
+    today = datetime.now().date()
+    return sum(1 for r in results if r and r['transaction_date'].date() != today)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emails', type=int, default=2000)
+    args = parser.parse_args()
+
+    texts, htmls = corpus(args.emails)
+    print(f"🧪 {args.emails} notifikácií, HTML {sum(map(len, htmls)) / len(htmls) / 1024:.1f} kB / email, "
+          f"lxml {'áno' if email_parser.lxml_html is not None else 'nie'}\n")
+    print(f"{'vstup':<15}{'pôvodne':>12}{'teraz':>12}{'zrýchlenie':>12}   zhoda údajov   dátum pôvodne/teraz")
+
+    lxml_html = email_parser.lxml_html
+    runs = [('plain text', texts, lxml_html), ('HTML', htmls, lxml_html)]
+    if lxml_html is not None:
+        runs.append(('HTML bez lxml', htmls, None))
+    for label, bodies, extractor in runs:
+        email_parser.lxml_html = extractor
+        before, before_us = measure(legacy_parse, bodies)
+        after, after_us = measure(current_parse, bodies)
+        print(f"{label:<15}{before_us:>9.0f} µs{after_us:>9.0f} µs{before_us / after_us:>11.1f}x   "
+              f"{same(before, after):>5}/{len(bodies):<8}{dated(before):>8}/{dated(after)}")
+    email_parser.lxml_html = lxml_html
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
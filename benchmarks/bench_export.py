@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: export celej histórie - jeden materializovaný výsledok vs. stream
+
+Každý režim beží v samostatnom procese s vlastným Hrana stubom s N
+transakciami; meria sa nárast špičky RSS procesu (ru_maxrss) počas exportu
+oproti stavu po naplnení databázy a čas:
+
+- naraz: jeden `turso_query` cez všetky riadky + `json.dumps` (ako list
+  endpoint bez limitu)
+- stream: `/api/transactions/export` (Flask test client), odpoveď sa
+  číta po kúskoch a zahadzuje - ako klient, ktorý zapisuje do súboru
+
+Pri streame je špička daná veľkosťou dávky (EXPORT_CHUNK_SIZE), nie N.
+
+    python benchmarks/bench_export.py --transactions 50000 --chunk-size 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import start_stub  # noqa: E402
+
+
+def seed(conn, count):
+    from migrate import apply_sqlite  # importuje turso_client - až po nastavení TURSO_* env
+
+    apply_sqlite(conn)
+    rnd = random.Random(1)
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, Description, CategoryID, TransactionType) "
+        "VALUES (datetime('now', ?), ?, ?, ?, ?, ?)",
+        [
+            (f"-{rnd.randrange(5 * 365 * 24 * 60)} minutes", amount, rnd.choice(['LIDL', 'BOLT', 'KAUFLAND', 'SHELL']),
+             f"Platba kartou {rnd.randrange(10 ** 6)}", rnd.choice([1, 2, 3, None]), 'Debit' if amount < 0 else 'Credit')
+            for amount in (round(rnd.uniform(-120, 60), 2) for _ in range(count))
+        ]
+    )
+    conn.commit()
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(args):
+    """Jeden režim v tomto procese - vypíše JSON {size, rss_mb, seconds}"""
+    server, stub, url = start_stub()
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+    os.environ['EXPORT_CHUNK_SIZE'] = str(args.chunk_size)
+    seed(stub.conn, args.transactions)
+
+    import export
+    import web_ui
+    from turso_client import to_jsonable, turso_query
+
+    def at_once():
+        sql = export.SELECT_SQL.format(
+            columns=', '.join(f"{expr} AS {name}" for name, expr, _ in export.EXPORT_COLUMNS), where=""
+        )
+        result = turso_query(sql, [args.transactions + 1])
+        return len(json.dumps(result["data"], default=to_jsonable, ensure_ascii=False).encode('utf-8'))
+
+    client = web_ui.app.test_client()
+
+    def streamed(fmt):
+        def run():
+            response = client.get(f'/api/transactions/export?format={fmt}', buffered=False)
+            size = sum(len(part) for part in response.response)
+            response.close()
+            return size
+        return run
+
+    fn = at_once if args.mode == 'json' else streamed(args.mode)
+    client.get('/api/transactions/export?format=ndjson&date_from=2100-01-01').close()  # zahriatie importov
+    baseline = max_rss_mb()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"size": size, "rss_mb": max_rss_mb() - baseline, "seconds": elapsed}))
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return 0
+
+    try:
+        import pyarrow  # noqa: F401
+        formats = ['ndjson', 'csv', 'parquet']
+    except ImportError:
+        formats = ['ndjson', 'csv']
+
+    print(f"🧪 {args.transactions} transakcií, dávka {args.chunk_size}\n")
+    print(f"{'režim':<18}{'nárast RSS':>14}{'čas':>10}{'veľkosť':>12}")
+    for mode in ['json'] + formats:
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--transactions', str(args.transactions),
+             '--chunk-size', str(args.chunk_size)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        label = 'naraz (JSON)' if mode == 'json' else f'stream {mode}'
+        print(f"{label:<18}{result['rss_mb']:>11.1f} MB{result['seconds']:>8.2f} s"
+              f"{result['size'] / 1024 / 1024:>9.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vyhľadávanie `MerchantName LIKE '%...%'` vs. FTS5 (fulltext.py)
+
+Naplní SQLite databázu (migrácie vrátane 0007_fulltext.sql s triggermi) N
+transakciami s textami v štýle B-mailov a porovná pôvodný LIKE filter
+(full scan) s fulltextovým filtrom zo search_filter() a s poradím podľa
+relevancie (RANK_JOIN). Meria aj réžiu FTS triggerov pri vkladaní.
+
+    python benchmarks/bench_fulltext.py --transactions 100000 -n 20
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fulltext import RANK_CONDITION, RANK_JOIN, match_query, search_filter  # noqa: E402
+from migrate import apply_sqlite  # noqa: E402
+
+MERCHANTS = ['LIDL', 'BILLA 122', 'Kaviareň Modrá', 'Dr.Max 383', 'SHELL', 'Bolt', 'Tesco Nitra',
+             'Reštaurácia U Tri Ruží', 'Kino Lumière', 'Potraviny Jednota']
+WORDS = ['nákup', 'platba', 'kartou', 'faktúra', 'nájom', 'škola', 'obed', 'krúžok', 'poistenie', 'energie']
+
+SELECT = """
+    SELECT t.TransactionID, t.TransactionDate, t.Amount, t.MerchantName, t.Description
+    FROM Transactions t {join}
+    WHERE {where}
+    ORDER BY {order}
+    LIMIT 50"""
+
+
+def make_db(count, with_fulltext):
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    # 0006 = schéma bez fulltextu, 0007 = FTS5 tabuľka a triggery
+    apply_sqlite(conn, until=None if with_fulltext else 6)
+    rnd = random.Random(1)
+    start = time.perf_counter()
+    # Vzácny obchodník (~0,05 % riadkov) = typické selektívne hľadanie
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, Description, RecipientInfo, "
+        "CounterpartyPurpose) VALUES (datetime('now', ?), ?, ?, ?, ?, ?)",
+        ((f"-{rnd.randrange(5 * 365)} days", round(rnd.uniform(-120, 60), 2),
+          'Papiernictvo Školák' if rnd.random() < 0.0005 else rnd.choice(MERCHANTS),
+          ' '.join(rnd.sample(WORDS, 3)), f"{rnd.choice(WORDS)} {rnd.randrange(1000)}", rnd.choice(WORDS))
+         for _ in range(count))
+    )
+    return conn, (time.perf_counter() - start) / count * 1e6
+
+
+def p50(conn, sql, params, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    plain, plain_us = make_db(args.transactions, False)
+    indexed, fts_us = make_db(args.transactions, True)
+    date_order = "t.TransactionDate DESC, t.TransactionID DESC"
+
+    print(f"🧪 {args.transactions} transakcií, medián z {args.iterations} behov\n")
+    print(f"{'hľadaný text':<16}{'LIKE':>12}{'FTS':>12}{'FTS rank':>12}{'zhody LIKE/FTS':>18}")
+    for text in ('Kaviareň', 'kaviaren', 'lumi', 'Papiernictvo', 'skolak', 'krúžok 417'):
+        like_sql = SELECT.format(join="", where="t.MerchantName LIKE ?", order=date_order)
+        conditions, fts_args = search_filter("t.TransactionID", text)
+        fts_sql = SELECT.format(join="", where=" AND ".join(conditions), order=date_order)
+        rank_sql = SELECT.format(join=RANK_JOIN, where=RANK_CONDITION, order="f.rank, t.TransactionDate DESC")
+
+        like_count = plain.execute(f"SELECT COUNT(*) FROM Transactions t WHERE t.MerchantName LIKE ?",
+                                   [f"%{text}%"]).fetchone()[0]
+        fts_count = indexed.execute(f"SELECT COUNT(*) FROM Transactions t WHERE {conditions[0]}", fts_args).fetchone()[0]
+        like_ms = p50(plain, like_sql, [f"%{text}%"], args.iterations)
+        fts_ms = p50(indexed, fts_sql, fts_args, args.iterations)
+        rank_ms = p50(indexed, rank_sql, [match_query(text)], args.iterations)
+        print(f"{text:<16}{like_ms:>9.2f} ms{fts_ms:>9.2f} ms{rank_ms:>9.2f} ms{like_count:>10}/{fts_count}")
+    print(f"\nINSERT: {plain_us:.1f} µs bez FTS, {fts_us:.1f} µs s FTS triggermi na transakciu")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sťahovanie B-mailov z IMAP - po jednej správe vs. dávkovo
+
+Lokálny IMAP stub (imap_stub.py) s N B-mailmi (text/plain + HTML
+alternatíva) a latenciou na príkaz. Porovnáva stiahnutie a rozparsovanie
+všetkých B-mailov na subject/date/body/from:
+
+- RFC822: `FETCH <id> (RFC822)` po jednej správe + email.message_from_bytes
+  (pôvodný worker / email_receiver / sync_emails)
+- dávkovo: `imap_fetch.iter_fetch` - BODYSTRUCTURE + hlavičky, potom len
+  text/plain časť, `--batch` UID na príkaz
+- dávkovo + COMPRESS=DEFLATE
+
+Meria správy za sekundu, počet IMAP príkazov a bajty prenesené serverom.
+Voliteľne `--bandwidth-kbps` simuluje pomalú linku.
+
+    python benchmarks/bench_imap_fetch.py --messages 500 --latency-ms 20 --batch 50
+"""
+
+import argparse
+import email
+import imaplib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import imap_stub  # noqa: E402
+import imap_fetch  # noqa: E402
+
+
+def per_message(mail):
+    """Pôvodné sťahovanie - celá správa, jeden round trip na správu"""
+    _, messages = mail.search(None, '(FROM "b-mail@tatrabanka.sk")')
+    bodies = []
+    for email_id in messages[0].split():
+        _, msg_data = mail.fetch(email_id, "(RFC822)")
+        for part in msg_data:
+            if isinstance(part, tuple):
+                msg = email.message_from_bytes(part[1])
+                body = ""
+                for sub in msg.walk():
+                    if sub.get_content_type() == "text/plain":
+                        body = sub.get_payload(decode=True).decode()
+                bodies.append(body)
+    return bodies
+
+
+def batched(mail, batch_size):
+    _, data = mail.uid('SEARCH', None, '(FROM "b-mail@tatrabanka.sk")')
+    uids = [int(uid) for uid in data[0].split()]
+    return [message["body"] for message in imap_fetch.iter_fetch(mail, uids, batch_size)]
+
+
+def run(args, label, compress, fn):
+    server, stub, (host, port) = imap_stub.start_stub(
+        args.messages, args.latency_ms, args.bandwidth_kbps, other_every=10, compress=compress, html=True
+    )
+    mail = imaplib.IMAP4(host, port)
+    mail.login('bench@example.com', 'bench')
+    if compress:
+        assert imap_fetch.enable_compression(mail)
+    mail.select("INBOX", readonly=True)
+
+    commands, sent = stub.commands, stub.bytes_sent
+    start = time.perf_counter()
+    bodies = fn(mail)
+    seconds = time.perf_counter() - start
+    commands, sent = stub.commands - commands, stub.bytes_sent - sent
+
+    mail.logout()
+    server.shutdown()
+    print(f"{label:<22}{len(bodies):>7}{seconds:>8.2f} s{len(bodies) / seconds:>10.0f}{commands:>10}{sent / 1024:>10.0f} kB")
+    return bodies, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='latencia IMAP príkazu')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0.0, help='priepustnosť linky (0 = bez limitu)')
+    parser.add_argument('--batch', type=int, default=imap_fetch.IMAP_FETCH_BATCH)
+    args = parser.parse_args()
+
+    print(f"🧪 {args.messages} správ v INBOX, latencia {args.latency_ms} ms na IMAP príkaz, dávka {args.batch}\n")
+    print(f"{'režim':<22}{'správ':>7}{'čas':>10}{'správ/s':>10}{'príkazov':>10}{'prenesené':>13}")
+    reference, baseline = run(args, 'RFC822 po jednej', False, per_message)
+    results = [
+        run(args, 'dávkovo', False, lambda mail: batched(mail, args.batch)),
+        run(args, 'dávkovo + DEFLATE', True, lambda mail: batched(mail, args.batch)),
+    ]
+
+    ok = all(bodies == reference for bodies, _ in results)
+    print(f"\n{'✅' if ok else '❌'} rovnaké telá správ, zrýchlenie {baseline / results[-1][1]:.0f}x")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
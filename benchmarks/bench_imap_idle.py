@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latencia B-mail -> transakcia v databáze, IMAP IDLE vs. polling
+
+Worker (`worker.run_worker`) beží vo vlákne proti lokálnemu IMAP stubu
+(imap_stub.py) a Hrana stubu. Benchmark pridá do schránky B-mail a meria
+čas, kým sa transakcia objaví v Transactions:
+
+- IDLE: server ohlási `* N EXISTS`, worker hneď stiahne a uloží správu
+- polling: server bez IDLE, worker kontroluje každých
+  EMAIL_POLL_MIN_INTERVAL..EMAIL_CHECK_INTERVAL sekúnd (`--poll-interval`)
+
+Pre IDLE overí, že žiadna latencia nepresiahne 1 s.
+
+    python benchmarks/bench_imap_idle.py --messages 10 --latency-ms 20 --poll-interval 5
+"""
+
+import argparse
+import contextlib
+import imaplib
+import io
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import imap_stub  # noqa: E402
+from hrana_stub import start_stub  # noqa: E402
+
+
+def run_mode(worker, conn, args, idle, offset):
+    server, stub, (host, port) = imap_stub.start_stub(20, args.latency_ms, idle=idle)
+    address = f"{'idle' if idle else 'poll'}@example.com"
+
+    session = worker.ImapSession(address, 'bench', host, factory=lambda: imaplib.IMAP4(host, port))
+    receiver = worker.EmailReceiver(address, 'bench', host, session=session)
+    threading.Thread(target=worker.run_worker, args=(receiver, worker.BMailParser()), daemon=True).start()
+
+    def count():
+        return conn.execute("SELECT COUNT(*) FROM Transactions").fetchone()[0]
+
+    def wait_until(predicate, limit):
+        deadline = time.perf_counter() + limit
+        while not predicate():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("worker nespracoval B-mail včas")
+            time.sleep(0.002)
+
+    # prvá synchronizácia (IMAP_SYNC_INITIAL=latest) - existujúce správy sa preskočia
+    wait_until(lambda: conn.execute(
+        "SELECT 1 FROM ImapSyncState WHERE Mailbox LIKE ?", [address + '%']
+    ).fetchone(), 30)
+
+    rnd = random.Random(1)
+    latencies = []
+    for index in range(args.messages):
+        time.sleep(rnd.uniform(0.1, 0.5))
+        before = count()
+        start = time.perf_counter()
+        stub.append(imap_stub.bmail(offset + index))
+        wait_until(lambda: count() > before, args.poll_interval * 3 + 30)
+        latencies.append(time.perf_counter() - start)
+
+    server.shutdown()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='latencia IMAP príkazu')
+    parser.add_argument('--db-latency-ms', type=float, default=20.0, help='latencia Turso requestu')
+    parser.add_argument('--poll-interval', type=int, default=5, help='EMAIL_CHECK_INTERVAL pre polling')
+    args = parser.parse_args()
+
+    hrana_server, hrana, url = start_stub(latency_ms=args.db_latency_ms)
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+    os.environ['IMAP_SYNC_INITIAL'] = 'latest'
+    os.environ['EMAIL_IMAP_MODE'] = 'idle'
+    os.environ['EMAIL_CHECK_INTERVAL'] = str(args.poll_interval)
+    os.environ['EMAIL_POLL_MIN_INTERVAL'] = str(max(1, args.poll_interval // 4))
+
+    from migrate import apply_sqlite
+    import worker
+
+    apply_sqlite(hrana.conn)
+    hrana.conn.execute("INSERT INTO Accounts (IBAN, AccountName) VALUES ('SK8911000000002933213912', 'Osobný')")
+    hrana.conn.commit()
+
+    print(f"🧪 {args.messages} B-mailov, IMAP latencia {args.latency_ms} ms, Turso {args.db_latency_ms} ms\n")
+    print(f"{'režim':<28}{'min':>8}{'medián':>9}{'max':>8}")
+    results = {}
+    modes = ((True, 'IDLE'), (False, f'polling {worker.EMAIL_POLL_MIN_INTERVAL}-{args.poll_interval} s'))
+    for number, (idle, label) in enumerate(modes):
+        # vlastné B-maily pre každý režim - rovnaké by odtlačky (fingerprints) zahodili ako duplicity
+        offset = 1000 + number * args.messages
+        with contextlib.redirect_stdout(io.StringIO()):  # výpisy workera
+            latencies = run_mode(worker, hrana.conn, args, idle, offset)
+        results[idle] = latencies
+        print(f"{label:<28}{min(latencies):>6.2f} s{statistics.median(latencies):>7.2f} s{max(latencies):>6.2f} s")
+
+    ok = max(results[True]) < 1.0
+    print(f"\n{'✅' if ok else '❌'} IDLE: max latencia notifikácia -> databáza {max(results[True]) * 1000:.0f} ms")
+    hrana_server.shutdown()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: kontrola B-mailov - celá schránka vs. inkrementálne podľa UID
+
+Lokálny IMAP stub (imap_stub.py) s N B-mailmi a latenciou na príkaz,
+stav synchronizácie v Hrana stube. Porovnáva jednu kontrolu schránky:
+
+- celá: `SEARCH FROM b-mail` + `FETCH (RFC822)` každej nájdenej správy
+  (pôvodné get_bmails / get_unread_emails)
+- UID: `imap_sync.iter_new_messages` - po prvej synchronizácii len nové
+  správy od posledného spracovaného UID
+
+Meria sa čas, počet IMAP príkazov a prenesené bajty pre kontrolu bez
+nových správ a s `--new` novými správami.
+
+    python benchmarks/bench_imap_sync.py --messages 2000 --new 3 --latency-ms 20
+"""
+
+import argparse
+import email
+import imaplib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import imap_stub  # noqa: E402
+from hrana_stub import start_stub  # noqa: E402
+
+
+def full_scan(mail):
+    """Pôvodná kontrola - všetky B-maily v priečinku"""
+    mail.select("INBOX")
+    _, messages = mail.search(None, '(FROM "b-mail@tatrabanka.sk")')
+    found = 0
+    for email_id in messages[0].split():
+        _, msg_data = mail.fetch(email_id, "(RFC822)")
+        for part in msg_data:
+            if isinstance(part, tuple):
+                email.message_from_bytes(part[1])
+                found += 1
+    return found
+
+
+def measure(stub, fn):
+    commands, sent = stub.commands, stub.bytes_sent
+    start = time.perf_counter()
+    found = fn()
+    return found, time.perf_counter() - start, stub.commands - commands, stub.bytes_sent - sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--new', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    hrana_server, hrana, url = start_stub()
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+    os.environ['IMAP_SYNC_INITIAL'] = 'latest'
+
+    from migrate import apply_sqlite
+    import imap_sync
+
+    apply_sqlite(hrana.conn)
+
+    server, stub, (host, port) = imap_stub.start_stub(args.messages, args.latency_ms, other_every=10)
+    mail = imaplib.IMAP4(host, port)
+    mail.login('bench@example.com', 'bench')
+    mailbox = imap_sync.mailbox_key('bench@example.com')
+
+    def incremental():
+        return sum(1 for _ in imap_sync.iter_new_messages(mail, mailbox))
+
+    incremental()  # prvá synchronizácia (latest) - uloží stav
+
+    print(f"🧪 {args.messages} správ v INBOX, latencia {args.latency_ms} ms na IMAP príkaz\n")
+    print(f"{'kontrola':<26}{'správ':>7}{'čas':>10}{'príkazov':>10}{'prenesené':>12}")
+    for label, new in (('bez nových', 0), (f'{args.new} nové', args.new)):
+        for index in range(new):
+            stub.append(imap_stub.bmail(args.messages + index))
+        for name, fn in (('celá', lambda: full_scan(mail)), ('UID', incremental)):
+            found, seconds, commands, sent = measure(stub, fn)
+            print(f"{name + ' / ' + label:<26}{found:>7}{seconds:>8.2f} s{commands:>10}{sent / 1024:>9.0f} kB")
+
+    mail.logout()
+    server.shutdown()
+    hrana_server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stránkovanie /api/transactions/list cez OFFSET vs. keyset kurzor
+
+Naplní SQLite databázu (všetky migrácie) N transakciami a pre
+rôzne hĺbky stránky porovná pôvodný `LIMIT ? OFFSET ?` s keyset
+podmienkou z query_filters.keyset_after (rovnaký SELECT ako endpoint).
+OFFSET rastie lineárne s hĺbkou, kurzor má zostať konštantný.
+
+    python benchmarks/bench_pagination.py --transactions 100000 -n 20
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrate import apply_sqlite  # noqa: E402
+from query_filters import encode_cursor, keyset_after  # noqa: E402
+
+PAGE_SQL = """
+    SELECT t.TransactionID, t.TransactionDate, t.TxEpoch, t.Amount, t.Currency, t.MerchantName,
+           t.Description, t.PaymentMethod, t.IBAN,
+           COALESCE(c.Name, 'Nezaradené') AS CategoryName, c.Icon AS CategoryIcon, t.CategorySource,
+           COALESCE(a.AccountName, 'Nepriradený') AS AccountName, a.BankName AS BankName
+    FROM Transactions t
+    LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
+    LEFT JOIN Accounts a ON t.AccountID = a.AccountID
+    {where}
+    ORDER BY t.TxEpoch DESC, t.TransactionID DESC
+    LIMIT ? OFFSET ?"""
+
+
+def make_db(count):
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    apply_sqlite(conn)
+    conn.execute("INSERT INTO Accounts (AccountName, BankName) VALUES ('Osobný', 'Tatra banka')")
+    rnd = random.Random(1)
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, CategoryID, AccountID) "
+        "VALUES (datetime('now', ?), ?, ?, ?, ?)",
+        ((f"-{rnd.randrange(5 * 365 * 24 * 60)} minutes", round(rnd.uniform(-120, 60), 2),
+          rnd.choice(['LIDL', 'BOLT', 'KAUFLAND', 'SHELL']), rnd.choice([1, 2, 3, 5, None]), rnd.choice([1, None]))
+         for _ in range(count))
+    )
+    conn.execute("ANALYZE")
+    return conn
+
+
+def p50(conn, sql, params, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = make_db(args.transactions)
+    offset_sql = PAGE_SQL.format(where="")
+    pages = [p for p in (1, 10, 100, 1000, args.transactions // args.limit) if (p - 1) * args.limit < args.transactions]
+
+    print(f"🧪 {args.transactions} transakcií, {args.limit} na stránku, medián z {args.iterations} behov\n")
+    print(f"{'strana':>8}{'OFFSET':>14}{'kurzor':>12}{'zrýchlenie':>14}")
+    for page in pages:
+        offset = (page - 1) * args.limit
+        offset_rows = conn.execute(offset_sql, [args.limit, offset]).fetchall()
+
+        # Kurzor pre stranu = posledný riadok predchádzajúcej strany (ako next_cursor)
+        cursor = None
+        if offset:
+            previous = conn.execute(offset_sql, [1, offset - 1]).fetchone()
+            cursor = encode_cursor(previous)
+        conditions, cursor_args = keyset_after("t.TxEpoch", "t.TransactionID", cursor)
+        keyset_sql = PAGE_SQL.format(where="WHERE " + " AND ".join(conditions) if conditions else "")
+        keyset_rows = conn.execute(keyset_sql, cursor_args + [args.limit, 0]).fetchall()
+        assert [r["TransactionID"] for r in keyset_rows] == [r["TransactionID"] for r in offset_rows]
+
+        offset_ms = p50(conn, offset_sql, [args.limit, offset], args.iterations)
+        keyset_ms = p50(conn, keyset_sql, cursor_args + [args.limit, 0], args.iterations)
+        print(f"{page:>8}{offset_ms:>11.2f} ms{keyset_ms:>9.2f} ms{offset_ms / keyset_ms:>13.1f}x")
+    print("\nKurzorové stránky sú zhodné s OFFSET stránkami ✅")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dashboard endpointy bez cache vs. s `query_cache`
+
+Volá `/api/summary`, `/api/categories/list` a `/api/accounts/list`
+(Flask test client) proti lokálnemu Hrana stubu so simulovanou latenciou
+a časom príkazu. Meria p50 bez cache, s cache (hit) a po zápise
+(zmena kategórie transakcie -> invalidácia -> miss), plus počet requestov
+na stub.
+
+    python benchmarks/bench_query_cache.py -n 50 --latency-ms 20 --stmt-ms 15
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import start_stub  # noqa: E402
+from bench_summary_fanout import seed  # noqa: E402
+
+ENDPOINTS = ('/api/summary', '/api/categories/list', '/api/accounts/list')
+
+
+def p50(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--stmt-ms', type=float, default=15.0)
+    parser.add_argument('--transactions', type=int, default=2000)
+    args = parser.parse_args()
+
+    server, stub, url = start_stub(latency_ms=args.latency_ms, stmt_ms=args.stmt_ms)
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+    seed(stub, args.transactions)
+    os.environ['QUERY_CACHE_VERSION_FILE'] = ''
+
+    import web_ui
+    import query_cache
+
+    client = web_ui.app.test_client()
+    cache = query_cache.get_cache()
+
+    def page_load():
+        for endpoint in ENDPOINTS:
+            assert client.get(endpoint).status_code == 200
+
+    def write_then_load():
+        client.put('/api/transactions/update-category/1', json={'category_id': 2})
+        page_load()
+
+    cache.ttl = 0
+    page_load()  # zahriatie spojení
+    requests_before = stub.requests_served
+    uncached_ms = p50(page_load, args.iterations)
+    uncached_requests = (stub.requests_served - requests_before) / args.iterations
+
+    cache.ttl = 60
+    page_load()
+    requests_before = stub.requests_served
+    cached_ms = p50(page_load, args.iterations)
+    cached_requests = (stub.requests_served - requests_before) / args.iterations
+    invalidated_ms = p50(write_then_load, max(args.iterations // 5, 3))
+
+    print(f"🧪 Hrana stub: latencia {args.latency_ms} ms, príkaz {args.stmt_ms} ms, "
+          f"{len(ENDPOINTS)} endpointy na načítanie stránky\n")
+    print(f"{'bez cache':<28} p50 {uncached_ms:8.2f} ms  ({uncached_requests:.1f} requestov)")
+    print(f"{'cache hit':<28} p50 {cached_ms:8.2f} ms  ({cached_requests:.1f} requestov)")
+    print(f"{'zápis + načítanie (miss)':<28} p50 {invalidated_ms:8.2f} ms")
+    print(f"\nCache: {cache.stats()}")
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
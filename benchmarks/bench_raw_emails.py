@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sken Transactions pre /api/summary s RawEmailData v riadku vs. RawEmails
+
+Naplní SQLite súbor (migrácie po 0007) N transakciami s ~2 kB B-mailom v
+stĺpci RawEmailData a zmeria queries, ktoré pri /api/summary prechádzajú
+tabuľku Transactions (top obchodníci, pôvodný súhrn bez rollupov). Potom
+aplikuje migrations/0008_raw_emails.sql, skomprimuje presunuté emaily
+(raw_emails.compress) a meria znova - po migrácii aj po VACUUM. Každý beh
+otvára nové spojenie, aby SQLite page cache nezostala teplá.
+
+Migrácia beží s PRAGMA foreign_keys=ON (Turso cudzie kľúče vynucuje) a
+na konci sa overí PRAGMA foreign_key_check.
+
+    python benchmarks/bench_raw_emails.py --transactions 50000 -n 10
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrate import apply_sqlite  # noqa: E402
+from raw_emails import RAW_EMAIL_CODEC, compress, decompress  # noqa: E402
+
+QUERIES = {
+    # /api/summary - top obchodníci (jediná summary query, ktorá číta Transactions)
+    'top_merchants': """
+        SELECT MerchantName, COUNT(*) as count, SUM(ABS(Amount)) as total
+        FROM Transactions WHERE Amount < 0
+        GROUP BY MerchantName ORDER BY total DESC LIMIT 5""",
+    # /api/summary pred rollupmi - agregát cez celú tabuľku
+    'summary_scan': """
+        SELECT COUNT(*), SUM(CASE WHEN Amount < 0 THEN ABS(Amount) ELSE 0 END),
+               SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END), COUNT(DISTINCT CategoryID)
+        FROM Transactions NOT INDEXED""",
+}
+
+MERCHANTS = ['LIDL', 'BOLT', 'KAUFLAND', 'SHELL', 'TESCO', 'DM DROGERIE', 'IKEA', 'ORANGE']
+
+
+def make_body(rnd, merchant, amount, size_kb):
+    """Syntetický B-mail Tatra banky (~size_kb kB)"""
+    head = (
+        f"Vazeny klient,\n{rnd.randrange(1, 28)}.{rnd.randrange(1, 12)}.2025 {rnd.randrange(24)}:"
+        f"{rnd.randrange(60):02d} bol zostatok Vasho uctu SK3111000000002612345678 "
+        f"{'znizeny' if amount < 0 else 'zvyseny'} o {abs(amount):.2f} EUR.\n"
+        f"Popis transakcie: Platba kartou 4405**{rnd.randrange(1000, 9999)}, {merchant}.SVK{rnd.randrange(1000)}\n"
+        f"Referencia platitela: /VS{rnd.randrange(10 ** 9)}/SS/KS0308\n"
+        f"Ucel protistrany: {merchant} nakup {rnd.randrange(10 ** 6)}\n\n"
+    )
+    footer = (
+        "Aktualny zostatok a pohyby na ucte najdete v aplikacii Tatra banka. Toto je automaticky "
+        "generovana sprava, neodpovedajte na nu. S pozdravom Vasa Tatra banka, a.s. "
+    )
+    body = head
+    while len(body) < size_kb * 1024:
+        body += footer
+    return body
+
+
+def seed(path, count, size_kb):
+    conn = sqlite3.connect(path, isolation_level=None)
+    apply_sqlite(conn, until=7)
+    rnd = random.Random(1)
+    rows = []
+    for _ in range(count):
+        merchant = rnd.choice(MERCHANTS)
+        amount = round(rnd.uniform(-120, 60), 2)
+        rows.append((f"-{rnd.randrange(3 * 365)} days", amount, merchant, rnd.choice([1, 2, 3, 5, None]),
+                     'Debit' if amount < 0 else 'Credit', make_body(rnd, merchant, amount, size_kb)))
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, CategoryID, TransactionType, RawEmailData) "
+        "VALUES (datetime('now', ?), ?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def migrate_and_compress(path):
+    """0008 + kompresia presunutých emailov (ako raw_emails.compress_pending), vráti trvania v s"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON")
+    start = time.perf_counter()
+    apply_sqlite(conn, until=8)
+    migrated = time.perf_counter() - start
+    violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    assert not violations, f"foreign_key_check po 0008: {violations[:5]}"
+
+    start = time.perf_counter()
+    conn.execute("BEGIN")
+    rows = conn.execute("SELECT TransactionID, Body FROM RawEmails WHERE Codec = 'none'").fetchall()
+    conn.executemany(
+        "UPDATE RawEmails SET Codec = ?, Body = ?, OriginalSize = ? WHERE TransactionID = ?",
+        [(*compress(decompress('none', body)), tx_id) for tx_id, body in rows]
+    )
+    conn.execute("COMMIT")
+    compressed = time.perf_counter() - start
+    conn.close()
+    return migrated, compressed
+
+
+def vacuum(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def table_size(path, table):
+    conn = sqlite3.connect(path)
+    size = conn.execute("SELECT TOTAL(pgsize) FROM dbstat WHERE name = ?", [table]).fetchone()[0]
+    conn.close()
+    return size / 1024 / 1024
+
+
+def p50(path, sql, iterations):
+    timings = []
+    for _ in range(iterations):
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+        conn.close()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--body-kb', type=float, default=2)
+    parser.add_argument('-n', '--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_raw_emails_')
+    try:
+        before = os.path.join(workdir, 'before.db')
+        seed(before, args.transactions, args.body_kb)
+        after = os.path.join(workdir, 'after.db')
+        shutil.copy(before, after)
+        migrated_s, compressed_s = migrate_and_compress(after)
+        vacuumed = os.path.join(workdir, 'vacuumed.db')
+        shutil.copy(after, vacuumed)
+        vacuum(vacuumed)
+
+        variants = [('RawEmailData', before), ('RawEmails', after), ('+ VACUUM', vacuumed)]
+        print(f"🧪 {args.transactions} transakcií, B-mail ~{args.body_kb:g} kB, kodek {RAW_EMAIL_CODEC}, "
+              f"medián z {args.iterations} behov\n")
+        print(f"{'query':<16}" + ''.join(f"{name:>16}" for name, _ in variants))
+        for name, sql in QUERIES.items():
+            timings = [p50(path, sql, args.iterations) for _, path in variants]
+            print(f"{name:<16}" + ''.join(f"{ms:>13.2f} ms" for ms in timings)
+                  + f"   ({timings[0] / timings[-1]:.1f}x)")
+
+        print(f"\n{'Transactions':<16}" + ''.join(f"{table_size(p, 'Transactions'):>13.1f} MB" for _, p in variants))
+        print(f"{'RawEmails':<16}{'-':>16}" + ''.join(f"{table_size(p, 'RawEmails'):>13.1f} MB" for _, p in variants[1:]))
+        print(f"{'súbor':<16}" + ''.join(f"{os.path.getsize(p) / 1024 / 1024:>13.1f} MB" for _, p in variants))
+        print(f"\nMigrácia 0008: {migrated_s:.2f} s, kompresia emailov: {compressed_s:.2f} s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: čítanie z primárnej databázy vs. z lokálnej read repliky
+
+Naplní lokálny Hrana stub (simulovaná latencia siete), zosynchronizuje
+`turso_replica.LocalReplica` do dočasného súboru a porovná latenciu
+dashboard query cez `turso_query` bez repliky a s ňou. Meria aj čas
+inkrementálnej synchronizácie po vložení nových transakcií.
+
+    python benchmarks/bench_replica_reads.py -n 200 --latency-ms 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import start_stub  # noqa: E402
+
+QUERY = """
+SELECT c.Name AS category, SUM(ABS(t.Amount)) AS total
+FROM Transactions t
+LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
+WHERE t.Amount < 0 AND t.TransactionDate >= datetime('now', ?)
+GROUP BY c.Name
+ORDER BY total DESC;
+"""
+
+
+def insert_transactions(conn, count, rnd):
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, CategoryID, TransactionType) "
+        "VALUES (datetime('now', ?), ?, ?, ?, 'Debit')",
+        [(f"-{rnd.randrange(365)} days", -round(rnd.uniform(1, 80), 2),
+          rnd.choice(['LIDL', 'BOLT', 'KAUFLAND', 'SHELL']), rnd.choice([1, 2, 3, None]))
+         for _ in range(count)]
+    )
+
+
+def p50(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--transactions', type=int, default=5000)
+    args = parser.parse_args()
+
+    server, stub, url = start_stub(latency_ms=args.latency_ms)
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+    from migrate import apply_sqlite  # importuje turso_client - až po nastavení TURSO_* env
+
+    apply_sqlite(stub.conn)
+    rnd = random.Random(1)
+    insert_transactions(stub.conn, args.transactions, rnd)
+
+    import turso_client
+    from turso_client import turso_query
+    from turso_replica import LocalReplica
+
+    primary_ms = p50(lambda: turso_query(QUERY, ["-30 days"]), args.iterations)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replica = LocalReplica(os.path.join(tmp, 'replica.db'), sync_interval=3600)
+        start = time.perf_counter()
+        replica.sync()
+        initial_ms = (time.perf_counter() - start) * 1000
+
+        turso_client.set_read_router(replica.route)
+        assert turso_query(QUERY, ["-30 days"])["data"].rows == stub.conn.execute(QUERY, ["-30 days"]).fetchall()
+        replica_ms = p50(lambda: turso_query(QUERY, ["-30 days"]), args.iterations)
+
+        insert_transactions(stub.conn, 50, rnd)
+        start = time.perf_counter()
+        while not replica.sync():  # lock môže držať sync vlákno spustené routerom
+            time.sleep(0.005)
+            start = time.perf_counter()
+        incremental_ms = (time.perf_counter() - start) * 1000
+        turso_client.set_read_router(None)
+        replica.stop()
+
+    print(f"🧪 {args.transactions} transakcií, latencia stubu {args.latency_ms} ms, {args.iterations} queries\n")
+    print(f"{'primárna DB (HTTP)':<28} p50 {primary_ms:8.3f} ms")
+    print(f"{'lokálna replika':<28} p50 {replica_ms:8.3f} ms")
+    print(f"\nPrvá (plná) synchronizácia: {initial_ms:.0f} ms, inkrementálna (+50 riadkov): {incremental_ms:.0f} ms")
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: dekódovanie Hrana výsledku - dual-cased dicty vs. ResultSet
+
+Porovnáva pôvodný `turso_query` (dict na riadok, každý stĺpec 2x - pôvodný
+názov + lowercase, isinstance dispatch na každú bunku) s kompaktným
+`turso_client.ResultSet` (tuple riadky, dekodér vybraný raz na stĺpec).
+Meria čas dekódovania, pamäť (tracemalloc) a veľkosť + čas JSON odpovede.
+
+    python benchmarks/bench_result_decode.py --rows 10000 -n 20
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turso_client import decode_result, to_jsonable  # noqa: E402
+
+COLUMNS = [
+    'TransactionID', 'TransactionDate', 'Amount', 'Currency', 'MerchantName',
+    'Description', 'PaymentMethod', 'IBAN', 'CategoryName', 'CategoryIcon',
+    'CategorySource', 'AccountName', 'BankName'
+]
+
+
+def make_response(n_rows):
+    """Syntetická Hrana odpoveď v tvare /api/transactions/list"""
+    rows = []
+    for i in range(n_rows):
+        rows.append([
+            {"type": "integer", "value": str(i + 1)},
+            {"type": "text", "value": f"2025-03-{i % 28 + 1:02d}T14:35:00"},
+            {"type": "float", "value": -12.5 - (i % 100)},
+            {"type": "text", "value": "EUR"},
+            {"type": "text", "value": ("LIDL", "BOLT", "KAUFLAND", "Kaviareň Mondieu")[i % 4]},
+            {"type": "text", "value": "Platba kartou 4405**1234"},
+            {"type": "text", "value": "Card"},
+            {"type": "text", "value": "SK8911000000002933213912"},
+            {"type": "text", "value": "Potraviny"} if i % 5 else {"type": "null"},
+            {"type": "text", "value": "🛒"},
+            {"type": "text", "value": "Auto"},
+            {"type": "text", "value": "Osobný"},
+            {"type": "null"} if i % 3 else {"type": "text", "value": "Tatra banka"},
+        ])
+    return {
+        "type": "ok",
+        "response": {
+            "type": "execute",
+            "result": {"cols": [{"name": c} for c in COLUMNS], "rows": rows, "affected_row_count": 0}
+        }
+    }
+
+
+def legacy_decode(result_obj):
+    """Pôvodné dekódovanie z web_ui.turso_query"""
+    query_result = result_obj['response']['result']
+    columns = [col['name'] for col in query_result.get('cols', [])]
+    data = []
+    for row in query_result.get('rows', []):
+        row_dict = {}
+        for i, col_name in enumerate(columns):
+            cell = row[i]
+            if isinstance(cell, dict) and 'value' in cell:
+                value = cell['value']
+                if cell.get('type') == 'integer':
+                    row_dict[col_name] = int(value) if value is not None else None
+                elif cell.get('type') == 'float':
+                    row_dict[col_name] = float(value) if value is not None else None
+                else:
+                    row_dict[col_name] = value
+            elif isinstance(cell, dict) and cell.get('type') == 'null':
+                row_dict[col_name] = None
+            else:
+                row_dict[col_name] = cell
+            row_dict[col_name.lower()] = row_dict[col_name]
+        data.append(row_dict)
+    return {"success": True, "data": data}
+
+
+def time_it(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def retained_bytes(fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    response = make_response(args.rows)
+    legacy = legacy_decode(response)
+    compact = decode_result(response)
+    assert compact["data"].to_dicts() == [
+        {c: row[c] for c in COLUMNS} for row in legacy["data"]
+    ], "výsledky sa líšia"
+
+    legacy_json = json.dumps(legacy["data"])
+    compact_json = json.dumps(compact["data"], default=to_jsonable)
+
+    rows = [
+        ("dual-cased dict (pôvodné)",
+         time_it(lambda: legacy_decode(response), args.iterations),
+         retained_bytes(lambda: legacy_decode(response)),
+         time_it(lambda: json.dumps(legacy["data"]), args.iterations),
+         len(legacy_json.encode('utf-8'))),
+        ("ResultSet (tuple riadky)",
+         time_it(lambda: decode_result(response), args.iterations),
+         retained_bytes(lambda: decode_result(response)),
+         time_it(lambda: json.dumps(compact["data"], default=to_jsonable), args.iterations),
+         len(compact_json.encode('utf-8'))),
+    ]
+
+    print(f"📊 {args.rows} riadkov x {len(COLUMNS)} stĺpcov, medián z {args.iterations} behov\n")
+    print(f"{'':<28}{'decode':>10}{'pamäť':>12}{'json.dumps':>12}{'JSON':>12}")
+    for label, decode_ms, mem, dumps_ms, size in rows:
+        print(f"{label:<28}{decode_ms:>7.1f} ms{mem / 1e6:>9.2f} MB{dumps_ms:>9.1f} ms{size / 1e6:>9.2f} MB")
+
+    (_, legacy_ms, legacy_mem, legacy_dumps, legacy_size), (_, new_ms, new_mem, new_dumps, new_size) = rows
+    print(f"\nDecode {legacy_ms / new_ms:.2f}x rýchlejšie, pamäť {legacy_mem / new_mem:.2f}x menej, "
+          f"JSON {legacy_size / new_size:.2f}x menší ({legacy_dumps / new_dumps:.2f}x rýchlejší dumps)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
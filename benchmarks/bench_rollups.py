@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dashboard agregáty z Transactions vs. z rollup tabuľky
+
+Naplní SQLite databázu (všetky migrácie - rollupy v centoch podľa TxDay)
+N transakciami za niekoľko rokov a porovná čas pôvodných GROUP BY queries
+cez celú tabuľku Transactions s queries nad TransactionRollups (to, čo
+robí server pri /api/summary a /api/gpt/transactions/monthly). Meria aj
+réžiu triggerov pri vkladaní, overí konzistenciu (rollups.CHECK_SQL) a
+ukáže odchýlku float súčtu SUM(Amount) od presného SUM(AmountCents).
+
+    python benchmarks/bench_rollups.py --transactions 100000 -n 20
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrate import apply_sqlite  # noqa: E402
+from query_filters import month_label  # noqa: E402
+from rollups import CHECK_SQL  # noqa: E402
+
+LEGACY = {
+    'summary': """
+        SELECT COUNT(*), SUM(CASE WHEN Amount < 0 THEN ABS(Amount) ELSE 0 END),
+               SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END),
+               AVG(CASE WHEN Amount < 0 THEN ABS(Amount) ELSE NULL END)
+        FROM Transactions""",
+    'by_category': """
+        SELECT c.Name, SUM(ABS(t.Amount)) AS total FROM Transactions t
+        LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
+        WHERE t.Amount < 0 GROUP BY c.Name ORDER BY total DESC""",
+    'monthly': """
+        SELECT strftime('%Y-%m', TransactionDate) AS month, COUNT(*),
+               SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END),
+               SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END)
+        FROM Transactions GROUP BY month ORDER BY month DESC""",
+}
+
+ROLLUP = {
+    'summary': """
+        SELECT SUM(TxCount), SUM(ExpenseCents) / 100.0, SUM(IncomeCents) / 100.0,
+               SUM(ExpenseCents) / 100.0 / NULLIF(SUM(ExpenseCount), 0)
+        FROM TransactionRollups""",
+    'by_category': """
+        SELECT c.Name, SUM(r.ExpenseCents) / 100.0 AS total FROM TransactionRollups r
+        LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+        WHERE r.ExpenseCount > 0 GROUP BY c.Name ORDER BY total DESC""",
+    'monthly': f"""
+        SELECT {month_label('Day')} AS month, SUM(TxCount), -SUM(ExpenseCents) / 100.0, SUM(IncomeCents) / 100.0
+        FROM TransactionRollups GROUP BY Day / 100 ORDER BY month DESC""",
+}
+
+
+def rows(count, rnd):
+    for _ in range(count):
+        amount = round(rnd.uniform(-120, 60), 2)
+        yield (f"-{rnd.randrange(5 * 365)} days", amount, rnd.choice(['LIDL', 'BOLT', 'KAUFLAND', 'SHELL']),
+               rnd.choice([1, 2, 3, 5, 8, None]), rnd.choice([1, 2]), 'Debit' if amount < 0 else 'Credit')
+
+
+def insert(conn, count, rnd):
+    start = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, CategoryID, AccountID, TransactionType) "
+        "VALUES (datetime('now', ?), ?, ?, ?, ?, ?)",
+        rows(count, rnd)
+    )
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def p50(conn, sql, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def make_db(with_rollups):
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    # 0004 = schéma bez rollupov, všetky = rollupy v centoch + kanonické stĺpce
+    apply_sqlite(conn, until=None if with_rollups else 4)
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    plain, rolled = make_db(False), make_db(True)
+    plain_us = insert(plain, args.transactions, random.Random(1))
+    rolled_us = insert(rolled, args.transactions, random.Random(1))
+    problems = rolled.execute(CHECK_SQL, [10]).fetchall()
+    rollup_rows = rolled.execute("SELECT COUNT(*) FROM TransactionRollups").fetchone()[0]
+
+    print(f"🧪 {args.transactions} transakcií, {rollup_rows} riadkov rollupov, medián z {args.iterations} behov\n")
+    print(f"{'query':<14}{'Transactions':>16}{'rollupy':>12}{'zrýchlenie':>14}")
+    for name in LEGACY:
+        legacy_ms = p50(plain, LEGACY[name], args.iterations)
+        rollup_ms = p50(rolled, ROLLUP[name], args.iterations)
+        print(f"{name:<14}{legacy_ms:>13.2f} ms{rollup_ms:>9.2f} ms{legacy_ms / rollup_ms:>13.1f}x")
+    print(f"\nINSERT: {plain_us:.1f} µs bez triggerov, {rolled_us:.1f} µs s triggermi na transakciu")
+    print(f"Konzistencia (rollups.CHECK_SQL): {'OK' if not problems else f'{len(problems)} rozdielov'}")
+    float_sum, cents_sum = rolled.execute("SELECT SUM(Amount), SUM(AmountCents) FROM Transactions").fetchone()
+    sign = '-' if cents_sum < 0 else ''
+    print(f"SUM(Amount) = {float_sum!r}, SUM(AmountCents) / 100 = {sign}{abs(cents_sum) // 100}.{abs(cents_sum) % 100:02d} "
+          f"(float odchýlka {abs(float_sum * 100 - cents_sum) / 100:.2e} EUR)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import výpisu - jednotlivé INSERTy vs. dávkový import
+
+Vygeneruje Tatra banka CSV výpis s N transakciami a importuje ho do
+lokálneho Hrana stubu so simulovanou latenciou siete (`--latency-ms`):
+
+- po riadku: jeden `turso_query` INSERT na transakciu (ako B-mail ingestion)
+- dávkovo: `statement_import.import_statements` (viacriadkové INSERTy,
+  IMPORT_BATCH_SIZE riadkov na request, dedupe dotaz na dávku)
+
+Zvlášť meria samotné parsovanie väčšieho súboru (`--parse-rows`) v jednom
+procese a v process poole. Na konci overí, že opakovaný import nič nevloží.
+
+    python benchmarks/bench_statement_import.py --transactions 5000 --latency-ms 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import start_stub  # noqa: E402
+
+IBAN = 'SK8911000000002933213912'
+MERCHANTS = ['LIDL', 'BOLT', 'KAUFLAND', 'SHELL', 'TESCO', 'DM DROGERIE', 'IKEA', 'ORANGE']
+HEADER = ('Dátum transakcie;Dátum zaúčtovania;Suma;Mena;Názov protiúčtu;Protiúčet;'
+          'Popis transakcie;Referencia platiteľa;Informácia pre príjemcu\n')
+
+
+def write_statement(path, count, seed=1):
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        for _ in range(count):
+            day = (start + timedelta(days=rnd.randrange(365))).strftime('%d.%m.%Y')
+            amount = f"{rnd.uniform(-120, 60):.2f}".replace('.', ',')
+            merchant = rnd.choice(MERCHANTS)
+            f.write(f"{day};{day};{amount};EUR;{merchant} s.r.o.;;Platba kartou 4405**{rnd.randrange(1000, 9999)}, "
+                    f"{merchant};/VS{rnd.randrange(10 ** 6)}/SS/KS0308;nákup {rnd.randrange(10 ** 4)}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=5000)
+    parser.add_argument('--parse-rows', type=int, default=200000)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    server, stub, url = start_stub(latency_ms=args.latency_ms)
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+
+    from migrate import apply_sqlite
+    import statement_import
+    from turso_client import turso_query
+
+    apply_sqlite(stub.conn)
+    stub.conn.execute("INSERT INTO Accounts (IBAN, AccountName) VALUES (?, 'Osobný')", [IBAN])
+    stub.conn.commit()
+
+    workdir = tempfile.mkdtemp(prefix='bench_import_')
+    statement = os.path.join(workdir, 'vypis.csv')
+    write_statement(statement, args.transactions)
+
+    print(f"🧪 {args.transactions} transakcií, latencia {args.latency_ms} ms na request\n")
+
+    # Po riadku - rovnaké záznamy, jeden INSERT = jeden request
+    records = [r for block, _ in statement_import.parse_blocks([statement], IBAN) for r in block]
+    columns = statement_import.INSERT_COLUMNS
+    sql = f"INSERT INTO Transactions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))});"
+    start = time.perf_counter()
+    for record in records:
+        record['AccountID'], record['CreatedAt'] = 1, datetime.now().isoformat()
+        turso_query(sql, [record[c] for c in columns])
+    single_s = time.perf_counter() - start
+    print(f"{'po riadku':<12}{single_s:>8.2f} s{len(records) / single_s:>10.0f} riadkov/s{len(records):>8} requestov")
+
+    stub.conn.execute("DELETE FROM Transactions")
+    stub.conn.commit()
+    stats = statement_import.import_statements([statement], IBAN, workers=1)
+    print(f"{'dávkovo':<12}{stats.seconds:>8.2f} s{stats.rows_per_second:>10.0f} riadkov/s{stats.requests:>8} requestov"
+          f"   ({single_s / stats.seconds:.0f}x)")
+
+    again = statement_import.import_statements([statement], IBAN, workers=1)
+    print(f"\nOpakovaný import: vložených {again.inserted}, duplicít {again.duplicates}")
+    count = stub.conn.execute("SELECT COUNT(*) FROM Transactions").fetchone()[0]
+    assert again.inserted == 0 and count == args.transactions, (again, count)
+
+    big = os.path.join(workdir, 'velky.csv')
+    write_statement(big, args.parse_rows, seed=2)
+    print(f"\nParsovanie {args.parse_rows} riadkov ({os.path.getsize(big) / 1024 / 1024:.1f} MB):")
+    for workers in sorted({1, statement_import.IMPORT_WORKERS}):
+        start = time.perf_counter()
+        parsed = sum(len(block) for block, _ in statement_import.parse_blocks([big], IBAN, workers))
+        elapsed = time.perf_counter() - start
+        print(f"  {workers:>2} proces(y) {elapsed:>7.2f} s{parsed / elapsed:>10.0f} riadkov/s")
+
+    os.remove(statement)
+    os.remove(big)
+    os.rmdir(workdir)
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latencia /api/summary - sekvenčne vs. pipeline vs. async fan-out
+
+Volá skutočný handler `web_ui.get_summary` (Flask test client) proti
+lokálnemu Hrana stubu so simulovanou latenciou siete (`--latency-ms`) a
+časom vykonania príkazu na serveri (`--stmt-ms`). Režimy:
+
+- sekvenčne: 5x turso_query, latencia = súčet round tripov
+- pipeline: turso_query_many, 1 round trip, príkazy na serveri po sebe
+- fan-out: turso_query_concurrent, 5 súbežných requestov, ~ najpomalší príkaz
+
+    python benchmarks/bench_summary_fanout.py -n 30 --latency-ms 20 --stmt-ms 15
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import start_stub  # noqa: E402
+
+
+def seed(stub, n_transactions):
+    from migrate import apply_sqlite  # importuje turso_client - až po nastavení TURSO_* env
+
+    conn = stub.conn
+    apply_sqlite(conn)
+    rnd = random.Random(1)
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, CategoryID, TransactionType) "
+        "VALUES (datetime('now', ?), ?, ?, ?, ?)",
+        [
+            (f"-{i % 365} days", amount, rnd.choice(['LIDL', 'BOLT', 'KAUFLAND', 'SHELL']),
+             rnd.choice([1, 2, 3, None]), 'Debit' if amount < 0 else 'Credit')
+            for i, amount in ((i, round(rnd.uniform(-80, 40), 2)) for i in range(n_transactions))
+        ]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--stmt-ms', type=float, default=15.0)
+    parser.add_argument('--transactions', type=int, default=2000)
+    args = parser.parse_args()
+
+    server, stub, url = start_stub(latency_ms=args.latency_ms, stmt_ms=args.stmt_ms)
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'bench'
+    seed(stub, args.transactions)
+    os.environ['QUERY_CACHE_TTL'] = '0'  # meriame databázu, nie cache
+
+    import web_ui
+    from turso_client import turso_query, turso_query_concurrent, turso_query_many
+
+    def sequential(statements):
+        return [turso_query(sql) for sql in statements]
+
+    client = web_ui.app.test_client()
+    modes = [
+        ("sekvenčne (5x turso_query)", sequential),
+        ("pipeline (turso_query_many)", turso_query_many),
+        ("fan-out (turso_query_concurrent)", turso_query_concurrent),
+    ]
+
+    print(f"🧪 Hrana stub: latencia {args.latency_ms} ms, príkaz {args.stmt_ms} ms, "
+          f"{args.iterations} volaní /api/summary\n")
+    results = {}
+    for label, fn in modes:
+        web_ui.turso_query_concurrent = fn
+        assert client.get('/api/summary').status_code == 200  # zahriatie spojení
+        timings = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            client.get('/api/summary')
+            timings.append((time.perf_counter() - start) * 1000)
+        results[label] = statistics.median(timings)
+        print(f"{label:<34} p50 {results[label]:8.1f} ms")
+
+    slowest = args.latency_ms + args.stmt_ms
+    print(f"\nNajpomalší jednotlivý query (teoreticky): ~{slowest:.0f} ms")
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
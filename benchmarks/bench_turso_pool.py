@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latencia jedného Turso query - nové spojenie vs. keep-alive pool
+
+Porovnáva pôvodné správanie (`requests.post` = nový TCP/TLS handshake pre
+každý príkaz) so zdieľaným `turso_client.TursoClient`.
+
+Bez argumentov beží proti lokálnemu Hrana stubu so simulovaným handshake;
+s `--real` proti databáze z TURSO_DATABASE_URL / TURSO_AUTH_TOKEN.
+
+    python benchmarks/bench_turso_pool.py -n 100 --latency-ms 15 --handshake-ms 40
+    python benchmarks/bench_turso_pool.py --real -n 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import turso_client  # noqa: E402
+from turso_client import TursoClient, to_http_url  # noqa: E402
+from hrana_stub import start_stub  # noqa: E402
+
+QUERY = "SELECT 1 AS one;"
+
+
+def legacy_query(http_url, auth_token, sql):
+    """Pôvodná implementácia - samostatný requests.post na každý príkaz"""
+    response = requests.post(
+        f"{http_url}/v2/pipeline",
+        headers={
+            "Authorization": f"Bearer {auth_token}",
+            "Content-Type": "application/json"
+        },
+        json={"requests": [{"type": "execute", "stmt": {"sql": sql}}]},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def measure(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings_sorted = sorted(timings)
+    p95 = timings_sorted[int(len(timings_sorted) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(timings):8.2f} ms   "
+          f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=100)
+    parser.add_argument('--real', action='store_true', help="použiť TURSO_DATABASE_URL namiesto stubu")
+    parser.add_argument('--latency-ms', type=float, default=10.0, help="simulovaná latencia requestu (stub)")
+    parser.add_argument('--handshake-ms', type=float, default=30.0, help="simulovaný TCP+TLS handshake (stub)")
+    args = parser.parse_args()
+
+    if args.real:
+        http_url = to_http_url(turso_client.TURSO_DATABASE_URL)
+        auth_token = turso_client.TURSO_AUTH_TOKEN
+        if not http_url:
+            print("❌ TURSO_DATABASE_URL nie je nastavená")
+            return 1
+        server = stub = None
+    else:
+        server, stub, http_url = start_stub(latency_ms=args.latency_ms, handshake_ms=args.handshake_ms)
+        auth_token = 'bench'
+        print(f"🧪 Hrana stub {http_url} (latencia {args.latency_ms} ms, handshake {args.handshake_ms} ms)")
+
+    client = TursoClient(database_url=http_url, auth_token=auth_token)
+    client.execute(QUERY)  # zahriatie poolu
+
+    legacy = measure(lambda: legacy_query(http_url, auth_token, QUERY), args.iterations)
+    pooled = measure(lambda: client.execute(QUERY), args.iterations)
+
+    print(f"\n{args.iterations} x {QUERY!r}")
+    report("requests.post (pôvodné)", legacy)
+    report("TursoClient (keep-alive)", pooled)
+    print(f"\nZrýchlenie (mean): {statistics.mean(legacy) / statistics.mean(pooled):.2f}x")
+    if stub is not None:
+        print(f"Otvorené TCP spojenia na stube: {stub.connections_opened}")
+
+    client.close()
+    if server is not None:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: webhook INSERT - escapovaný f-string vs. bound parametre
+
+Porovnáva pôvodný INSERT z `/api/receive-email` (celé telo B-mailu vložené
+do SQL cez `.replace("'", "''")`) s príkazom s `?` parametrami, kde telo
+ide ako typovaná Hrana hodnota. Meria veľkosť JSON requestu a CPU čas
+zostavenia + serializácie; s `--stub` aj celý round trip cez lokálny stub.
+
+    python benchmarks/bench_webhook_insert.py --body-kb 8 -n 2000
+    python benchmarks/bench_webhook_insert.py --stub -n 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turso_client import TursoClient, make_stmt  # noqa: E402
+from hrana_stub import start_stub  # noqa: E402
+
+BMAIL_HEAD = (
+    "Vazeny klient,\n\n"
+    "12.3.2025 14:35 bol zostatok Vasho uctu SK1234567890123456789012 znizeny o 23,50 EUR.\n"
+    "Popis transakcie: Platba kartou 4405**1234, LIDL SLOVENSKA REPUBLIKA\n"
+    "Ucet protistrany: LIDL s.r.o.\n"
+    "Ucel protistrany: Nakup potravin 'Petrzalka'\n"
+    "Informacia pre prijemcu: O'Neill, 1. trieda\n\n"
+)
+BMAIL_FOOTER = (
+    "Toto je automaticky generovana sprava, neodpovedajte na nu. "
+    "S pozdravom Vasa Tatra banka, a.s. - 'Banka roka'. "
+)
+
+INSERT_COLUMNS = """
+    TransactionDate, Amount, Currency, MerchantName, Description,
+    IBAN, TransactionType, PaymentMethod, RawEmailData,
+    CategorySource, AccountID, RecipientInfo, CounterpartyPurpose, CreatedAt
+"""
+
+PARAM_SQL = f"""
+INSERT INTO Transactions ({INSERT_COLUMNS}) VALUES (?, ?, 'EUR', ?, ?, ?, ?, ?, ?, 'Email', ?, ?, ?, ?);
+"""
+
+SCHEMA = f"CREATE TABLE Transactions (TransactionID INTEGER PRIMARY KEY, {INSERT_COLUMNS});"
+
+
+def make_body(size_kb):
+    """Syntetické telo B-mailu s apostrofmi v pätičke (~size_kb KB)"""
+    body = BMAIL_HEAD
+    while len(body) < size_kb * 1024:
+        body += BMAIL_FOOTER
+    return body
+
+
+def sample_fields(body):
+    return {
+        'trans_date': datetime(2025, 3, 12, 14, 35),
+        'amount': -23.5,
+        'merchant': 'LIDL s.r.o.',
+        'description': 'Platba kartou 4405**1234, LIDL SLOVENSKA REPUBLIKA',
+        'iban': 'SK1234567890123456789012',
+        'payment_method': 'Card',
+        'email_body': body,
+        'account_id': 1,
+        'recipient_info': "O'Neill, 1. trieda",
+        'counterparty_purpose': "Nakup potravin 'Petrzalka'",
+    }
+
+
+def legacy_stmt(f):
+    """Pôvodné zostavenie INSERTu z receive_email"""
+    account_id_sql = str(f['account_id']) if f['account_id'] else 'NULL'
+    sql = f"""
+    INSERT INTO Transactions ({INSERT_COLUMNS}) VALUES (
+        '{f['trans_date'].isoformat()}', {f['amount']}, 'EUR',
+        '{f['merchant'].replace("'", "''")}', '{f['description'].replace("'", "''")}',
+        '{f['iban']}', '{'Debit' if f['amount'] < 0 else 'Credit'}', '{f['payment_method']}',
+        '{f['email_body'].replace("'", "''")}', 'Email', {account_id_sql},
+        '{f['recipient_info'].replace("'", "''")}', '{f['counterparty_purpose'].replace("'", "''")}',
+        '{datetime.now().isoformat()}'
+    );
+    """
+    return {"sql": sql}
+
+
+def param_stmt(f):
+    """Nové zostavenie s bound parametrami"""
+    return make_stmt(PARAM_SQL, [
+        f['trans_date'].isoformat(), f['amount'], f['merchant'], f['description'],
+        f['iban'], 'Debit' if f['amount'] < 0 else 'Credit', f['payment_method'],
+        f['email_body'], f['account_id'], f['recipient_info'], f['counterparty_purpose'],
+        datetime.now().isoformat()
+    ])
+
+
+def request_body(stmt):
+    return json.dumps({"requests": [{"type": "execute", "stmt": stmt}, {"type": "close"}]})
+
+
+def measure_cpu(build, fields, iterations):
+    """CPU čas zostavenia statementu + JSON serializácie (µs / insert)"""
+    start = time.process_time()
+    for _ in range(iterations):
+        request_body(build(fields))
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def measure_roundtrip(client, build, fields, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        client.pipeline([{"type": "execute", "stmt": build(fields)}])
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=2000)
+    parser.add_argument('--body-kb', type=float, default=8.0, help="veľkosť tela B-mailu v KB")
+    parser.add_argument('--stub', action='store_true', help="zmerať aj round trip cez lokálny Hrana stub")
+    args = parser.parse_args()
+
+    fields = sample_fields(make_body(args.body_kb))
+    legacy_size = len(request_body(legacy_stmt(fields)).encode('utf-8'))
+    param_size = len(request_body(param_stmt(fields)).encode('utf-8'))
+
+    print(f"📧 Telo B-mailu: {len(fields['email_body'])} B, {args.iterations} insertov\n")
+    print(f"{'':<26}{'request JSON':>14}{'CPU / insert':>16}")
+    legacy_cpu = measure_cpu(legacy_stmt, fields, args.iterations)
+    param_cpu = measure_cpu(param_stmt, fields, args.iterations)
+    print(f"{'f-string + replace':<26}{legacy_size:>12} B{legacy_cpu:>13.1f} µs")
+    print(f"{'bound parametre':<26}{param_size:>12} B{param_cpu:>13.1f} µs")
+    print(f"\nRozdiel (f-string - parametre): {legacy_size - param_size} B na request "
+          f"({(1 - param_size / legacy_size) * 100:.1f} %), CPU {legacy_cpu / param_cpu:.2f}x")
+
+    if args.stub:
+        server, stub, url = start_stub()
+        stub.conn.execute(SCHEMA)
+        client = TursoClient(database_url=url, auth_token='bench')
+        iterations = min(args.iterations, 500)
+        legacy_rt = measure_roundtrip(client, legacy_stmt, fields, iterations)
+        param_rt = measure_roundtrip(client, param_stmt, fields, iterations)
+        print(f"\nRound trip cez stub ({iterations}x): f-string {legacy_rt:.2f} ms, "
+              f"parametre {param_rt:.2f} ms")
+        client.close()
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Kontrola plánov: každý endpoint číta Transactions cez index
+
+Spustí skutočné handlery web_ui a api_server (Flask test client) proti
+lokálnemu Hrana stubu so všetkými migráciami (migrate.apply_sqlite), zachytí
+každý SQL príkaz, ktorý endpoint pošle, a pre príkazy nad Transactions
+vykoná `EXPLAIN QUERY PLAN` s tými istými argumentmi. Príkaz neprejde, ak
+plán obsahuje `SCAN` tabuľky Transactions bez indexu (full table scan).
+
+    python benchmarks/check_query_plans.py          # exit 1 pri full scane
+    python benchmarks/check_query_plans.py -v       # vypíše aj plány
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hrana_stub import decode_value, start_stub  # noqa: E402
+from query_filters import encode_cursor  # noqa: E402
+
+CURSOR = encode_cursor({"TxEpoch": 1748779200, "TransactionID": 2500})  # 2025-06-01 12:00:00
+
+WEB_UI_ENDPOINTS = [
+    '/api/summary',
+    '/api/categories/list',
+    '/api/transactions/list?limit=50',
+    '/api/transactions/list?date_from=2025-01-01&date_to=2025-03-31',
+    '/api/transactions/list?category=Potraviny',
+    '/api/transactions/list?category=Nezaradené',
+    '/api/transactions/list?type=expense&date_from=2025-02-01',
+    '/api/transactions/list?with_total=1',
+    '/api/transactions/list?search=kaviaren',
+    '/api/transactions/list?search=lid&category=Potraviny&with_total=1',
+    '/api/transactions/list?category=Potraviny&with_total=1',
+    f'/api/transactions/list?cursor={CURSOR}',
+    f'/api/transactions/list?category=Nezaradené&cursor={CURSOR}',
+    '/api/transactions/export?format=ndjson',
+    '/api/transactions/export?format=csv&type=expense&date_from=2025-01-01&include_raw=1',
+    '/api/gpt/transactions/summary?days=30',
+    '/api/gpt/transactions/summary?days=30&account_id=1',
+    '/api/gpt/transactions/recent?limit=10',
+    '/api/gpt/transactions/by-category?days=30',
+    '/api/gpt/transactions/top-merchants?days=30',
+    '/api/gpt/transactions/monthly?months=6',
+    '/api/gpt/transactions/search?merchant=LIDL',
+    '/api/gpt/transactions/search?account_id=1&min_amount=-50',
+    f'/api/gpt/transactions/search?account_id=1&cursor={CURSOR}',
+    '/api/gpt/transactions/search?merchant=kaviareň&sort=relevance',
+    '/api/gpt/accounts/1/summary?days=30',
+]
+
+API_SERVER_ENDPOINTS = [
+    '/api/transactions/summary?days=30&account_id=1',
+    '/api/transactions/recent?limit=10',
+    '/api/transactions/top-merchants?days=30',
+    '/api/transactions/monthly?months=6',
+    '/api/transactions/search?merchant=LIDL&account_id=1',
+    '/api/accounts/1/summary?days=30',
+]
+
+FULL_SCAN = re.compile(r'^SCAN (t|Transactions)\b(?!.*USING (COVERING )?INDEX)')
+TOUCHES_TRANSACTIONS = re.compile(r'\bTransactions\b')
+
+
+def seed(conn, count):
+    from migrate import apply_sqlite  # importuje turso_client - až po nastavení TURSO_* env
+
+    apply_sqlite(conn)
+    conn.execute("INSERT INTO Accounts (IBAN, AccountName) VALUES ('SK8911000000002933213912', 'Osobný')")
+    rnd = random.Random(1)
+    conn.executemany(
+        "INSERT INTO Transactions (TransactionDate, Amount, MerchantName, CategoryID, AccountID, TransactionType) "
+        "VALUES (datetime('now', ?), ?, ?, ?, ?, ?)",
+        [
+            (f"-{rnd.randrange(3 * 365)} days", amount, rnd.choice(['LIDL', 'BOLT', 'KAUFLAND', 'SHELL']),
+             rnd.choice([1, 2, 3, 5, None]), rnd.choice([1, None]), 'Debit' if amount < 0 else 'Credit')
+            for amount in (round(rnd.uniform(-120, 60), 2) for _ in range(count))
+        ]
+    )
+    conn.execute("ANALYZE")
+
+
+def record_statements(stub):
+    """Obalí stub.execute_stmt - zoznam (sql, params) vykonaných príkazov"""
+    recorded = []
+    original = stub.execute_stmt
+
+    def execute_stmt(stmt):
+        if stmt.get('named_args'):
+            params = {a['name'].lstrip(':@$'): decode_value(a['value']) for a in stmt['named_args']}
+        else:
+            params = [decode_value(a) for a in stmt.get('args', [])]
+        recorded.append((stmt['sql'], params))
+        return original(stmt)
+
+    stub.execute_stmt = execute_stmt
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=5000)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server, stub, url = start_stub()
+    os.environ['TURSO_DATABASE_URL'] = url
+    os.environ['TURSO_AUTH_TOKEN'] = 'plans'
+    seed(stub.conn, args.transactions)
+    os.environ['QUERY_CACHE_TTL'] = '0'
+    recorded = record_statements(stub)
+
+    import api_server
+    import web_ui
+
+    targets = [
+        (web_ui.app, {'Authorization': f'Bearer {web_ui.GPT_API_KEY}'}, WEB_UI_ENDPOINTS),
+        (api_server.app, {'Authorization': f'Bearer {api_server.API_KEY}'}, API_SERVER_ENDPOINTS),
+    ]
+
+    failures = 0
+    checked = 0
+    for app, headers, endpoints in targets:
+        client = app.test_client()
+        for endpoint in endpoints:
+            recorded.clear()
+            response = client.get(endpoint, headers=headers)
+            response.get_data()  # streamované odpovede (export) vykonajú dotazy až pri čítaní
+            status = response.status_code
+            print(f"{'✅' if status < 500 else '⚠️ '} {endpoint} (HTTP {status})")
+            for sql, params in list(recorded):
+                if not TOUCHES_TRANSACTIONS.search(sql) or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                    continue
+                try:
+                    plan = [row[3] for row in stub.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+                except sqlite3.Error as e:
+                    print(f"     ⚠️  nedá sa vyhodnotiť: {e}")
+                    continue
+                checked += 1
+                scans = [detail for detail in plan if FULL_SCAN.search(detail)]
+                first_line = ' '.join(sql.split())[:90]
+                if scans:
+                    failures += 1
+                    print(f"     ❌ full scan: {first_line}")
+                    for detail in plan:
+                        print(f"          {detail}")
+                elif args.verbose:
+                    print(f"     ✓ {first_line}")
+                    for detail in plan:
+                        print(f"          {detail}")
+
+    print(f"\n{checked} príkazov nad Transactions, {failures} s full table scanom")
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Lokálny Hrana (/v2/pipeline) server nad sqlite3 pre benchmarky
+
+Implementuje podmnožinu protokolu, ktorú používa turso_client: `execute`,
+`batch` (s podmienkami ok/not/and/or) a `close`. Voliteľne simuluje sieťovú
+latenciu na request (`latency_ms`), cenu nového TCP/TLS spojenia
+(`handshake_ms`), aby bolo vidno rozdiel medzi keep-alive a novým spojením,
+a čas vykonania jedného príkazu na serveri (`stmt_ms`).
+
+Použitie:
+    python benchmarks/hrana_stub.py --port 8089 --db /tmp/finance.db --latency-ms 20
+"""
+
+import argparse
+import base64
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def encode_value(value):
+    """Python hodnota -> Hrana value"""
+    if value is None:
+        return {"type": "null"}
+    if isinstance(value, int):
+        return {"type": "integer", "value": str(value)}
+    if isinstance(value, float):
+        return {"type": "float", "value": value}
+    if isinstance(value, bytes):
+        return {"type": "blob", "base64": base64.b64encode(value).decode('ascii')}
+    return {"type": "text", "value": str(value)}
+
+
+def decode_value(cell):
+    """Hrana value -> Python hodnota"""
+    cell_type = cell.get('type')
+    if cell_type == 'null':
+        return None
+    if cell_type == 'integer':
+        return int(cell['value'])
+    if cell_type == 'float':
+        return float(cell['value'])
+    if cell_type == 'blob':
+        return base64.b64decode(cell['base64'])
+    return cell['value']
+
+
+class HranaStub:
+    """sqlite3 databáza + vykonávanie Hrana requestov"""
+
+    def __init__(self, db_path=':memory:'):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.requests_served = 0
+        self.connections_opened = 0
+
+    def execute_stmt(self, stmt):
+        sql = stmt['sql']
+        if stmt.get('named_args'):
+            params = {arg['name'].lstrip(':@$'): decode_value(arg['value']) for arg in stmt['named_args']}
+        else:
+            params = [decode_value(arg) for arg in stmt.get('args', [])]
+        cursor = self.conn.execute(sql, params)
+        cols = [{"name": d[0], "decltype": None} for d in (cursor.description or [])]
+        rows = [[encode_value(v) for v in row] for row in cursor.fetchall()]
+        return {
+            "cols": cols,
+            "rows": rows,
+            "affected_row_count": max(cursor.rowcount, 0) if not cols else 0,
+            "last_insert_rowid": str(cursor.lastrowid) if cursor.lastrowid else None,
+            "replication_index": None
+        }
+
+    def _condition(self, cond, step_results, step_errors):
+        kind = cond['type']
+        if kind == 'ok':
+            return step_results[cond['step']] is not None
+        if kind == 'error':
+            return step_errors[cond['step']] is not None
+        if kind == 'not':
+            return not self._condition(cond['cond'], step_results, step_errors)
+        if kind == 'and':
+            return all(self._condition(c, step_results, step_errors) for c in cond['conds'])
+        if kind == 'or':
+            return any(self._condition(c, step_results, step_errors) for c in cond['conds'])
+        raise ValueError(f"Unknown condition {kind}")
+
+    def execute_batch(self, batch):
+        steps = batch['steps']
+        step_results = [None] * len(steps)
+        step_errors = [None] * len(steps)
+        for i, step in enumerate(steps):
+            cond = step.get('condition')
+            if cond is not None and not self._condition(cond, step_results, step_errors):
+                continue
+            try:
+                step_results[i] = self.execute_stmt(step['stmt'])
+            except sqlite3.Error as e:
+                step_errors[i] = {"message": str(e)}
+        return {"step_results": step_results, "step_errors": step_errors}
+
+    def count_statements(self, body):
+        """Počet SQL príkazov v pipeline (execute + kroky batchov)"""
+        count = 0
+        for req in body.get('requests', []):
+            if req.get('type') == 'execute':
+                count += 1
+            elif req.get('type') == 'batch':
+                count += len(req['batch']['steps'])
+        return count
+
+    def pipeline(self, body):
+        results = []
+        with self.lock:
+            self.requests_served += 1
+            for req in body.get('requests', []):
+                kind = req.get('type')
+                try:
+                    if kind == 'execute':
+                        response = {"type": "execute", "result": self.execute_stmt(req['stmt'])}
+                    elif kind == 'batch':
+                        response = {"type": "batch", "result": self.execute_batch(req['batch'])}
+                    elif kind == 'close':
+                        response = {"type": "close"}
+                    else:
+                        raise ValueError(f"Unsupported request type {kind}")
+                    results.append({"type": "ok", "response": response})
+                except (sqlite3.Error, ValueError) as e:
+                    results.append({"type": "error", "error": {"message": str(e)}})
+        return {"baton": None, "base_url": None, "results": results}
+
+
+def make_handler(stub, latency_ms=0.0, handshake_ms=0.0, stmt_ms=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            stub.connections_opened += 1
+            if handshake_ms:
+                time.sleep(handshake_ms / 1000)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if self.path.rstrip('/') != '/v2/pipeline':
+                self.send_error(404)
+                return
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if stmt_ms:
+                # Príkazy jednej pipeline server vykonáva po sebe
+                time.sleep(stmt_ms * stub.count_statements(body) / 1000)
+            payload = json.dumps(stub.pipeline(body)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub(db_path=':memory:', latency_ms=0.0, handshake_ms=0.0, port=0, stmt_ms=0.0):
+    """Spustí stub server vo vlákne, vráti (server, stub, url)"""
+    stub = HranaStub(db_path)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(stub, latency_ms, handshake_ms, stmt_ms))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, stub, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokálny Hrana stub server")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--db', default=':memory:')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--handshake-ms', type=float, default=0.0)
+    parser.add_argument('--stmt-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, _, url = start_stub(args.db, args.latency_ms, args.handshake_ms, args.port, args.stmt_ms)
+    print(f"🧪 Hrana stub beží na {url} (db={args.db})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Lokálny IMAP4rev1 server v pamäti pre benchmarky
+
+Implementuje podmnožinu protokolu, ktorú používa imaplib v workeri a
+email_receiveri: LOGIN, SELECT/EXAMINE (s UIDVALIDITY a UIDNEXT), SEARCH
+(ALL, FROM, UID <set>), FETCH (RFC822, BODY[], BODYSTRUCTURE,
+BODY.PEEK[<časť>], BODY.PEEK[HEADER.FIELDS (...)]) - aj ako UID príkazy -,
+IDLE (`* N EXISTS` pri každom `append`), COMPRESS=DEFLATE a CLOSE/LOGOUT.
+Jeden priečinok INBOX, správy sa pridávajú cez `ImapStub.append`.
+
+Voliteľne simuluje sieťovú latenciu na príkaz (`latency_ms`) a
+priepustnosť linky (`bandwidth_kbps`). `stub.bytes_sent` počíta bajty
+skutočne odoslané na linku (po kompresii).
+
+Použitie:
+    python benchmarks/imap_stub.py --port 1143 --messages 1000 --latency-ms 20
+"""
+
+import argparse
+import email
+import io
+import re
+import socketserver
+import threading
+import time
+import zlib
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid, parseaddr
+from datetime import datetime, timedelta
+
+TOKEN = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()]+')
+FETCH_ITEM = re.compile(r'[A-Z0-9.]+(?:\[[^\]]*\])?(?:<[\d.]+>)?')
+NEWLINE = b'\n'
+
+
+class ImapStub:
+    """Obsah schránky - zdieľaný všetkými spojeniami"""
+
+    def __init__(self, uid_validity=1):
+        self.lock = threading.Lock()
+        self.uid_validity = uid_validity
+        self.next_uid = 1
+        self.messages = []  # (uid, from_addr, raw_bytes, flags)
+        self.idle_listeners = set()  # spojenia v IDLE - callback(počet správ)
+        self.commands = 0
+        self.bytes_sent = 0
+
+    def append(self, raw: bytes, flags=()):
+        """Pridá správu do INBOX, vráti jej UID"""
+        from_addr = ''
+        for line in raw.split(b'\r\n\r\n', 1)[0].split(b'\n'):
+            if line.lower().startswith(b'from:'):
+                from_addr = parseaddr(line[5:].decode('utf-8', 'replace').strip())[1].lower()
+        with self.lock:
+            uid = self.next_uid
+            self.next_uid += 1
+            self.messages.append((uid, from_addr, raw, set(flags)))
+            exists, listeners = len(self.messages), list(self.idle_listeners)
+        for notify in listeners:
+            notify(exists)
+        return uid
+
+    def renumber(self):
+        """Simulácia prečíslovania schránky serverom (nová UIDVALIDITY)"""
+        with self.lock:
+            self.uid_validity += 1
+            self.messages = [(i, f, raw, flags) for i, (_, f, raw, flags) in enumerate(self.messages, 1)]
+            self.next_uid = len(self.messages) + 1
+
+
+def bmail(index, when=None, amount=None, sender='b-mail@tatrabanka.sk', html=False):
+    """
+    Vzorový B-mail ako RFC822 bajty
+
+    html=True pridá HTML alternatívu (multipart/alternative) s logom a
+    pätičkou, aká býva v bežných notifikačných emailoch.
+    """
+    when = when or datetime(2025, 11, 3, 13, 1) + timedelta(minutes=index)
+    amount = amount if amount is not None else 1 + index % 97 + (index % 100) / 100
+    message = EmailMessage()
+    message['From'] = f"Tatra banka <{sender}>"
+    message['To'] = 'financie@example.com'
+    message['Subject'] = 'B-mail'
+    message['Date'] = format_datetime(when)
+    message['Message-ID'] = make_msgid(f"bmail{index}", 'tatrabanka.sk')
+    amount_sk = f"{amount:.2f}".replace('.', ',')
+    text = (
+        f"{when.day}.{when.month}.{when.year} {when.strftime('%H:%M')} bol zostatok Vasho uctu "
+        f"SK8911000000002933213912 znizeny o {amount_sk} EUR.\n"
+        "uctovny zostatok:                               878,06 EUR\n"
+        f"Popis transakcie: Platba kartou 4405**9645, BOLT.EUD{2511031201 + index}.\n"
+    )
+    message.set_content(text)
+    if html:
+        rows = ''.join(f'<tr><td style="padding:4px;font-family:Arial">{line}</td></tr>\n'
+                       for line in text.splitlines())
+        footer = '<p style="font-size:10px">Tato sprava bola vygenerovana automaticky. Neodpovedajte na nu.</p>\n'
+        message.add_alternative(
+            '<html><head><style>body{font-family:Arial;color:#333}</style></head><body>\n'
+            f'<img src="data:image/png;base64,{"iVBORw0KGgo" * 300}" alt="Tatra banka">\n'
+            f'<table>{rows}</table>\n{footer * 20}</body></html>\n',
+            subtype='html'
+        )
+    return bytes(message).replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+
+
+def parse_set(spec: str, largest: int):
+    """Množina čísel v IMAP zápise (1,3,5:*) ako funkcia n -> bool"""
+    ranges = []
+    for part in spec.split(','):
+        low, _, high = part.partition(':')
+        low = largest if low == '*' else int(low)
+        high = low if not high else (largest if high == '*' else int(high))
+        ranges.append((min(low, high), max(low, high)))
+    return lambda n: any(low <= n <= high for low, high in ranges)
+
+
+def _quote(value):
+    if value is None:
+        return 'NIL'
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def bodystructure(part) -> str:
+    """BODYSTRUCTURE (RFC 3501) pre email.message.Message"""
+    if part.is_multipart():
+        children = ''.join(bodystructure(child) for child in part.get_payload())
+        subtype = _quote(part.get_content_subtype().upper())
+        return f'({children} {subtype} ("BOUNDARY" {_quote(part.get_boundary())}) NIL NIL)'
+    params = (part.get_params() or [])[1:]
+    params_list = ' '.join(f'{_quote(key.upper())} {_quote(value)}' for key, value in params)
+    payload = part.get_payload().encode('utf-8', 'replace')
+    encoding = (part['Content-Transfer-Encoding'] or '7BIT').upper()
+    fields = (f'{_quote(part.get_content_maintype().upper())} {_quote(part.get_content_subtype().upper())} '
+              f'{"(" + params_list + ")" if params else "NIL"} NIL NIL {_quote(encoding)} {len(payload)}')
+    if part.get_content_maintype() == 'text':
+        fields += f' {payload.count(NEWLINE)}'
+    disposition = 'NIL'
+    if part.get_content_disposition():
+        filename = f' ("FILENAME" {_quote(part.get_filename())})' if part.get_filename() else ' NIL'
+        disposition = f'({_quote(part.get_content_disposition().upper())}{filename})'
+    return f'({fields} NIL {disposition} NIL)'
+
+
+def section_bytes(raw: bytes, section: str) -> bytes:
+    """Obsah BODY[section] - '', TEXT, HEADER, HEADER.FIELDS (...), číselná časť (1.2)"""
+    header, _, body = raw.partition(b'\r\n\r\n')
+    if not section:
+        return raw
+    if section == 'TEXT':
+        return body
+    if section == 'HEADER':
+        return header + b'\r\n\r\n'
+    if section.startswith('HEADER.FIELDS'):
+        wanted = set(section[section.index('(') + 1:section.rindex(')')].split())
+        lines = re.split(rb'\r\n(?![ \t])', header)
+        kept = [line for line in lines if line.split(b':', 1)[0].strip().upper().decode() in wanted]
+        return b''.join(line + b'\r\n' for line in kept) + b'\r\n'
+    part = email.message_from_bytes(raw)
+    for number in section.split('.'):
+        if part.is_multipart():
+            part = part.get_payload()[int(number) - 1]
+        elif number != '1':
+            return b''
+    return part.get_payload().encode('utf-8', 'replace')
+
+
+class _Writer:
+    """Výstup spojenia - buffer do flush(), voliteľne komprimovaný (COMPRESS=DEFLATE)"""
+
+    def __init__(self, sock, stub, bandwidth_kbps):
+        self.sock, self.stub, self.bandwidth_kbps = sock, stub, bandwidth_kbps
+        self.parts = []
+        self.compressor = None
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.parts.append(data)
+
+    def flush(self):
+        data, self.parts = b''.join(self.parts), []
+        if not data:
+            return
+        if self.compressor:
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.bandwidth_kbps:
+            time.sleep(len(data) * 8 / (self.bandwidth_kbps * 1000))
+        self.stub.bytes_sent += len(data)
+        self.sock.sendall(data)
+
+    def close(self):
+        self.closed = True
+
+
+class _InflateReader(io.RawIOBase):
+    """Vstup spojenia po COMPRESS DEFLATE"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.decompressor = zlib.decompressobj(-15)
+        self.buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                return 0
+            self.buffer = self.decompressor.decompress(chunk)
+        size = min(len(target), len(self.buffer))
+        target[:size], self.buffer = self.buffer[:size], self.buffer[size:]
+        return size
+
+
+def make_handler(stub, latency_ms=0.0, bandwidth_kbps=0.0, idle=True, compress=False):
+    capabilities = 'IMAP4rev1' + (' IDLE' if idle else '') + (' COMPRESS=DEFLATE' if compress else '')
+
+    class Handler(socketserver.StreamRequestHandler):
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            self.wfile = _Writer(self.connection, stub, bandwidth_kbps)
+
+        def send(self, data: bytes):
+            with self.write_lock:
+                self.wfile.write(data)
+
+        def line(self, text: str):
+            self.send(text.encode('utf-8') + b'\r\n')
+
+        def push(self, text: str):
+            """Nevyžiadaná odpoveď z iného vlákna (IDLE)"""
+            self.line(text)
+            self.flush()
+
+        def flush(self):
+            with self.write_lock:
+                self.wfile.flush()
+
+        def handle(self):
+            self.selected = False
+            self.write_lock = threading.Lock()
+            self.line(f'* OK [CAPABILITY {capabilities}] imap_stub ready')
+            self.flush()
+            while True:
+                raw = self.rfile.readline()
+                if not raw:
+                    return
+                if latency_ms:
+                    time.sleep(latency_ms / 1000)
+                stub.commands += 1
+                parts = raw.rstrip(b'\r\n').split(b' ', 2)
+                tag = parts[0].decode()
+                command = parts[1].decode().upper() if len(parts) > 1 else ''
+                rest = parts[2] if len(parts) > 2 else b''
+                use_uid = command == 'UID'
+                if use_uid:
+                    command, _, rest = rest.partition(b' ')
+                    command = command.decode().upper()
+                try:
+                    if not self.dispatch(tag, command, rest, use_uid):
+                        return
+                except Exception as e:  # noqa: BLE001 - chyba príkazu, spojenie beží ďalej
+                    self.line(f'{tag} BAD {e}')
+                self.flush()
+
+        def dispatch(self, tag, command, rest, use_uid):
+            if command == 'CAPABILITY':
+                self.line(f'* CAPABILITY {capabilities}')
+            elif command == 'IDLE' and idle:
+                return self.idle(tag)
+            elif command == 'COMPRESS' and compress:
+                self.line(f'{tag} OK DEFLATE active')
+                self.flush()
+                self.rfile = io.BufferedReader(_InflateReader(self.connection))
+                self.wfile.compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+                return True
+            elif command in ('LOGIN', 'NOOP'):
+                pass
+            elif command in ('SELECT', 'EXAMINE'):
+                with stub.lock:
+                    exists, validity, uid_next = len(stub.messages), stub.uid_validity, stub.next_uid
+                self.line(f'* {exists} EXISTS')
+                self.line('* 0 RECENT')
+                self.line(f'* OK [UIDVALIDITY {validity}] UIDs valid')
+                self.line(f'* OK [UIDNEXT {uid_next}] Predicted next UID')
+                self.selected = True
+                mode = 'READ-ONLY' if command == 'EXAMINE' else 'READ-WRITE'
+                self.line(f'{tag} OK [{mode}] {command} completed')
+                return True
+            elif command == 'SEARCH':
+                self.search(rest, use_uid)
+            elif command == 'FETCH':
+                self.fetch(rest, use_uid)
+            elif command == 'CLOSE':
+                self.selected = False
+            elif command == 'LOGOUT':
+                self.line('* BYE imap_stub logging out')
+                self.line(f'{tag} OK LOGOUT completed')
+                self.flush()
+                return False
+            else:
+                self.line(f'{tag} BAD Unknown command {command}')
+                return True
+            self.line(f'{tag} OK {command} completed')
+            return True
+
+        def idle(self, tag):
+            def notify(exists):
+                self.push(f'* {exists} EXISTS')
+
+            with stub.lock:
+                stub.idle_listeners.add(notify)
+            try:
+                self.push('+ idling')
+                done = self.rfile.readline()
+            finally:
+                with stub.lock:
+                    stub.idle_listeners.discard(notify)
+            if not done:
+                return False
+            self.line(f'{tag} OK IDLE terminated')
+            return True
+
+        def search(self, rest, use_uid):
+            tokens = [t.decode('utf-8') for t in TOKEN.findall(rest) if t not in (b'(', b')')]
+            with stub.lock:
+                messages = list(stub.messages)
+            largest_uid = messages[-1][0] if messages else 0
+            checks = []
+            i = 0
+            while i < len(tokens):
+                key = tokens[i].upper()
+                if key == 'CHARSET':
+                    i += 2
+                    continue
+                if key == 'FROM':
+                    needle = tokens[i + 1].strip('"').lower()
+                    checks.append(lambda m, needle=needle: needle in m[1])
+                    i += 2
+                elif key == 'UID':
+                    in_set = parse_set(tokens[i + 1], largest_uid)
+                    checks.append(lambda m, in_set=in_set: in_set(m[0]))
+                    i += 2
+                elif key == 'UNSEEN':
+                    checks.append(lambda m: '\\Seen' not in m[3])
+                    i += 1
+                else:  # ALL a neznáme kritériá
+                    i += 1
+            hits = [str(m[0] if use_uid else seq) for seq, m in enumerate(messages, 1)
+                    if all(check(m) for check in checks)]
+            self.line('* SEARCH' + ''.join(' ' + hit for hit in hits))
+
+        def fetch(self, rest, use_uid):
+            spec, _, items = rest.decode('utf-8').partition(' ')
+            items = FETCH_ITEM.findall(items.upper())
+            with stub.lock:
+                messages = list(stub.messages)
+            largest = (messages[-1][0] if messages else 0) if use_uid else len(messages)
+            in_set = parse_set(spec, largest)
+            for seq, (uid, _, raw, flags) in enumerate(messages, 1):
+                if not in_set(uid if use_uid else seq):
+                    continue
+                response = f'* {seq} FETCH (UID {uid}'.encode()
+                for item in items:
+                    if item == 'FLAGS':
+                        response += f' FLAGS ({" ".join(sorted(flags))})'.encode()
+                    elif item == 'BODYSTRUCTURE':
+                        response += b' BODYSTRUCTURE ' + bodystructure(email.message_from_bytes(raw)).encode()
+                    elif item == 'RFC822' or item.startswith('BODY'):
+                        if not item.startswith('BODY.PEEK'):
+                            flags.add('\\Seen')
+                        section = item[item.index('[') + 1:item.rindex(']')] if '[' in item else ''
+                        data = section_bytes(raw, section)
+                        name = 'RFC822' if item == 'RFC822' else f'BODY[{section}]'
+                        response += f' {name} {{{len(data)}}}\r\n'.encode() + data
+                self.send(response + b')\r\n')
+
+    return Handler
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def start_stub(messages=0, latency_ms=0.0, bandwidth_kbps=0.0, port=0, other_every=0, idle=True,
+               compress=False, html=False):
+    """
+    Spustí IMAP stub vo vlákne, vráti (server, stub, (host, port))
+
+    messages B-mailov; ak other_every > 0, každá other_every-tá správa je od
+    iného odosielateľa (newsletter), aby SEARCH FROM niečo filtroval.
+    compress=True ponúkne COMPRESS=DEFLATE, html=True vytvorí B-maily
+    s HTML alternatívou.
+    """
+    stub = ImapStub()
+    for index in range(messages):
+        sender = 'news@example.com' if other_every and index % other_every == 0 else 'b-mail@tatrabanka.sk'
+        stub.append(bmail(index, sender=sender, html=html), flags=('\\Seen',))
+    server = _Server(('127.0.0.1', port), make_handler(stub, latency_ms, bandwidth_kbps, idle, compress))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, stub, server.server_address
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokálny IMAP stub server")
+    parser.add_argument('--port', type=int, default=1143)
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--compress', action='store_true', help='ponúknuť COMPRESS=DEFLATE')
+    parser.add_argument('--html', action='store_true', help='B-maily s HTML alternatívou')
+    args = parser.parse_args()
+
+    server, _, (host, port) = start_stub(args.messages, args.latency_ms, port=args.port,
+                                         compress=args.compress, html=args.html)
+    print(f"🧪 IMAP stub beží na {host}:{port} ({args.messages} správ, login ľubovoľný)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
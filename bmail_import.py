@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Import historických B-mailov z archívov - mbox a adresáre EML
+
+Pre nové nasadenie: export schránky (Gmail Takeout / Thunderbird mbox
+alebo adresár .eml súborov) sa naimportuje naraz, bez IMAP a bez
+INSERTu po jednej transakcii.
+
+- mbox sa číta cez mmap po blokoch (BMAIL_IMPORT_BLOCK_BYTES); hranice
+  blokov sa zarovnajú na začiatok správy (`From ` riadok), takže bloky
+  môžu parsovať procesy nezávisle a súbor sa nikdy nenačíta celý
+- EML adresár sa spracuje po BMAIL_IMPORT_BLOCK_FILES súboroch (zoradené)
+- bloky parsujú procesy v poole (telo správy + bmail_parser, kompresia
+  tela pre RawEmails), poradie ostáva zachované
+- zápis po dávkach: viacriadkové INSERTy ... ON CONFLICT (Fingerprint) DO
+  NOTHING (fingerprints) v jednej transakcii na dávku - B-maily, ktoré už
+  v databáze sú (z workera, webhooku alebo predošlého importu), sa
+  preskočia
+- po zapísaní bloku sa pozícia uloží do checkpoint súboru - prerušený
+  import pokračuje od posledného zapísaného bloku
+
+B-maily importuj pred výpismi (statement_import) - výpis preskočí
+transakcie, ktoré už z B-mailov existujú, opačne to neplatí.
+
+    python bmail_import.py takeout/Tatra.mbox
+    python bmail_import.py bmaily/ --workers 8
+    python bmail_import.py takeout/Tatra.mbox --checkpoint import.json  # pokračovanie
+    python bmail_import.py takeout/Tatra.mbox --dry-run                 # len parsovanie
+"""
+
+import argparse
+import email
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+import fingerprints
+import imap_fetch
+import raw_emails
+from query_filters import canonical_values
+from statement_import import load_accounts, normalize_iban, run_tasks
+from turso_client import Statement, turso_transaction
+from bmail_parser import BMailParser
+
+load_dotenv()
+
+BMAIL_IMPORT_BATCH_SIZE = int(os.getenv('BMAIL_IMPORT_BATCH_SIZE', '500'))
+BMAIL_IMPORT_ROWS_PER_STATEMENT = int(os.getenv('BMAIL_IMPORT_ROWS_PER_STATEMENT', '100'))
+BMAIL_IMPORT_WORKERS = int(os.getenv('BMAIL_IMPORT_WORKERS', str(min(os.cpu_count() or 2, 8))))
+BMAIL_IMPORT_BLOCK_BYTES = int(os.getenv('BMAIL_IMPORT_BLOCK_BYTES', str(8 * 1024 * 1024)))
+BMAIL_IMPORT_BLOCK_FILES = int(os.getenv('BMAIL_IMPORT_BLOCK_FILES', '500'))
+DEFAULT_CHECKPOINT = '.bmail_import_checkpoint.json'
+
+INSERT_COLUMNS = (
+    'TransactionDate', 'Amount', 'Currency', 'MerchantName', 'Description',
+    'IBAN', 'TransactionType', 'PaymentMethod', 'CategorySource', 'AccountID',
+    'CreatedAt', 'AmountCents', 'TxEpoch', 'TxDay', 'Fingerprint'
+)
+
+MBOX_SEPARATOR = b'\nFrom '
+# mboxrd: riadok tela začínajúci "From " je uložený ako ">From " (">>From " ...)
+_MBOX_QUOTED_FROM = re.compile(rb'^>(>*From )', re.MULTILINE)
+
+
+@dataclass
+class ArchiveStats:
+    messages: int = 0
+    parsed: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    skipped: int = 0  # správy, ktoré nie sú B-mail transakcia
+    unknown_accounts: int = 0
+    requests: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 1024 / 1024 / self.seconds if self.seconds else 0.0
+
+
+# --- Parsovanie (beží v procesoch poolu) --------------------------------------
+
+def parse_message(raw: bytes, store_raw: bool = True) -> Optional[Dict[str, Any]]:
+    """RFC822 správa -> záznam pre Transactions (None, ak nie je B-mail transakcia)"""
+    body = imap_fetch.message_body(email.message_from_bytes(raw))
+    transaction = BMailParser.parse_transaction(body) if body else None
+    if not transaction:
+        return None
+    amount, when = transaction['amount'], transaction['date']
+    record = {
+        'TransactionDate': when.isoformat(),
+        'Amount': amount,
+        'Currency': 'EUR',
+        'MerchantName': transaction.get('merchant', 'Unknown'),
+        'Description': transaction.get('description', ''),
+        'IBAN': transaction.get('iban', ''),
+        'TransactionType': transaction.get('transaction_type', 'Debit'),
+        'PaymentMethod': transaction.get('payment_method', 'Other'),
+        'CategorySource': 'Email',
+        'AccountID': None,
+        'CreatedAt': None,
+        'Fingerprint': fingerprints.transaction_fingerprint(transaction),
+    }
+    record['AmountCents'], record['TxEpoch'], record['TxDay'] = canonical_values(amount, when)
+    if store_raw:
+        record['_raw'] = raw_emails.compress(body)
+    return record
+
+
+def _mbox_boundary(data, position: int) -> int:
+    """Začiatok prvej správy na pozícii position alebo za ňou (len(data), ak už žiadna nie je)"""
+    if position == 0 and data[:5] == b'From ':
+        return 0
+    found = data.find(MBOX_SEPARATOR, max(0, position - 1))
+    return len(data) if found < 0 else found + 1
+
+
+def _mbox_messages(data, start: int, end: int) -> Iterator[bytes]:
+    """Správy začínajúce v [start, end) bez `From ` riadku obálky"""
+    position = start
+    while position < end:
+        found = data.find(MBOX_SEPARATOR, position)
+        following = len(data) if found < 0 else found + 1
+        chunk = data[position:following]
+        newline = chunk.find(b'\n')
+        if newline >= 0:
+            yield _MBOX_QUOTED_FROM.sub(rb'\1', chunk[newline + 1:])
+        position = following
+
+
+def mbox_block(path: str, start: int, end: int, store_raw: bool) -> Tuple[str, Any, List[Dict], int, int, int]:
+    """
+    Správy mbox súboru začínajúce v bloku [start, end) (hranice sa zarovnajú na správy)
+
+    Returns:
+        (súbor, pozícia pre checkpoint, záznamy, správ, preskočených, bajtov)
+    """
+    records, messages, skipped = [], 0, 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        first = _mbox_boundary(data, start)
+        last = _mbox_boundary(data, end) if end < len(data) else len(data)
+        for raw in _mbox_messages(data, first, last):
+            messages += 1
+            record = parse_message(raw, store_raw)
+            if record:
+                records.append(record)
+            else:
+                skipped += 1
+    return path, last, records, messages, skipped, max(0, last - first)
+
+
+def eml_block(directory: str, names: Sequence[str], store_raw: bool) -> Tuple[str, Any, List[Dict], int, int, int]:
+    """EML súbory (cesty relatívne k directory); pozícia pre checkpoint = posledný súbor"""
+    records, skipped, size = [], 0, 0
+    for name in names:
+        with open(os.path.join(directory, name), 'rb') as f:
+            raw = f.read()
+        size += len(raw)
+        record = parse_message(raw, store_raw)
+        if record:
+            records.append(record)
+        else:
+            skipped += 1
+    return directory, names[-1], records, len(names), skipped, size
+
+
+# --- Úlohy a checkpoint -------------------------------------------------------
+
+def eml_files(directory: str) -> List[str]:
+    """Relatívne cesty .eml súborov v adresári (rekurzívne), zoradené"""
+    names = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith('.eml'):
+                names.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(names)
+
+
+def archive_tasks(
+    paths: Sequence[str],
+    checkpoint: Dict[str, Any],
+    store_raw: bool,
+    block_bytes: int = BMAIL_IMPORT_BLOCK_BYTES,
+    block_files: int = BMAIL_IMPORT_BLOCK_FILES
+) -> Iterator[Tuple[Callable, tuple]]:
+    """Úlohy pre pool od pozície v checkpointe; kľúč checkpointu = absolútna cesta zdroja"""
+    for path in paths:
+        source = os.path.abspath(path)
+        if os.path.isdir(path):
+            names = eml_files(path)
+            last = checkpoint.get(source)
+            if last:
+                names = [name for name in names if name > last]
+            for i in range(0, len(names), block_files):
+                yield eml_block, (source, names[i:i + block_files], store_raw)
+        elif path.lower().endswith('.eml'):
+            if checkpoint.get(source) is None:
+                yield eml_block, (os.path.dirname(source), [os.path.basename(source)], store_raw)
+        else:
+            size = os.path.getsize(path)
+            offset = checkpoint.get(source) or 0
+            if offset > size:  # iný (kratší) súbor s rovnakou cestou
+                offset = 0
+            for start in range(offset, size, block_bytes):
+                yield mbox_block, (source, start, min(start + block_bytes, size), store_raw)
+
+
+def load_checkpoint(path: Optional[str]) -> Dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """Atomický zápis - prerušenie počas zápisu nezničí predošlý checkpoint"""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=1, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+# --- Zápis --------------------------------------------------------------------
+
+def insert_statements(records: Sequence[Dict[str, Any]], rows_per_statement: int) -> List[Statement]:
+    """Viacriadkové INSERTy ... ON CONFLICT (Fingerprint) DO NOTHING + RawEmails k vloženým riadkom"""
+    placeholders = '(' + ', '.join('?' * len(INSERT_COLUMNS)) + ')'
+    statements = []
+    for i in range(0, len(records), rows_per_statement):
+        chunk = records[i:i + rows_per_statement]
+        statements.append((
+            f"INSERT INTO Transactions ({', '.join(INSERT_COLUMNS)}) VALUES "
+            + ', '.join([placeholders] * len(chunk)) + " ON CONFLICT (Fingerprint) DO NOTHING;",
+            [record[column] for record in chunk for column in INSERT_COLUMNS]
+        ))
+    return statements
+
+
+def raw_email_statements(records: Sequence[Dict[str, Any]], rows_per_statement: int) -> List[Statement]:
+    """RawEmails podľa odtlačku - transakcia, ktorá email už má, sa nezmení"""
+    with_raw = [record for record in records if record.get('_raw')]
+    statements = []
+    for i in range(0, len(with_raw), rows_per_statement):
+        chunk = with_raw[i:i + rows_per_statement]
+        statements.append((
+            "WITH v (Fingerprint, Codec, Body, OriginalSize) AS (VALUES "
+            + ', '.join(['(?, ?, ?, ?)'] * len(chunk)) + ") "
+            "INSERT OR IGNORE INTO RawEmails (TransactionID, Codec, Body, OriginalSize) "
+            "SELECT t.TransactionID, v.Codec, v.Body, v.OriginalSize "
+            "FROM v JOIN Transactions t ON t.Fingerprint = v.Fingerprint;",
+            [value for record in chunk for value in (record['Fingerprint'], *record['_raw'])]
+        ))
+    return statements
+
+
+class ArchiveImporter:
+    """Dávkovač záznamov - jeden request (transakcia) na dávku"""
+
+    def __init__(
+        self,
+        accounts: Dict[str, int],
+        batch_size: int = BMAIL_IMPORT_BATCH_SIZE,
+        rows_per_statement: int = BMAIL_IMPORT_ROWS_PER_STATEMENT,
+        dry_run: bool = False
+    ):
+        self.accounts = accounts
+        self.batch_size = batch_size
+        self.rows_per_statement = rows_per_statement
+        self.dry_run = dry_run
+        self.stats = ArchiveStats()
+        self._batch: List[Dict[str, Any]] = []
+
+    def add(self, records: Sequence[Dict[str, Any]]):
+        for record in records:
+            self.stats.parsed += 1
+            record['AccountID'] = self.accounts.get(normalize_iban(record['IBAN']))
+            if record['AccountID'] is None:
+                self.stats.unknown_accounts += 1
+            self._batch.append(record)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        if self.dry_run:
+            self.stats.inserted += len(batch)
+            return
+
+        created_at = datetime.now().isoformat()
+        for record in batch:
+            record['CreatedAt'] = created_at
+        inserts = insert_statements(batch, self.rows_per_statement)
+        results = turso_transaction(inserts + raw_email_statements(batch, self.rows_per_statement))
+        self.stats.requests += 1
+        if not all(r["success"] for r in results):
+            raise RuntimeError(next(r for r in results if not r["success"]).get("error", "Import insert failed"))
+        inserted = sum(r.get("affected_rows") or 0 for r in results[:len(inserts)])
+        self.stats.inserted += inserted
+        self.stats.duplicates += len(batch) - inserted
+
+
+def import_archives(
+    paths: Sequence[str],
+    workers: Optional[int] = None,
+    checkpoint_path: Optional[str] = DEFAULT_CHECKPOINT,
+    batch_size: int = BMAIL_IMPORT_BATCH_SIZE,
+    store_raw: bool = True,
+    dry_run: bool = False,
+    progress: bool = True
+) -> ArchiveStats:
+    """
+    Importuje B-maily z mbox súborov / EML adresárov do Transactions
+
+    Args:
+        workers: procesy na parsovanie (None = BMAIL_IMPORT_WORKERS)
+        checkpoint_path: súbor s pozíciou importu (None = bez pokračovania)
+        store_raw: uložiť telo B-mailu do RawEmails
+
+    Returns:
+        ArchiveStats
+    """
+    workers = BMAIL_IMPORT_WORKERS if workers is None else workers
+    checkpoint = load_checkpoint(checkpoint_path)
+    start = time.perf_counter()
+    importer = ArchiveImporter(load_accounts(), batch_size, dry_run=dry_run)
+    stats = importer.stats
+    tasks = archive_tasks(paths, checkpoint, store_raw)
+    for source, position, records, messages, skipped, size in run_tasks(tasks, workers):
+        stats.messages += messages
+        stats.skipped += skipped
+        stats.bytes += size
+        importer.add(records)
+        importer.flush()  # checkpoint smie ukazovať len za zapísané záznamy
+        if checkpoint_path and not dry_run:
+            checkpoint[source] = position
+            save_checkpoint(checkpoint_path, checkpoint)
+        stats.seconds = time.perf_counter() - start
+        if progress:
+            print(f"   📬 {stats.messages} správ, {stats.inserted} vložených, "
+                  f"{stats.messages_per_second:.0f} správ/s")
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='mbox súbory, .eml súbory alebo adresáre s .eml')
+    parser.add_argument('--workers', type=int, help=f'procesy na parsovanie (default {BMAIL_IMPORT_WORKERS})')
+    parser.add_argument('--batch-size', type=int, default=BMAIL_IMPORT_BATCH_SIZE)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='súbor s pozíciou importu')
+    parser.add_argument('--restart', action='store_true', help='ignorovať checkpoint a začať odznova')
+    parser.add_argument('--no-raw', action='store_true', help='neukladať telá B-mailov do RawEmails')
+    parser.add_argument('--dry-run', action='store_true', help='len parsovanie, bez zápisu')
+    args = parser.parse_args(argv)
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    print(f"📥 Import B-mailov z {len(args.paths)} archívov{' (dry run)' if args.dry_run else ''}...")
+    try:
+        stats = import_archives(
+            args.paths, args.workers, args.checkpoint, args.batch_size,
+            store_raw=not args.no_raw, dry_run=args.dry_run
+        )
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ Import zlyhal: {e}")
+        print(f"   Spustenie s rovnakými parametrami pokračuje od checkpointu ({args.checkpoint})")
+        return 1
+
+    print(f"✅ Správ {stats.messages}, transakcií {stats.parsed}, vložených {stats.inserted}, "
+          f"duplicít {stats.duplicates}, iných správ {stats.skipped}")
+    if stats.unknown_accounts:
+        print(f"⚠️  {stats.unknown_accounts} transakcií bez účtu v Accounts (AccountID = NULL)")
+    print(f"⏱️  {stats.seconds:.2f} s, {stats.messages_per_second:.0f} správ/s, "
+          f"{stats.megabytes_per_second:.1f} MB/s, {stats.requests} requestov")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
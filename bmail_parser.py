@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Parser B-mail notifikácií z Tatra banky
+
+Jediné miesto, kde sa rozoberá text B-mailu - používa ho worker,
+email_receiver, /api/sync-emails, CloudMailin webhook, bmail_import aj
+backfill_recipient_info. Príklad:
+
+    3.11.2025 13:01 bol zostatok Vasho uctu SK8911000000002933213912 znizeny o 10,18 EUR.
+    uctovny zostatok:                               878,06 EUR
+    Popis transakcie: Platba kartou 4405**9645, BOLT.EUD2511031201.
+    Ucet protistrany: ...
+    Ucel protistrany: ...
+    Informacia pre prijemcu: ...
+
+- vzory sú skompilované raz pri importe modulu
+- hlavný riadok aj všetky polia nájde jeden `finditer` - telo sa prejde raz;
+  vzor je ukotvený na začiatok riadku, takže zvyšok riadkov (zostatky,
+  pätička) regex preskočí bez skúšania alternatív na každom znaku
+- B-mail, kde hlavný riadok nezačína na začiatku riadku (text z HTML),
+  sa dohľadá neukotvenými vzormi - len ak ukotvený prechod nič nenájde
+- dátum sa skladá z čísel zo skupín regexu (datetime(...)), bez strptime
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, Optional
+
+# Hlavný riadok (dátum, čas, IBAN, smer, suma); suma môže mať medzery ako
+# oddeľovač tisícov (1 234,56)
+_HEADER = (
+    r'(?P<day>\d{1,2})\.(?P<month>\d{1,2})\.(?P<year>\d{4})\s+(?P<hour>\d{1,2}):(?P<minute>\d{2})'
+    r'\s+bol zostatok.*?(?P<iban>SK\d+)\s+(?P<direction>znizeny|zvyseny)\s+o\s+(?P<amount>\d[\d\s,]*?)\s*EUR'
+)
+# Pole "Názov: hodnota"
+_FIELD = (
+    r'(?P<label>(?i:Popis transakcie|Ucet protistrany|Ucel protistrany|Informacia pre prijemcu))'
+    r':\s*(?P<value>[^\n]+)'
+)
+_BMAIL_LINES = re.compile(rf'^[ \t]*(?:{_HEADER}|{_FIELD})', re.MULTILINE)
+_BMAIL_HEADER = re.compile(_HEADER)
+_BMAIL_FIELDS = re.compile(_FIELD)
+_CARD_MERCHANT = re.compile(r',\s*([A-Z0-9\.\-]+)')
+_MERCHANT_REFERENCE = re.compile(r'\.?[A-Z]{3}\d+$')
+_WHITESPACE = re.compile(r'\s+')
+
+# Názov poľa (malými písmenami) -> kľúč vo výsledku
+FIELDS = {
+    'popis transakcie': 'description',
+    'ucet protistrany': 'counterparty_name',
+    'ucel protistrany': 'counterparty_purpose',
+    'informacia pre prijemcu': 'recipient_info',
+}
+
+
+def extract_fields(email_body: str) -> Dict[str, str]:
+    """
+    Polia B-mailu jedným prechodom tela
+
+    Returns:
+        dict s kľúčmi z FIELDS (prvý výskyt poľa) a 'header' = match
+        hlavného riadku, ak ho telo obsahuje
+    """
+    email_body = email_body or ''
+    fields = {}
+    for match in _BMAIL_LINES.finditer(email_body):
+        label, value = match.group('label', 'value')
+        if label is None:
+            fields.setdefault('header', match)
+        else:
+            fields.setdefault(FIELDS[label.lower()], value.strip())
+    if 'header' not in fields:
+        header = _BMAIL_HEADER.search(email_body)
+        if header:
+            fields['header'] = header
+            for match in _BMAIL_FIELDS.finditer(email_body):
+                fields.setdefault(FIELDS[match.group('label').lower()], match.group('value').strip())
+    return fields
+
+
+def card_merchant(description: str) -> Optional[str]:
+    """Obchodník z popisu platby kartou ("Platba kartou 4405**9645, BOLT.EUD2511031201." -> BOLT)"""
+    match = _CARD_MERCHANT.search(description)
+    if not match:
+        return None
+    merchant_raw = match.group(1).strip('.')
+    # Očistíme referenčné čísla
+    return _MERCHANT_REFERENCE.sub('', merchant_raw) or merchant_raw
+
+
+def parse_transaction(email_body: str) -> Optional[Dict]:
+    """
+    Transakcia z B-mailu alebo None, ak telo nie je B-mail transakcia
+
+    Kľúče: date, iban, amount (znizeny = mínus), transaction_type, raw_email,
+    counterparty_name, counterparty_purpose, recipient_info ('' ak chýbajú)
+    a ak B-mail má popis aj description, payment_method, merchant.
+    """
+    fields = extract_fields(email_body)
+    header = fields.get('header')
+    if header is None:
+        return None
+
+    try:
+        transaction = {
+            'date': datetime(*map(int, header.group('year', 'month', 'day', 'hour', 'minute'))),
+            'iban': header.group('iban'),
+        }
+        amount = float(_WHITESPACE.sub('', header.group('amount')).replace(',', '.'))
+    except ValueError as e:
+        print(f"❌ Chyba pri parsovaní: {e}")
+        return None
+    transaction['amount'] = -amount if header.group('direction') == 'znizeny' else amount
+
+    description = fields.get('description')
+    if description is not None:
+        transaction['description'] = description
+        if 'Platba kartou' in description:
+            transaction['payment_method'] = 'Card'
+            transaction['merchant'] = card_merchant(description) or 'Unknown'
+        elif 'Prevod' in description or 'Prikaz' in description:
+            transaction['payment_method'] = 'Transfer'
+            transaction['merchant'] = description
+        else:
+            transaction['payment_method'] = 'Other'
+            transaction['merchant'] = description
+
+    for key in ('counterparty_name', 'counterparty_purpose', 'recipient_info'):
+        transaction[key] = fields.get(key, '')
+    transaction['transaction_type'] = 'Debit' if transaction['amount'] < 0 else 'Credit'
+    transaction['raw_email'] = email_body
+    return transaction
+
+
+class BMailParser:
+    """Parser pre B-mail z Tatra banky (rozhranie workera a email_receivera)"""
+
+    parse_transaction = staticmethod(parse_transaction)
@@ -10,6 +10,8 @@ import ssl
 import certifi
 
 from config import settings
+from query_filters import canonical_values, month_days, tx_epoch
+import raw_emails
 
 
 logger = logging.getLogger(__name__)
@@ -84,12 +86,14 @@ class DatabaseClient:
                     AccountNumber, IBAN, CategoryID, Description,
                     VariableSymbol, ConstantSymbol, SpecificSymbol,
                     TransactionType, PaymentMethod, CO2Footprint,
-                    RawEmailData, AIConfidence, CategorySource
+                    AIConfidence, CategorySource,
+                    AmountCents, TxEpoch, TxDay
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                RETURNING TransactionID
             """
             
-            result = self.execute(query, (
+            params = (
                 transaction_date.isoformat(),
                 amount,
                 currency,
@@ -105,14 +109,18 @@ class DatabaseClient:
                 transaction_type,
                 payment_method,
                 co2_footprint,
-                raw_email_data,
                 ai_confidence,
-                category_source
-            ))
+                category_source,
+                *canonical_values(amount, transaction_date)
+            )
             
-            # Get last inserted ID
-            last_id_result = self.execute("SELECT last_insert_rowid()")
-            transaction_id = last_id_result.rows[0][0]
+            # Pôvodný email ide komprimovaný do RawEmails v tej istej transakcii
+            raw_email = raw_emails.insert_after_transaction(raw_email_data)
+            if raw_email:
+                result = self._get_client().batch([(query, params), raw_email])[0]
+            else:
+                result = self.execute(query, params)
+            transaction_id = result.rows[0][0]
             
             logger.info(f"Vložená transakcia ID: {transaction_id}")
             return transaction_id
@@ -169,15 +177,13 @@ class DatabaseClient:
             # Vytvor nového
             finstat_json = json.dumps(finstat_data) if finstat_data else None
             
-            self.execute("""
+            result = self.execute("""
                 INSERT INTO Merchants (
                     Name, IBAN, AccountNumber, ICO, FinstatData, DefaultCategoryID
                 )
                 VALUES (?, ?, ?, ?, ?, ?)
+                RETURNING MerchantID
             """, (name, iban, account_number, ico, finstat_json, default_category_id))
-            
-            # Get last inserted ID
-            result = self.execute("SELECT last_insert_rowid()")
             merchant_id = result.rows[0][0]
             
             logger.info(f"Vytvorený nový obchodník ID: {merchant_id}")
@@ -233,18 +239,18 @@ class DatabaseClient:
             params = []
             
             if start_date:
-                query += " AND t.TransactionDate >= ?"
-                params.append(start_date.isoformat())
+                query += " AND t.TxEpoch >= ?"
+                params.append(tx_epoch(start_date))
             
             if end_date:
-                query += " AND t.TransactionDate <= ?"
-                params.append(end_date.isoformat())
+                query += " AND t.TxEpoch <= ?"
+                params.append(tx_epoch(end_date))
             
             if category_id:
                 query += " AND t.CategoryID = ?"
                 params.append(category_id)
             
-            query += " ORDER BY t.TransactionDate DESC LIMIT ?"
+            query += " ORDER BY t.TxEpoch DESC, t.TransactionID DESC LIMIT ?"
             params.append(limit)
             
             result = self.execute(query, tuple(params))
@@ -280,17 +286,18 @@ class DatabaseClient:
             Dictionary s prehľadom
         """
         try:
+            # Rozsah dní mesiaca (TxDay) pre rollup tabuľku, sumy v centoch
+            month_start, month_end = month_days(year, month)
+            
             # Celkové výdavky
             result = self.execute("""
                 SELECT 
-                    COUNT(*) as TransactionCount,
-                    SUM(Amount) as TotalAmount,
-                    AVG(Amount) as AvgAmount
-                FROM Transactions
-                WHERE strftime('%Y', TransactionDate) = ? 
-                    AND strftime('%m', TransactionDate) = ?
-                    AND TransactionType = 'Debit'
-            """, (str(year), f"{month:02d}"))
+                    SUM(ExpenseCount) as TransactionCount,
+                    -SUM(ExpenseCents) / 100.0 as TotalAmount,
+                    -SUM(ExpenseCents) / 100.0 / NULLIF(SUM(ExpenseCount), 0) as AvgAmount
+                FROM TransactionRollups
+                WHERE Day >= ? AND Day < ?
+            """, (month_start, month_end))
             
             row = result.rows[0] if result.rows else (0, 0, 0)
             summary = {
@@ -303,16 +310,15 @@ class DatabaseClient:
             result = self.execute("""
                 SELECT 
                     c.Name as Category,
-                    COUNT(*) as Count,
-                    SUM(t.Amount) as Total
-                FROM Transactions t
-                LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-                WHERE strftime('%Y', t.TransactionDate) = ? 
-                    AND strftime('%m', t.TransactionDate) = ?
-                    AND t.TransactionType = 'Debit'
+                    SUM(r.ExpenseCount) as Count,
+                    -SUM(r.ExpenseCents) / 100.0 as Total
+                FROM TransactionRollups r
+                LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+                WHERE r.Day >= ? AND r.Day < ?
+                    AND r.ExpenseCount > 0
                 GROUP BY c.Name
                 ORDER BY Total DESC
-            """, (str(year), f"{month:02d}"))
+            """, (month_start, month_end))
             
             categories = []
             for row in result.rows:
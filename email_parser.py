@@ -1,12 +1,49 @@
 """
 Email parser pre B-mail notifikácie o pohyboch na účte
+
+Plain text sa parsuje priamo; HTML sa na text prevádza len vtedy, keď
+plain text nie je k dispozícii - cez lxml (ak je nainštalované), inak
+html2text. Parser je bezstavový, parse_bmail_notification používa jednu
+inštanciu (get_parser).
 """
+import html
 import re
 from datetime import datetime
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
-import html2text
-from bs4 import BeautifulSoup
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree
+except ImportError:  # voliteľné - rýchly prevod HTML na text
+    lxml_html = None
+
+try:
+    import html2text
+except ImportError:
+    html2text = None
+
+# Rozpoznanie HTML tela (plain text B-mailu tagy neobsahuje)
+_HTML_TAG = re.compile(r'<(?:!doctype|html|head|body|div|p|br|table|tr|td|span|a|img|font|b|strong)\b', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]+>')
+# Elementy, za ktorými html2text robí nový riadok
+_BLOCK_TAGS = ('p', 'div', 'br', 'tr', 'li', 'table', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+def looks_like_html(body: str) -> bool:
+    """Či telo emailu vyzerá ako HTML"""
+    return bool(_HTML_TAG.search(body))
+
+
+def _lxml_to_text(markup: str) -> str:
+    """Text z HTML cez lxml - bloky na samostatných riadkoch, bez script/style"""
+    root = lxml_html.fromstring(markup)
+    etree.strip_elements(root, 'script', 'style', 'head', etree.Comment, with_tail=False)
+    for element in root.iter(*_BLOCK_TAGS):
+        element.tail = '\n' + (element.tail or '')
+    for element in root.iter('td', 'th'):
+        element.tail = ' ' + (element.tail or '')
+    return root.text_content()
 
 
 @dataclass
@@ -30,29 +67,32 @@ class EmailParser:
     """Parser pre B-mail notifikácie"""
     
     def __init__(self):
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
+        self._html_converter = None  # html2text až pri prvom HTML bez lxml
+    
+    @property
+    def html_converter(self):
+        if self._html_converter is None and html2text is not None:
+            self._html_converter = html2text.HTML2Text()
+            self._html_converter.ignore_links = False
+        return self._html_converter
         
-    def parse_email(self, email_body: str, is_html: bool = True) -> Optional[TransactionData]:
+    def parse_email(self, email_body: str, is_html: Optional[bool] = None) -> Optional[TransactionData]:
         """
         Parsuje email telo a extrahuje transakčné dáta
         
         Args:
             email_body: Telo emailu (HTML alebo plain text)
-            is_html: Či je email v HTML formáte
+            is_html: Či je email v HTML formáte (None = rozpozná sa podľa tagov)
             
         Returns:
             TransactionData alebo None ak sa nepodarilo parsovať
         """
-        if is_html:
-            text = self._html_to_text(email_body)
-            soup = BeautifulSoup(email_body, 'html.parser')
-        else:
-            text = email_body
-            soup = None
+        if is_html is None:
+            is_html = looks_like_html(email_body)
+        text = self._html_to_text(email_body) if is_html else email_body
             
         # Extrahuj základné informácie
-        merchant_name = self._extract_merchant_name(text, soup)
+        merchant_name = self._extract_merchant_name(text)
         amount = self._extract_amount(text)
         currency = self._extract_currency(text)
         transaction_date = self._extract_date(text)
@@ -83,11 +123,18 @@ class EmailParser:
             specific_symbol=specific_symbol
         )
     
-    def _html_to_text(self, html: str) -> str:
-        """Konvertuje HTML na plain text"""
-        return self.html_converter.handle(html)
+    def _html_to_text(self, markup: str) -> str:
+        """Konvertuje HTML na plain text (lxml, inak html2text, inak odstránenie tagov)"""
+        if lxml_html is not None:
+            try:
+                return _lxml_to_text(markup)
+            except (ValueError, etree.LxmlError):
+                pass  # napr. <?xml encoding=...?> v str alebo prázdny dokument
+        if self.html_converter is not None:
+            return self.html_converter.handle(markup)
+        return html.unescape(_TAG.sub('\n', markup))
     
-    def _extract_merchant_name(self, text: str, soup: Optional[BeautifulSoup]) -> Optional[str]:
+    def _extract_merchant_name(self, text: str) -> Optional[str]:
         """
         Extrahuje názov obchodníka
         
@@ -243,18 +290,32 @@ class EmailParser:
         return None
 
 
-def parse_bmail_notification(email_html: str) -> Optional[Dict[str, Any]]:
+_default_parser: Optional[EmailParser] = None
+
+
+def get_parser() -> EmailParser:
+    """Zdieľaná inštancia parsera"""
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = EmailParser()
+    return _default_parser
+
+
+def parse_bmail_notification(email_html: str, email_text: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Hlavná funkcia pre parsovanie B-mail notifikácie
     
     Args:
-        email_html: HTML telo emailu
+        email_html: telo emailu (HTML alebo plain text)
+        email_text: plain text časť, ak ju volajúci má - HTML sa potom neprevádza
         
     Returns:
         Dictionary s transakčnými dátami alebo None
     """
-    parser = EmailParser()
-    transaction = parser.parse_email(email_html, is_html=True)
+    if email_text:
+        transaction = get_parser().parse_email(email_text, is_html=False)
+    else:
+        transaction = get_parser().parse_email(email_html)
     
     if not transaction:
         return None
@@ -4,14 +4,18 @@ Email Receiver - Prijímanie a spracovanie B-mail notifikácií
 """
 
 import imaplib
-import email
-from email.header import decode_header
-import re
 from datetime import datetime
-from typing import Dict, Optional
-import subprocess
+from typing import Dict, Iterator, Union
 import json
 
+import imap_fetch
+import fingerprints
+import imap_sync
+import raw_emails
+from bmail_parser import BMailParser
+from query_filters import canonical_values
+from turso_client import turso_transaction
+
 class EmailReceiver:
     def __init__(self, email_address: str, password: str, imap_server: str = "imap.gmail.com"):
         """
@@ -32,6 +36,7 @@ class EmailReceiver:
         try:
             self.mail = imaplib.IMAP4_SSL(self.imap_server)
             self.mail.login(self.email_address, self.password)
+            imap_fetch.enable_compression(self.mail)
             print(f"✅ Pripojený k {self.email_address}")
             return True
         except Exception as e:
@@ -43,205 +48,59 @@ class EmailReceiver:
         if self.mail:
             self.mail.close()
             self.mail.logout()
+            self.mail = None
     
-    def get_unread_emails(self, folder: str = "INBOX") -> list:
+    def get_unread_emails(self, folder: str = "INBOX") -> Iterator[Dict]:
         """
-        Získanie neprečítaných emailov
+        Získanie nových B-mail emailov (generátor)
+        
+        Vracia len B-maily s UID vyšším ako posledný spracovaný v tomto
+        priečinku (imap_sync, tabuľka ImapSyncState) - bez ohľadu na
+        príznak prečítania. UID sa potvrdí, keď si volajúci vypýta ďalší
+        email; pri `break` sa email pri ďalšej kontrole vráti znova.
         
         Args:
             folder: Priečinok (default: INBOX)
             
-        Returns:
-            List emailov
+        Yields:
+            Email ako dict (subject, date, body, from, uid)
         """
         if not self.mail:
-            self.connect()
-        
-        self.mail.select(folder)
-        
-        # Hľadáme VŠETKY emaily od B-mail (aj prečítané)
-        status, messages = self.mail.search(None, '(FROM "b-mail@tatrabanka.sk")')
-        
-        if status != "OK":
-            print(f"❌ Status nie je OK: {status}")
-            return []
-        
-        email_ids = messages[0].split()
-        print(f"🔍 Nájdených emailov: {len(email_ids)}")
-        
-        emails = []
-        
-        for email_id in email_ids:
-            try:
-                status, msg_data = self.mail.fetch(email_id, "(RFC822)")
-                
-                if status != "OK":
-                    continue
-                
-                for response_part in msg_data:
-                    if isinstance(response_part, tuple):
-                        msg = email.message_from_bytes(response_part[1])
-                        emails.append(self._parse_email(msg))
-            
-            except Exception as e:
-                print(f"❌ Chyba pri spracovaní emailu {email_id}: {e}")
-        
-        return emails
-    
-    def _parse_email(self, msg) -> Dict:
-        """Parsovanie email správy"""
-        # Dekódovanie predmetu
-        subject = ""
-        if msg["Subject"]:
-            subject, encoding = decode_header(msg["Subject"])[0]
-            if isinstance(subject, bytes):
-                subject = subject.decode(encoding if encoding else "utf-8")
-        
-        # Získanie dátumu
-        date = msg["Date"]
-        
-        # Získanie tela emailu
-        body = ""
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        body = part.get_payload(decode=True).decode()
-                    except:
-                        pass
-        else:
-            try:
-                body = msg.get_payload(decode=True).decode()
-            except:
-                pass
-        
-        return {
-            "subject": subject,
-            "date": date,
-            "body": body,
-            "from": msg["From"]
-        }
-
-
-class BMailParser:
-    """Parser pre B-mail notifikácie z Tatra banky"""
-    
-    @staticmethod
-    def parse_transaction(email_body: str) -> Optional[Dict]:
-        """
-        Parsovanie B-mail notifikácie z Tatra banky
-        
-        Príklad skutočného B-mail formátu:
-        -------------------------
-        3.11.2025 13:01 bol zostatok Vasho uctu SK8911000000002933213912 znizeny o 10,18 EUR.
-        uctovny zostatok:                               878,06 EUR
-        Popis transakcie: Platba kartou 4405**9645, BOLT.EUD2511031201.
-        -------------------------
-        """
-        transaction = {}
+            if not self.connect():
+                return
         
+        mailbox = imap_sync.mailbox_key(self.email_address, folder)
         try:
-            # Extrahovanie dátumu a sumy z prvého riadku
-            # Formát: "3.11.2025 13:01 bol zostatok Vasho uctu SKXXXX znizeny o 10,18 EUR"
-            main_match = re.search(
-                r'(\d{1,2}\.\d{1,2}\.\d{4})\s+(\d{1,2}:\d{2})\s+bol zostatok.*?'
-                r'(SK\d+)\s+(znizeny|zvyseny)\s+o\s+([\d,]+)\s*EUR',
-                email_body
-            )
-            
-            if main_match:
-                # Dátum a čas
-                date_str = f"{main_match.group(1)} {main_match.group(2)}"
-                transaction['date'] = datetime.strptime(date_str, "%d.%m.%Y %H:%M")
-                
-                # IBAN
-                transaction['iban'] = main_match.group(3)
-                
-                # Suma (znizeny = mínus, zvyseny = plus)
-                amount_str = main_match.group(5).replace(',', '.')
-                amount = float(amount_str)
-                if main_match.group(4) == 'znizeny':
-                    amount = -amount
-                transaction['amount'] = amount
-            else:
-                print("⚠️  Nepodarilo sa extrahovať základné údaje")
-                return None
-            
-            # Extrahovanie popisu transakcie
-            desc_match = re.search(r'Popis transakcie:\s*(.+?)(?:\n|$)', email_body)
-            if desc_match:
-                description = desc_match.group(1).strip()
-                transaction['description'] = description
-                
-                # Extrakcia obchodníka z popisu
-                # Formát: "Platba kartou 4405**9645, BOLT.EUD2511031201."
-                if 'Platba kartou' in description:
-                    transaction['payment_method'] = 'Card'
-                    # Extrakcia obchodníka (časť po čiarke)
-                    merchant_match = re.search(r',\s*([A-Z0-9\.\-]+)', description)
-                    if merchant_match:
-                        merchant_raw = merchant_match.group(1).strip('.')
-                        # Očistíme referenčné čísla
-                        merchant = re.sub(r'\.?[A-Z]{3}\d+$', '', merchant_raw)
-                        transaction['merchant'] = merchant if merchant else merchant_raw
-                    else:
-                        transaction['merchant'] = 'Unknown'
-                elif 'Prevod' in description or 'Prikaz' in description:
-                    transaction['payment_method'] = 'Transfer'
-                    transaction['merchant'] = description
-                else:
-                    transaction['payment_method'] = 'Other'
-                    transaction['merchant'] = description
-            
-            # Typ transakcie
-            transaction['transaction_type'] = 'Debit' if transaction['amount'] < 0 else 'Credit'
-            
-            # Celý email ako raw data
-            transaction['raw_email'] = email_body
-            
-            return transaction
-            
-        except Exception as e:
-            print(f"❌ Chyba pri parsovaní: {e}")
-            return None
+            for _, email_data in imap_sync.iter_new_messages(self.mail, mailbox, folder):
+                yield email_data
+        except RuntimeError as e:
+            print(f"❌ Chyba pri získavaní emailov: {e}")
 
 
-def save_transaction_to_db(transaction: Dict) -> bool:
+def save_transaction_to_db(transaction: Dict) -> Union[int, None, bool]:
     """
-    Uloženie transakcie do Turso databázy cez CLI
+    Uloženie transakcie do Turso databázy
     
     Args:
         transaction: Dictionary s údajmi transakcie
         
+    Transakcia s odtlačkom, ktorý už v databáze je (fingerprints), sa
+    nevloží znova - INSERT ... ON CONFLICT (Fingerprint) DO NOTHING.
+    
     Returns:
-        True ak úspešné, False inak
+        TransactionID vloženej transakcie, None pre duplicitu (už uložená),
+        False pri chybe
     """
     try:
-        # Najprv skúsime nájsť AccountID podľa IBAN
-        account_id = None
-        iban = transaction.get('iban', '')
-        
-        if iban:
-            account_query = f"SELECT AccountID FROM Accounts WHERE IBAN = '{iban}' AND IsActive = 1 LIMIT 1;"
-            account_result = subprocess.run(
-                ['turso', 'db', 'shell', 'financa-sprava', account_query],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if account_result.returncode == 0:
-                lines = account_result.stdout.strip().split('\n')
-                if len(lines) > 1 and lines[1].strip():
-                    account_id = int(lines[1].strip())
-                    print(f"  🏦 Účet nájdený: AccountID = {account_id}")
-                else:
-                    print(f"  ⚠️  Účet s IBAN {iban} neexistuje v Settings. Pridaj ho!")
-        
-        # Pripravíme SQL query
-        account_id_sql = str(account_id) if account_id else 'NULL'
+        fingerprint = fingerprints.transaction_fingerprint(transaction)
+        index = fingerprints.get_index()
+        if index.is_known(fingerprint):
+            print(f"⏭️  Transakcia už je uložená: {transaction.get('merchant')} - {transaction['amount']} EUR")
+            return None
         
-        query = f"""
+        # AccountID podľa IBAN cez subquery, transakcia + komprimovaný B-mail
+        # (RawEmails) atomicky v jednom round trip-e
+        query = """
         INSERT INTO Transactions (
             TransactionDate,
             Amount,
@@ -253,41 +112,60 @@ def save_transaction_to_db(transaction: Dict) -> bool:
             TransactionType,
             PaymentMethod,
             CO2Footprint,
-            RawEmailData,
             CategorySource,
             AccountID,
-            CreatedAt
+            CreatedAt,
+            AmountCents,
+            TxEpoch,
+            TxDay,
+            Fingerprint
         ) VALUES (
-            '{transaction['date'].isoformat()}',
-            {transaction['amount']},
-            'EUR',
-            '{transaction.get('merchant', 'Unknown').replace("'", "''")}',
-            '{transaction.get('description', '').replace("'", "''")}',
-            '{transaction.get('iban', '')}',
-            '{transaction.get('variable_symbol', '')}',
-            '{transaction.get('transaction_type', 'Debit')}',
-            '{transaction.get('payment_method', 'Other')}',
-            {transaction.get('co2_footprint', 0)},
-            '{transaction.get('raw_email', '').replace("'", "''")}',
-            'Email',
-            {account_id_sql},
-            '{datetime.now().isoformat()}'
-        );
+            ?, ?, 'EUR', ?, ?, ?, ?, ?, ?, ?, 'Email',
+            (SELECT AccountID FROM Accounts WHERE IBAN = ? AND IsActive = 1 LIMIT 1),
+            ?, ?, ?, ?, ?
+        )
+        ON CONFLICT (Fingerprint) DO NOTHING
+        RETURNING TransactionID, AccountID;
         """
+        iban = transaction.get('iban', '')
+        statements = [(query, [
+            transaction['date'].isoformat(),
+            transaction['amount'],
+            transaction.get('merchant', 'Unknown'),
+            transaction.get('description', ''),
+            iban,
+            transaction.get('variable_symbol', ''),
+            transaction.get('transaction_type', 'Debit'),
+            transaction.get('payment_method', 'Other'),
+            transaction.get('co2_footprint', 0),
+            iban,
+            datetime.now().isoformat(),
+            *canonical_values(transaction['amount'], transaction['date']),
+            fingerprint
+        ])]
+        raw_email = raw_emails.insert_after_transaction(transaction.get('raw_email'))
+        if raw_email:
+            statements.append(raw_email)
+        result = turso_transaction(statements)[0]
         
-        # Vykonáme cez Turso CLI
-        result = subprocess.run(
-            ['turso', 'db', 'shell', 'financa-sprava', query],
-            capture_output=True,
-            text=True
-        )
+        if not result["success"]:
+            print(f"❌ Chyba pri ukladaní: {result.get('error')}")
+            return False
         
-        if result.returncode == 0:
-            print(f"✅ Transakcia uložená: {transaction['merchant']} - {transaction['amount']} EUR")
-            return True
+        index.add(fingerprint)
+        if not result["data"]:
+            print(f"⏭️  Transakcia už je uložená (iný zdroj): "
+                  f"{transaction.get('merchant')} - {transaction['amount']} EUR")
+            return None
+        
+        row = result["data"][0]
+        if row["AccountID"]:
+            print(f"  🏦 Účet nájdený: AccountID = {row['AccountID']}")
         else:
-            print(f"❌ Chyba pri ukladaní: {result.stderr}")
-            return False
+            print(f"  ⚠️  Účet s IBAN {iban} neexistuje v Settings. Pridaj ho!")
+        print(f"✅ Transakcia uložená (ID={row['TransactionID']}): "
+              f"{transaction.get('merchant')} - {transaction['amount']} EUR")
+        return int(row["TransactionID"])
     
     except Exception as e:
         print(f"❌ Chyba: {e}")
@@ -326,23 +204,15 @@ def main():
     if not receiver.connect():
         return
     
-    # Získanie emailov
+    # Získanie a spracovanie nových emailov po jednom
     print("\n📬 Kontrolujem B-mail notifikácie...")
-    emails = receiver.get_unread_emails()
-    
-    if not emails:
-        print("📭 Žiadne B-mail notifikácie")
-        receiver.disconnect()
-        return
-    
-    print(f"\n📨 Našiel som {len(emails)} B-mail notifikácií\n")
-    
-    # Spracovanie každého emailu
     parser = BMailParser()
     success_count = 0
+    total = 0
     
-    for i, email_data in enumerate(emails, 1):
-        print(f"\n--- Email {i}/{len(emails)} ---")
+    for email_data in receiver.get_unread_emails():
+        total += 1
+        print(f"\n--- Email #{total} (UID {email_data['uid']}) ---")
         print(f"Predmet: {email_data['subject']}")
         
         # Parsovanie transakcie
@@ -354,44 +224,39 @@ def main():
             print(f"📅 Dátum: {transaction['date']}")
             
             # Uloženie do databázy
-            if save_transaction_to_db(transaction):
+            transaction_id = save_transaction_to_db(transaction)
+            if transaction_id is not False:
                 success_count += 1
                 
-                # Pokúsime sa automaticky kategorizovať
-                try:
-                    from auto_categorize import AutoCategorizer
-                    categorizer = AutoCategorizer()
-                    
-                    # Získame ID poslednej vloženej transakcie
-                    result = subprocess.run(
-                        ['turso', 'db', 'shell', 'financa-sprava',
-                         'SELECT TransactionID FROM Transactions ORDER BY TransactionID DESC LIMIT 1;'],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    if result.returncode == 0:
-                        lines = result.stdout.strip().split('\n')
-                        if len(lines) > 1:
-                            transaction_id = int(lines[1].strip())
-                            print(f"\n🤖 Automatická kategorizácia...")
-                            categorizer.categorize_transaction(
-                                transaction_id,
-                                transaction.get('merchant', 'Unknown'),
-                                transaction.get('description', ''),
-                                transaction['amount']
-                            )
-                except Exception as e:
-                    print(f"⚠️  Auto-kategorizácia zlyhala: {e}")
+                # Kategorizuje sa len práve vložená transakcia (duplicita = None)
+                if transaction_id:
+                    try:
+                        from auto_categorize import AutoCategorizer
+                        categorizer = AutoCategorizer()
+                        print(f"\n🤖 Automatická kategorizácia...")
+                        categorizer.categorize_transaction(
+                            transaction_id,
+                            transaction.get('merchant', 'Unknown'),
+                            transaction.get('description', ''),
+                            transaction['amount']
+                        )
+                    except Exception as e:
+                        print(f"⚠️  Auto-kategorizácia zlyhala: {e}")
+            else:
+                # UID sa neposunie - email sa spracuje pri ďalšom spustení
+                break
         else:
             print("❌ Nepodarilo sa extrahovať údaje")
     
     # Odpojenie
     receiver.disconnect()
     
+    if not total:
+        print("📭 Žiadne nové B-mail notifikácie")
+        return
+    
     print("\n" + "=" * 50)
-    print(f"✅ Úspešne spracovaných: {success_count}/{len(emails)}")
+    print(f"✅ Úspešne spracovaných: {success_count}/{total}")
 
 
 if __name__ == "__main__":
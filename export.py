@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Streamovaný export transakcií - NDJSON, CSV a Parquet
+
+Transakcie sa čítajú po dávkach keyset dotazmi (`ORDER BY TxEpoch DESC,
+TransactionID DESC`, ďalšia dávka = riadky za posledným riadkom
+predošlej), takže v pamäti je vždy len jedna dávka - bez ohľadu na to,
+koľko rokov histórie sa exportuje. Každá dávka sa hneď sformátuje a
+odošle (`/api/transactions/export` vo web_ui).
+
+Surové B-maily (RawEmails) sa pridajú len na požiadanie (`include_raw`),
+načítané a dekomprimované po dávkach cez `raw_emails.load_many`.
+
+Parquet vyžaduje voliteľný balík `pyarrow`; každá dávka je jedna row group.
+
+    python export.py ndjson > transakcie.ndjson
+    python export.py csv --date-from 2025-01-01 > 2025.csv
+    python export.py parquet --include-raw > transakcie.parquet
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from turso_client import ResultSet, turso_query
+from query_filters import encode_cursor, epoch_range, keyset_after
+import raw_emails
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # voliteľná závislosť - len pre formát parquet
+    pyarrow = None
+
+load_dotenv()
+
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '1000'))
+
+# (stĺpec, SQL výraz, typ pre Parquet) - poradie = poradie v exporte
+EXPORT_COLUMNS: List[Tuple[str, str, str]] = [
+    ('TransactionID', 't.TransactionID', 'int64'),
+    ('TransactionDate', 't.TransactionDate', 'string'),
+    ('TxEpoch', 't.TxEpoch', 'int64'),
+    ('Amount', 't.Amount', 'float64'),
+    ('AmountCents', 't.AmountCents', 'int64'),
+    ('Currency', 't.Currency', 'string'),
+    ('MerchantName', 't.MerchantName', 'string'),
+    ('Description', 't.Description', 'string'),
+    ('TransactionType', 't.TransactionType', 'string'),
+    ('PaymentMethod', 't.PaymentMethod', 'string'),
+    ('IBAN', 't.IBAN', 'string'),
+    ('VariableSymbol', 't.VariableSymbol', 'string'),
+    ('ConstantSymbol', 't.ConstantSymbol', 'string'),
+    ('SpecificSymbol', 't.SpecificSymbol', 'string'),
+    ('RecipientInfo', 't.RecipientInfo', 'string'),
+    ('CounterpartyPurpose', 't.CounterpartyPurpose', 'string'),
+    ('CO2Footprint', 't.CO2Footprint', 'float64'),
+    ('CategoryName', "COALESCE(c.Name, 'Nezaradené')", 'string'),
+    ('CategorySource', 't.CategorySource', 'string'),
+    ('AccountName', "COALESCE(a.AccountName, 'Nepriradený')", 'string'),
+    ('AccountIBAN', 'a.IBAN', 'string'),
+    ('CreatedAt', 't.CreatedAt', 'string'),
+]
+RAW_EMAIL_COLUMN = ('RawEmail', None, 'string')
+
+SELECT_SQL = """
+    SELECT {columns}
+    FROM Transactions t
+    LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
+    LEFT JOIN Accounts a ON t.AccountID = a.AccountID
+    {where}
+    ORDER BY t.TxEpoch DESC, t.TransactionID DESC
+    LIMIT ?;
+"""
+
+
+def column_names(include_raw: bool = False) -> List[str]:
+    names = [name for name, _, _ in EXPORT_COLUMNS]
+    return names + [RAW_EMAIL_COLUMN[0]] if include_raw else names
+
+
+def iter_chunks(
+    conditions: Sequence[str] = (),
+    args: Sequence[Any] = (),
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    include_raw: bool = False
+) -> Iterator[ResultSet]:
+    """
+    Dávky transakcií pre filter (podmienky nad aliasmi t / c / a)
+
+    Každá dávka je samostatný keyset dotaz - medzi dávkami sa nedrží
+    žiadne spojenie ani kurzor databázy.
+
+    Raises:
+        RuntimeError: pri chybe dotazu (stream sa preruší)
+    """
+    columns = ', '.join(f"{expr} AS {name}" for name, expr, _ in EXPORT_COLUMNS)
+    cursor = None
+    while True:
+        cursor_conditions, cursor_args = keyset_after("t.TxEpoch", "t.TransactionID", cursor)
+        where_conditions = list(conditions) + cursor_conditions
+        where = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        result = turso_query(
+            SELECT_SQL.format(columns=columns, where=where),
+            list(args) + cursor_args + [chunk_size]
+        )
+        if not result["success"]:
+            raise RuntimeError(result.get("error", "Export query failed"))
+        chunk = result["data"]
+        if not chunk:
+            return
+
+        if include_raw:
+            emails = raw_emails.load_many(chunk.column('TransactionID'))
+            chunk = ResultSet(
+                chunk.columns + (RAW_EMAIL_COLUMN[0],),
+                [values + (emails.get(values[0]),) for values in chunk.rows]
+            )
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            return
+        cursor = encode_cursor(chunk[-1])
+
+
+def ndjson_stream(chunks: Iterable[ResultSet]) -> Iterator[str]:
+    """Jeden JSON objekt na riadok"""
+    for chunk in chunks:
+        columns = chunk.columns
+        yield ''.join(
+            json.dumps(dict(zip(columns, values)), ensure_ascii=False, separators=(',', ':')) + '\n'
+            for values in chunk.rows
+        )
+
+
+def csv_stream(chunks: Iterable[ResultSet], include_raw: bool = False) -> Iterator[str]:
+    """CSV s hlavičkou (aj pre prázdny export)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column_names(include_raw))
+    for chunk in chunks:
+        writer.writerows(chunk.rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _StreamSink(io.RawIOBase):
+    """Zapisovateľný súbor pre ParquetWriter - zapísané bajty sa odoberajú cez `drain`"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def parquet_schema(include_raw: bool = False):
+    columns = EXPORT_COLUMNS + [RAW_EMAIL_COLUMN] if include_raw else EXPORT_COLUMNS
+    return pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, _, kind in columns])
+
+
+def parquet_stream(chunks: Iterable[ResultSet], include_raw: bool = False) -> Iterator[bytes]:
+    """Parquet súbor - jedna row group na dávku, pätička na konci"""
+    if pyarrow is None:
+        raise RuntimeError("Export do Parquet vyžaduje balík pyarrow")
+    schema = parquet_schema(include_raw)
+    sink = _StreamSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for chunk in chunks:
+            writer.write_table(pyarrow.Table.from_pydict(
+                {name: chunk.column(name) for name in schema.names}, schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# formát -> (mimetype, prípona, generátor(chunks, include_raw))
+FORMATS: Dict[str, Tuple[str, str, Callable[[Iterable[ResultSet], bool], Iterator[Any]]]] = {
+    'ndjson': ('application/x-ndjson', 'ndjson', lambda chunks, include_raw: ndjson_stream(chunks)),
+    'csv': ('text/csv; charset=utf-8', 'csv', csv_stream),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', parquet_stream),
+}
+
+
+def format_available(name: str) -> bool:
+    return name in FORMATS and (name != 'parquet' or pyarrow is not None)
+
+
+def export(
+    fmt: str,
+    conditions: Sequence[str] = (),
+    args: Sequence[Any] = (),
+    include_raw: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """Stream exportu vo formáte fmt (str pre ndjson/csv, bytes pre parquet)"""
+    _, _, stream = FORMATS[fmt]
+    return stream(iter_chunks(conditions, args, chunk_size, include_raw), include_raw)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('format', choices=sorted(FORMATS))
+    parser.add_argument('--date-from')
+    parser.add_argument('--date-to')
+    parser.add_argument('--include-raw', action='store_true')
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if not format_available(args.format):
+        print("❌ Export do Parquet vyžaduje balík pyarrow", file=sys.stderr)
+        return 1
+
+    try:
+        conditions, query_args = epoch_range("t.TxEpoch", args.date_from, args.date_to)
+    except ValueError:
+        print("❌ Neplatný dátum (očakávaný formát YYYY-MM-DD)", file=sys.stderr)
+        return 2
+
+    out = sys.stdout.buffer
+    try:
+        for part in export(args.format, conditions, query_args, args.include_raw, args.chunk_size):
+            out.write(part if isinstance(part, bytes) else part.encode('utf-8'))
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    out.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Odtlačky transakcií - idempotentný príjem B-mailov zo všetkých zdrojov
+
+Ten istý B-mail príde cez CloudMailin webhook (`/api/receive-email`),
+IMAP worker, monitor_bmails.py aj `/api/sync-emails`. Každá transakcia z
+B-mailu dostane odtlačok - hash normalizovaného (IBAN, dátum a čas, suma
+v centoch, popis) - uložený v unikátnom stĺpci Transactions.Fingerprint
+(migrácia 0011). Vkladá sa cez `INSERT ... ON CONFLICT (Fingerprint) DO
+NOTHING`, takže druhý výskyt sa nevloží bez ohľadu na zdroj a poradie.
+
+Odtlačok je z obsahu, nie z Message-ID: CloudMailin vo form-data formáte
+hlavičku Message-ID neposiela, preposlaná kópia B-mailu má nový a
+transakcie uložené pred migráciou ho nemajú vôbec.
+
+Pred databázou stojí bloom filter v procese (naplnený odtlačkami z
+databázy pri prvom použití): "určite nový" odtlačok ide rovno na INSERT.
+Kladnú odpoveď (bloom filter môže mať falošné zhody) potvrdí presná
+množina odtlačkov spracovaných v tomto procese, inak jeden SELECT podľa
+unikátneho indexu.
+
+    python fingerprints.py backfill                      # doplní odtlačky starých B-mailov
+    python fingerprints.py backfill --delete-duplicates  # ... a zmaže duplicitné riadky
+    python fingerprints.py stats
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+from turso_client import Statement, turso_query, turso_transaction
+
+load_dotenv()
+
+FINGERPRINT_BLOOM_CAPACITY = int(os.getenv('FINGERPRINT_BLOOM_CAPACITY', '200000'))
+FINGERPRINT_BLOOM_ERROR_RATE = float(os.getenv('FINGERPRINT_BLOOM_ERROR_RATE', '0.001'))
+FINGERPRINT_RECENT = int(os.getenv('FINGERPRINT_RECENT', '10000'))
+FINGERPRINT_BACKFILL_BATCH = int(os.getenv('FINGERPRINT_BACKFILL_BATCH', '500'))
+
+# Transakcie z B-mailov (kandidáti na backfill) - webhook ich ukladá ako 'Auto'
+# alebo 'Email', IMAP cesty ako 'Email'; všetky s B-mailom majú riadok v RawEmails
+BMAIL_ROWS_SQL = (
+    "(t.CategorySource IN ('Email', 'Auto') "
+    "OR EXISTS (SELECT 1 FROM RawEmails r WHERE r.TransactionID = t.TransactionID))"
+)
+
+
+# ==============================================================================
+# Odtlačok
+# ==============================================================================
+
+def _normalize_text(text: Optional[str]) -> str:
+    """Malé písmená bez diakritiky, jedna medzera, bez koncovej bodky"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', text).strip().rstrip('.').casefold()
+
+
+def fingerprint(iban: Optional[str], when: datetime, amount: float, description: Optional[str]) -> str:
+    """
+    Odtlačok transakcie z B-mailu (32 hex znakov)
+
+    Čas sa berie na minúty (B-mail sekundy nemá), suma v centoch - rovnaký
+    výsledok pre "12,50" z webhooku aj 12.5 z IMAP parsera.
+    """
+    key = '|'.join((
+        re.sub(r'\s+', '', iban or '').upper(),
+        when.strftime('%Y-%m-%dT%H:%M'),
+        str(int(round(amount * 100))),
+        _normalize_text(description),
+    ))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def transaction_fingerprint(transaction: Dict[str, Any]) -> str:
+    """Odtlačok pre dict z BMailParser.parse_transaction (iban, date, amount, description)"""
+    return fingerprint(
+        transaction.get('iban'), transaction['date'], transaction['amount'], transaction.get('description')
+    )
+
+
+# ==============================================================================
+# Bloom filter
+# ==============================================================================
+
+class BloomFilter:
+    """Bloom filter nad bytearray - k pozícií z dvoch 64-bit hashov (Kirsch-Mitzenmacher)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class FingerprintIndex:
+    """
+    Známe odtlačky: bloom filter + presná množina posledných odtlačkov procesu
+
+    Databáza (unikátny index) ostáva zdrojom pravdy - index len šetrí round
+    tripy. Pri výpadku databázy `is_known` vráti False a rozhodne ON CONFLICT.
+    """
+
+    def __init__(
+        self,
+        capacity: int = FINGERPRINT_BLOOM_CAPACITY,
+        error_rate: float = FINGERPRINT_BLOOM_ERROR_RATE,
+        recent: int = FINGERPRINT_RECENT
+    ):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.recent: "OrderedDict[str, None]" = OrderedDict()
+        self.recent_limit = recent
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.db_checks = 0
+        self.skipped = 0
+
+    def load(self) -> bool:
+        """Naplnenie bloom filtra odtlačkami z databázy (raz, pri prvom použití)"""
+        with self.lock:
+            if self.loaded:
+                return True
+            result = turso_query("SELECT Fingerprint FROM Transactions WHERE Fingerprint IS NOT NULL;")
+            if not result["success"]:
+                print(f"⚠️  Načítanie odtlačkov zlyhalo: {result.get('error')}")
+                return False
+            for row in result["data"]:
+                self.bloom.add(row["Fingerprint"])
+            self.loaded = True
+            return True
+
+    def add(self, value: str):
+        """Odtlačok je v databáze (vložený alebo odmietnutý ako duplicita)"""
+        with self.lock:
+            self.bloom.add(value)
+            self.recent[value] = None
+            self.recent.move_to_end(value)
+            while len(self.recent) > self.recent_limit:
+                self.recent.popitem(last=False)
+
+    def is_known(self, value: str) -> bool:
+        """True = transakcia s týmto odtlačkom už v databáze je (preskočiť)"""
+        self.load()
+        with self.lock:
+            if value not in self.bloom:
+                return False
+            if value in self.recent:
+                self.skipped += 1
+                return True
+        self.db_checks += 1
+        result = turso_query("SELECT 1 FROM Transactions WHERE Fingerprint = ? LIMIT 1;", [value])
+        known = bool(result["success"] and result["data"])
+        if known:
+            self.add(value)
+            self.skipped += 1
+        return known
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "bloom_entries": len(self.bloom),
+            "bloom_bytes": len(self.bloom.bits),
+            "recent": len(self.recent),
+            "db_checks": self.db_checks,
+            "skipped": self.skipped,
+        }
+
+
+_default_index: Optional[FingerprintIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_index() -> FingerprintIndex:
+    """Zdieľaný index odtlačkov pre proces"""
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = FingerprintIndex()
+    return _default_index
+
+
+# ==============================================================================
+# Backfill existujúcich B-mail transakcií
+# ==============================================================================
+
+def backfill(batch_size: int = FINGERPRINT_BACKFILL_BATCH, delete_duplicates: bool = False) -> Dict[str, int]:
+    """
+    Doplní Fingerprint B-mail transakciám bez neho, po dávkach (keyset podľa TransactionID)
+
+    Transakcia, ktorej odtlačok už má staršia transakcia, je duplicita -
+    ostane bez odtlačku (UPDATE OR IGNORE), s delete_duplicates sa zmaže
+    aj s jej RawEmails.
+
+    Returns:
+        {"updated", "duplicates", "deleted"}
+    """
+    counts = {"updated": 0, "duplicates": 0, "deleted": 0}
+    last_id = 0
+    while True:
+        result = turso_query(
+            f"""
+            SELECT t.TransactionID, t.IBAN, t.TransactionDate, t.Amount, t.Description
+            FROM Transactions t
+            WHERE t.TransactionID > ? AND t.Fingerprint IS NULL AND {BMAIL_ROWS_SQL}
+            ORDER BY t.TransactionID LIMIT ?;
+            """,
+            [last_id, batch_size]
+        )
+        if not result["success"]:
+            raise RuntimeError(result.get("error", "Transactions query failed"))
+        rows = list(result["data"])
+        if not rows:
+            return counts
+        last_id = rows[-1]["TransactionID"]
+
+        ids: List[int] = []
+        statements: List[Statement] = []
+        for row in rows:
+            try:
+                when = datetime.fromisoformat(str(row["TransactionDate"]))
+            except ValueError:
+                continue
+            value = fingerprint(row["IBAN"], when, float(row["Amount"]), row["Description"])
+            ids.append(row["TransactionID"])
+            statements.append((
+                "UPDATE OR IGNORE Transactions SET Fingerprint = ? WHERE TransactionID = ?;",
+                [value, row["TransactionID"]]
+            ))
+        if not statements:
+            continue
+        results = turso_transaction(statements)
+        if not all(r["success"] for r in results):
+            raise RuntimeError(results[0].get("error", "Fingerprint update failed"))
+
+        duplicates = [tid for tid, r in zip(ids, results) if not r.get("affected_rows")]
+        counts["updated"] += len(ids) - len(duplicates)
+        counts["duplicates"] += len(duplicates)
+        if delete_duplicates and duplicates:
+            placeholders = ', '.join('?' * len(duplicates))
+            results = turso_transaction([
+                (f"DELETE FROM RawEmails WHERE TransactionID IN ({placeholders});", duplicates),
+                (f"DELETE FROM Transactions WHERE TransactionID IN ({placeholders});", duplicates),
+            ])
+            if not all(r["success"] for r in results):
+                raise RuntimeError(results[0].get("error", "Duplicate delete failed"))
+            counts["deleted"] += results[1].get("affected_rows") or 0
+        print(f"   🔑 odtlačkov {counts['updated']}, duplicít {counts['duplicates']}")
+
+
+def stats() -> Dict[str, int]:
+    result = turso_query(
+        f"""
+        SELECT COUNT(t.Fingerprint) AS WithFingerprint,
+               SUM(CASE WHEN t.Fingerprint IS NULL AND {BMAIL_ROWS_SQL} THEN 1 ELSE 0 END) AS Missing
+        FROM Transactions t;
+        """
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Transactions query failed"))
+    row = result["data"][0]
+    return {"with_fingerprint": int(row["WithFingerprint"] or 0), "missing": int(row["Missing"] or 0)}
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Odtlačky B-mail transakcií")
+    parser.add_argument('command', nargs='?', default='stats', choices=('backfill', 'stats'))
+    parser.add_argument('--delete-duplicates', action='store_true',
+                        help='pri backfille zmazať duplicitné B-mail transakcie')
+    args = parser.parse_args(argv[1:])
+
+    try:
+        if args.command == 'backfill':
+            print("🔑 Dopĺňam odtlačky B-mail transakcií...")
+            counts = backfill(delete_duplicates=args.delete_duplicates)
+            print(f"✅ Odtlačkov: {counts['updated']}, duplicít: {counts['duplicates']}, "
+                  f"zmazaných: {counts['deleted']}")
+            return 0
+
+        counts = stats()
+        print(f"  s odtlačkom {counts['with_fingerprint']:>8}")
+        print(f"  bez odtlačku (B-mail) {counts['missing']:>8}")
+        return 0
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
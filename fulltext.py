@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Fulltextové vyhľadávanie transakcií - FTS5 tabuľka TransactionsFts
+
+`MerchantName LIKE '%...%'` nepoužije žiadny index a prejde celú tabuľku
+Transactions. Vyhľadávacie endpointy namiesto toho hľadajú v FTS5 indexe
+nad MerchantName, Description, RecipientInfo a CounterpartyPurpose
+(migrations/0007_fulltext.sql) - bez diakritiky, s prefixami a poradím
+podľa relevancie (bm25). Tabuľku, triggery a prvé naplnenie robí
+migrácia (python migrate.py).
+
+    python fulltext.py rebuild   # znovu naplní index z Transactions
+    python fulltext.py check     # FTS5 integrity-check voči Transactions
+"""
+
+import re
+import sys
+from typing import Any, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from turso_client import turso_query, turso_transaction
+
+load_dotenv()
+
+REBUILD_STATEMENTS = ["INSERT INTO TransactionsFts (TransactionsFts) VALUES ('rebuild')"]
+CHECK_STATEMENT = "INSERT INTO TransactionsFts (TransactionsFts, rank) VALUES ('integrity-check', 1)"
+
+# Join pre poradie podľa relevancie: ... FROM Transactions t {RANK_JOIN} WHERE {RANK_CONDITION} ORDER BY f.rank
+RANK_JOIN = "JOIN TransactionsFts f ON f.rowid = t.TransactionID"
+RANK_CONDITION = "f.TransactionsFts MATCH ?"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def match_query(text: str) -> Optional[str]:
+    """
+    Text od používateľa -> FTS5 MATCH výraz
+
+    Každé slovo je prefix v úvodzovkách (`"kaviar"*`), slová sa spájajú
+    cez AND. Úvodzovky zároveň neutralizujú FTS5 syntax (NEAR, OR, -, ...)
+    v zadanom texte. None = text neobsahuje žiadne slovo.
+    """
+    words = _WORD.findall(text or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_filter(rowid_column: str, text: str) -> Tuple[List[str], List[Any]]:
+    """
+    Podmienka `rowid_column` patrí medzi výsledky fulltextu (poradie určí volajúci)
+
+    Returns:
+        (podmienky, argumenty) - prázdne, ak text neobsahuje žiadne slovo
+    """
+    query = match_query(text)
+    if query is None:
+        return [], []
+    return [f"{rowid_column} IN (SELECT rowid FROM TransactionsFts WHERE TransactionsFts MATCH ?)"], [query]
+
+
+def rebuild() -> bool:
+    """Naplní index znovu z obsahu Transactions"""
+    results = turso_transaction(REBUILD_STATEMENTS)
+    return bool(results) and all(result["success"] for result in results)
+
+
+def check() -> Optional[str]:
+    """None = index zodpovedá Transactions, inak chybová správa FTS5"""
+    result = turso_query(CHECK_STATEMENT)
+    return None if result["success"] else result.get("error", "integrity-check failed")
+
+
+def main(argv: List[str]) -> int:
+    command = argv[1] if len(argv) > 1 else 'check'
+
+    if command == 'rebuild':
+        print("🔁 Napĺňam fulltextový index z Transactions...")
+        if not rebuild():
+            print("❌ Naplnenie zlyhalo")
+            return 1
+        print("✅ Fulltextový index naplnený")
+        return 0
+
+    if command == 'check':
+        print("🔍 Kontrolujem fulltextový index...")
+        error = check()
+        if error is None:
+            print("✅ Fulltextový index je konzistentný s Transactions")
+            return 0
+        print(f"❌ {error} - spusti: python fulltext.py rebuild")
+        return 1
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
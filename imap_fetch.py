@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Dávkové čiastočné sťahovanie správ z IMAP
+
+Namiesto `FETCH <id> (RFC822)` po jednej správe (celá správa vrátane
+HTML alternatívy a príloh, jeden round trip na správu) stiahne dávku
+správ dvoma príkazmi:
+
+1. `UID FETCH <uid-set> (BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS (...)])`
+   - štruktúra správy a len potrebné hlavičky
+2. `UID FETCH <uid-set> (BODY.PEEK[<časť>])` - len text/plain časť,
+   jeden príkaz pre všetky správy s rovnakým číslom časti
+
+Správy bez text/plain časti sa stiahnu celé (`BODY.PEEK[]`). PEEK
+nemení príznak \\Seen. Ak server ponúka COMPRESS=DEFLATE (RFC 4978),
+`enable_compression` zapne kompresiu celého spojenia.
+
+Výsledok má rovnaký tvar ako pôvodné `_parse_email` (subject, date, body,
+from) + uid a message_id.
+"""
+
+import base64
+import email
+import imaplib
+import io
+import os
+import quopri
+import re
+import zlib
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+IMAP_FETCH_BATCH = int(os.getenv('IMAP_FETCH_BATCH', '50'))
+IMAP_COMPRESS = os.getenv('IMAP_COMPRESS', '1') == '1'
+
+HEADER_FIELDS = 'SUBJECT DATE FROM MESSAGE-ID'
+
+# atóm s voliteľnou [sekciou] (môže obsahovať medzery a zátvorky) a <offsetom>
+_TOKEN = re.compile(
+    rb'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"\[\]]*\[[^\]]*\](?:<\d+>)?|[^\s()"]+'
+)
+_LITERAL = re.compile(rb'\{(\d+)\}$')
+_MESSAGE_START = re.compile(rb'^\d+ \(')
+
+_LITERAL_MARK = object()
+
+
+# ==============================================================================
+# Parsovanie FETCH odpovedí
+# ==============================================================================
+
+def _tokens(data: Sequence[Any]) -> Iterator[Tuple[int, List[Any]]]:
+    """Odpoveď imaplib FETCH -> (seq, tokeny) po správach; literal = (_LITERAL_MARK, bytes)"""
+    seq, tokens = None, []
+    for part in data:
+        text, literal = (part[0], part[1]) if isinstance(part, tuple) else (part, None)
+        if text is None:
+            continue
+        if _MESSAGE_START.match(text):
+            if seq is not None:
+                yield seq, tokens
+            number, _, text = text.partition(b' ')
+            seq, tokens = int(number), []
+        if literal is not None:
+            text = _LITERAL.sub(b'', text.rstrip())
+        tokens.extend(_TOKEN.findall(text))
+        if literal is not None:
+            tokens.append((_LITERAL_MARK, literal))
+    if seq is not None:
+        yield seq, tokens
+
+
+def _parse(tokens: List[Any], position: int = 0) -> Tuple[Any, int]:
+    """Jeden prvok (zoznam v zátvorkách, reťazec, číslo, NIL) od position"""
+    token = tokens[position]
+    if isinstance(token, tuple):
+        return token[1], position + 1
+    if token == b'(':
+        items, position = [], position + 1
+        while tokens[position] != b')':
+            item, position = _parse(tokens, position)
+            items.append(item)
+        return items, position + 1
+    if token.startswith(b'"'):
+        return re.sub(rb'\\(.)', rb'\1', token[1:-1]), position + 1
+    if token.upper() == b'NIL':
+        return None, position + 1
+    if token.isdigit():
+        return int(token), position + 1
+    return token, position + 1
+
+
+def parse_fetch(data: Sequence[Any]) -> Dict[int, Dict[str, Any]]:
+    """
+    FETCH odpoveď -> {uid: {POLOŽKA: hodnota}}
+
+    Kľúče sú veľkými písmenami tak, ako ich vrátil server (napr.
+    `BODYSTRUCTURE`, `BODY[1]`, `BODY[HEADER.FIELDS (SUBJECT DATE)]`).
+    """
+    messages = {}
+    for _, tokens in _tokens(data):
+        items, _ = _parse(tokens)
+        fields = {}
+        for index in range(0, len(items) - 1, 2):
+            key = items[index]
+            fields[key.decode('ascii', 'replace').upper() if isinstance(key, bytes) else str(key)] = items[index + 1]
+        if 'UID' in fields:
+            messages[int(fields['UID'])] = fields
+    return messages
+
+
+def _section_value(fields: Dict[str, Any], prefix: str) -> Optional[bytes]:
+    """Hodnota položky BODY[...] podľa začiatku sekcie (server môže upraviť medzery)"""
+    for key, value in fields.items():
+        if key.startswith(prefix):
+            return value
+    return None
+
+
+# ==============================================================================
+# BODYSTRUCTURE
+# ==============================================================================
+
+def _text(value: Any) -> str:
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else ('' if value is None else str(value))
+
+
+def _params(value: Any) -> Dict[str, str]:
+    if not isinstance(value, list):
+        return {}
+    return {_text(value[i]).lower(): _text(value[i + 1]) for i in range(0, len(value) - 1, 2)}
+
+
+def find_text_part(structure: Any, section: str = '') -> Optional[Tuple[str, str, str]]:
+    """
+    Posledná text/plain časť (ako pôvodné `_parse_email`), ktorá nie je príloha
+
+    Returns:
+        (sekcia pre BODY[...], Content-Transfer-Encoding, charset) alebo None
+    """
+    if not isinstance(structure, list) or not structure:
+        return None
+    if isinstance(structure[0], list):  # multipart: časti..., subtyp, rozšírené polia
+        found = None
+        for index, child in enumerate(structure):
+            if not isinstance(child, list):
+                break
+            result = find_text_part(child, f"{section}.{index + 1}" if section else str(index + 1))
+            if result:
+                found = result
+        return found
+
+    media_type, subtype = _text(structure[0]).lower(), _text(structure[1]).lower()
+    if (media_type, subtype) != ('text', 'plain'):
+        return None
+    # text/*: typ, subtyp, parametre, id, popis, kódovanie, veľkosť, riadky, md5, disposition
+    disposition = structure[9] if len(structure) > 9 else None
+    if isinstance(disposition, list) and disposition and _text(disposition[0]).lower() == 'attachment':
+        return None
+    charset = _params(structure[2]).get('charset', 'utf-8')
+    return section or '1', _text(structure[5]).lower(), charset
+
+
+def decode_body(raw: bytes, encoding: str, charset: str) -> str:
+    if encoding == 'quoted-printable':
+        raw = quopri.decodestring(raw)
+    elif encoding == 'base64':
+        raw = base64.b64decode(raw)
+    try:
+        return raw.decode(charset or 'utf-8', 'replace')
+    except LookupError:
+        return raw.decode('utf-8', 'replace')
+
+
+def _decode_subject(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    try:
+        return str(make_header(decode_header(value)))
+    except (UnicodeDecodeError, LookupError):
+        return value
+
+
+def _headers(raw: Optional[bytes]) -> Dict[str, Any]:
+    headers = BytesHeaderParser().parsebytes(raw or b'')
+    return {
+        "subject": _decode_subject(headers["Subject"]),
+        "date": headers["Date"],
+        "from": headers["From"],
+        "message_id": (headers["Message-ID"] or '').strip() or None,
+    }
+
+
+def message_body(msg) -> str:
+    """text/plain z celej správy (správy bez text/plain v BODYSTRUCTURE, import archívov)"""
+    body = ""
+    for part in (msg.walk() if msg.is_multipart() else [msg]):
+        if part.is_multipart():
+            continue
+        if msg.is_multipart() and part.get_content_type() != "text/plain":
+            continue
+        payload = part.get_payload(decode=True) or b''
+        body = payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+    return body
+
+
+# ==============================================================================
+# Dávkový fetch
+# ==============================================================================
+
+def uid_set(uids: Iterable[int]) -> str:
+    """[3, 4, 5, 9] -> '3:5,9'"""
+    ranges: List[List[int]] = []
+    for uid in sorted(set(uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ','.join(str(low) if low == high else f"{low}:{high}" for low, high in ranges)
+
+
+def _uid_fetch(mail, uids: Sequence[int], items: str) -> Dict[int, Dict[str, Any]]:
+    status, data = mail.uid('FETCH', uid_set(uids), items)
+    if status != 'OK':
+        raise RuntimeError(f"UID FETCH {items} zlyhal: {status}")
+    return parse_fetch(data)
+
+
+def fetch_batch(mail, uids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Hlavičky + text/plain telo pre dávku UID
+
+    Returns:
+        {uid: {subject, date, body, from, message_id, uid}} - zmazané správy chýbajú
+    """
+    if not uids:
+        return {}
+    overview = _uid_fetch(mail, uids, f'(BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])')
+
+    results: Dict[int, Dict[str, Any]] = {}
+    by_section: Dict[str, List[int]] = {}
+    parts: Dict[int, Tuple[str, str, str]] = {}
+    full: List[int] = []
+    for uid, fields in overview.items():
+        results[uid] = dict(_headers(_section_value(fields, 'BODY[HEADER')), body="", uid=uid)
+        part = find_text_part(fields.get('BODYSTRUCTURE'))
+        if part:
+            parts[uid] = part
+            by_section.setdefault(part[0], []).append(uid)
+        else:
+            full.append(uid)
+
+    for section, section_uids in by_section.items():
+        bodies = _uid_fetch(mail, section_uids, f'(BODY.PEEK[{section}])')
+        for uid, fields in bodies.items():
+            raw = _section_value(fields, f'BODY[{section}]')
+            if uid in results and raw is not None:
+                _, encoding, charset = parts[uid]
+                results[uid]["body"] = decode_body(raw, encoding, charset)
+
+    if full:
+        for uid, fields in _uid_fetch(mail, full, '(BODY.PEEK[])').items():
+            raw = _section_value(fields, 'BODY[]')
+            if uid in results and raw is not None:
+                results[uid]["body"] = message_body(email.message_from_bytes(raw))
+
+    return results
+
+
+def iter_fetch(mail, uids: Sequence[int], batch_size: int = IMAP_FETCH_BATCH) -> Iterator[Dict[str, Any]]:
+    """Správy v poradí uids, sťahované po dávkach batch_size"""
+    for start in range(0, len(uids), batch_size):
+        batch = list(uids[start:start + batch_size])
+        fetched = fetch_batch(mail, batch)
+        for uid in batch:
+            if uid in fetched:
+                yield fetched[uid]
+
+
+# ==============================================================================
+# COMPRESS=DEFLATE (RFC 4978)
+# ==============================================================================
+
+class DeflateSocket:
+    """Socket, ktorý odosielané dáta komprimuje a prijaté dekomprimuje (raw deflate)"""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        self._decompressor = zlib.decompressobj(-15)
+        self._buffer = b''
+        self.bytes_in = 0  # skutočne prenesené (komprimované) bajty
+        self.bytes_in_plain = 0
+
+    def sendall(self, data: bytes):
+        self._sock.sendall(self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def recv(self, size: int) -> bytes:
+        while not self._buffer:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                return b''
+            self.bytes_in += len(chunk)
+            self._buffer = self._decompressor.decompress(chunk)
+            self.bytes_in_plain += len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def pending(self) -> int:
+        """Dekomprimované dáta pripravené bez čítania zo socketu (select ich nevidí)"""
+        inner = getattr(self._sock, 'pending', None)
+        return len(self._buffer) + (inner() if inner else 0)
+
+    def __getattr__(self, name):  # fileno, shutdown, close, settimeout, ...
+        return getattr(self._sock, name)
+
+
+class _SocketReader(io.RawIOBase):
+    def __init__(self, sock):
+        self._sock = sock
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._sock.recv(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def enable_compression(mail) -> bool:
+    """
+    Zapne COMPRESS=DEFLATE na prihlásenom spojení, ak ho server ponúka
+
+    Returns:
+        True, ak je kompresia aktívna
+    """
+    if not IMAP_COMPRESS or isinstance(mail.sock, DeflateSocket):
+        return isinstance(mail.sock, DeflateSocket)
+    status, data = mail.capability()  # po LOGIN môže server ponúknuť viac ako pred ním
+    if status == 'OK' and data and data[-1]:
+        mail.capabilities = tuple(data[-1].decode('ascii', 'replace').upper().split())
+    if 'COMPRESS=DEFLATE' not in mail.capabilities:
+        return False
+
+    imaplib.Commands.setdefault('COMPRESS', ('AUTH', 'SELECTED'))
+    status, _ = mail._simple_command('COMPRESS', 'DEFLATE')
+    if status != 'OK':
+        return False
+    previous = mail.file
+    mail.sock = DeflateSocket(mail.sock)
+    mail.file = io.BufferedReader(_SocketReader(mail.sock))
+    previous.close()  # len makefile() reader, socket ostáva otvorený
+    return True
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Perzistentná IMAP session - jedno prihlásené spojenie na proces
+
+Worker aj `/api/sync-emails` vo web_ui používajú to isté spojenie namiesto
+nového TLS handshake + LOGIN pri každej kontrole / každom HTTP volaní:
+
+- pred použitím spojenia, ktoré bolo dlhšie nečinné (IMAP_KEEPALIVE_INTERVAL),
+  sa pošle NOOP - mŕtvy socket sa tak zistí ešte pred prvým príkazom;
+  voliteľné vlákno (`start_keepalive`) posiela NOOP aj medzi požiadavkami
+- chyba socketu počas práce (`imaplib.IMAP4.abort`, OSError) spojenie
+  zahodí, ďalšie použitie sa pripojí nanovo
+- neúspešné pripojenia sa opakujú s exponenciálnym backoffom s jitterom
+  (IMAP_RECONNECT_BACKOFF * 2^n, najviac IMAP_RECONNECT_MAX_DELAY); počas
+  backoffu `connection()` hneď vyhodí ConnectionError a nečaká
+- po prihlásení sa zapne COMPRESS=DEFLATE, ak ho server ponúka (imap_fetch)
+- `health()` vracia vek spojenia, počty pripojení / reconnectov a poslednú
+  chybu (web_ui /health)
+
+Použitie:
+    with imap_session.get_session().connection() as mail:
+        mail.select("INBOX", readonly=True)
+"""
+
+import imaplib
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+import imap_fetch
+
+load_dotenv()
+
+IMAP_KEEPALIVE_INTERVAL = float(os.getenv('IMAP_KEEPALIVE_INTERVAL', '300'))
+IMAP_RECONNECT_BACKOFF = float(os.getenv('IMAP_RECONNECT_BACKOFF', '2'))
+IMAP_RECONNECT_MAX_DELAY = float(os.getenv('IMAP_RECONNECT_MAX_DELAY', '300'))
+IMAP_TIMEOUT = float(os.getenv('IMAP_TIMEOUT', '30'))
+
+# Chyby, po ktorých spojenie nie je použiteľné (socket, TLS, server ho zavrel)
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, OSError, EOFError)
+
+
+def _backoff_delay(backoff: float, attempt: int, max_delay: float) -> float:
+    """Exponenciálny backoff s jitterom (50-100 % z backoff * 2^attempt, strop max_delay)"""
+    delay = min(max_delay, backoff * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)
+
+
+class ImapSession:
+    """Jedno prihlásené IMAP spojenie s keepalive, reconnectom a štatistikami"""
+
+    def __init__(
+        self,
+        email_address: str,
+        password: str,
+        imap_server: str = "imap.gmail.com",
+        port: Optional[int] = None,
+        keepalive: Optional[float] = None,
+        backoff: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        timeout: Optional[float] = None,
+        factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            factory: vytvorenie nepripojeného-neprihláseného IMAP4 objektu
+                (default IMAP4_SSL na imap_server:port) - benchmarky / testy
+        """
+        self.email_address = email_address
+        self.password = password
+        self.imap_server = imap_server
+        self.port = port or imaplib.IMAP4_SSL_PORT
+        self.keepalive = keepalive if keepalive is not None else IMAP_KEEPALIVE_INTERVAL
+        self.backoff = backoff if backoff is not None else IMAP_RECONNECT_BACKOFF
+        self.max_delay = max_delay if max_delay is not None else IMAP_RECONNECT_MAX_DELAY
+        self.timeout = timeout if timeout is not None else IMAP_TIMEOUT
+        self.factory = factory
+        self.lock = threading.RLock()
+        self.mail = None
+
+        self.connected_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.connects = 0
+        self.reconnects = 0
+        self.failures = 0  # po sebe idúce neúspešné pripojenia
+        self.noops = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[str] = None
+        self._retry_at = 0.0
+        self._keepalive_thread: Optional[threading.Thread] = None
+
+    def _open(self):
+        if self.factory:
+            mail = self.factory()
+        else:
+            mail = imaplib.IMAP4_SSL(self.imap_server, self.port, timeout=self.timeout)
+        try:
+            mail.login(self.email_address, self.password)
+            if imap_fetch.enable_compression(mail):
+                print("🗜️  IMAP COMPRESS=DEFLATE zapnuté")
+        except Exception:
+            mail.shutdown()
+            raise
+        return mail
+
+    def _record_error(self, error: Exception):
+        self.last_error = f"{type(error).__name__}: {error}"
+        self.last_error_at = datetime.now().isoformat()
+
+    def retry_in(self) -> float:
+        """Sekundy do ďalšieho povoleného pokusu o pripojenie (0 = hneď)"""
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def connect(self) -> bool:
+        """
+        Pripojenie a prihlásenie (ak ešte nie je)
+
+        Počas backoffu po neúspešnom pokuse vráti False bez pokusu.
+        """
+        with self.lock:
+            if self.mail is not None:
+                return True
+            if self.retry_in() > 0:
+                return False
+            try:
+                self.mail = self._open()
+            except (imaplib.IMAP4.error, *CONNECTION_ERRORS) as e:
+                self.failures += 1
+                self._record_error(e)
+                delay = _backoff_delay(self.backoff, self.failures - 1, self.max_delay)
+                self._retry_at = time.monotonic() + delay
+                print(f"❌ IMAP pripojenie zlyhalo ({self.failures}x, ďalší pokus o {delay:.0f} s): {e}")
+                return False
+
+            now = time.monotonic()
+            self.connected_at = self.last_used = now
+            self.connects += 1
+            if self.connects > 1:
+                self.reconnects += 1
+            self.failures = 0
+            self._retry_at = 0.0
+            suffix = f" (reconnect #{self.reconnects})" if self.reconnects else ""
+            print(f"✅ Pripojený k {self.email_address}{suffix}")
+            return True
+
+    def mark_broken(self, error: Optional[Exception] = None):
+        """Zahodenie spojenia bez LOGOUT (socket je mŕtvy alebo v neznámom stave)"""
+        with self.lock:
+            if error is not None:
+                self._record_error(error)
+                print(f"⚠️  IMAP spojenie prerušené: {error}")
+            if self.mail is not None:
+                try:
+                    self.mail.shutdown()
+                except Exception:
+                    pass
+            self.mail = None
+            self.connected_at = None
+
+    def close(self):
+        """Korektné odhlásenie"""
+        with self.lock:
+            if self.mail is None:
+                return
+            try:
+                if self.mail.state == 'SELECTED':
+                    self.mail.close()
+                self.mail.logout()
+            except Exception:
+                pass
+            self.mail = None
+            self.connected_at = None
+
+    def _noop(self) -> bool:
+        try:
+            status, _ = self.mail.noop()
+        except CONNECTION_ERRORS as e:
+            self.mark_broken(e)
+            return False
+        self.noops += 1
+        self.last_used = time.monotonic()
+        return status == 'OK'
+
+    def ensure(self) -> bool:
+        """Živé prihlásené spojenie - NOOP po dlhšej nečinnosti, inak (re)connect"""
+        with self.lock:
+            if self.mail is not None and time.monotonic() - self.last_used >= self.keepalive:
+                if not self._noop():
+                    self.mark_broken()
+            return self.connect()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Prihlásené spojenie (imaplib.IMAP4) pre blok príkazov
+
+        Spojenie je počas bloku zamknuté pre toto vlákno. Chyba socketu v
+        bloku spojenie zahodí a prepadne ďalej.
+
+        Raises:
+            ConnectionError: pripojenie zlyhalo alebo beží backoff
+        """
+        with self.lock:
+            if not self.ensure():
+                raise ConnectionError(
+                    f"IMAP server nedostupný (ďalší pokus o {self.retry_in():.0f} s): {self.last_error}"
+                )
+            try:
+                yield self.mail
+            except CONNECTION_ERRORS as e:
+                self.mark_broken(e)
+                raise
+            finally:
+                self.last_used = time.monotonic()
+
+    def start_keepalive(self):
+        """Vlákno, ktoré posiela NOOP každých keepalive sekúnd nečinnosti"""
+        if self._keepalive_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(max(1.0, self.keepalive / 2))
+                if not self.lock.acquire(blocking=False):
+                    continue  # spojenie sa práve používa
+                try:
+                    if self.mail is not None and time.monotonic() - self.last_used >= self.keepalive:
+                        self._noop()
+                finally:
+                    self.lock.release()
+
+        self._keepalive_thread = threading.Thread(target=run, name="imap-keepalive", daemon=True)
+        self._keepalive_thread.start()
+
+    def health(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "connected": self.mail is not None,
+            "compressed": self.mail is not None and isinstance(self.mail.sock, imap_fetch.DeflateSocket),
+            "server": self.imap_server,
+            "connection_age_s": round(now - self.connected_at, 1) if self.connected_at else None,
+            "idle_s": round(now - self.last_used, 1) if self.mail is not None and self.last_used else None,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "consecutive_failures": self.failures,
+            "noops": self.noops,
+            "retry_in_s": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
+_default_session: Optional[ImapSession] = None
+_default_session_lock = threading.Lock()
+
+
+def get_session(create: bool = True) -> Optional[ImapSession]:
+    """
+    Zdieľaná session pre proces (EMAIL_ADDRESS / EMAIL_PASSWORD / EMAIL_IMAP_SERVER)
+
+    None, ak email nie je nastavený alebo create=False a session ešte nevznikla.
+    """
+    global _default_session
+    if _default_session is None and create:
+        address, password = os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD")
+        if not address or not password:
+            return None
+        with _default_session_lock:
+            if _default_session is None:
+                _default_session = ImapSession(address, password, os.getenv("EMAIL_IMAP_SERVER", "imap.gmail.com"))
+    return _default_session
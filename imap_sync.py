@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Inkrementálna IMAP synchronizácia B-mailov podľa UID
+
+Namiesto `SEARCH FROM b-mail` + `FETCH (RFC822)` všetkých správ pri každej
+kontrole si pamätáme najvyšší spracovaný UID schránky (tabuľka
+ImapSyncState, migrácia 0010) a pýtame sa len na nové správy:
+
+    UID SEARCH UID <LastUid+1>:* FROM "b-mail@tatrabanka.sk"
+
+Kontrola tak stojí O(nových správ), nie O(celej histórie schránky).
+Nové správy sa sťahujú po dávkach cez imap_fetch (BODYSTRUCTURE + len
+text/plain časť, `BODY.PEEK` - na rozdiel od RFC822 neoznačí správu ako
+prečítanú) a odovzdávajú po jednej (generátor).
+
+UID sú platné len v rámci UIDVALIDITY priečinka. Ak sa UIDVALIDITY zmení
+(server prečísloval správy), uložený stav sa zahodí a začína sa podľa
+IMAP_SYNC_INITIAL:
+
+- `latest` (default) - od aktuálne najvyššieho UID, staršie správy sa
+  nespracujú (bezpečné pre existujúce nasadenia, ktoré už históriu majú)
+- `all` - od začiatku, spracujú sa všetky B-maily v priečinku
+
+Stav sa posunie až keď konzument spracovanie správy potvrdí - teda keď si
+od generátora vypýta ďalšiu správu. Ak cyklus skončí `break`-om alebo
+výnimkou, správa sa pri ďalšej kontrole stiahne znova.
+
+Medzi kontrolami môže worker namiesto spánku čakať v IMAP IDLE
+(`idle_wait`, RFC 2177) - server sám ohlási novú správu (`* N EXISTS`).
+"""
+
+import os
+import select
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+import imap_fetch
+from turso_client import turso_query
+
+load_dotenv()
+
+IMAP_SYNC_INITIAL = os.getenv('IMAP_SYNC_INITIAL', 'latest').strip().lower()
+
+BMAIL_SEARCH = '(FROM "b-mail@tatrabanka.sk")'
+
+
+def mailbox_key(email_address: str, folder: str = "INBOX") -> str:
+    """Kľúč stavu v ImapSyncState - účet + priečinok"""
+    return f"{(email_address or '').lower()}:{folder}"
+
+
+def load_state(mailbox: str) -> Optional[Tuple[int, int]]:
+    """(UidValidity, LastUid) alebo None, ak schránka ešte nebola synchronizovaná"""
+    result = turso_query(
+        "SELECT UidValidity, LastUid FROM ImapSyncState WHERE Mailbox = ?;", [mailbox]
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Načítanie IMAP stavu zlyhalo"))
+    if not result["data"]:
+        return None
+    row = result["data"][0]
+    return int(row["UidValidity"]), int(row["LastUid"])
+
+
+def save_state(mailbox: str, uid_validity: int, last_uid: int) -> bool:
+    result = turso_query(
+        """
+        INSERT INTO ImapSyncState (Mailbox, UidValidity, LastUid, UpdatedAt)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (Mailbox) DO UPDATE SET
+            UidValidity = excluded.UidValidity,
+            LastUid = excluded.LastUid,
+            UpdatedAt = excluded.UpdatedAt;
+        """,
+        [mailbox, uid_validity, last_uid]
+    )
+    if not result["success"]:
+        print(f"⚠️  Uloženie IMAP stavu zlyhalo: {result.get('error')}")
+    return result["success"]
+
+
+def _response_int(mail, code: str) -> Optional[int]:
+    """Číslo z odpovede servera po SELECT (napr. [UIDVALIDITY 123])"""
+    _, data = mail.response(code)
+    if data and data[-1]:
+        try:
+            return int(data[-1])
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def select_folder(mail, folder: str = "INBOX") -> Tuple[int, Optional[int]]:
+    """
+    SELECT priečinka (readonly)
+
+    Returns:
+        (UIDVALIDITY, UIDNEXT) - UIDNEXT môže chýbať, ak ho server neposlal
+    """
+    status, _ = mail.select(folder, readonly=True)
+    if status != "OK":
+        raise RuntimeError(f"SELECT {folder} zlyhal: {status}")
+    uid_validity = _response_int(mail, 'UIDVALIDITY')
+    if uid_validity is None:
+        raise RuntimeError(f"Server neposlal UIDVALIDITY pre {folder}")
+    return uid_validity, _response_int(mail, 'UIDNEXT')
+
+
+def search_uids(mail, after_uid: int, criteria: str = BMAIL_SEARCH) -> List[int]:
+    """UID správ vyhovujúcich criteria s UID > after_uid, vzostupne"""
+    status, data = mail.uid('SEARCH', f'UID {after_uid + 1}:*', criteria)
+    if status != "OK":
+        raise RuntimeError(f"UID SEARCH zlyhal: {status}")
+    # rozsah n:* vždy obsahuje aj najvyšší UID, aj keď je menší ako n
+    return sorted(uid for uid in (int(value) for value in (data[0] or b'').split()) if uid > after_uid)
+
+
+def starting_uid(mail, uid_next: Optional[int], criteria: str = BMAIL_SEARCH) -> int:
+    """Posledný "spracovaný" UID pre novú schránku podľa IMAP_SYNC_INITIAL"""
+    if IMAP_SYNC_INITIAL == 'all':
+        return 0
+    if uid_next:
+        return uid_next - 1
+    uids = search_uids(mail, 0, criteria)
+    return uids[-1] if uids else 0
+
+
+def iter_new_messages(
+    mail,
+    mailbox: str,
+    folder: str = "INBOX",
+    criteria: str = BMAIL_SEARCH
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Nové správy v priečinku ako (uid, email dict z imap_fetch), po jednej
+
+    LastUid sa uloží po návrate konzumenta do generátora, t.j. až po
+    spracovaní správy. Nový stav sa uloží aj keď nie sú žiadne nové správy
+    (prvá synchronizácia, zmena UIDVALIDITY).
+
+    Raises:
+        RuntimeError: pri chybe IMAP príkazu alebo načítania stavu
+    """
+    uid_validity, uid_next = select_folder(mail, folder)
+    state = load_state(mailbox)
+
+    if state and state[0] == uid_validity:
+        last_uid = state[1]
+    else:
+        if state:
+            print(f"⚠️  UIDVALIDITY {mailbox} sa zmenila ({state[0]} -> {uid_validity}), "
+                  f"synchronizácia začína odznova ({IMAP_SYNC_INITIAL})")
+        last_uid = starting_uid(mail, uid_next, criteria)
+        save_state(mailbox, uid_validity, last_uid)
+
+    if uid_next and uid_next <= last_uid + 1:
+        return  # server hlási, že odvtedy neprišla žiadna správa
+
+    uids = search_uids(mail, last_uid, criteria)
+    for start in range(0, len(uids), imap_fetch.IMAP_FETCH_BATCH):
+        batch = uids[start:start + imap_fetch.IMAP_FETCH_BATCH]
+        fetched = imap_fetch.fetch_batch(mail, batch)
+        for uid in batch:
+            if uid in fetched:  # inak správa medzičasom zmazaná
+                yield uid, fetched[uid]
+            save_state(mailbox, uid_validity, uid)
+
+
+def supports_idle(mail) -> bool:
+    return 'IDLE' in getattr(mail, 'capabilities', ())
+
+
+def idle_wait(mail, timeout: float, reply_timeout: float = 30.0) -> bool:
+    """
+    IDLE nad vybraným priečinkom najviac timeout sekúnd
+
+    imaplib (Python < 3.14) IDLE nepozná, preto sa počas IDLE číta priamo
+    zo socketu (vlastný buffer) - select() nad socketom tak nemôže
+    prehliadnuť riadok, ktorý už leží v bufferi imaplib. Po ohlásení
+    novej správy alebo uplynutí timeoutu sa IDLE ukončí (DONE) a spojenie
+    je opäť pripravené na bežné príkazy.
+
+    Returns:
+        True, ak server počas IDLE ohlásil novú správu (EXISTS)
+
+    Raises:
+        RuntimeError: server IDLE odmietol
+        ConnectionError / OSError: spojenie sa prerušilo
+    """
+    sock = mail.sock
+    buffer = b''
+
+    def next_line(deadline: float) -> Optional[bytes]:
+        nonlocal buffer
+        while b'\r\n' not in buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            pending = getattr(sock, 'pending', None)  # TLS: dáta už dešifrované v SSL vrstve
+            if not (pending and pending()) and not select.select([sock], [], [], remaining)[0]:
+                return None
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("IMAP server ukončil spojenie počas IDLE")
+            buffer += chunk
+        line, buffer = buffer.split(b'\r\n', 1)
+        return line
+
+    def is_exists(line: bytes) -> bool:
+        return line.startswith(b'* ') and line.rstrip().upper().endswith(b' EXISTS')
+
+    tag = mail._new_tag()
+    mail.send(tag + b' IDLE\r\n')
+    line = next_line(time.monotonic() + reply_timeout)
+    if line is None or not line.startswith(b'+'):
+        raise RuntimeError(f"Server odmietol IDLE: {line!r}")
+
+    new_mail = False
+    deadline = time.monotonic() + timeout
+    while not new_mail:
+        line = next_line(deadline)
+        if line is None:
+            break
+        new_mail = is_exists(line)
+
+    mail.send(b'DONE\r\n')
+    while True:
+        line = next_line(time.monotonic() + reply_timeout)
+        if line is None:
+            raise ConnectionError("IMAP server neodpovedal na DONE")
+        if line.startswith(tag + b' '):
+            if not line[len(tag) + 1:].upper().startswith(b'OK'):
+                raise RuntimeError(f"IDLE zlyhal: {line!r}")
+            return new_mail
+        new_mail = new_mail or is_exists(line)
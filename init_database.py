@@ -4,6 +4,7 @@ Inicializácia Turso databázy pre Finance Tracker
 """
 import sys
 from database_client import db_client
+import migrate
 
 def init_database():
     """Inicializuje databázu so schémou"""
@@ -11,67 +12,13 @@ def init_database():
     print("")
     
     try:
-        # Načítaj SQL schému
-        with open('database_schema_turso.sql', 'r', encoding='utf-8') as f:
-            sql_content = f.read()
-        
-        # Rozdeľ na jednotlivé príkazy
-        commands = []
-        current_command = []
-        
-        for line in sql_content.split('\n'):
-            # Preskočiť komentáre
-            if line.strip().startswith('--'):
-                continue
-            
-            current_command.append(line)
-            
-            # Ak riadok končí `;`, je to koniec príkazu
-            if line.strip().endswith(';'):
-                command = '\n'.join(current_command).strip()
-                if command:
-                    commands.append(command)
-                current_command = []
-        
-        # Vykonaj každý príkaz
-        success_count = 0
-        error_count = 0
-        
-        for i, command in enumerate(commands, 1):
-            try:
-                # Skip prázdne príkazy
-                if not command or command == ';':
-                    continue
-                
-                db_client.execute(command)
-                
-                # Zisti typ príkazu pre lepší output
-                cmd_type = command.split()[0].upper()
-                if cmd_type == 'CREATE':
-                    if 'TABLE' in command.upper():
-                        table_name = command.split('TABLE')[1].split('(')[0].strip().split()[0]
-                        print(f"  ✓ Vytvorená tabuľka: {table_name}")
-                    elif 'INDEX' in command.upper():
-                        print(f"  ✓ Vytvorený index")
-                    elif 'VIEW' in command.upper():
-                        view_name = command.split('VIEW')[1].split('AS')[0].strip().split()[0]
-                        print(f"  ✓ Vytvorený view: {view_name}")
-                elif cmd_type == 'INSERT':
-                    print(f"  ✓ Vložené základné dáta")
-                
-                success_count += 1
-                
-            except Exception as e:
-                error_msg = str(e)
-                # Ignoruj "already exists" chyby
-                if 'already exists' in error_msg.lower():
-                    print(f"  ⚠ Už existuje (preskakujem)")
-                else:
-                    print(f"  ✗ Chyba: {error_msg}")
-                    error_count += 1
-        
-        print("")
-        print(f"✅ Hotovo! Úspešných: {success_count}, Chýb: {error_count}")
+        # Očíslované migrácie z migrations/ - každá v jednej transakcii,
+        # už aplikované (SchemaVersion) sa preskočia
+        applied = migrate.migrate()
+        if applied:
+            print(f"✅ Aplikovaných migrácií: {len(applied)}")
+        else:
+            print("✅ Schéma je aktuálna, žiadne nové migrácie")
         print("")
         
         # Overenie
@@ -106,9 +53,8 @@ def init_database():
         
         return 0
         
-    except FileNotFoundError:
-        print("❌ Súbor database_schema_turso.sql nebol nájdený!")
-        print("   Uistite sa, že ste v správnom priečinku.")
+    except migrate.MigrationError as e:
+        print(f"❌ Migrácia zlyhala: {e}")
         return 1
         
     except Exception as e:
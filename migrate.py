@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Verzionované migrácie schémy Turso databázy
+
+Migrácie sú očíslované SQL súbory v migrations/ (`0001_base_schema.sql`,
+`0002_...`). Tabuľka SchemaVersion drží číslo, názov a SHA-256 checksum
+každej aplikovanej migrácie - zmena už aplikovaného súboru sa odhalí
+a migrácie sa zastavia (novú zmenu treba dať do novej migrácie).
+
+Každá migrácia sa aplikuje ako jedna Hrana transakcia (jeden round trip):
+všetky príkazy + zápis do SchemaVersion, pri chybe ROLLBACK celku. Ak dva
+procesy migrujú naraz, druhý narazí na PRIMARY KEY v SchemaVersion a jeho
+transakcia sa vráti.
+
+Databázy vytvorené pred migráciami (ručné ALTER TABLE, pôvodné
+init_database.py) sa adoptujú: všetky CREATE sú IF NOT EXISTS a
+`ALTER TABLE ... ADD COLUMN` pre stĺpec, ktorý už existuje, sa preskočí.
+
+    python migrate.py           # aplikuje čakajúce migrácie
+    python migrate.py status    # aplikované / čakajúce migrácie
+    python migrate.py verify    # exit 1, ak schéma nie je aktuálna
+"""
+
+import hashlib
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from turso_client import split_sql_script, turso_query, turso_query_many, turso_transaction
+
+load_dotenv()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+# Aplikovať čakajúce migrácie pri štarte web_ui / workera (napr. Railway bez release fázy)
+SCHEMA_AUTO_MIGRATE = os.getenv('SCHEMA_AUTO_MIGRATE', '0').lower() in ('1', 'true', 'yes')
+
+SCHEMA_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS SchemaVersion (
+    Version INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL,
+    Checksum TEXT NOT NULL,
+    AppliedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_FILENAME = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+_ADD_COLUMN = re.compile(r'^ALTER\s+TABLE\s+"?(\w+)"?\s+ADD\s+(?:COLUMN\s+)?"?(\w+)"?', re.IGNORECASE)
+
+
+class MigrationError(Exception):
+    """Migráciu nie je možné aplikovať (chyba SQL, zmenený súbor, neznáma verzia)"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Jeden očíslovaný SQL súbor z migrations/"""
+    version: int
+    name: str
+    path: str
+    sql: str
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def checksum(self) -> str:
+        """SHA-256 obsahu (nezávislé od CRLF/LF a koncových medzier)"""
+        normalized = self.sql.replace('\r\n', '\n').strip()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def statements(self) -> List[str]:
+        return split_sql_script(self.sql)
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """Migrácie z adresára zoradené podľa čísla"""
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicitné číslo migrácie {version}: {migrations[version].filename}, {filename}")
+        path = os.path.join(directory, filename)
+        with open(path, 'r', encoding='utf-8') as f:
+            migrations[version] = Migration(version, match.group(2), path, f.read())
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_migrations() -> Dict[int, Tuple[str, str]]:
+    """Verzia -> (názov, checksum) zo SchemaVersion (prázdne, ak tabuľka ešte nie je)"""
+    result = turso_query("SELECT Version, Name, Checksum FROM SchemaVersion ORDER BY Version;")
+    if not result["success"]:
+        if 'no such table' in result.get("error", "").lower():
+            return {}
+        raise MigrationError(f"SchemaVersion sa nedá prečítať: {result.get('error')}")
+    return {row["Version"]: (row["Name"], row["Checksum"]) for row in result["data"]}
+
+
+def pending_migrations(
+    migrations: Optional[List[Migration]] = None,
+    applied: Optional[Dict[int, Tuple[str, str]]] = None
+) -> List[Migration]:
+    """
+    Migrácie, ktoré ešte nie sú v databáze
+
+    Raises:
+        MigrationError: aplikovaná migrácia má iný checksum alebo v
+            repozitári chýba
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    applied = applied_migrations() if applied is None else applied
+    known = {migration.version: migration for migration in migrations}
+
+    for version, (name, checksum) in sorted(applied.items()):
+        migration = known.get(version)
+        if migration is None:
+            raise MigrationError(f"Databáza má migráciu {version:04d}_{name}, ktorá v migrations/ chýba")
+        if migration.checksum != checksum:
+            raise MigrationError(
+                f"{migration.filename} sa zmenil po aplikovaní (checksum {checksum[:12]} -> "
+                f"{migration.checksum[:12]}) - zmenu schémy pridaj ako novú migráciu"
+            )
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def is_current(migrations: Optional[List[Migration]] = None) -> bool:
+    """Rýchla kontrola pri štarte - jeden SELECT nad SchemaVersion"""
+    return not pending_migrations(migrations)
+
+
+def _existing_columns(statements: List[str]) -> Dict[str, set]:
+    """Stĺpce tabuliek, ktoré migrácia rozširuje cez ALTER TABLE ... ADD COLUMN"""
+    tables = sorted({match.group(1) for match in map(_ADD_COLUMN.match, statements) if match})
+    if not tables:
+        return {}
+    results = turso_query_many([("SELECT name FROM pragma_table_info(?);", [table]) for table in tables])
+    columns = {}
+    for table, result in zip(tables, results):
+        if not result["success"]:
+            raise MigrationError(f"Stĺpce tabuľky {table} sa nedajú zistiť: {result.get('error')}")
+        columns[table.lower()] = {name.lower() for name in result["data"].column('name')}
+    return columns
+
+
+def _adopt(statements: List[str]) -> Tuple[List[str], List[str]]:
+    """Vynechá ADD COLUMN pre stĺpce, ktoré už existujú (databázy spred migrácií)"""
+    existing = _existing_columns(statements)
+    kept, skipped = [], []
+    for statement in statements:
+        match = _ADD_COLUMN.match(statement)
+        if match and match.group(2).lower() in existing.get(match.group(1).lower(), ()):
+            skipped.append(f"{match.group(1)}.{match.group(2)}")
+        else:
+            kept.append(statement)
+    return kept, skipped
+
+
+def apply_migration(migration: Migration) -> float:
+    """Aplikuje jednu migráciu v jednej transakcii, vráti trvanie v ms"""
+    start = time.perf_counter()
+    statements, skipped = _adopt(migration.statements())
+    for column in skipped:
+        print(f"   ℹ️  {column} už existuje - preskakujem ADD COLUMN")
+    statements.append((
+        "INSERT INTO SchemaVersion (Version, Name, Checksum) VALUES (?, ?, ?);",
+        [migration.version, migration.name, migration.checksum]
+    ))
+    results = turso_transaction(statements)
+    if not results or not all(result["success"] for result in results):
+        error = results[0].get("error") if results else "prázdna odpoveď"
+        raise MigrationError(f"{migration.filename}: {error}")
+    return (time.perf_counter() - start) * 1000
+
+
+def migrate(migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    """
+    Aplikuje všetky čakajúce migrácie v poradí
+
+    Returns:
+        aplikované migrácie (prázdny zoznam = schéma už bola aktuálna)
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    pending = pending_migrations(migrations)
+    if not pending:
+        return []
+
+    result = turso_query(SCHEMA_VERSION_SQL)
+    if not result["success"]:
+        raise MigrationError(f"SchemaVersion sa nedá vytvoriť: {result.get('error')}")
+    for migration in pending:
+        print(f"🔧 Migrácia {migration.filename}...")
+        duration_ms = apply_migration(migration)
+        print(f"   ✓ aplikovaná za {duration_ms:.0f} ms")
+    return pending
+
+
+def apply_sqlite(conn, until: Optional[int] = None, migrations: Optional[List[Migration]] = None) -> int:
+    """
+    Migrácie priamo do lokálnej sqlite3 databázy (benchmarky, Hrana stub)
+
+    Args:
+        until: posledná verzia, ktorá sa aplikuje (None = všetky)
+
+    Returns:
+        počet aplikovaných migrácií
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    conn.executescript(SCHEMA_VERSION_SQL + ";")
+    applied = {row[0] for row in conn.execute("SELECT Version FROM SchemaVersion")}
+    count = 0
+    for migration in migrations:
+        if migration.version in applied or (until is not None and migration.version > until):
+            continue
+        conn.executescript(migration.sql)
+        conn.execute(
+            "INSERT INTO SchemaVersion (Version, Name, Checksum) VALUES (?, ?, ?)",
+            (migration.version, migration.name, migration.checksum)
+        )
+        count += 1
+    conn.commit()
+    return count
+
+
+def startup_check() -> bool:
+    """
+    Kontrola pri štarte aplikácie - jeden SELECT, ak je schéma aktuálna
+
+    Čakajúce migrácie sa aplikujú len so SCHEMA_AUTO_MIGRATE=1, inak
+    ostane varovanie v logu.
+    """
+    try:
+        pending = pending_migrations()
+        if pending and SCHEMA_AUTO_MIGRATE:
+            try:
+                migrate()
+            except MigrationError as e:
+                pending = pending_migrations()
+                # Súbežne migroval iný proces (PRIMARY KEY v SchemaVersion) -
+                # inak je to skutočná chyba migrácie
+                if pending:
+                    print(f"❌ Migrácia zlyhala: {e}")
+                else:
+                    print(f"ℹ️  Migrácie aplikoval súbežne iný proces ({e})")
+            else:
+                pending = pending_migrations()
+    except MigrationError as e:
+        print(f"⚠️  Migrácie: {e}")
+        return False
+    if pending:
+        print(f"⚠️  Databáza nemá {len(pending)} migrácií ({', '.join(m.filename for m in pending)}) "
+              f"- spusti: python migrate.py")
+        return False
+    return True
+
+
+def main(argv: List[str]) -> int:
+    command = argv[1] if len(argv) > 1 else 'up'
+
+    try:
+        if command == 'up':
+            applied = migrate()
+            if applied:
+                print(f"✅ Aplikovaných migrácií: {len(applied)}")
+            else:
+                print("✅ Schéma je aktuálna")
+            return 0
+
+        if command == 'status':
+            migrations = load_migrations()
+            applied = applied_migrations()
+            pending = {m.version for m in pending_migrations(migrations, applied)}
+            for migration in migrations:
+                mark = "⏳ čaká" if migration.version in pending else "✓"
+                print(f"  {mark:<8} {migration.filename}")
+            return 0
+
+        if command == 'verify':
+            if is_current():
+                print("✅ Schéma je aktuálna")
+                return 0
+            print("❌ Čakajúce migrácie - spusti: python migrate.py")
+            return 1
+    except MigrationError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
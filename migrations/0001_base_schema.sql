@@ -1,5 +1,5 @@
--- Turso Database Schema (SQLite/LibSQL syntax)
--- Pre Finance Tracker aplikáciu
+-- Migrácia 0001: základná schéma (SQLite/LibSQL syntax)
+-- Pre Finance Tracker aplikáciu - ďalšie zmeny schémy sú v nasledujúcich migráciách
 
 -- Tabuľka kategórií
 CREATE TABLE IF NOT EXISTS Categories (
@@ -82,24 +82,12 @@ CREATE TABLE IF NOT EXISTS CategoryRules (
 -- Indexy pre výkon
 CREATE INDEX IF NOT EXISTS idx_transactions_date ON Transactions(TransactionDate);
 CREATE INDEX IF NOT EXISTS idx_transactions_merchant ON Transactions(MerchantID);
-CREATE INDEX IF NOT EXISTS idx_transactions_category ON Transactions(CategoryID);
+-- (CategoryID, TransactionDate) a ďalšie kompozitné indexy: 0006_transaction_indexes.sql
 CREATE INDEX IF NOT EXISTS idx_merchants_iban ON Merchants(IBAN);
 CREATE INDEX IF NOT EXISTS idx_merchants_ico ON Merchants(ICO);
 
--- View pre prehľad výdavkov
-CREATE VIEW IF NOT EXISTS vw_MonthlyExpenses AS
-SELECT 
-    CAST(strftime('%Y', TransactionDate) AS INTEGER) AS Year,
-    CAST(strftime('%m', TransactionDate) AS INTEGER) AS Month,
-    c.Name AS Category,
-    COUNT(*) AS TransactionCount,
-    SUM(Amount) AS TotalAmount,
-    AVG(Amount) AS AvgAmount,
-    SUM(CO2Footprint) AS TotalCO2
-FROM Transactions t
-LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-WHERE TransactionType = 'Debit'
-GROUP BY strftime('%Y', TransactionDate), strftime('%m', TransactionDate), c.Name;
+-- View pre prehľad výdavkov (vw_MonthlyExpenses) číta z rollup tabuľky -
+-- vytvára ho 0005_rollups.sql
 
 -- View pre top obchodníkov
 CREATE VIEW IF NOT EXISTS vw_TopMerchants AS
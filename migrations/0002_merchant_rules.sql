@@ -1,3 +1,5 @@
+-- Migrácia 0002: učiace sa pravidlá kategorizácie (smart_categorizer.py)
+
 -- Tabuľka pre učiace sa pravidlá kategorizácie
 CREATE TABLE IF NOT EXISTS MerchantRules (
     RuleID INTEGER PRIMARY KEY AUTOINCREMENT,
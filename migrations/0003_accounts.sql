@@ -0,0 +1,19 @@
+-- Migrácia 0003: bankové účty a priradenie transakcie k účtu
+-- (tabuľka vznikla pôvodne ručne v Turso, migrácia ju formalizuje)
+
+CREATE TABLE IF NOT EXISTS Accounts (
+    AccountID INTEGER PRIMARY KEY AUTOINCREMENT,
+    IBAN TEXT,
+    AccountName TEXT NOT NULL,
+    BankName TEXT,
+    AccountType TEXT, -- 'Osobný', 'Firemný', 'Sporiaci', ...
+    Currency TEXT DEFAULT 'EUR',
+    Color TEXT,
+    IsActive INTEGER DEFAULT 1,
+    CreatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Priradenie B-mailu k účtu podľa IBAN (receive_email, worker)
+CREATE INDEX IF NOT EXISTS idx_accounts_iban ON Accounts(IBAN);
+
+ALTER TABLE Transactions ADD COLUMN AccountID INTEGER REFERENCES Accounts(AccountID);
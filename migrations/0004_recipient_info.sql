@@ -0,0 +1,8 @@
+-- Migrácia 0004: text z B-mailu pre príjemcu a účel protistrany
+-- (predtým add_recipient_info_column.py)
+
+-- Informácia pre príjemcu, napr. 'Adam Martinkovych 4.A'
+ALTER TABLE Transactions ADD COLUMN RecipientInfo TEXT;
+
+-- Účel platby protistrany
+ALTER TABLE Transactions ADD COLUMN CounterpartyPurpose TEXT;
@@ -0,0 +1,144 @@
+-- Migrácia 0005: rollup tabuľka agregátov transakcií po (účet, deň, kategória)
+-- Udržiavaná triggermi pri každom INSERT / UPDATE / DELETE v Transactions,
+-- prepočet a kontrola konzistencie: python rollups.py rebuild | check
+CREATE TABLE IF NOT EXISTS TransactionRollups (
+    AccountID INTEGER NOT NULL DEFAULT 0, -- 0 = transakcia bez účtu
+    Day TEXT NOT NULL, -- date(TransactionDate), YYYY-MM-DD
+    CategoryID INTEGER NOT NULL DEFAULT 0, -- 0 = nezaradená
+    TxCount INTEGER NOT NULL DEFAULT 0,
+    IncomeCount INTEGER NOT NULL DEFAULT 0,
+    IncomeSum REAL NOT NULL DEFAULT 0,
+    ExpenseCount INTEGER NOT NULL DEFAULT 0,
+    ExpenseSum REAL NOT NULL DEFAULT 0, -- kladná suma výdavkov (ABS(Amount))
+    CO2Sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (AccountID, Day, CategoryID)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rollups_day ON TransactionRollups(Day);
+
+-- Deň transakcie: COALESCE(date(TransactionDate), substr(TransactionDate, 1, 10))
+-- (rovnaký výraz používa rollups.py pri prepočte a kontrole)
+
+CREATE TRIGGER IF NOT EXISTS trg_rollups_insert
+AFTER INSERT ON Transactions
+BEGIN
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeSum, ExpenseCount, ExpenseSum, CO2Sum
+    ) VALUES (
+        COALESCE(NEW.AccountID, 0),
+        COALESCE(date(NEW.TransactionDate), substr(NEW.TransactionDate, 1, 10)),
+        COALESCE(NEW.CategoryID, 0),
+        1,
+        NEW.Amount > 0, MAX(NEW.Amount, 0),
+        NEW.Amount < 0, MAX(-NEW.Amount, 0),
+        COALESCE(NEW.CO2Footprint, 0)
+    )
+    ON CONFLICT (AccountID, Day, CategoryID) DO UPDATE SET
+        TxCount = TxCount + excluded.TxCount,
+        IncomeCount = IncomeCount + excluded.IncomeCount,
+        IncomeSum = IncomeSum + excluded.IncomeSum,
+        ExpenseCount = ExpenseCount + excluded.ExpenseCount,
+        ExpenseSum = ExpenseSum + excluded.ExpenseSum,
+        CO2Sum = CO2Sum + excluded.CO2Sum;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollups_delete
+AFTER DELETE ON Transactions
+BEGIN
+    UPDATE TransactionRollups SET
+        TxCount = TxCount - 1,
+        IncomeCount = IncomeCount - (OLD.Amount > 0),
+        IncomeSum = IncomeSum - MAX(OLD.Amount, 0),
+        ExpenseCount = ExpenseCount - (OLD.Amount < 0),
+        ExpenseSum = ExpenseSum - MAX(-OLD.Amount, 0),
+        CO2Sum = CO2Sum - COALESCE(OLD.CO2Footprint, 0)
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0);
+    DELETE FROM TransactionRollups
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0)
+        AND TxCount <= 0;
+END;
+
+-- Zmena kategórie / sumy / dátumu / účtu: odpočítaj starý riadok, pripočítaj nový
+CREATE TRIGGER IF NOT EXISTS trg_rollups_update
+AFTER UPDATE OF TransactionDate, Amount, AccountID, CategoryID, CO2Footprint ON Transactions
+WHEN OLD.TransactionDate IS NOT NEW.TransactionDate
+    OR OLD.Amount IS NOT NEW.Amount
+    OR OLD.AccountID IS NOT NEW.AccountID
+    OR OLD.CategoryID IS NOT NEW.CategoryID
+    OR OLD.CO2Footprint IS NOT NEW.CO2Footprint
+BEGIN
+    UPDATE TransactionRollups SET
+        TxCount = TxCount - 1,
+        IncomeCount = IncomeCount - (OLD.Amount > 0),
+        IncomeSum = IncomeSum - MAX(OLD.Amount, 0),
+        ExpenseCount = ExpenseCount - (OLD.Amount < 0),
+        ExpenseSum = ExpenseSum - MAX(-OLD.Amount, 0),
+        CO2Sum = CO2Sum - COALESCE(OLD.CO2Footprint, 0)
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0);
+    DELETE FROM TransactionRollups
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0)
+        AND TxCount <= 0;
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeSum, ExpenseCount, ExpenseSum, CO2Sum
+    ) VALUES (
+        COALESCE(NEW.AccountID, 0),
+        COALESCE(date(NEW.TransactionDate), substr(NEW.TransactionDate, 1, 10)),
+        COALESCE(NEW.CategoryID, 0),
+        1,
+        NEW.Amount > 0, MAX(NEW.Amount, 0),
+        NEW.Amount < 0, MAX(-NEW.Amount, 0),
+        COALESCE(NEW.CO2Footprint, 0)
+    )
+    ON CONFLICT (AccountID, Day, CategoryID) DO UPDATE SET
+        TxCount = TxCount + excluded.TxCount,
+        IncomeCount = IncomeCount + excluded.IncomeCount,
+        IncomeSum = IncomeSum + excluded.IncomeSum,
+        ExpenseCount = ExpenseCount + excluded.ExpenseCount,
+        ExpenseSum = ExpenseSum + excluded.ExpenseSum,
+        CO2Sum = CO2Sum + excluded.CO2Sum;
+END;
+
+-- Mesačný prehľad výdavkov z rollupov (výdavok = Amount < 0)
+DROP VIEW IF EXISTS vw_MonthlyExpenses;
+CREATE VIEW vw_MonthlyExpenses AS
+SELECT
+    CAST(substr(r.Day, 1, 4) AS INTEGER) AS Year,
+    CAST(substr(r.Day, 6, 2) AS INTEGER) AS Month,
+    c.Name AS Category,
+    SUM(r.ExpenseCount) AS TransactionCount,
+    -SUM(r.ExpenseSum) AS TotalAmount,
+    -SUM(r.ExpenseSum) / SUM(r.ExpenseCount) AS AvgAmount,
+    SUM(r.CO2Sum) AS TotalCO2
+FROM TransactionRollups r
+LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+WHERE r.ExpenseCount > 0
+GROUP BY substr(r.Day, 1, 7), c.Name;
+
+-- Naplnenie z existujúcich transakcií (rovnaký agregát ako rollups.REBUILD_STATEMENTS)
+DELETE FROM TransactionRollups;
+INSERT INTO TransactionRollups (
+    AccountID, Day, CategoryID, TxCount,
+    IncomeCount, IncomeSum, ExpenseCount, ExpenseSum, CO2Sum
+)
+SELECT
+    COALESCE(AccountID, 0),
+    COALESCE(date(TransactionDate), substr(TransactionDate, 1, 10)),
+    COALESCE(CategoryID, 0),
+    COUNT(*),
+    SUM(Amount > 0),
+    TOTAL(MAX(Amount, 0)),
+    SUM(Amount < 0),
+    TOTAL(MAX(-Amount, 0)),
+    TOTAL(CO2Footprint)
+FROM Transactions
+GROUP BY 1, 2, 3;
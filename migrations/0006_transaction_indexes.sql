@@ -0,0 +1,14 @@
+-- Migrácia 0006: kompozitné indexy pre filtre transakcií (podľa reálnych queries endpointov)
+-- Kontrola plánov: python benchmarks/check_query_plans.py
+
+-- Účet + časové okno (GPT/API súhrn účtu, vyhľadávanie podľa účtu)
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON Transactions(AccountID, TransactionDate);
+
+-- Kategória + časové okno, aj "Nezaradené" (CategoryID IS NULL) zoradené podľa dátumu
+CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON Transactions(CategoryID, TransactionDate);
+-- nahradený indexom (CategoryID, TransactionDate)
+DROP INDEX IF EXISTS idx_transactions_category;
+
+-- Len výdavky (Amount < 0): top obchodníci a výdavky za obdobie bez čítania tabuľky
+CREATE INDEX IF NOT EXISTS idx_transactions_expenses ON Transactions(TransactionDate, MerchantName, Amount)
+WHERE Amount < 0;
@@ -0,0 +1,49 @@
+-- Migrácia 0007: fulltextový index transakcií (FTS5) nad textom z B-mailov
+-- External content tabuľka: text sa neukladá druhýkrát, index drží triggery,
+-- opätovné naplnenie a kontrola: python fulltext.py rebuild | check
+-- unicode61 remove_diacritics 2: "kaviaren" nájde aj "Kaviareň"
+-- prefix '2 3': rýchle prefixové dotazy ("kav"*) pre krátke prefixy
+CREATE VIRTUAL TABLE IF NOT EXISTS TransactionsFts USING fts5(
+    MerchantName,
+    Description,
+    RecipientInfo,
+    CounterpartyPurpose,
+    content = 'Transactions',
+    content_rowid = 'TransactionID',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_insert
+AFTER INSERT ON Transactions
+BEGIN
+    INSERT INTO TransactionsFts (rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES (NEW.TransactionID, NEW.MerchantName, NEW.Description, NEW.RecipientInfo, NEW.CounterpartyPurpose);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_delete
+AFTER DELETE ON Transactions
+BEGIN
+    INSERT INTO TransactionsFts (TransactionsFts, rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES ('delete', OLD.TransactionID, OLD.MerchantName, OLD.Description, OLD.RecipientInfo, OLD.CounterpartyPurpose);
+END;
+
+-- Zmena textu: starý obsah z indexu odstrániť, nový pridať
+CREATE TRIGGER IF NOT EXISTS trg_fts_update
+AFTER UPDATE OF MerchantName, Description, RecipientInfo, CounterpartyPurpose ON Transactions
+WHEN OLD.MerchantName IS NOT NEW.MerchantName
+    OR OLD.Description IS NOT NEW.Description
+    OR OLD.RecipientInfo IS NOT NEW.RecipientInfo
+    OR OLD.CounterpartyPurpose IS NOT NEW.CounterpartyPurpose
+BEGIN
+    INSERT INTO TransactionsFts (TransactionsFts, rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES ('delete', OLD.TransactionID, OLD.MerchantName, OLD.Description, OLD.RecipientInfo, OLD.CounterpartyPurpose);
+    INSERT INTO TransactionsFts (rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES (NEW.TransactionID, NEW.MerchantName, NEW.Description, NEW.RecipientInfo, NEW.CounterpartyPurpose);
+END;
+
+-- Poradie podľa relevancie (ORDER BY rank): názov obchodníka váži najviac
+INSERT INTO TransactionsFts (TransactionsFts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 4.0, 2.0)');
+
+-- Naplnenie indexu z existujúcich transakcií
+INSERT INTO TransactionsFts (TransactionsFts) VALUES ('rebuild');
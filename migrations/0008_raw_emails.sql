@@ -0,0 +1,237 @@
+-- Migrácia 0008: surové B-maily mimo Transactions (tabuľka RawEmails)
+-- RawEmailData mal niekoľko kB na riadok - každý sken Transactions čítal
+-- stránky s textom emailu (typicky 1 transakcia na 4 kB stránku). Telo sa
+-- teraz načíta len na požiadanie (raw_emails.load), kľúčom je TransactionID.
+-- Presunuté riadky majú kodek 'none' (SQL nevie zlib/zstd), skomprimuje ich:
+-- python raw_emails.py compress
+--
+-- Telá idú najprv do pomocnej tabuľky bez cudzieho kľúča - RawEmails
+-- s REFERENCES Transactions vznikne až po prestavbe. Inak by DROP TABLE
+-- Transactions (implicitný DELETE) pri foreign_keys=ON zlyhal a PRAGMA
+-- foreign_keys sa v transakcii migrácie zmeniť nedá.
+CREATE TABLE RawEmails_migration (
+    TransactionID INTEGER PRIMARY KEY,
+    Body BLOB NOT NULL
+);
+
+INSERT INTO RawEmails_migration (TransactionID, Body)
+SELECT TransactionID, CAST(RawEmailData AS BLOB)
+FROM Transactions
+WHERE RawEmailData IS NOT NULL AND RawEmailData != '';
+
+-- Prestavba Transactions bez RawEmailData (postup zo SQLite "ALTER TABLE"
+-- dokumentácie). ALTER TABLE DROP COLUMN by riadky len skrátil - stránky by
+-- ostali poloprázdne a sken by bol rovnako drahý až do VACUUM.
+-- TransactionID sa zachovajú - FTS index (content_rowid) a rollupy platia ďalej.
+CREATE TABLE Transactions_new (
+    TransactionID INTEGER PRIMARY KEY AUTOINCREMENT,
+    TransactionDate DATETIME NOT NULL,
+    Amount REAL NOT NULL,
+    Currency TEXT DEFAULT 'EUR',
+    MerchantID INTEGER,
+    MerchantName TEXT,
+    AccountNumber TEXT,
+    IBAN TEXT,
+    CategoryID INTEGER,
+    Description TEXT,
+    VariableSymbol TEXT,
+    ConstantSymbol TEXT,
+    SpecificSymbol TEXT,
+    TransactionType TEXT, -- 'Debit' alebo 'Credit'
+    PaymentMethod TEXT, -- 'Card', 'Transfer', 'Cash', atď.
+    CO2Footprint REAL, -- kg CO2e z B-mail
+    IsRecurring INTEGER DEFAULT 0,
+    Notes TEXT,
+    AIConfidence REAL, -- Istota AI kategorizácie (0-100)
+    CategorySource TEXT, -- 'Manual', 'AI', 'Rule', 'Finstat'
+    CreatedAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+    AccountID INTEGER REFERENCES Accounts(AccountID),
+    RecipientInfo TEXT,
+    CounterpartyPurpose TEXT,
+    FOREIGN KEY (MerchantID) REFERENCES Merchants(MerchantID),
+    FOREIGN KEY (CategoryID) REFERENCES Categories(CategoryID)
+);
+
+INSERT INTO Transactions_new (
+    TransactionID, TransactionDate, Amount, Currency, MerchantID, MerchantName,
+    AccountNumber, IBAN, CategoryID, Description, VariableSymbol, ConstantSymbol,
+    SpecificSymbol, TransactionType, PaymentMethod, CO2Footprint, IsRecurring, Notes,
+    AIConfidence, CategorySource, CreatedAt, UpdatedAt, AccountID, RecipientInfo, CounterpartyPurpose
+)
+SELECT
+    TransactionID, TransactionDate, Amount, Currency, MerchantID, MerchantName,
+    AccountNumber, IBAN, CategoryID, Description, VariableSymbol, ConstantSymbol,
+    SpecificSymbol, TransactionType, PaymentMethod, CO2Footprint, IsRecurring, Notes,
+    AIConfidence, CategorySource, CreatedAt, UpdatedAt, AccountID, RecipientInfo, CounterpartyPurpose
+FROM Transactions
+ORDER BY TransactionID;
+
+-- AUTOINCREMENT pokračuje od pôvodnej hodnoty (ani zmazané ID sa nepoužijú znova)
+UPDATE sqlite_sequence
+SET seq = MAX(seq, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'Transactions'), 0))
+WHERE name = 'Transactions_new';
+
+DROP VIEW IF EXISTS vw_TopMerchants;
+DROP TABLE Transactions;
+ALTER TABLE Transactions_new RENAME TO Transactions;
+
+CREATE TABLE IF NOT EXISTS RawEmails (
+    TransactionID INTEGER PRIMARY KEY REFERENCES Transactions(TransactionID),
+    Codec TEXT NOT NULL DEFAULT 'none', -- 'none' | 'zlib' | 'zstd'
+    Body BLOB NOT NULL,
+    OriginalSize INTEGER NOT NULL, -- veľkosť textu v bajtoch pred kompresiou
+    CreatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO RawEmails (TransactionID, Codec, Body, OriginalSize)
+SELECT TransactionID, 'none', Body, length(Body)
+FROM RawEmails_migration;
+
+DROP TABLE RawEmails_migration;
+
+-- Indexy (0001, 0006)
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON Transactions(TransactionDate);
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant ON Transactions(MerchantID);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON Transactions(AccountID, TransactionDate);
+CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON Transactions(CategoryID, TransactionDate);
+CREATE INDEX IF NOT EXISTS idx_transactions_expenses ON Transactions(TransactionDate, MerchantName, Amount)
+WHERE Amount < 0;
+
+-- View pre top obchodníkov (0001)
+CREATE VIEW IF NOT EXISTS vw_TopMerchants AS
+SELECT
+    m.Name,
+    c.Name AS Category,
+    COUNT(*) AS TransactionCount,
+    SUM(t.Amount) AS TotalSpent,
+    MAX(t.TransactionDate) AS LastTransaction
+FROM Transactions t
+JOIN Merchants m ON t.MerchantID = m.MerchantID
+LEFT JOIN Categories c ON m.DefaultCategoryID = c.CategoryID
+WHERE t.TransactionType = 'Debit'
+GROUP BY m.Name, c.Name;
+
+-- Rollup triggery (0005)
+CREATE TRIGGER IF NOT EXISTS trg_rollups_insert
+AFTER INSERT ON Transactions
+BEGIN
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeSum, ExpenseCount, ExpenseSum, CO2Sum
+    ) VALUES (
+        COALESCE(NEW.AccountID, 0),
+        COALESCE(date(NEW.TransactionDate), substr(NEW.TransactionDate, 1, 10)),
+        COALESCE(NEW.CategoryID, 0),
+        1,
+        NEW.Amount > 0, MAX(NEW.Amount, 0),
+        NEW.Amount < 0, MAX(-NEW.Amount, 0),
+        COALESCE(NEW.CO2Footprint, 0)
+    )
+    ON CONFLICT (AccountID, Day, CategoryID) DO UPDATE SET
+        TxCount = TxCount + excluded.TxCount,
+        IncomeCount = IncomeCount + excluded.IncomeCount,
+        IncomeSum = IncomeSum + excluded.IncomeSum,
+        ExpenseCount = ExpenseCount + excluded.ExpenseCount,
+        ExpenseSum = ExpenseSum + excluded.ExpenseSum,
+        CO2Sum = CO2Sum + excluded.CO2Sum;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollups_delete
+AFTER DELETE ON Transactions
+BEGIN
+    UPDATE TransactionRollups SET
+        TxCount = TxCount - 1,
+        IncomeCount = IncomeCount - (OLD.Amount > 0),
+        IncomeSum = IncomeSum - MAX(OLD.Amount, 0),
+        ExpenseCount = ExpenseCount - (OLD.Amount < 0),
+        ExpenseSum = ExpenseSum - MAX(-OLD.Amount, 0),
+        CO2Sum = CO2Sum - COALESCE(OLD.CO2Footprint, 0)
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0);
+    DELETE FROM TransactionRollups
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0)
+        AND TxCount <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollups_update
+AFTER UPDATE OF TransactionDate, Amount, AccountID, CategoryID, CO2Footprint ON Transactions
+WHEN OLD.TransactionDate IS NOT NEW.TransactionDate
+    OR OLD.Amount IS NOT NEW.Amount
+    OR OLD.AccountID IS NOT NEW.AccountID
+    OR OLD.CategoryID IS NOT NEW.CategoryID
+    OR OLD.CO2Footprint IS NOT NEW.CO2Footprint
+BEGIN
+    UPDATE TransactionRollups SET
+        TxCount = TxCount - 1,
+        IncomeCount = IncomeCount - (OLD.Amount > 0),
+        IncomeSum = IncomeSum - MAX(OLD.Amount, 0),
+        ExpenseCount = ExpenseCount - (OLD.Amount < 0),
+        ExpenseSum = ExpenseSum - MAX(-OLD.Amount, 0),
+        CO2Sum = CO2Sum - COALESCE(OLD.CO2Footprint, 0)
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0);
+    DELETE FROM TransactionRollups
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = COALESCE(date(OLD.TransactionDate), substr(OLD.TransactionDate, 1, 10))
+        AND CategoryID = COALESCE(OLD.CategoryID, 0)
+        AND TxCount <= 0;
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeSum, ExpenseCount, ExpenseSum, CO2Sum
+    ) VALUES (
+        COALESCE(NEW.AccountID, 0),
+        COALESCE(date(NEW.TransactionDate), substr(NEW.TransactionDate, 1, 10)),
+        COALESCE(NEW.CategoryID, 0),
+        1,
+        NEW.Amount > 0, MAX(NEW.Amount, 0),
+        NEW.Amount < 0, MAX(-NEW.Amount, 0),
+        COALESCE(NEW.CO2Footprint, 0)
+    )
+    ON CONFLICT (AccountID, Day, CategoryID) DO UPDATE SET
+        TxCount = TxCount + excluded.TxCount,
+        IncomeCount = IncomeCount + excluded.IncomeCount,
+        IncomeSum = IncomeSum + excluded.IncomeSum,
+        ExpenseCount = ExpenseCount + excluded.ExpenseCount,
+        ExpenseSum = ExpenseSum + excluded.ExpenseSum,
+        CO2Sum = CO2Sum + excluded.CO2Sum;
+END;
+
+-- Fulltext triggery (0007)
+CREATE TRIGGER IF NOT EXISTS trg_fts_insert
+AFTER INSERT ON Transactions
+BEGIN
+    INSERT INTO TransactionsFts (rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES (NEW.TransactionID, NEW.MerchantName, NEW.Description, NEW.RecipientInfo, NEW.CounterpartyPurpose);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_delete
+AFTER DELETE ON Transactions
+BEGIN
+    INSERT INTO TransactionsFts (TransactionsFts, rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES ('delete', OLD.TransactionID, OLD.MerchantName, OLD.Description, OLD.RecipientInfo, OLD.CounterpartyPurpose);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_update
+AFTER UPDATE OF MerchantName, Description, RecipientInfo, CounterpartyPurpose ON Transactions
+WHEN OLD.MerchantName IS NOT NEW.MerchantName
+    OR OLD.Description IS NOT NEW.Description
+    OR OLD.RecipientInfo IS NOT NEW.RecipientInfo
+    OR OLD.CounterpartyPurpose IS NOT NEW.CounterpartyPurpose
+BEGIN
+    INSERT INTO TransactionsFts (TransactionsFts, rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES ('delete', OLD.TransactionID, OLD.MerchantName, OLD.Description, OLD.RecipientInfo, OLD.CounterpartyPurpose);
+    INSERT INTO TransactionsFts (rowid, MerchantName, Description, RecipientInfo, CounterpartyPurpose)
+    VALUES (NEW.TransactionID, NEW.MerchantName, NEW.Description, NEW.RecipientInfo, NEW.CounterpartyPurpose);
+END;
+
+-- Zmazaná transakcia zmaže aj svoj email
+CREATE TRIGGER IF NOT EXISTS trg_raw_emails_delete
+AFTER DELETE ON Transactions
+BEGIN
+    DELETE FROM RawEmails WHERE TransactionID = OLD.TransactionID;
+END;
@@ -0,0 +1,210 @@
+-- Migrácia 0009: kanonické celočíselné stĺpce pre sumy a dátumy
+-- AmountCents = suma v centoch (presné súčty), TxEpoch = Unix čas
+-- (TransactionDate ako UTC), TxDay = deň ako YYYYMMDD. Aplikácia ich
+-- vypĺňa pri vkladaní (query_filters.canonical_values), triggery nižšie
+-- ich dopočítajú pre zápisy, ktoré ich nenastavia.
+-- Výrazy (rovnaké v query_filters.py):
+--   CAST(ROUND(Amount * 100) AS INTEGER)
+--   CAST(strftime('%s', TransactionDate) AS INTEGER)
+--   COALESCE(CAST(strftime('%Y%m%d', TransactionDate) AS INTEGER), 0)  (0 = neplatný dátum)
+ALTER TABLE Transactions ADD COLUMN AmountCents INTEGER;
+ALTER TABLE Transactions ADD COLUMN TxEpoch INTEGER;
+ALTER TABLE Transactions ADD COLUMN TxDay INTEGER;
+
+-- Backfill (UPDATE týchto stĺpcov nespúšťa rollup ani FTS triggery)
+UPDATE Transactions SET
+    AmountCents = CAST(ROUND(Amount * 100) AS INTEGER),
+    TxEpoch = CAST(strftime('%s', TransactionDate) AS INTEGER),
+    TxDay = COALESCE(CAST(strftime('%Y%m%d', TransactionDate) AS INTEGER), 0);
+
+-- Zápis bez kanonických hodnôt (ručný INSERT, starší klient) - dopočítať
+CREATE TRIGGER IF NOT EXISTS trg_canonical_insert
+AFTER INSERT ON Transactions
+WHEN NEW.AmountCents IS NULL OR NEW.TxEpoch IS NULL OR NEW.TxDay IS NULL
+BEGIN
+    UPDATE Transactions SET
+        AmountCents = CAST(ROUND(NEW.Amount * 100) AS INTEGER),
+        TxEpoch = CAST(strftime('%s', NEW.TransactionDate) AS INTEGER),
+        TxDay = COALESCE(CAST(strftime('%Y%m%d', NEW.TransactionDate) AS INTEGER), 0)
+    WHERE TransactionID = NEW.TransactionID;
+END;
+
+-- Zmena sumy / dátumu bez kanonických stĺpcov - prepočítať (a tým aj rollupy)
+CREATE TRIGGER IF NOT EXISTS trg_canonical_update
+AFTER UPDATE OF Amount, TransactionDate ON Transactions
+WHEN NEW.AmountCents IS NOT CAST(ROUND(NEW.Amount * 100) AS INTEGER)
+    OR NEW.TxEpoch IS NOT CAST(strftime('%s', NEW.TransactionDate) AS INTEGER)
+    OR NEW.TxDay IS NOT COALESCE(CAST(strftime('%Y%m%d', NEW.TransactionDate) AS INTEGER), 0)
+BEGIN
+    UPDATE Transactions SET
+        AmountCents = CAST(ROUND(NEW.Amount * 100) AS INTEGER),
+        TxEpoch = CAST(strftime('%s', NEW.TransactionDate) AS INTEGER),
+        TxDay = COALESCE(CAST(strftime('%Y%m%d', NEW.TransactionDate) AS INTEGER), 0)
+    WHERE TransactionID = NEW.TransactionID;
+END;
+
+-- Indexy nad TxEpoch namiesto textového TransactionDate (0001, 0006)
+DROP INDEX IF EXISTS idx_transactions_date;
+DROP INDEX IF EXISTS idx_transactions_account_date;
+DROP INDEX IF EXISTS idx_transactions_category_date;
+DROP INDEX IF EXISTS idx_transactions_expenses;
+
+-- Poradie zoznamov (TxEpoch DESC, TransactionID DESC) a keyset kurzor
+CREATE INDEX IF NOT EXISTS idx_transactions_epoch ON Transactions(TxEpoch);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_epoch ON Transactions(AccountID, TxEpoch);
+CREATE INDEX IF NOT EXISTS idx_transactions_category_epoch ON Transactions(CategoryID, TxEpoch);
+-- Len výdavky: top obchodníci a výdavky za obdobie bez čítania tabuľky
+CREATE INDEX IF NOT EXISTS idx_transactions_expenses ON Transactions(TxEpoch, MerchantName, AmountCents)
+WHERE AmountCents < 0;
+
+-- Rollupy v centoch a s dňom TxDay (0005 mal REAL sumy a textový deň)
+DROP TRIGGER IF EXISTS trg_rollups_insert;
+DROP TRIGGER IF EXISTS trg_rollups_delete;
+DROP TRIGGER IF EXISTS trg_rollups_update;
+DROP VIEW IF EXISTS vw_MonthlyExpenses;
+DROP TABLE IF EXISTS TransactionRollups;
+
+CREATE TABLE TransactionRollups (
+    AccountID INTEGER NOT NULL DEFAULT 0, -- 0 = transakcia bez účtu
+    Day INTEGER NOT NULL, -- TxDay, YYYYMMDD (0 = neplatný dátum)
+    CategoryID INTEGER NOT NULL DEFAULT 0, -- 0 = nezaradená
+    TxCount INTEGER NOT NULL DEFAULT 0,
+    IncomeCount INTEGER NOT NULL DEFAULT 0,
+    IncomeCents INTEGER NOT NULL DEFAULT 0,
+    ExpenseCount INTEGER NOT NULL DEFAULT 0,
+    ExpenseCents INTEGER NOT NULL DEFAULT 0, -- kladná suma výdavkov v centoch
+    CO2Sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (AccountID, Day, CategoryID)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rollups_day ON TransactionRollups(Day);
+
+-- Naplnenie (rovnaký agregát ako rollups.REBUILD_STATEMENTS)
+INSERT INTO TransactionRollups (
+    AccountID, Day, CategoryID, TxCount,
+    IncomeCount, IncomeCents, ExpenseCount, ExpenseCents, CO2Sum
+)
+SELECT
+    COALESCE(AccountID, 0),
+    COALESCE(TxDay, 0),
+    COALESCE(CategoryID, 0),
+    COUNT(*),
+    SUM(AmountCents > 0),
+    SUM(MAX(AmountCents, 0)),
+    SUM(AmountCents < 0),
+    SUM(MAX(-AmountCents, 0)),
+    TOTAL(CO2Footprint)
+FROM Transactions
+GROUP BY 1, 2, 3;
+
+-- Riadok bez kanonických hodnôt ešte nedopočítal trg_canonical_insert -
+-- rollupy použijú rovnaký výraz ako on
+CREATE TRIGGER IF NOT EXISTS trg_rollups_insert
+AFTER INSERT ON Transactions
+BEGIN
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeCents, ExpenseCount, ExpenseCents, CO2Sum
+    )
+    SELECT
+        COALESCE(NEW.AccountID, 0),
+        COALESCE(NEW.TxDay, CAST(strftime('%Y%m%d', NEW.TransactionDate) AS INTEGER), 0),
+        COALESCE(NEW.CategoryID, 0),
+        1,
+        cents > 0, MAX(cents, 0),
+        cents < 0, MAX(-cents, 0),
+        COALESCE(NEW.CO2Footprint, 0)
+    FROM (SELECT COALESCE(NEW.AmountCents, CAST(ROUND(NEW.Amount * 100) AS INTEGER)) AS cents)
+    WHERE true
+    ON CONFLICT (AccountID, Day, CategoryID) DO UPDATE SET
+        TxCount = TxCount + excluded.TxCount,
+        IncomeCount = IncomeCount + excluded.IncomeCount,
+        IncomeCents = IncomeCents + excluded.IncomeCents,
+        ExpenseCount = ExpenseCount + excluded.ExpenseCount,
+        ExpenseCents = ExpenseCents + excluded.ExpenseCents,
+        CO2Sum = CO2Sum + excluded.CO2Sum;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollups_delete
+AFTER DELETE ON Transactions
+BEGIN
+    UPDATE TransactionRollups SET
+        TxCount = TxCount - 1,
+        IncomeCount = IncomeCount - (OLD.AmountCents > 0),
+        IncomeCents = IncomeCents - MAX(OLD.AmountCents, 0),
+        ExpenseCount = ExpenseCount - (OLD.AmountCents < 0),
+        ExpenseCents = ExpenseCents - MAX(-OLD.AmountCents, 0),
+        CO2Sum = CO2Sum - COALESCE(OLD.CO2Footprint, 0)
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = OLD.TxDay
+        AND CategoryID = COALESCE(OLD.CategoryID, 0);
+    DELETE FROM TransactionRollups
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = OLD.TxDay
+        AND CategoryID = COALESCE(OLD.CategoryID, 0)
+        AND TxCount <= 0;
+END;
+
+-- Zmena kategórie / sumy / dňa / účtu: odpočítaj starý riadok, pripočítaj nový.
+-- Doplnenie kanonických hodnôt z NULL (trg_canonical_insert) nie je zmena -
+-- trg_rollups_insert už započítal rovnaké hodnoty.
+CREATE TRIGGER IF NOT EXISTS trg_rollups_update
+AFTER UPDATE OF AmountCents, TxDay, AccountID, CategoryID, CO2Footprint ON Transactions
+WHEN OLD.AmountCents IS NOT NULL AND OLD.TxDay IS NOT NULL AND (
+    OLD.AmountCents IS NOT NEW.AmountCents
+    OR OLD.TxDay IS NOT NEW.TxDay
+    OR OLD.AccountID IS NOT NEW.AccountID
+    OR OLD.CategoryID IS NOT NEW.CategoryID
+    OR OLD.CO2Footprint IS NOT NEW.CO2Footprint
+)
+BEGIN
+    UPDATE TransactionRollups SET
+        TxCount = TxCount - 1,
+        IncomeCount = IncomeCount - (OLD.AmountCents > 0),
+        IncomeCents = IncomeCents - MAX(OLD.AmountCents, 0),
+        ExpenseCount = ExpenseCount - (OLD.AmountCents < 0),
+        ExpenseCents = ExpenseCents - MAX(-OLD.AmountCents, 0),
+        CO2Sum = CO2Sum - COALESCE(OLD.CO2Footprint, 0)
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = OLD.TxDay
+        AND CategoryID = COALESCE(OLD.CategoryID, 0);
+    DELETE FROM TransactionRollups
+    WHERE AccountID = COALESCE(OLD.AccountID, 0)
+        AND Day = OLD.TxDay
+        AND CategoryID = COALESCE(OLD.CategoryID, 0)
+        AND TxCount <= 0;
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeCents, ExpenseCount, ExpenseCents, CO2Sum
+    ) VALUES (
+        COALESCE(NEW.AccountID, 0),
+        NEW.TxDay,
+        COALESCE(NEW.CategoryID, 0),
+        1,
+        NEW.AmountCents > 0, MAX(NEW.AmountCents, 0),
+        NEW.AmountCents < 0, MAX(-NEW.AmountCents, 0),
+        COALESCE(NEW.CO2Footprint, 0)
+    )
+    ON CONFLICT (AccountID, Day, CategoryID) DO UPDATE SET
+        TxCount = TxCount + excluded.TxCount,
+        IncomeCount = IncomeCount + excluded.IncomeCount,
+        IncomeCents = IncomeCents + excluded.IncomeCents,
+        ExpenseCount = ExpenseCount + excluded.ExpenseCount,
+        ExpenseCents = ExpenseCents + excluded.ExpenseCents,
+        CO2Sum = CO2Sum + excluded.CO2Sum;
+END;
+
+-- Mesačný prehľad výdavkov z rollupov (sumy v EUR)
+CREATE VIEW vw_MonthlyExpenses AS
+SELECT
+    r.Day / 10000 AS Year,
+    r.Day / 100 % 100 AS Month,
+    c.Name AS Category,
+    SUM(r.ExpenseCount) AS TransactionCount,
+    -SUM(r.ExpenseCents) / 100.0 AS TotalAmount,
+    -SUM(r.ExpenseCents) / 100.0 / SUM(r.ExpenseCount) AS AvgAmount,
+    SUM(r.CO2Sum) AS TotalCO2
+FROM TransactionRollups r
+LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+WHERE r.ExpenseCount > 0
+GROUP BY r.Day / 100, c.Name;
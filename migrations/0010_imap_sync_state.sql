@@ -0,0 +1,12 @@
+-- Migrácia 0010: stav inkrementálnej IMAP synchronizácie (imap_sync.py)
+--
+-- Jeden riadok na schránku (účet + priečinok). LastUid je najvyšší UID
+-- spracovanej správy; platí len pre daný UidValidity - pri jeho zmene
+-- server prečísloval správy a synchronizácia začína odznova.
+
+CREATE TABLE IF NOT EXISTS ImapSyncState (
+    Mailbox TEXT PRIMARY KEY,
+    UidValidity INTEGER NOT NULL,
+    LastUid INTEGER NOT NULL DEFAULT 0,
+    UpdatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,10 @@
+-- Migrácia 0011: odtlačok transakcie pre idempotentný príjem B-mailov
+-- Ten istý B-mail môže prísť cez CloudMailin webhook, IMAP worker,
+-- monitor_bmails aj /api/sync-emails. Fingerprint je hash normalizovaného
+-- (IBAN, dátum a čas, suma v centoch, popis) - fingerprints.fingerprint -
+-- a vkladá sa cez INSERT ... ON CONFLICT (Fingerprint) DO NOTHING.
+-- NULL (ručné zápisy, import výpisov) unikátny index nekontroluje.
+-- Existujúce B-mail transakcie doplní: python fingerprints.py backfill
+ALTER TABLE Transactions ADD COLUMN Fingerprint TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_fingerprint ON Transactions(Fingerprint);
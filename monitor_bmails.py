@@ -50,35 +50,38 @@ def monitor_bmails(check_interval: int = 30):
                     time.sleep(check_interval)
                     continue
                 
-                emails = receiver.get_unread_emails()
-                
-                if not emails:
-                    print("📭 Žiadne nové")
-                else:
-                    print(f"\n📨 Nájdených {len(emails)} nových B-mailov!")
-                    print("-" * 60)
+                # Len B-maily od posledného spracovaného UID, po jednom
+                found = 0
+                for email_data in receiver.get_unread_emails():
+                    found += 1
+                    if found == 1:
+                        print("\n📨 Nové B-maily!")
+                        print("-" * 60)
+                    print(f"\n📧 Email #{found} (UID {email_data['uid']})")
+                    print(f"   Predmet: {email_data['subject']}")
                     
-                    for i, email_data in enumerate(emails, 1):
-                        print(f"\n📧 Email {i}/{len(emails)}")
-                        print(f"   Predmet: {email_data['subject']}")
-                        
-                        # Parsovanie transakcie
-                        transaction = parser.parse_transaction(email_data['body'])
+                    # Parsovanie transakcie
+                    transaction = parser.parse_transaction(email_data['body'])
+                    
+                    if transaction:
+                        print(f"   💰 Suma: {transaction['amount']} EUR")
+                        print(f"   🏪 Obchodník: {transaction.get('merchant', 'N/A')}")
+                        print(f"   📅 Dátum: {transaction['date']}")
                         
-                        if transaction:
-                            print(f"   💰 Suma: {transaction['amount']} EUR")
-                            print(f"   🏪 Obchodník: {transaction.get('merchant', 'N/A')}")
-                            print(f"   📅 Dátum: {transaction['date']}")
-                            
-                            # Uloženie do databázy
-                            if save_transaction_to_db(transaction):
-                                processed_count += 1
-                                print(f"   ✅ Uložené do databázy")
-                            else:
-                                print(f"   ❌ Nepodarilo sa uložiť")
+                        # Uloženie do databázy (None = duplicita, už uložená)
+                        if save_transaction_to_db(transaction) is not False:
+                            processed_count += 1
+                            print(f"   ✅ Uložené do databázy")
                         else:
-                            print("   ⚠️  Nepodarilo sa extrahovať údaje")
-                    
+                            # UID sa neposunie - email sa skúsi znova pri ďalšej kontrole
+                            print(f"   ❌ Nepodarilo sa uložiť, skúsim znova")
+                            break
+                    else:
+                        print("   ⚠️  Nepodarilo sa extrahovať údaje")
+                
+                if not found:
+                    print("📭 Žiadne nové")
+                else:
                     print("-" * 60)
                     print(f"✅ Celkom spracovaných: {processed_count}")
                     print()
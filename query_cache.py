@@ -0,0 +1,204 @@
+"""
+Process-level cache výsledkov čítacích queries (dashboard endpointy)
+
+Kľúčom je SQL + parametre, záznam má TTL (QUERY_CACHE_TTL sekúnd) a
+počet záznamov je ohraničený LRU (QUERY_CACHE_MAX_ENTRIES). Platnosť
+záznamov drží verzia dát: write listener v turso_client ju zvýši po
+každom úspešnom zápise cez `turso_query*` (receive_email, zmena kategórie
+transakcie, bulk-categorize, CRUD kategórií a účtov, ...), takže po
+zápise sa prvé čítanie vždy spýta databázy.
+
+Ostatné gunicorn workery na tom istom stroji sa o zápise dozvedia cez
+značkový súbor (QUERY_CACHE_VERSION_FILE, mtime = čas posledného zápisu).
+Zápisy mimo týchto procesov (worker.py na inom stroji, priamy zápis do
+Turso) pokrýva len TTL.
+
+QUERY_CACHE_TTL=0 cache vypne - všetky čítania idú priamo do databázy.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from turso_client import Statement, add_write_listener, split_statement, turso_query_many
+
+load_dotenv()
+
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', '60'))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '256'))
+QUERY_CACHE_VERSION_FILE = os.getenv(
+    'QUERY_CACHE_VERSION_FILE',
+    os.path.join(tempfile.gettempdir(), 'financa_query_cache.version')
+)
+
+
+def _key(statement: Statement) -> tuple:
+    sql, args, named_args = split_statement(statement)
+    return (
+        sql,
+        tuple(args) if args else (),
+        tuple(sorted(named_args.items())) if named_args else ()
+    )
+
+
+class QueryCache:
+    """LRU + TTL cache výsledkov `turso_query*` invalidovaná verziou dát"""
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        version_file: Optional[str] = None
+    ):
+        self.ttl = ttl if ttl is not None else QUERY_CACHE_TTL
+        self.max_entries = max_entries or QUERY_CACHE_MAX_ENTRIES
+        self.version_file = version_file if version_file is not None else QUERY_CACHE_VERSION_FILE
+
+        # kľúč -> (verzia, expirácia, výsledky)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._data_version = 0
+
+        # Metriky tohto procesu
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------------
+    # Verzia dát
+    # ------------------------------------------------------------------
+
+    def _external_version(self) -> int:
+        """Čas posledného zápisu z iného procesu (mtime značkového súboru)"""
+        if not self.version_file:
+            return 0
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except OSError:
+            return 0
+
+    def data_version(self) -> tuple:
+        """Aktuálna verzia dát - (lokálne zápisy, posledný zápis iného procesu)"""
+        return self._data_version, self._external_version()
+
+    def bump_version(self, statements: List[Statement] = None):
+        """Write listener - všetky doterajšie záznamy sú neplatné"""
+        with self._lock:
+            self._data_version += 1
+            self.invalidations += 1
+            self._entries.clear()
+        if self.version_file:
+            now = time.time_ns()
+            try:
+                with open(self.version_file, 'a'):
+                    pass
+                os.utime(self.version_file, ns=(now, now))
+            except OSError as e:
+                print(f"⚠️  Query cache: nepodarilo sa zapísať značku zápisu: {e}")
+
+    # ------------------------------------------------------------------
+    # Čítania
+    # ------------------------------------------------------------------
+
+    def get_many(
+        self,
+        statements: Sequence[Statement],
+        fetch: Callable[[List[Statement]], List[Dict[str, Any]]] = turso_query_many,
+        ttl: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Výsledky príkazov z cache, inak cez `fetch(statements)`
+
+        Všetky príkazy tvoria jeden záznam (napr. 5 queries dashboardu) -
+        pri miss sa vykonajú spolu, ako by sa vykonali bez cache.
+        """
+        statements = list(statements)
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return fetch(statements)
+
+        key = tuple(_key(s) for s in statements)
+        version = self.data_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [dict(result) for result in entry[2]]
+            self.misses += 1
+
+        # Verzia zistená pred fetch-om: ak medzitým prebehne zápis, záznam
+        # sa uloží so starou verziou a pri ďalšom čítaní sa nepoužije
+        results = fetch(statements)
+        if all(result["success"] for result in results):
+            with self._lock:
+                self._entries[key] = (version, now + ttl, results)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return [dict(result) for result in results]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Metriky
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Stav cache pre /health"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "data_version": self._data_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+_cache = None
+
+
+def get_cache() -> Optional[QueryCache]:
+    """Aktívna cache alebo None (install() ešte nebol zavolaný)"""
+    return _cache
+
+
+def install(ttl: Optional[float] = None) -> QueryCache:
+    """Vytvorí cache procesu a zaregistruje invalidáciu po zápisoch"""
+    global _cache
+    if _cache is None:
+        _cache = QueryCache(ttl=ttl)
+        add_write_listener(_cache.bump_version)
+    return _cache
+
+
+def cached_query(sql: str, args: Optional[Sequence[Any]] = None, ttl: Optional[float] = None) -> Dict[str, Any]:
+    """`turso_query` s cache (bez install() priamo do databázy)"""
+    return cached_query_many([(sql, args)] if args else [sql], ttl=ttl)[0]
+
+
+def cached_query_many(
+    statements: Sequence[Statement],
+    fetch: Callable[[List[Statement]], List[Dict[str, Any]]] = None,
+    ttl: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """`turso_query_many` (alebo iný `fetch`, napr. turso_query_concurrent) s cache"""
+    fetch = fetch or turso_query_many
+    if _cache is None:
+        return fetch(list(statements))
+    return _cache.get_many(statements, fetch, ttl)
@@ -0,0 +1,144 @@
+"""
+Sargable filtre nad kanonickými celočíselnými stĺpcami transakcií
+
+Transactions má popri `Amount REAL` a ISO texte `TransactionDate` aj
+kanonické stĺpce (migrations/0009_canonical_amounts.sql):
+
+- `AmountCents INTEGER` - suma v centoch, súčty sú presné
+- `TxEpoch INTEGER` - Unix čas transakcie (TransactionDate ako UTC)
+- `TxDay INTEGER` - deň ako YYYYMMDD (mesiac = TxDay / 100)
+
+Plnia sa pri vkladaní (`canonical_values`), triggery ich dopočítajú pre
+zápisy, ktoré ich nenastavia. Filtre, agregáty a rollupy porovnávajú len
+celé čísla - bez `strftime` nad každým riadkom a bez float súčtov.
+
+Hranice intervalov sú polootvorené nad holým stĺpcom (`col >= začiatok
+AND col < koniec`), takže použijú index. Stránkovanie zoznamov je keyset
+(kurzor = posledný riadok stránky), nie `OFFSET` - SQLite pri OFFSET
+prečíta a zahodí všetky predchádzajúce riadky, pri kurzore začne čítať
+index priamo za ním.
+"""
+
+import base64
+import calendar
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, List, Mapping, Optional, Tuple, Union
+
+# Relatívne okno "posledných N dní/mesiacov" (argument '-30 days') - vyhodnotí
+# sa raz pre query, argument ostáva rovnaký (query cache)
+EPOCH_SINCE = "CAST(strftime('%s', 'now', ?) AS INTEGER)"
+DAY_SINCE = "CAST(strftime('%Y%m%d', 'now', ?) AS INTEGER)"
+
+
+def month_label(day_column: str) -> str:
+    """SQL výraz YYYYMMDD -> 'YYYY-MM'"""
+    return f"printf('%04d-%02d', {day_column} / 10000, {day_column} / 100 % 100)"
+
+
+def parse_day(value: str) -> date:
+    """'YYYY-MM-DD' -> date (ValueError pri neplatnom dátume)"""
+    return datetime.strptime(value.strip()[:10], "%Y-%m-%d").date()
+
+
+def amount_cents(amount: float) -> int:
+    """Suma -> centy, rovnako ako SQLite `CAST(ROUND(Amount * 100) AS INTEGER)`"""
+    value = float(amount) * 100
+    return int(value + 0.5) if value >= 0 else int(value - 0.5)
+
+
+def _as_datetime(value: Union[datetime, date, str]) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value).strip())
+
+
+def tx_epoch(value: Union[datetime, date, str]) -> int:
+    """Dátum transakcie -> Unix čas, rovnako ako SQLite `strftime('%s', TransactionDate)`"""
+    moment = _as_datetime(value)
+    if moment.tzinfo is not None:
+        return calendar.timegm(moment.utctimetuple())
+    return calendar.timegm(moment.timetuple())
+
+
+def tx_day(value: Union[datetime, date, str]) -> int:
+    """Dátum transakcie -> YYYYMMDD"""
+    moment = _as_datetime(value)
+    if moment.tzinfo is not None:
+        moment = datetime(*moment.utctimetuple()[:6])
+    return moment.year * 10000 + moment.month * 100 + moment.day
+
+
+def canonical_values(amount: float, transaction_date: Union[datetime, date, str]) -> Tuple[int, int, int]:
+    """(AmountCents, TxEpoch, TxDay) pre INSERT transakcie"""
+    return amount_cents(amount), tx_epoch(transaction_date), tx_day(transaction_date)
+
+
+def month_days(year: int, month: int) -> Tuple[int, int]:
+    """Polootvorený interval mesiaca v TxDay: (20250301, 20250401)"""
+    start = year * 10000 + month * 100 + 1
+    end = (year + 1) * 10000 + 101 if month == 12 else year * 10000 + (month + 1) * 100 + 1
+    return start, end
+
+
+def epoch_range(
+    column: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> Tuple[List[str], List[Any]]:
+    """
+    Podmienky pre dni date_from..date_to (vrátane) nad TxEpoch stĺpcom
+
+    Returns:
+        (podmienky, argumenty) - `column >= polnoc from`, `column < polnoc dňa po to`
+    """
+    conditions = []
+    args = []
+    if date_from:
+        conditions.append(f"{column} >= ?")
+        args.append(tx_epoch(parse_day(date_from)))
+    if date_to:
+        conditions.append(f"{column} < ?")
+        args.append(tx_epoch(parse_day(date_to) + timedelta(days=1)))
+    return conditions, args
+
+
+def encode_cursor(row: Mapping[str, Any]) -> str:
+    """Kurzor za riadkom stránky - (TxEpoch, TransactionID) ako URL-safe token"""
+    payload = json.dumps([row["TxEpoch"], row["TransactionID"]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[int, int]:
+    """Token z encode_cursor -> (TxEpoch, TransactionID) (ValueError pri neplatnom)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        tx_time, tx_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Neplatný kurzor: {e}")
+    if not isinstance(tx_time, int) or not isinstance(tx_id, int):
+        raise ValueError("Neplatný kurzor")
+    return tx_time, tx_id
+
+
+def keyset_after(
+    epoch_column: str,
+    id_column: str,
+    cursor: Optional[str]
+) -> Tuple[List[str], List[Any]]:
+    """
+    Podmienka pre ďalšiu stránku pri `ORDER BY epoch_column DESC, id_column DESC`
+
+    Row-value porovnanie `(epoch, id) < (?, ?)` SQLite vyhodnotí ako rozsah
+    na indexe (TxEpoch), ktorý má TransactionID (rowid) ako posledný kľúč -
+    bez triedenia a bez preskakovania riadkov.
+
+    Returns:
+        (podmienky, argumenty) - prázdne bez kurzora (prvá stránka)
+    """
+    if not cursor:
+        return [], []
+    tx_time, tx_id = decode_cursor(cursor)
+    return [f"({epoch_column}, {id_column}) < (?, ?)"], [tx_time, tx_id]
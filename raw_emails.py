@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Surové B-maily v tabuľke RawEmails - komprimované, mimo Transactions
+
+Pôvodný stĺpec Transactions.RawEmailData (niekoľko kB textu na riadok)
+robil z každého skenu Transactions čítanie overflow stránok, hoci ho nikto
+okrem backfillu nečíta. Migrácia migrations/0008_raw_emails.sql presunie
+obsah do RawEmails (kľúč = TransactionID) a stĺpec odstráni; telo sa
+načíta až na požiadanie cez `load` / `load_many`.
+
+Telo je zlib (alebo zstd, ak je nainštalovaný balík `zstandard`), kodek je
+uložený pri každom riadku. Riadky presunuté migráciou majú kodek 'none'
+(SQL nevie komprimovať) - skomprimuje ich `python raw_emails.py compress`.
+
+    python raw_emails.py compress   # skomprimuje riadky s kodekom 'none'
+    python raw_emails.py stats      # počet, veľkosť pred/po kompresii
+"""
+
+import os
+import sys
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from turso_client import Statement, turso_query, turso_transaction
+
+try:
+    import zstandard
+except ImportError:  # voliteľná závislosť - zlib stačí
+    zstandard = None
+
+load_dotenv()
+
+# 'zstd' | 'zlib' | 'none' - zstd len ak je dostupný balík zstandard
+RAW_EMAIL_CODEC = os.getenv('RAW_EMAIL_CODEC', 'zstd' if zstandard else 'zlib').lower()
+if RAW_EMAIL_CODEC == 'zstd' and zstandard is None:
+    RAW_EMAIL_CODEC = 'zlib'
+RAW_EMAIL_COMPRESS_BATCH = int(os.getenv('RAW_EMAIL_COMPRESS_BATCH', '200'))
+
+# Vkladá sa v tom istom batchi hneď za INSERT INTO Transactions -
+# last_insert_rowid() je TransactionID práve vloženej transakcie. Ak INSERT
+# nič nevložil (ON CONFLICT (Fingerprint) DO NOTHING), changes() je 0 a
+# email sa nepriradí k inej transakcii.
+INSERT_AFTER_TRANSACTION_SQL = (
+    "INSERT INTO RawEmails (TransactionID, Codec, Body, OriginalSize) "
+    "SELECT last_insert_rowid(), ?, ?, ? WHERE changes() = 1;"
+)
+INSERT_SQL = (
+    "INSERT OR REPLACE INTO RawEmails (TransactionID, Codec, Body, OriginalSize) "
+    "VALUES (?, ?, ?, ?);"
+)
+
+
+def compress(text: str, codec: Optional[str] = None) -> Tuple[str, bytes, int]:
+    """Text B-mailu -> (kodek, telo, pôvodná veľkosť v bajtoch)"""
+    codec = codec or RAW_EMAIL_CODEC
+    data = text.encode('utf-8')
+    if codec == 'zstd':
+        return codec, zstandard.ZstdCompressor(level=9).compress(data), len(data)
+    if codec == 'zlib':
+        return codec, zlib.compress(data, 9), len(data)
+    return 'none', data, len(data)
+
+
+def decompress(codec: str, body) -> str:
+    """(kodek, telo) z RawEmails -> text B-mailu"""
+    if isinstance(body, str):  # 'none' riadok, ktorý SQLite vráti ako text
+        return body
+    data = bytes(body)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("RawEmails obsahuje zstd telo - nainštaluj balík zstandard")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == 'zlib':
+        data = zlib.decompress(data)
+    return data.decode('utf-8', errors='replace')
+
+
+def insert_after_transaction(text: Optional[str]) -> Optional[Statement]:
+    """
+    Príkaz, ktorý uloží B-mail k práve vloženej transakcii
+
+    Musí ísť v tej istej transakcii (turso_transaction) hneď za INSERT INTO
+    Transactions - pri zlyhaní INSERTu by last_insert_rowid() ukazoval na
+    predošlú transakciu spojenia.
+
+    Returns:
+        (sql, args) alebo None pre prázdny email
+    """
+    if not text:
+        return None
+    codec, body, size = compress(text)
+    return (INSERT_AFTER_TRANSACTION_SQL, [codec, body, size])
+
+
+def insert_for(transaction_id: int, text: str) -> Statement:
+    """Príkaz, ktorý uloží (prepíše) B-mail známej transakcie"""
+    codec, body, size = compress(text)
+    return (INSERT_SQL, [transaction_id, codec, body, size])
+
+
+def load_many(transaction_ids: Iterable[int]) -> Dict[int, str]:
+    """TransactionID -> text B-mailu (transakcie bez emailu chýbajú)"""
+    ids = sorted(set(transaction_ids))
+    if not ids:
+        return {}
+    result = turso_query(
+        f"SELECT TransactionID, Codec, Body FROM RawEmails "
+        f"WHERE TransactionID IN ({', '.join('?' * len(ids))});",
+        ids
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "RawEmails query failed"))
+    return {row["TransactionID"]: decompress(row["Codec"], row["Body"]) for row in result["data"]}
+
+
+def load(transaction_id: int) -> Optional[str]:
+    """Text B-mailu transakcie (None, ak email nie je uložený)"""
+    return load_many([transaction_id]).get(transaction_id)
+
+
+def compress_pending(batch_size: int = RAW_EMAIL_COMPRESS_BATCH) -> int:
+    """
+    Skomprimuje riadky s kodekom 'none' (presunuté migráciou) po dávkach
+
+    Každá dávka je jeden SELECT + jedna transakcia s UPDATE príkazmi.
+
+    Returns:
+        počet skomprimovaných riadkov
+    """
+    if RAW_EMAIL_CODEC == 'none':
+        return 0
+    total = 0
+    while True:
+        result = turso_query(
+            "SELECT TransactionID, Body FROM RawEmails WHERE Codec = 'none' ORDER BY TransactionID LIMIT ?;",
+            [batch_size]
+        )
+        if not result["success"]:
+            raise RuntimeError(result.get("error", "RawEmails query failed"))
+        if not result["data"]:
+            return total
+
+        statements: List[Statement] = []
+        for row in result["data"]:
+            codec, body, size = compress(decompress('none', row["Body"]))
+            statements.append((
+                "UPDATE RawEmails SET Codec = ?, Body = ?, OriginalSize = ? "
+                "WHERE TransactionID = ? AND Codec = 'none';",
+                [codec, body, size, row["TransactionID"]]
+            ))
+        results = turso_transaction(statements)
+        if not all(r["success"] for r in results):
+            raise RuntimeError(results[0].get("error", "RawEmails update failed"))
+        total += len(statements)
+        print(f"   🗜️  skomprimovaných {total}")
+
+
+def stats() -> Dict[str, int]:
+    """Počet emailov a veľkosť (pôvodná / uložená) podľa kodeku"""
+    result = turso_query(
+        "SELECT Codec, COUNT(*) AS Emails, TOTAL(OriginalSize) AS OriginalBytes, "
+        "TOTAL(length(Body)) AS StoredBytes FROM RawEmails GROUP BY Codec ORDER BY Codec;"
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "RawEmails query failed"))
+    return {
+        row["Codec"]: (int(row["Emails"]), int(row["OriginalBytes"]), int(row["StoredBytes"]))
+        for row in result["data"]
+    }
+
+
+def main(argv: List[str]) -> int:
+    command = argv[1] if len(argv) > 1 else 'stats'
+
+    try:
+        if command == 'compress':
+            print(f"🗜️  Komprimujem RawEmails ({RAW_EMAIL_CODEC})...")
+            count = compress_pending()
+            print(f"✅ Skomprimovaných emailov: {count}")
+            return 0
+
+        if command == 'stats':
+            for codec, (emails, original, stored) in stats().items():
+                ratio = stored / original if original else 0
+                print(f"  {codec:<5} {emails:>8} emailov  {original / 1024:>10.0f} kB -> "
+                      f"{stored / 1024:>10.0f} kB ({ratio:.0%})")
+            return 0
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Rollup tabuľka TransactionRollups - agregáty po (účet, deň, kategória)
+
+Dashboard a GPT endpointy čítajú súčty z rollupov namiesto GROUP BY cez
+celú tabuľku Transactions. Tabuľku, triggery a vw_MonthlyExpenses vytvára
+migrácia migrations/0009_canonical_amounts.sql (python migrate.py) - sumy
+v centoch z AmountCents, deň = TxDay (YYYYMMDD); tento skript rollupy
+prepočíta a skontroluje.
+
+    python rollups.py rebuild   # prepočet z Transactions (atomicky)
+    python rollups.py check     # porovnanie s agregátom z Transactions
+"""
+
+import sys
+from typing import List
+
+from dotenv import load_dotenv
+
+from turso_client import Row, turso_query, turso_transaction
+
+load_dotenv()
+
+AGGREGATE_SQL = """
+SELECT
+    COALESCE(AccountID, 0) AS AccountID,
+    COALESCE(TxDay, 0) AS Day,
+    COALESCE(CategoryID, 0) AS CategoryID,
+    COUNT(*) AS TxCount,
+    SUM(AmountCents > 0) AS IncomeCount,
+    SUM(MAX(AmountCents, 0)) AS IncomeCents,
+    SUM(AmountCents < 0) AS ExpenseCount,
+    SUM(MAX(-AmountCents, 0)) AS ExpenseCents,
+    TOTAL(CO2Footprint) AS CO2Sum
+FROM Transactions
+GROUP BY 1, 2, 3
+"""
+
+REBUILD_STATEMENTS = [
+    "DELETE FROM TransactionRollups",
+    f"""
+    INSERT INTO TransactionRollups (
+        AccountID, Day, CategoryID, TxCount,
+        IncomeCount, IncomeCents, ExpenseCount, ExpenseCents, CO2Sum
+    )
+    {AGGREGATE_SQL}
+    """
+]
+
+# Sumy v centoch sa porovnávajú presne; CO2 (float) zaokrúhlené - triggery
+# sčítavajú v inom poradí ako GROUP BY, float sa môže líšiť na posledných bitoch
+CHECK_SQL = f"""
+WITH expected AS (
+    SELECT AccountID, Day, CategoryID, TxCount, IncomeCount, IncomeCents,
+           ExpenseCount, ExpenseCents, ROUND(CO2Sum, 2) AS CO2Sum
+    FROM ({AGGREGATE_SQL})
+),
+actual AS (
+    SELECT AccountID, Day, CategoryID, TxCount, IncomeCount, IncomeCents,
+           ExpenseCount, ExpenseCents, ROUND(CO2Sum, 2)
+    FROM TransactionRollups
+)
+SELECT 'missing' AS Problem, * FROM (SELECT * FROM expected EXCEPT SELECT * FROM actual)
+UNION ALL
+SELECT 'unexpected' AS Problem, * FROM (SELECT * FROM actual EXCEPT SELECT * FROM expected)
+LIMIT ?;
+"""
+
+
+def rebuild() -> bool:
+    """Prepočet rollupov z Transactions (DELETE + INSERT ... SELECT atomicky)"""
+    results = turso_transaction(REBUILD_STATEMENTS)
+    return all(result["success"] for result in results)
+
+
+def check(limit: int = 50) -> List[Row]:
+    """
+    Riadky, v ktorých sa rollupy líšia od agregátu z Transactions
+
+    Problem = 'missing' (očakávaný riadok/hodnoty z Transactions) alebo
+    'unexpected' (aktuálny stav v rollupoch). Prázdny zoznam = konzistentné.
+    """
+    result = turso_query(CHECK_SQL, [limit])
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Check failed"))
+    return list(result["data"])
+
+
+def main(argv: List[str]) -> int:
+    command = argv[1] if len(argv) > 1 else 'check'
+
+    if command == 'rebuild':
+        print("🔁 Prepočítavam rollupy z Transactions...")
+        if not rebuild():
+            print("❌ Prepočet zlyhal")
+            return 1
+        print("✅ Rollupy prepočítané")
+        return 0
+
+    if command == 'check':
+        print("🔍 Kontrolujem konzistenciu rollupov...")
+        problems = check()
+        if not problems:
+            print("✅ Rollupy sú konzistentné s Transactions")
+            return 0
+        for row in problems:
+            print(f"   ⚠️  {row['Problem']}: účet {row['AccountID']}, deň {row['Day']}, "
+                  f"kategória {row['CategoryID']} - {row['TxCount']} tx, "
+                  f"príjmy {row['IncomeCents'] / 100:.2f}, výdavky {row['ExpenseCents'] / 100:.2f}")
+        print(f"❌ Nájdených {len(problems)} rozdielov - spusti: python rollups.py rebuild")
+        return 1
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
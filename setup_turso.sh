@@ -40,12 +40,13 @@ echo ""
 echo "📊 Inicializujem databázu financa-sprava..."
 echo ""
 
-if [ ! -f "database_schema_turso.sql" ]; then
-    echo "❌ Súbor database_schema_turso.sql nebol nájdený!"
+if [ ! -d "migrations" ]; then
+    echo "❌ Priečinok migrations/ nebol nájdený!"
     exit 1
 fi
 
-turso db shell financa-sprava < database_schema_turso.sql
+# Migrácie (TURSO_DATABASE_URL a TURSO_AUTH_TOKEN z .env)
+python3 migrate.py || exit 1
 
 echo ""
 echo "✅ Databáza inicializovaná!"
@@ -17,14 +17,16 @@ class SmartCategorizer:
     def __init__(self, turso_query_func):
         """
         Args:
-            turso_query_func: Funkcia na vykonávanie SQL queries
+            turso_query_func: Funkcia na vykonávanie SQL queries - signatúra
+                turso_query(sql, args=None), vracia {"success", "data", "error"}
         """
         self.turso_query = turso_query_func
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.use_ai = bool(self.openai_api_key)
         
     def categorize(self, merchant: str, description: str, amount: float, 
-                   counterparty_purpose: str = '', recipient_info: str = '') -> Optional[int]:
+                   counterparty_purpose: str = '', recipient_info: str = '',
+                   deferred_writes: Optional[List] = None) -> Optional[int]:
         """
         Hlavná kategorizačná funkcia
         
@@ -34,6 +36,9 @@ class SmartCategorizer:
             amount: Suma (+ príjem, - výdavok)
             counterparty_purpose: Účel protistrany (napr. "Mestska cast Bratislava - Petrzalka")
             recipient_info: Informácia pre príjemcu (napr. "Martinkovychova Livia, 1. trieda")
+            deferred_writes: Ak je zadaný zoznam, zápisy pravidiel (UsageCount, učenie)
+                sa doň pridajú ako (sql, args) namiesto vykonania - volajúci ich
+                pošle v jednom pipeline s INSERTom transakcie
             
         Returns:
             CategoryID alebo None
@@ -43,7 +48,7 @@ class SmartCategorizer:
             return self._get_or_create_income_category()
         
         # 2. Hľadaj v naučených pravidlách
-        category_id = self._find_by_rules(merchant)
+        category_id = self._find_by_rules(merchant, deferred_writes)
         if category_id:
             return category_id
         
@@ -53,12 +58,19 @@ class SmartCategorizer:
                                                    counterparty_purpose, recipient_info)
             if category_id:
                 # Ulož ako nové pravidlo
-                self._learn_rule(merchant, category_id, 'AI', 0.8)
+                self._learn_rule(merchant, category_id, 'AI', 0.8, deferred_writes)
                 return category_id
         
         # 4. Žiadna kategória nenájdená
         return None
     
+    def _write(self, sql: str, args: List, deferred_writes: Optional[List] = None):
+        """Vykonaj zápis hneď, alebo ho odlož do deferred_writes"""
+        if deferred_writes is not None:
+            deferred_writes.append((sql, args))
+        else:
+            self.turso_query(sql, args)
+    
     def _get_or_create_income_category(self) -> Optional[int]:
         """Získaj alebo vytvor kategóriu Príjem"""
         try:
@@ -66,62 +78,60 @@ class SmartCategorizer:
             query = "SELECT CategoryID FROM Categories WHERE Name IN ('Príjem', 'Príjmy') LIMIT 1;"
             result = self.turso_query(query)
             
-            if result and 'rows' in result and len(result['rows']) > 0:
-                return int(result['rows'][0][0]['value'])
+            if result["success"] and result["data"]:
+                return int(result["data"][0]["CategoryID"])
             
             # Vytvor novú
             create_query = """
             INSERT INTO Categories (Name, Icon, Color, CreatedAt)
-            VALUES ('Príjem', '💰', '#10b981', datetime('now'));
+            VALUES ('Príjem', '💰', '#10b981', datetime('now'))
+            RETURNING CategoryID;
             """
-            self.turso_query(create_query)
-            
-            # Získaj ID
-            result = self.turso_query("SELECT CategoryID FROM Categories WHERE Name = 'Príjem' LIMIT 1;")
-            if result and 'rows' in result and len(result['rows']) > 0:
-                return int(result['rows'][0][0]['value'])
+            result = self.turso_query(create_query)
+            if result["success"] and result["data"]:
+                return int(result["data"][0]["CategoryID"])
         except Exception as e:
             print(f"Error getting income category: {e}")
         
         return None
     
-    def _find_by_rules(self, merchant: str) -> Optional[int]:
+    def _find_by_rules(self, merchant: str, deferred_writes: Optional[List] = None) -> Optional[int]:
         """Hľadaj kategóriu v naučených pravidlách"""
         try:
             merchant_clean = merchant.strip().upper()
             
             # Hľadaj exact match
-            query = f"""
+            query = """
             SELECT CategoryID, RuleID FROM MerchantRules 
-            WHERE UPPER(MerchantPattern) = '{merchant_clean}' 
+            WHERE UPPER(MerchantPattern) = ? 
             AND MatchType = 'exact'
             ORDER BY UsageCount DESC, Confidence DESC
             LIMIT 1;
             """
-            result = self.turso_query(query)
+            result = self.turso_query(query, [merchant_clean])
             
-            if result and 'rows' in result and len(result['rows']) > 0:
-                category_id = int(result['rows'][0][0]['value'])
-                rule_id = int(result['rows'][0][1]['value'])
-                self._update_rule_usage(rule_id)
+            if result["success"] and result["data"]:
+                category_id = int(result["data"][0]["CategoryID"])
+                rule_id = int(result["data"][0]["RuleID"])
+                self._update_rule_usage(rule_id, deferred_writes)
                 print(f"   📚 Rule match (exact): {merchant} → CategoryID={category_id}")
                 return category_id
             
             # Hľadaj contains match
-            query = f"""
+            query = """
             SELECT CategoryID, RuleID, MerchantPattern FROM MerchantRules 
             WHERE MatchType = 'contains'
             ORDER BY LENGTH(MerchantPattern) DESC, UsageCount DESC;
             """
             result = self.turso_query(query)
             
-            if result and 'rows' in result:
-                for row in result['rows']:
-                    pattern = row[2]['value'].upper()
+            if result["success"]:
+                for row in result["data"]:
+                    pattern = row["MerchantPattern"].upper()
                     if pattern in merchant_clean:
-                        category_id = int(row[0]['value'])
-                        rule_id = int(row[1]['value'])
-                        self._update_rule_usage(rule_id)
+                        category_id = int(row["CategoryID"])
+                        rule_id = int(row["RuleID"])
+                        self._update_rule_usage(rule_id, deferred_writes)
                         print(f"   📚 Rule match (contains '{pattern}'): {merchant} → CategoryID={category_id}")
                         return category_id
         
@@ -130,16 +140,16 @@ class SmartCategorizer:
         
         return None
     
-    def _update_rule_usage(self, rule_id: int):
+    def _update_rule_usage(self, rule_id: int, deferred_writes: Optional[List] = None):
         """Aktualizuj počet použití pravidla"""
         try:
-            query = f"""
+            query = """
             UPDATE MerchantRules 
             SET UsageCount = UsageCount + 1,
                 LastUsed = datetime('now')
-            WHERE RuleID = {rule_id};
+            WHERE RuleID = ?;
             """
-            self.turso_query(query)
+            self._write(query, [rule_id], deferred_writes)
         except Exception as e:
             print(f"Error updating rule usage: {e}")
     
@@ -154,15 +164,15 @@ class SmartCategorizer:
             categories_query = "SELECT CategoryID, Name, Icon FROM Categories WHERE Name != 'Príjem' AND Name != 'Nezaradené';"
             categories_result = self.turso_query(categories_query)
             
-            if not categories_result or 'rows' not in categories_result:
+            if not categories_result["success"]:
                 return None
             
             categories_list = []
             categories_map = {}
-            for row in categories_result['rows']:
-                cat_id = int(row[0]['value'])
-                cat_name = row[1]['value']
-                cat_icon = row[2]['value'] if len(row) > 2 and row[2].get('value') else ''
+            for row in categories_result["data"]:
+                cat_id = int(row["CategoryID"])
+                cat_name = row["Name"]
+                cat_icon = row["Icon"] or ''
                 categories_list.append(f"{cat_icon} {cat_name}")
                 categories_map[cat_name.lower()] = cat_id
             
@@ -223,41 +233,42 @@ Kategória: [názov]"""
         
         return None
     
-    def _learn_rule(self, merchant: str, category_id: int, source: str = 'Manual', confidence: float = 1.0):
+    def _learn_rule(self, merchant: str, category_id: int, source: str = 'Manual', confidence: float = 1.0,
+                    deferred_writes: Optional[List] = None):
         """Ulož nové pravidlo kategorizácie"""
         try:
             merchant_clean = merchant.strip()
             
             # Skontroluj či už pravidlo neexistuje
-            check_query = f"""
+            check_query = """
             SELECT RuleID FROM MerchantRules 
-            WHERE UPPER(MerchantPattern) = '{merchant_clean.upper()}' 
-            AND CategoryID = {category_id}
+            WHERE UPPER(MerchantPattern) = ? 
+            AND CategoryID = ?
             LIMIT 1;
             """
-            result = self.turso_query(check_query)
+            result = self.turso_query(check_query, [merchant_clean.upper(), category_id])
             
-            if result and 'rows' in result and len(result['rows']) > 0:
+            if result["success"] and result["data"]:
                 # Už existuje, aktualizuj confidence
-                rule_id = int(result['rows'][0][0]['value'])
-                update_query = f"""
+                rule_id = int(result["data"][0]["RuleID"])
+                update_query = """
                 UPDATE MerchantRules 
-                SET Confidence = {confidence},
-                    LearnedFrom = '{source}',
+                SET Confidence = ?,
+                    LearnedFrom = ?,
                     UsageCount = UsageCount + 1
-                WHERE RuleID = {rule_id};
+                WHERE RuleID = ?;
                 """
-                self.turso_query(update_query)
+                self._write(update_query, [confidence, source, rule_id], deferred_writes)
                 print(f"   📝 Updated rule: {merchant_clean} → CategoryID={category_id}")
             else:
                 # Vytvor nové pravidlo
-                insert_query = f"""
+                insert_query = """
                 INSERT INTO MerchantRules 
                 (MerchantPattern, CategoryID, MatchType, Confidence, LearnedFrom, UsageCount, CreatedAt)
                 VALUES 
-                ('{merchant_clean}', {category_id}, 'exact', {confidence}, '{source}', 1, datetime('now'));
+                (?, ?, 'exact', ?, ?, 1, datetime('now'));
                 """
-                self.turso_query(insert_query)
+                self._write(insert_query, [merchant_clean, category_id, confidence, source], deferred_writes)
                 print(f"   ✨ Learned new rule: {merchant_clean} → CategoryID={category_id} (from {source})")
         
         except Exception as e:
@@ -270,15 +281,15 @@ Kategória: [názov]"""
         """
         try:
             # Získaj merchant z transakcie
-            query = f"""
+            query = """
             SELECT MerchantName, Amount FROM Transactions 
-            WHERE TransactionID = {transaction_id};
+            WHERE TransactionID = ?;
             """
-            result = self.turso_query(query)
+            result = self.turso_query(query, [transaction_id])
             
-            if result and 'rows' in result and len(result['rows']) > 0:
-                merchant = result['rows'][0][0]['value']
-                amount = float(result['rows'][0][1]['value'])
+            if result["success"] and result["data"]:
+                merchant = result["data"][0]["MerchantName"]
+                amount = float(result["data"][0]["Amount"])
                 
                 # Príjmy sa neučia (sú automatické)
                 if amount > 0:
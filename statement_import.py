@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+Hromadný import bankových výpisov - Tatra banka CSV a ISO 20022 CAMT.053
+
+Výpis sa číta prúdovo (CSV po riadkoch, CAMT cez `iterparse` po
+jednotlivých `<Ntry>`), účty sa priradia podľa IBAN z tabuľky Accounts a
+transakcie sa vkladajú po dávkach: jedna dávka (IMPORT_BATCH_SIZE riadkov)
+= jeden request s viacriadkovými INSERTmi po IMPORT_ROWS_PER_STATEMENT
+riadkov v jednej transakcii.
+
+Duplicity: pred každou dávkou sa načítajú počty existujúcich transakcií
+podľa (IBAN účtu, TxDay, AmountCents) v rozsahu dní dávky a z dávky sa
+preskočí toľko zhodných riadkov, koľko ich už v databáze je - opakovaný
+import toho istého výpisu nevloží nič, transakcie z B-mailov sa
+nezdvojí a dve rovnaké platby v jeden deň ostanú dve.
+
+Veľký vstup (od IMPORT_PARALLEL_MIN_BYTES) sa parsuje v process poole -
+CSV po blokoch riadkov, CAMT po blokoch <Ntry>; poradie ostáva zachované.
+
+    python statement_import.py vypis_2025.csv --iban SK8911000000002933213912
+    python statement_import.py camt053/*.xml
+    python statement_import.py vypis.csv --dry-run   # len parsovanie a štatistika
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from turso_client import Statement, turso_query, turso_transaction
+from query_filters import canonical_values, tx_epoch
+
+load_dotenv()
+
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+IMPORT_ROWS_PER_STATEMENT = int(os.getenv('IMPORT_ROWS_PER_STATEMENT', '100'))
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', str(min(os.cpu_count() or 2, 8))))
+IMPORT_PARALLEL_MIN_BYTES = int(os.getenv('IMPORT_PARALLEL_MIN_BYTES', str(5 * 1024 * 1024)))
+IMPORT_PARSE_BLOCK = 5000  # CSV riadkov / CAMT <Ntry> na jednu úlohu v poole
+
+INSERT_COLUMNS = (
+    'TransactionDate', 'Amount', 'Currency', 'MerchantName', 'Description',
+    'IBAN', 'AccountNumber', 'VariableSymbol', 'ConstantSymbol', 'SpecificSymbol',
+    'TransactionType', 'PaymentMethod', 'RecipientInfo', 'CounterpartyPurpose',
+    'CategorySource', 'AccountID', 'CreatedAt', 'AmountCents', 'TxEpoch', 'TxDay'
+)
+
+# Normalizovaná hlavička CSV (malé písmená, bez diakritiky) -> pole záznamu.
+# Pre pole vyhráva prvý stĺpec v poradí tohto zoznamu, ktorý vo výpise je.
+CSV_HEADER_ALIASES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('date', ('datum transakcie', 'datum zauctovania', 'datum spracovania', 'datum', 'booking date',
+              'datum valuty')),
+    ('amount', ('suma', 'ciastka', 'suma transakcie', 'amount')),
+    ('currency', ('mena', 'currency')),
+    ('direction', ('typ transakcie', 'typ pohybu', 'debet/kredit', 'd/c')),
+    ('account_iban', ('iban uctu', 'vlastny iban', 'cislo uctu', 'iban')),
+    ('counterparty', ('nazov protiuctu', 'nazov protistrany', 'protistrana', 'prijemca / platitel',
+                      'counterparty')),
+    ('counterparty_account', ('protiucet', 'iban protiuctu', 'cislo protiuctu', 'ucet protistrany',
+                              'counterparty account')),
+    ('description', ('popis transakcie', 'popis', 'description', 'poznamka')),
+    ('recipient_info', ('informacia pre prijemcu', 'sprava pre prijemcu', 'sprava')),
+    ('purpose', ('ucel protistrany', 'ucel platby')),
+    ('reference', ('referencia platitela', 'referencia', 'end to end')),
+    ('vs', ('variabilny symbol', 'vs')),
+    ('ks', ('konstantny symbol', 'ks')),
+    ('ss', ('specificky symbol', 'ss')),
+]
+
+SYMBOLS_RE = re.compile(r'/VS(\d*)/SS(\d*)/KS(\d*)', re.IGNORECASE)
+
+
+class SemicolonDialect(csv.excel):
+    """Predvolený formát exportu internet bankingu"""
+    delimiter = ';'
+
+
+@dataclass
+class ImportStats:
+    parsed: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    unknown_accounts: int = 0
+    requests: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.parsed / self.seconds if self.seconds else 0.0
+
+
+def normalize_header(name: str) -> str:
+    """'Dátum zaúčtovania ' -> 'datum zauctovania'"""
+    text = unicodedata.normalize('NFKD', name.strip().strip('\ufeff'))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+def normalize_iban(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return re.sub(r'\s+', '', value).upper() or None
+
+
+def parse_amount(text: str) -> float:
+    """'-1 234,56' / '1.234,56' / '-12.30' -> float (ValueError pri neplatnej sume)"""
+    value = text.strip().replace('\xa0', '').replace(' ', '')
+    if ',' in value:
+        value = value.replace('.', '').replace(',', '.')
+    return float(value)
+
+
+def parse_date(text: str) -> datetime:
+    """'12.03.2025', '12.3.2025 14:35', '2025-03-12', '2025-03-12T14:35:00+01:00' -> datetime"""
+    value = text.strip()
+    for fmt in ('%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%d.%m.%Y'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    # Dátum s časovou zónou -> miestny čas bez zóny (ako TransactionDate z B-mailov)
+    return moment.replace(tzinfo=None) if moment.tzinfo is not None else moment
+
+
+def parse_symbols(reference: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """'/VS123/SS/KS0308' -> (VS, SS, KS)"""
+    match = SYMBOLS_RE.search(reference or '')
+    if not match:
+        return None, None, None
+    return tuple(group or None for group in match.groups())
+
+
+def payment_method(text: str) -> str:
+    lowered = text.lower()
+    if 'kart' in lowered or 'card' in lowered:
+        return 'Card'
+    if 'inkaso' in lowered or 'direct debit' in lowered:
+        return 'Direct Debit'
+    if 'vyber' in lowered or 'výber' in lowered or 'atm' in lowered:
+        return 'Cash'
+    return 'Transfer'
+
+
+def make_record(
+    date: datetime,
+    amount: float,
+    currency: Optional[str],
+    account_iban: Optional[str],
+    counterparty: Optional[str] = None,
+    counterparty_account: Optional[str] = None,
+    description: Optional[str] = None,
+    recipient_info: Optional[str] = None,
+    purpose: Optional[str] = None,
+    reference: Optional[str] = None,
+    vs: Optional[str] = None,
+    ks: Optional[str] = None,
+    ss: Optional[str] = None
+) -> Dict[str, Any]:
+    """Záznam transakcie v stĺpcoch Transactions (bez AccountID a CreatedAt)"""
+    ref_vs, ref_ss, ref_ks = parse_symbols(reference)
+    description = (description or '').strip()
+    merchant = (counterparty or '').strip() or (purpose or '').strip() or description[:100] or 'Unknown'
+    amount_cents, epoch, day = canonical_values(amount, date)
+    return {
+        'TransactionDate': date.isoformat(),
+        'Amount': amount,
+        'Currency': (currency or 'EUR').strip().upper(),
+        'MerchantName': merchant,
+        'Description': description or reference or '',
+        'IBAN': normalize_iban(account_iban),
+        'AccountNumber': normalize_iban(counterparty_account),
+        'VariableSymbol': (vs or '').strip() or ref_vs,
+        'ConstantSymbol': (ks or '').strip() or ref_ks,
+        'SpecificSymbol': (ss or '').strip() or ref_ss,
+        'TransactionType': 'Debit' if amount < 0 else 'Credit',
+        'PaymentMethod': payment_method(f"{description} {purpose or ''}"),
+        'RecipientInfo': (recipient_info or '').strip() or None,
+        'CounterpartyPurpose': (purpose or '').strip() or None,
+        'CategorySource': 'Import',
+        'AmountCents': amount_cents,
+        'TxEpoch': epoch,
+        'TxDay': day,
+    }
+
+
+# --- Tatra banka CSV ---------------------------------------------------------
+
+def open_csv(path: str) -> io.TextIOBase:
+    """CSV výpis ako text - UTF-8 (aj s BOM), inak windows-1250 (staršie exporty)"""
+    with open(path, 'rb') as f:
+        head = f.read(64 * 1024)
+    try:
+        head.decode('utf-8-sig')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'cp1250'
+    return open(path, 'r', encoding=encoding, newline='')
+
+
+def csv_header_map(header: Sequence[str]) -> Dict[str, int]:
+    """Pole záznamu -> index stĺpca podľa CSV_HEADER_ALIASES"""
+    normalized = {normalize_header(name): i for i, name in reversed(list(enumerate(header)))}
+    mapping = {}
+    for field, aliases in CSV_HEADER_ALIASES:
+        for alias in aliases:
+            if alias in normalized and normalized[alias] not in mapping.values():
+                mapping[field] = normalized[alias]
+                break
+    if 'date' not in mapping or 'amount' not in mapping:
+        raise ValueError(f"CSV výpis bez stĺpca dátumu alebo sumy: {list(header)}")
+    return mapping
+
+
+def convert_csv_rows(
+    mapping: Dict[str, int],
+    rows: List[List[str]],
+    default_iban: Optional[str]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Surové CSV riadky -> (záznamy, počet neplatných riadkov); beží aj v poole"""
+    records = []
+    invalid = 0
+    for row in rows:
+        values = {field: row[i].strip() if i < len(row) else '' for field, i in mapping.items()}
+        try:
+            amount = parse_amount(values['amount'])
+            date = parse_date(values['date'])
+        except (ValueError, KeyError):
+            invalid += 1
+            continue
+        direction = values.get('direction', '').lower()
+        # Suma bez znamienka + samostatný stĺpec debet / kredit
+        if amount > 0 and direction.startswith(('d', 'debet', 'výdav', 'vydav')):
+            amount = -amount
+        records.append(make_record(
+            date, amount, values.get('currency'), values.get('account_iban') or default_iban,
+            counterparty=values.get('counterparty'),
+            counterparty_account=values.get('counterparty_account'),
+            description=values.get('description'),
+            recipient_info=values.get('recipient_info'),
+            purpose=values.get('purpose'),
+            reference=values.get('reference'),
+            vs=values.get('vs'), ks=values.get('ks'), ss=values.get('ss')
+        ))
+    return records, invalid
+
+
+def csv_tasks(path: str, default_iban: Optional[str]) -> Iterator[Tuple[Callable, tuple]]:
+    """Úlohy (funkcia, argumenty) po IMPORT_PARSE_BLOCK riadkoch - súbor sa číta prúdovo"""
+    with open_csv(path) as f:
+        sample = f.read(8192)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = SemicolonDialect
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        mapping = csv_header_map(header)
+        block = []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            block.append(row)
+            if len(block) >= IMPORT_PARSE_BLOCK:
+                yield convert_csv_rows, (mapping, block, default_iban)
+                block = []
+        if block:
+            yield convert_csv_rows, (mapping, block, default_iban)
+
+
+# --- ISO 20022 CAMT.053 ------------------------------------------------------
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _find(element: Optional[ET.Element], *path: str) -> Optional[ET.Element]:
+    """Potomok podľa lokálnych názvov (bez ohľadu na namespace verzie camt.053.001.xx)"""
+    for name in path:
+        if element is None:
+            return None
+        element = next((child for child in element if _local(child.tag) == name), None)
+    return element
+
+
+def _text(element: Optional[ET.Element], *path: str) -> Optional[str]:
+    found = _find(element, *path)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def _camt_date(entry: ET.Element) -> Optional[str]:
+    """Dátum transakcie - čas akceptácie karty, inak dátum zaúčtovania, inak valuty"""
+    details = _find(entry, 'NtryDtls', 'TxDtls')
+    return (
+        _text(details, 'RltdDts', 'AccptncDtTm')
+        or _text(details, 'RltdDts', 'TxDtTm')
+        or _text(entry, 'BookgDt', 'DtTm') or _text(entry, 'BookgDt', 'Dt')
+        or _text(entry, 'ValDt', 'DtTm') or _text(entry, 'ValDt', 'Dt')
+    )
+
+
+def camt_entry_record(entry: ET.Element, account_iban: Optional[str]) -> Optional[Dict[str, Any]]:
+    """<Ntry> -> záznam (None pri neplatnej sume / dátume)"""
+    amount_element = _find(entry, 'Amt')
+    date_text = _camt_date(entry)
+    if amount_element is None or not amount_element.text or not date_text:
+        return None
+    try:
+        amount = float(amount_element.text)
+        date = parse_date(date_text)
+    except ValueError:
+        return None
+    debit = _text(entry, 'CdtDbtInd') == 'DBIT'
+    if debit:
+        amount = -abs(amount)
+
+    details = _find(entry, 'NtryDtls', 'TxDtls')
+    # Protistrana = príjemca pri debete, platiteľ pri kredite
+    party, party_account = ('Cdtr', 'CdtrAcct') if debit else ('Dbtr', 'DbtrAcct')
+    counterparty = _text(details, 'RltdPties', party, 'Nm') or _text(details, 'RltdPties', party, 'Pty', 'Nm')
+    remittance = _find(details, 'RmtInf')
+    unstructured = [
+        child.text.strip() for child in (remittance if remittance is not None else [])
+        if _local(child.tag) == 'Ustrd' and child.text
+    ]
+    return make_record(
+        date, amount, amount_element.get('Ccy'), account_iban,
+        counterparty=counterparty,
+        counterparty_account=_text(details, 'RltdPties', party_account, 'Id', 'IBAN'),
+        description=_text(entry, 'AddtlNtryInf') or _text(details, 'AddtlTxInf') or ' '.join(unstructured),
+        recipient_info=' '.join(unstructured) or None,
+        purpose=_text(details, 'Purp', 'Cd') or _text(details, 'Purp', 'Prtry'),
+        reference=_text(details, 'Refs', 'EndToEndId')
+    )
+
+
+def camt_entry_records(
+    entries: List[ET.Element],
+    account_iban: Optional[str]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """<Ntry> elementy -> (záznamy, počet neplatných); beží aj v poole"""
+    records = []
+    invalid = 0
+    for entry in entries:
+        record = camt_entry_record(entry, account_iban)
+        if record is None:
+            invalid += 1
+        else:
+            records.append(record)
+    return records, invalid
+
+
+def camt_tasks(path: str, default_iban: Optional[str]) -> Iterator[Tuple[Callable, tuple]]:
+    """
+    Úlohy po IMPORT_PARSE_BLOCK <Ntry> (všetky <Stmt>) - iterparse, odovzdané
+    <Ntry> sa odoberú z rodiča, takže pamäť nerastie s veľkosťou XML
+    """
+    account_iban = default_iban
+    parents = []
+    block = []
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        name = _local(element.tag)
+        if name == 'Acct' and _find(element, 'Id', 'IBAN') is not None:
+            account_iban = _text(element, 'Id', 'IBAN')
+        elif name == 'Ntry':
+            block.append(element)
+            if parents:
+                parents[-1].remove(element)
+            if len(block) >= IMPORT_PARSE_BLOCK:
+                yield camt_entry_records, (block, account_iban)
+                block = []
+        elif name == 'Stmt':
+            # Blok nesmie prejsť do ďalšieho výpisu - iný účet
+            if block:
+                yield camt_entry_records, (block, account_iban)
+                block = []
+            element.clear()
+            account_iban = default_iban
+    if block:
+        yield camt_entry_records, (block, account_iban)
+
+
+def detect_format(path: str) -> str:
+    """'camt' alebo 'csv' - podľa prípony, inak podľa začiatku súboru"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xml':
+        return 'camt'
+    if extension == '.csv':
+        return 'csv'
+    with open(path, 'rb') as f:
+        head = f.read(512).lstrip(b'\xef\xbb\xbf \r\n\t')
+    return 'camt' if head.startswith(b'<') else 'csv'
+
+
+def parse_tasks(paths: Iterable[str], default_iban: Optional[str]) -> Iterator[Tuple[Callable, tuple]]:
+    for path in paths:
+        if detect_format(path) == 'camt':
+            yield from camt_tasks(path, default_iban)
+        else:
+            yield from csv_tasks(path, default_iban)
+
+
+def _call(task: Tuple[Callable, tuple]):
+    function, args = task
+    return function(*args)
+
+
+def run_tasks(tasks: Iterable[Tuple[Callable, tuple]], workers: int = 1) -> Iterator[Any]:
+    """
+    Výsledky úloh (funkcia, argumenty) v poradí úloh
+
+    Pri workers > 1 bežia v process poole s obmedzeným počtom
+    rozpracovaných úloh (2 na proces), aby sa vstup nenačítal celý vopred.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield _call(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(_call, task))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def parse_blocks(
+    paths: Sequence[str],
+    default_iban: Optional[str] = None,
+    workers: int = 1
+) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+    """Bloky (záznamy, neplatné) v poradí vstupu"""
+    return run_tasks(parse_tasks(paths, default_iban), workers)
+
+
+# --- Vkladanie ----------------------------------------------------------------
+
+def load_accounts() -> Dict[str, int]:
+    """IBAN -> AccountID aktívnych účtov"""
+    result = turso_query("SELECT AccountID, IBAN FROM Accounts WHERE IsActive = 1;")
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Accounts query failed"))
+    return {normalize_iban(row["IBAN"]): row["AccountID"] for row in result["data"] if row["IBAN"]}
+
+
+def dedupe_key(record: Dict[str, Any]) -> Tuple[Optional[str], int, int]:
+    return record['IBAN'], record['TxDay'], record['AmountCents']
+
+
+def existing_counts(records: Sequence[Dict[str, Any]]) -> Counter:
+    """Počty existujúcich transakcií podľa dedupe_key v rozsahu dní dávky (index na TxEpoch)"""
+    days = [record['TxDay'] for record in records]
+    first, last = min(days), max(days)
+    start = tx_epoch(datetime.strptime(str(first), '%Y%m%d'))
+    end = tx_epoch(datetime.strptime(str(last), '%Y%m%d') + timedelta(days=1))
+    result = turso_query(
+        """
+        SELECT UPPER(REPLACE(IBAN, ' ', '')) AS IBAN, TxDay, AmountCents, COUNT(*) AS Count
+        FROM Transactions
+        WHERE TxEpoch >= ? AND TxEpoch < ?
+        GROUP BY 1, 2, 3;
+        """,
+        [start, end]
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Dedupe query failed"))
+    return Counter({(row["IBAN"], row["TxDay"], row["AmountCents"]): row["Count"] for row in result["data"]})
+
+
+def insert_statements(records: Sequence[Dict[str, Any]], rows_per_statement: int) -> List[Statement]:
+    """Viacriadkové INSERTy po rows_per_statement riadkoch"""
+    placeholders = '(' + ', '.join('?' * len(INSERT_COLUMNS)) + ')'
+    statements = []
+    for i in range(0, len(records), rows_per_statement):
+        chunk = records[i:i + rows_per_statement]
+        sql = (
+            f"INSERT INTO Transactions ({', '.join(INSERT_COLUMNS)}) VALUES "
+            + ', '.join([placeholders] * len(chunk)) + ';'
+        )
+        statements.append((sql, [record[column] for record in chunk for column in INSERT_COLUMNS]))
+    return statements
+
+
+class BatchImporter:
+    """Dávkovač záznamov - dedupe + jeden request (transakcia) na dávku"""
+
+    def __init__(
+        self,
+        accounts: Dict[str, int],
+        batch_size: int = IMPORT_BATCH_SIZE,
+        rows_per_statement: int = IMPORT_ROWS_PER_STATEMENT,
+        dry_run: bool = False
+    ):
+        self.accounts = accounts
+        self.batch_size = batch_size
+        self.rows_per_statement = rows_per_statement
+        self.dry_run = dry_run
+        self.stats = ImportStats()
+        self._batch: List[Dict[str, Any]] = []
+        # Existujúce riadky už spárované / vložené týmto importom - predošlé
+        # dávky ich nesmú započítať znova (dávky sa prekrývajú v dňoch)
+        self._used = Counter()
+
+    def add(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.stats.parsed += 1
+            record['AccountID'] = self.accounts.get(record['IBAN'])
+            if record['AccountID'] is None:
+                self.stats.unknown_accounts += 1
+            self._batch.append(record)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        if self.dry_run:
+            self.stats.inserted += len(batch)
+            return
+
+        existing = existing_counts(batch)
+        self.stats.requests += 1
+        for key in existing:
+            existing[key] -= self._used[key]
+        new_records = []
+        for record in batch:
+            key = dedupe_key(record)
+            if existing[key] > 0:
+                existing[key] -= 1
+                self._used[key] += 1
+                self.stats.duplicates += 1
+            else:
+                new_records.append(record)
+        if not new_records:
+            return
+
+        created_at = datetime.now().isoformat()
+        for record in new_records:
+            record['CreatedAt'] = created_at
+        results = turso_transaction(insert_statements(new_records, self.rows_per_statement))
+        self.stats.requests += 1
+        if not all(r["success"] for r in results):
+            raise RuntimeError(results[0].get("error", "Import insert failed"))
+        self._used.update(dedupe_key(record) for record in new_records)
+        self.stats.inserted += len(new_records)
+
+
+def import_statements(
+    paths: Sequence[str],
+    default_iban: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    rows_per_statement: int = IMPORT_ROWS_PER_STATEMENT,
+    dry_run: bool = False
+) -> ImportStats:
+    """
+    Importuje výpisy (CSV / CAMT.053) do Transactions
+
+    Args:
+        default_iban: IBAN účtu pre výpisy, ktoré ho neobsahujú (CSV bez stĺpca účtu)
+        workers: procesy na parsovanie (None = IMPORT_WORKERS pri veľkom vstupe, inak 1)
+
+    Returns:
+        ImportStats
+    """
+    if workers is None:
+        total_bytes = sum(os.path.getsize(path) for path in paths)
+        workers = IMPORT_WORKERS if total_bytes >= IMPORT_PARALLEL_MIN_BYTES else 1
+
+    start = time.perf_counter()
+    importer = BatchImporter(
+        load_accounts(), batch_size, rows_per_statement, dry_run
+    )
+    for records, invalid in parse_blocks(paths, normalize_iban(default_iban), workers):
+        importer.stats.invalid += invalid
+        importer.add(records)
+    importer.flush()
+    importer.stats.seconds = time.perf_counter() - start
+    return importer.stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='CSV / CAMT.053 súbory')
+    parser.add_argument('--iban', help='IBAN účtu pre výpisy bez IBAN')
+    parser.add_argument('--workers', type=int, help='procesy na parsovanie (predvolene podľa veľkosti vstupu)')
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help='len parsovanie, bez zápisu')
+    args = parser.parse_args(argv)
+
+    print(f"📥 Import {len(args.paths)} výpisov{' (dry run)' if args.dry_run else ''}...")
+    try:
+        stats = import_statements(args.paths, args.iban, args.workers, args.batch_size, dry_run=args.dry_run)
+    except (OSError, ValueError, ET.ParseError, RuntimeError) as e:
+        print(f"❌ Import zlyhal: {e}")
+        return 1
+
+    print(f"✅ Spracovaných {stats.parsed}, vložených {stats.inserted}, duplicít {stats.duplicates}, "
+          f"neplatných {stats.invalid}")
+    if stats.unknown_accounts:
+        print(f"⚠️  {stats.unknown_accounts} transakcií bez účtu v Accounts (AccountID = NULL)")
+    print(f"⏱️  {stats.seconds:.2f} s, {stats.rows_per_second:.0f} riadkov/s, {stats.requests} requestov")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,824 @@
+"""
+Zdieľaný Turso HTTP klient (Hrana /v2/pipeline)
+
+Jedna `requests.Session` na proces s keep-alive connection poolom, timeoutmi
+a retry s exponenciálnym backoffom. Všetky moduly (web_ui, api_server, worker,
+skripty) volajú `turso_query` odtiaľto namiesto vlastného `requests.post`.
+
+`AsyncTursoClient` (httpx, HTTP/2) a `turso_query_concurrent` posielajú
+nezávislé queries súbežne s ohraničeným počtom requestov na proces.
+"""
+
+import asyncio
+import base64
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping, Sequence as SequenceABC
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TURSO_DATABASE_URL = os.getenv('TURSO_DATABASE_URL', '')
+TURSO_AUTH_TOKEN = os.getenv('TURSO_AUTH_TOKEN', '')
+
+# Veľkosť poolu na jeden proces (gunicorn worker) - zodpovedá počtu
+# súbežných requestov, ktoré worker obsluhuje
+TURSO_POOL_SIZE = int(os.getenv('TURSO_POOL_SIZE', '4'))
+TURSO_TIMEOUT = float(os.getenv('TURSO_TIMEOUT', '10'))
+TURSO_CONNECT_TIMEOUT = float(os.getenv('TURSO_CONNECT_TIMEOUT', '3.05'))
+TURSO_MAX_RETRIES = int(os.getenv('TURSO_MAX_RETRIES', '3'))
+TURSO_RETRY_BACKOFF = float(os.getenv('TURSO_RETRY_BACKOFF', '0.2'))
+# Max. súbežných requestov async klienta na proces (fan-out nezávislých queries)
+TURSO_ASYNC_CONCURRENCY = int(os.getenv('TURSO_ASYNC_CONCURRENCY', '8'))
+
+# HTTP statusy, pri ktorých server požiadavku určite nespracoval
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+READ_ONLY_PREFIXES = ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN')
+# Tokeny pre rozbor WITH: reťazce/identifikátory v úvodzovkách, komentáre,
+# zátvorky a slová (obsah CTE v zátvorkách sa preskočí)
+_SQL_TOKENS = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\]|--[^\n]*|/\*.*?\*/|(?P<paren>[()])|(?P<word>\w+)",
+    re.DOTALL
+)
+_WRITE_KEYWORDS = {'INSERT', 'UPDATE', 'DELETE', 'REPLACE'}
+# PRAGMA bez hodnoty (`PRAGMA user_version`, `PRAGMA main.foreign_key_check`)
+_BARE_PRAGMA = re.compile(r'PRAGMA\s+(?:\w+\s*\.\s*)?\w+\s*;?\s*$')
+
+
+def to_http_url(database_url: str) -> str:
+    """Konverzia libsql:// URL na https://"""
+    if database_url.startswith('libsql://'):
+        database_url = 'https://' + database_url[len('libsql://'):]
+    return database_url.rstrip('/')
+
+
+class TursoHTTPError(Exception):
+    """Chyba HTTP vrstvy (status != 200 alebo neplatná odpoveď)"""
+
+
+# Príkaz pre turso_query_many: "SQL", ("SQL", [args]), ("SQL", {named}) alebo
+# {"sql": ..., "args": [...], "named_args": {...}}
+Statement = Union[str, tuple, Dict[str, Any]]
+
+
+def encode_value(value: Any) -> Dict[str, Any]:
+    """Python hodnota -> typovaná Hrana hodnota"""
+    if value is None:
+        return {"type": "null"}
+    if isinstance(value, bool):
+        return {"type": "integer", "value": "1" if value else "0"}
+    if isinstance(value, int):
+        return {"type": "integer", "value": str(value)}
+    if isinstance(value, float):
+        return {"type": "float", "value": value}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"type": "blob", "base64": base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, (datetime, date)):
+        return {"type": "text", "value": value.isoformat()}
+    return {"type": "text", "value": str(value)}
+
+
+def make_stmt(
+    sql: str,
+    args: Optional[Sequence[Any]] = None,
+    named_args: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Zostaví Hrana `stmt` s pozičnými (?) alebo pomenovanými (:name) argumentmi"""
+    stmt = {"sql": sql}
+    if args:
+        stmt["args"] = [encode_value(value) for value in args]
+    if named_args:
+        stmt["named_args"] = [
+            {
+                "name": name if name[:1] in (':', '@', '$') else f":{name}",
+                "value": encode_value(value)
+            }
+            for name, value in named_args.items()
+        ]
+    return stmt
+
+
+def _to_stmt(statement: Statement) -> Dict[str, Any]:
+    """Normalizácia príkazu z turso_query_many na Hrana `stmt`"""
+    if isinstance(statement, str):
+        return {"sql": statement}
+    if isinstance(statement, tuple):
+        sql, params = statement
+        if isinstance(params, dict):
+            return make_stmt(sql, named_args=params)
+        return make_stmt(sql, args=params)
+    return make_stmt(statement["sql"], statement.get("args"), statement.get("named_args"))
+
+
+def split_statement(statement: Statement) -> Tuple[str, Optional[Sequence[Any]], Optional[Dict[str, Any]]]:
+    """Statement -> (sql, args, named_args) pre `execute`"""
+    if isinstance(statement, str):
+        return statement, None, None
+    if isinstance(statement, tuple):
+        sql, params = statement
+        if isinstance(params, dict):
+            return sql, None, params
+        return sql, params, None
+    return statement["sql"], statement.get("args"), statement.get("named_args")
+
+
+def split_sql_script(script: str) -> List[str]:
+    """SQL skript -> jednotlivé príkazy (triggery s BEGIN ... END zostanú celé)"""
+    statements = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        if not current and (not line.strip() or line.strip().startswith('--')):
+            continue
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def is_read_only_sql(sql: str) -> bool:
+    """
+    True pre čítací príkaz (SELECT / WITH / PRAGMA / EXPLAIN)
+
+    WITH je čítanie len bez INSERT/UPDATE/DELETE/REPLACE mimo zátvoriek
+    CTE - `WITH ... INSERT ...` je zápis (primary, invalidácia cache).
+    PRAGMA je čítanie len bez hodnoty - `PRAGMA x = 1` aj `PRAGMA x(1)`
+    môžu nastavovať, preto idú ako zápis.
+    """
+    sql = sql.lstrip().upper()
+    if not sql.startswith(READ_ONLY_PREFIXES):
+        return False
+    if sql.startswith('PRAGMA'):
+        return _BARE_PRAGMA.match(sql) is not None
+    if not sql.startswith('WITH'):
+        return True
+    depth = 0
+    for match in _SQL_TOKENS.finditer(sql):
+        paren, word = match.group('paren', 'word')
+        if paren:
+            depth += 1 if paren == '(' else -1
+        elif word and depth == 0 and word in _WRITE_KEYWORDS:
+            return False
+    return True
+
+
+def _request_not_sent(error: requests.ConnectionError) -> bool:
+    """
+    Či chyba spojenia nastala pred odoslaním requestu (server ho určite
+    nespracoval) - connect timeout, TLS/proxy handshake, nedostupný server
+    """
+    if isinstance(error, (requests.ConnectTimeout, requests.exceptions.SSLError, requests.exceptions.ProxyError)):
+        return True
+    reason = error.args[0] if error.args else None
+    # MaxRetryError z urllib3 nesie pôvodnú chybu v .reason
+    return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
+
+
+def _is_read_only(pipeline_requests: List[Dict]) -> bool:
+    """True ak pipeline obsahuje iba čítacie príkazy (bezpečné zopakovať)"""
+    for req in pipeline_requests:
+        if req.get('type') == 'execute':
+            stmts = [req['stmt']]
+        elif req.get('type') == 'batch':
+            stmts = [step['stmt'] for step in req['batch']['steps']]
+        else:
+            continue
+        if not all(is_read_only_sql(stmt['sql']) for stmt in stmts):
+            return False
+    return True
+
+
+def _backoff_delay(backoff: float, attempt: int) -> float:
+    """Exponenciálny backoff s jitterom (50-100 % z backoff * 2^attempt)"""
+    delay = backoff * (2 ** attempt)
+    return delay * (0.5 + random.random() / 2)
+
+
+class TursoClient:
+    """Turso klient nad zdieľanou keep-alive session"""
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        auth_token: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None
+    ):
+        self.http_url = to_http_url(database_url if database_url is not None else TURSO_DATABASE_URL)
+        self.auth_token = auth_token if auth_token is not None else TURSO_AUTH_TOKEN
+        self.pool_size = pool_size or TURSO_POOL_SIZE
+        self.timeout = (TURSO_CONNECT_TIMEOUT, timeout or TURSO_TIMEOUT)
+        self.max_retries = TURSO_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = TURSO_RETRY_BACKOFF if backoff is None else backoff
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> requests.Session:
+        """Vytvorí session pri prvom použití (aj po forku gunicorn workera)"""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    # Retry riešime sami (poznáme idempotenciu pipeline)
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.pool_size,
+                        max_retries=0
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({
+                        "Authorization": f"Bearer {self.auth_token}",
+                        "Content-Type": "application/json"
+                    })
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def _sleep_backoff(self, attempt: int):
+        """Exponenciálny backoff s jitterom"""
+        time.sleep(_backoff_delay(self.backoff, attempt))
+
+    def pipeline(self, pipeline_requests: List[Dict]) -> List[Dict]:
+        """
+        Odošle Hrana pipeline a vráti zoznam `results`
+
+        Opakuje sa pri 429/5xx a pri chybe spojenia pred odoslaním requestu
+        (nedostupný server, connect timeout). Prerušené spojenie po odoslaní
+        ("Connection aborted", reset pri čítaní) a timeout pri čítaní
+        odpovede sa opakujú iba pre čisto čítacie pipeline - zápis mohol na
+        serveri prebehnúť.
+        """
+        session = self._get_session()
+        url = f"{self.http_url}/v2/pipeline"
+        body = {"requests": pipeline_requests}
+        read_only = _is_read_only(pipeline_requests)
+
+        attempt = 0
+        while True:
+            try:
+                response = session.post(url, json=body, timeout=self.timeout)
+            except requests.ConnectionError as e:
+                # ConnectTimeout je podtrieda ConnectionError; ReadTimeout nie
+                if attempt >= self.max_retries or not (read_only or _request_not_sent(e)):
+                    raise
+                print(f"⚠️  Turso connection error (pokus {attempt + 1}): {e}")
+            except requests.ReadTimeout:
+                if not read_only or attempt >= self.max_retries:
+                    raise
+                print(f"⚠️  Turso timeout (pokus {attempt + 1})")
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json().get('results', [])
+                    except ValueError:
+                        raise TursoHTTPError("Invalid JSON response")
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    raise TursoHTTPError(f"HTTP {response.status_code} - {response.text}")
+                print(f"⚠️  Turso HTTP {response.status_code} (pokus {attempt + 1})")
+
+            self._sleep_backoff(attempt)
+            attempt += 1
+
+    def execute(
+        self,
+        sql: str,
+        args: Optional[Sequence[Any]] = None,
+        named_args: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Vykonanie jedného SQL príkazu, výsledok vo formáte {success, data, affected_rows}"""
+        return self.execute_many([{"sql": sql, "args": args, "named_args": named_args}])[0]
+
+    def execute_many(self, statements: List[Statement]) -> List[Dict[str, Any]]:
+        """
+        Vykonanie N príkazov v jednej pipeline (jeden HTTP round trip)
+
+        Args:
+            statements: SQL stringy, (sql, args) / (sql, named_args) tuple
+                alebo dict {"sql", "args", "named_args"}
+
+        Returns:
+            N výsledkov vo formáte {success, data, affected_rows}, v poradí príkazov
+        """
+        if not statements:
+            return []
+        try:
+            results = self.pipeline([
+                {"type": "execute", "stmt": _to_stmt(statement)} for statement in statements
+            ])
+        except TursoHTTPError as e:
+            print(f"❌ Database error: {e}")
+            error = str(e).split(' - ')[0]
+            return [{"success": False, "error": error, "data": []} for _ in statements]
+        except Exception as e:
+            print(f"❌ Database error: {e}")
+            return [{"success": False, "error": str(e), "data": []} for _ in statements]
+
+        decoded = [decode_result(result) for result in results]
+        # Server by mal vrátiť výsledok pre každý príkaz; chýbajúce doplň chybou
+        while len(decoded) < len(statements):
+            decoded.append({"success": False, "error": "Missing pipeline result", "data": []})
+        return decoded
+
+    def execute_transaction(self, statements: List[Statement]) -> List[Dict[str, Any]]:
+        """
+        Vykonanie N príkazov atomicky - jeden Hrana batch BEGIN ... COMMIT
+
+        Každý krok beží iba ak uspel predchádzajúci, pri chybe sa transakcia
+        vráti (ROLLBACK) a všetky výsledky sú neúspešné s chybou prvého
+        zlyhaného príkazu.
+        """
+        if not statements:
+            return []
+        steps = [{"stmt": {"sql": "BEGIN"}}]
+        for statement in statements:
+            steps.append({"stmt": _to_stmt(statement), "condition": {"type": "ok", "step": len(steps) - 1}})
+        commit_step = len(steps)
+        steps.append({"stmt": {"sql": "COMMIT"}, "condition": {"type": "ok", "step": commit_step - 1}})
+        steps.append({
+            "stmt": {"sql": "ROLLBACK"},
+            "condition": {"type": "not", "cond": {"type": "ok", "step": commit_step}}
+        })
+
+        try:
+            results = self.pipeline([{"type": "batch", "batch": {"steps": steps}}])
+            if not results or results[0].get('type') != 'ok':
+                error = (results[0].get('error') or {}).get('message') if results else None
+                raise TursoHTTPError(error or "Missing pipeline result")
+            batch = results[0]['response']['result']
+        except Exception as e:
+            print(f"❌ Database error: {e}")
+            return [{"success": False, "error": str(e).split(' - ')[0], "data": []} for _ in statements]
+
+        step_results, step_errors = batch['step_results'], batch['step_errors']
+        if step_results[commit_step] is None:
+            error = next((e['message'] for e in step_errors if e), "Transaction rolled back")
+            print(f"❌ Turso error: {error}")
+            return [{"success": False, "error": error, "data": []} for _ in statements]
+        return [
+            decode_result({"type": "ok", "response": {"type": "execute", "result": result}})
+            for result in step_results[1:commit_step]
+        ]
+
+    def close(self):
+        """Zatvorí session a všetky spojenia v poole"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def _decode_integer(cell: Dict) -> int:
+    return int(cell['value'])
+
+
+def _decode_float(cell: Dict) -> float:
+    return float(cell['value'])
+
+
+def _decode_blob(cell: Dict) -> bytes:
+    return base64.b64decode(cell.get('base64', ''))
+
+
+def _decode_null(cell: Dict) -> None:
+    return None
+
+
+# Dekodér podľa Hrana typu; `text` je len vytiahnutie hodnoty (C-level itemgetter)
+_CELL_DECODERS = {
+    'integer': _decode_integer,
+    'float': _decode_float,
+    'real': _decode_float,
+    'text': itemgetter('value'),
+    'blob': _decode_blob,
+    'null': _decode_null,
+}
+
+
+def _decode_cell(cell: Dict) -> Any:
+    return _CELL_DECODERS.get(cell.get('type'), itemgetter('value'))(cell)
+
+
+def _decode_column(cells: List[Dict]) -> List[Any]:
+    """
+    Dekódovanie jedného stĺpca - ak majú všetky bunky rovnaký typ (bežný
+    prípad), dekodér sa vyberie raz pre celý stĺpec
+    """
+    types = {cell['type'] for cell in cells}
+    if len(types) == 1:
+        decoder = _CELL_DECODERS.get(types.pop())
+        if decoder is not None:
+            return list(map(decoder, cells))
+    return [_decode_cell(cell) for cell in cells]
+
+
+class Row(Mapping):
+    """
+    Pohľad na jeden riadok `ResultSet`
+
+    Hodnoty ostávajú v tuple, kľúče sa hľadajú cez zdieľaný index stĺpcov
+    bez ohľadu na veľkosť písmen (`row['AccountID'] == row['accountid']`).
+    Iterácia a JSON vracajú len pôvodné názvy stĺpcov.
+    """
+
+    __slots__ = ('_columns', '_index', '_values')
+
+    def __init__(self, columns: Tuple[str, ...], index: Dict[str, int], values: Tuple[Any, ...]):
+        self._columns = columns
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            if isinstance(key, str) and key.lower() in self._index:
+                return self._values[self._index[key.lower()]]
+            raise
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index or (isinstance(key, str) and key.lower() in self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._columns, self._values))
+
+    def __repr__(self) -> str:
+        return f"Row({self.to_dict()!r})"
+
+
+class ResultSet(SequenceABC):
+    """
+    Kompaktný výsledok query - názvy stĺpcov + riadky ako tuple
+
+    Indexovanie vracá `Row` pohľad, `to_dicts()` zoznam dictov s pôvodnými
+    názvami stĺpcov (bez duplicitných lowercase kľúčov) pre JSON.
+    """
+
+    __slots__ = ('columns', 'rows', '_index')
+
+    def __init__(self, columns: Sequence[str], rows: List[Tuple[Any, ...]]):
+        self.columns = tuple(columns)
+        self.rows = rows
+        # Index pôvodných aj lowercase názvov; pri duplicitách vyhráva prvý stĺpec
+        index = {}
+        for i, name in enumerate(self.columns):
+            index.setdefault(name, i)
+            index.setdefault(name.lower(), i)
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ResultSet(self.columns, self.rows[i])
+        return Row(self.columns, self._index, self.rows[i])
+
+    def __iter__(self) -> Iterator[Row]:
+        columns, index = self.columns, self._index
+        for values in self.rows:
+            yield Row(columns, index, values)
+
+    def column(self, name: str) -> List[Any]:
+        """Všetky hodnoty jedného stĺpca"""
+        i = self._index.get(name, self._index.get(name.lower()))
+        if i is None:
+            raise KeyError(name)
+        return [values[i] for values in self.rows]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        columns = self.columns
+        return [dict(zip(columns, values)) for values in self.rows]
+
+    def __repr__(self) -> str:
+        return f"ResultSet(columns={self.columns!r}, rows={len(self.rows)})"
+
+
+def to_jsonable(obj: Any) -> Any:
+    """`default` hook pre JSON serializáciu `ResultSet` / `Row`"""
+    if isinstance(obj, ResultSet):
+        return obj.to_dicts()
+    if isinstance(obj, Row):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def decode_result(result_obj: Dict) -> Dict[str, Any]:
+    """Dekódovanie jedného Hrana výsledku do formátu {success, data: ResultSet, affected_rows}"""
+    if result_obj.get('type') == 'error':
+        error_msg = result_obj.get('error', {}).get('message', 'Unknown error')
+        print(f"❌ Turso error: {error_msg}")
+        return {"success": False, "error": error_msg, "data": []}
+
+    response_obj = result_obj.get('response', {})
+
+    # Check for errors
+    if response_obj.get('type') == 'error':
+        error_msg = response_obj.get('error', {}).get('message', 'Unknown error')
+        print(f"❌ Turso error: {error_msg}")
+        return {"success": False, "error": error_msg, "data": []}
+
+    query_result = response_obj.get('result', {})
+
+    columns = [col['name'] for col in query_result.get('cols', [])]
+    raw_rows = query_result.get('rows', [])
+
+    # For UPDATE/INSERT/DELETE, check affected_row_count
+    affected_rows = query_result.get('affected_row_count', 0)
+
+    # Dekódovanie po stĺpcoch, potom zip späť na tuple riadky
+    if raw_rows and columns:
+        decoded_columns = [_decode_column([row[i] for row in raw_rows]) for i in range(len(columns))]
+        rows = list(zip(*decoded_columns))
+    else:
+        rows = []
+
+    return {
+        "success": True,
+        "data": ResultSet(columns, rows),
+        "affected_rows": affected_rows
+    }
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> TursoClient:
+    """Zdieľaný klient pre celý proces"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = TursoClient()
+    return _default_client
+
+
+# Rozšírenia nad module-level funkciami (lokálna replika, cache):
+# router môže obslúžiť čisto čítacie príkazy sám (vráti výsledky alebo None),
+# listenery sa volajú po úspešnom zápise do primárnej databázy.
+_read_router = None
+_write_listeners = []
+
+
+def set_read_router(router: Optional[Callable[[List[Statement]], Optional[List[Dict[str, Any]]]]]):
+    """Nastaví router čítaní - `router(statements)` vráti výsledky alebo None (=> primárna DB)"""
+    global _read_router
+    _read_router = router
+
+
+def add_write_listener(listener: Callable[[List[Statement]], None]):
+    """Zaregistruje callback volaný po úspešnom zápise `listener(statements)`"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def _routed(statements: List[Statement], send: Callable[[List[Statement]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Čítania cez router (ak je a príkazy sú čisto čítacie), zápisy notifikujú listenery"""
+    read_only = all(is_read_only_sql(split_statement(s)[0]) for s in statements)
+    if read_only and _read_router is not None:
+        results = _read_router(statements)
+        if results is not None:
+            return results
+    results = send(statements)
+    if not read_only and _write_listeners and any(r["success"] for r in results):
+        for listener in _write_listeners:
+            listener(statements)
+    return results
+
+
+def turso_query(
+    sql: str,
+    args: Optional[Sequence[Any]] = None,
+    named_args: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Vykonanie SQL query v Turso databáze cez zdieľaný HTTP klient
+
+    Hodnoty sa posielajú ako typované Hrana argumenty - bez escapovania
+    a skladania literálov do SQL.
+
+    Args:
+        sql: SQL s placeholdermi `?` alebo `:name`
+        args: Pozičné argumenty
+        named_args: Pomenované argumenty
+    """
+    statement = {"sql": sql, "args": args, "named_args": named_args}
+    return _routed([statement], lambda s: get_client().execute_many(s))[0]
+
+
+def turso_query_many(statements: List[Statement]) -> List[Dict[str, Any]]:
+    """Vykonanie viacerých SQL queries v jednom Turso round trip-e"""
+    if not statements:
+        return []
+    return _routed(statements, get_client().execute_many)
+
+
+def turso_transaction(statements: List[Statement]) -> List[Dict[str, Any]]:
+    """Vykonanie viacerých SQL príkazov atomicky v jednom Turso round trip-e"""
+    if not statements:
+        return []
+    return _routed(statements, get_client().execute_transaction)
+
+
+class AsyncTursoClient:
+    """
+    asyncio Turso klient (httpx, HTTP/2 ak je dostupný balík h2)
+
+    Nezávislé príkazy sa dajú poslať súbežne cez `gather` - každý vo vlastnom
+    requeste, počet súbežných requestov ohraničuje semafor. Klient patrí
+    event loopu, v ktorom bol prvýkrát použitý.
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        auth_token: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None
+    ):
+        self.http_url = to_http_url(database_url if database_url is not None else TURSO_DATABASE_URL)
+        self.auth_token = auth_token if auth_token is not None else TURSO_AUTH_TOKEN
+        self.concurrency = concurrency or TURSO_ASYNC_CONCURRENCY
+        self.timeout = timeout or TURSO_TIMEOUT
+        self.max_retries = TURSO_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = TURSO_RETRY_BACKOFF if backoff is None else backoff
+        self._http = None
+        self._semaphore = None
+
+    def _get_http(self):
+        """httpx.AsyncClient pri prvom použití (import až tu - voliteľná závislosť)"""
+        if self._http is None:
+            import httpx
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+            self._http = httpx.AsyncClient(
+                http2=http2,
+                timeout=httpx.Timeout(self.timeout, connect=TURSO_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.auth_token}",
+                    "Content-Type": "application/json"
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._http
+
+    async def pipeline(self, pipeline_requests: List[Dict]) -> List[Dict]:
+        """Async obdoba `TursoClient.pipeline` s rovnakými pravidlami pre retry"""
+        import httpx
+
+        http = self._get_http()
+        url = f"{self.http_url}/v2/pipeline"
+        body = {"requests": pipeline_requests}
+        read_only = _is_read_only(pipeline_requests)
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await http.post(url, json=body)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # request neodišiel - opakuje sa aj zápis
+                if attempt >= self.max_retries:
+                    raise
+                print(f"⚠️  Turso connection error (pokus {attempt + 1}): {e}")
+            except httpx.TimeoutException:
+                if not read_only or attempt >= self.max_retries:
+                    raise
+                print(f"⚠️  Turso timeout (pokus {attempt + 1})")
+            except httpx.TransportError as e:
+                # spojenie prerušené po odoslaní (RemoteProtocolError, ReadError)
+                if not read_only or attempt >= self.max_retries:
+                    raise
+                print(f"⚠️  Turso connection error (pokus {attempt + 1}): {e}")
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json().get('results', [])
+                    except ValueError:
+                        raise TursoHTTPError("Invalid JSON response")
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    raise TursoHTTPError(f"HTTP {response.status_code} - {response.text}")
+                print(f"⚠️  Turso HTTP {response.status_code} (pokus {attempt + 1})")
+
+            await asyncio.sleep(_backoff_delay(self.backoff, attempt))
+            attempt += 1
+
+    async def execute(
+        self,
+        sql: str,
+        args: Optional[Sequence[Any]] = None,
+        named_args: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Vykonanie jedného SQL príkazu, výsledok vo formáte {success, data, affected_rows}"""
+        return (await self.execute_many([{"sql": sql, "args": args, "named_args": named_args}]))[0]
+
+    async def execute_many(self, statements: List[Statement]) -> List[Dict[str, Any]]:
+        """N príkazov v jednej pipeline (jeden request, server ich vykoná po sebe)"""
+        if not statements:
+            return []
+        try:
+            results = await self.pipeline([
+                {"type": "execute", "stmt": _to_stmt(statement)} for statement in statements
+            ])
+        except TursoHTTPError as e:
+            print(f"❌ Database error: {e}")
+            error = str(e).split(' - ')[0]
+            return [{"success": False, "error": error, "data": []} for _ in statements]
+        except Exception as e:
+            print(f"❌ Database error: {e}")
+            return [{"success": False, "error": str(e), "data": []} for _ in statements]
+
+        decoded = [decode_result(result) for result in results]
+        while len(decoded) < len(statements):
+            decoded.append({"success": False, "error": "Missing pipeline result", "data": []})
+        return decoded
+
+    async def gather(self, statements: List[Statement]) -> List[Dict[str, Any]]:
+        """
+        Nezávislé príkazy súbežne - každý vo vlastnom requeste
+
+        Latencia je približne latencia najpomalšieho príkazu (pri
+        `concurrency` >= počet príkazov). Výsledky sú v poradí príkazov.
+        """
+        return list(await asyncio.gather(*(self.execute(*split_statement(s)) for s in statements)))
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# Sync Flask handlery volajú async klienta cez event loop bežiaci vo vlákne
+# na pozadí - jeden loop a jeden httpx klient (s HTTP/2 spojeniami) na proces.
+_async_loop = None
+_async_loop_pid = None
+_async_client = None
+_async_lock = threading.Lock()
+
+
+def _get_async_loop() -> asyncio.AbstractEventLoop:
+    """Event loop vo vlákne na pozadí (znovu vytvorený po forku gunicorn workera)"""
+    global _async_loop, _async_loop_pid, _async_client
+    pid = os.getpid()
+    if _async_loop is None or _async_loop_pid != pid:
+        with _async_lock:
+            if _async_loop is None or _async_loop_pid != pid:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='turso-async', daemon=True)
+                thread.start()
+                _async_client = AsyncTursoClient()
+                _async_loop = loop
+                _async_loop_pid = pid
+    return _async_loop
+
+
+def turso_query_concurrent(statements: List[Statement]) -> List[Dict[str, Any]]:
+    """
+    Vykonanie nezávislých SQL queries súbežne z sync kódu
+
+    Na rozdiel od `turso_query_many` (jedna pipeline, príkazy po sebe) ide
+    každý príkaz vo vlastnom requeste, takže latencia ~ najpomalší príkaz.
+    Vhodné pre read-only dashboard/GPT queries bez vzájomných závislostí.
+    """
+    if not statements:
+        return []
+    return _routed(statements, _gather_in_background)
+
+
+def _gather_in_background(statements: List[Statement]) -> List[Dict[str, Any]]:
+    loop = _get_async_loop()
+    future = asyncio.run_coroutine_threadsafe(_async_client.gather(statements), loop)
+    return future.result()
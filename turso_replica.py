@@ -0,0 +1,516 @@
+"""
+Lokálna read replika Turso databázy (SQLite súbor)
+
+Zapína sa cez TURSO_REPLICA_PATH. Vlákno na pozadí každých
+TURSO_REPLICA_SYNC_INTERVAL sekúnd stiahne z primárnej databázy zmeny:
+
+- Transactions inkrementálne - nové riadky podľa rowid, zmenené podľa UpdatedAt
+- malé tabuľky (Categories, Accounts, MerchantRules, TransactionRollups) vždy celé
+- každá TURSO_REPLICA_FULL_SYNC_EVERY-tá synchronizácia je plná
+  (zachytí DELETE a UPDATE, ktoré nenastavili UpdatedAt)
+
+Čítacie príkazy z `turso_query*` obslúži replika, zápisy idú na primárnu
+databázu. Po zápise (aj z iného gunicorn workera - značkový súbor
+`<path>.written`) idú čítania na primárnu DB, kým nedobehne synchronizácia
+začatá až po zápise (read-your-writes). Súbor zdieľajú všetky procesy,
+synchronizuje vždy len jeden (fcntl lock).
+
+Alternatíva s libsql embedded replicas by vyžadovala natívny balík
+`libsql-experimental`; tento modul si vystačí so sqlite3 a Hrana HTTP.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - predpokladáme jeden proces
+    fcntl = None
+
+from dotenv import load_dotenv
+
+from turso_client import (
+    ResultSet, Statement, add_write_listener, get_client, set_read_router, split_statement
+)
+
+load_dotenv()
+
+TURSO_REPLICA_PATH = os.getenv('TURSO_REPLICA_PATH', '')
+TURSO_REPLICA_SYNC_INTERVAL = float(os.getenv('TURSO_REPLICA_SYNC_INTERVAL', '30'))
+# Staršia replika sa nepoužije (napr. keď synchronizácia dlhšie padá)
+TURSO_REPLICA_MAX_STALENESS = float(
+    os.getenv('TURSO_REPLICA_MAX_STALENESS', str(TURSO_REPLICA_SYNC_INTERVAL * 3))
+)
+TURSO_REPLICA_FULL_SYNC_EVERY = int(os.getenv('TURSO_REPLICA_FULL_SYNC_EVERY', '60'))
+
+# Tabuľka -> stĺpec so zmenou (inkrementálna synchronizácia)
+INCREMENTAL_TABLES = {'Transactions': 'UpdatedAt'}
+# Malé číselníky a rollupy (riadok na účet/deň/kategóriu) - stiahnu sa vždy celé
+FULL_TABLES = ('Categories', 'Accounts', 'MerchantRules', 'TransactionRollups')
+REPLICATED_TABLES = tuple(INCREMENTAL_TABLES) + FULL_TABLES
+
+PAGE_SIZE = 2000
+
+
+class LocalReplica:
+    """SQLite replika vybraných tabuliek + synchronizácia z primárnej databázy"""
+
+    def __init__(
+        self,
+        path: str,
+        client=None,
+        sync_interval: Optional[float] = None,
+        max_staleness: Optional[float] = None,
+        full_sync_every: Optional[int] = None
+    ):
+        self.path = path
+        self.marker_path = f"{path}.written"
+        self.lock_path = f"{path}.lock"
+        self.client = client or get_client()
+        self.sync_interval = sync_interval or TURSO_REPLICA_SYNC_INTERVAL
+        self.max_staleness = max_staleness or TURSO_REPLICA_MAX_STALENESS
+        self.full_sync_every = full_sync_every or TURSO_REPLICA_FULL_SYNC_EVERY
+
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+        self._local_write_ns = 0
+
+        # Metriky tohto procesu
+        self.reads_local = 0
+        self.reads_primary = 0
+        self.syncs = 0
+        self.rows_applied = 0
+        self.last_sync_ms = None
+        self.last_error = None
+
+        self._init_state()
+
+    # ------------------------------------------------------------------
+    # Spojenia
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Čítacie spojenie - jedno na vlákno (a proces)"""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=1")
+            self._local.conn = conn
+            self._local.pid = pid
+        return self._local.conn
+
+    def _init_state(self):
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS _ReplicaTables (
+                TableName TEXT PRIMARY KEY,
+                SchemaSQL TEXT,
+                MaxRowID INTEGER DEFAULT 0,
+                MaxUpdatedAt TEXT DEFAULT ''
+            );
+            CREATE TABLE IF NOT EXISTS _ReplicaSync (
+                ID INTEGER PRIMARY KEY CHECK (ID = 1),
+                SyncedFromNs INTEGER,
+                SyncCount INTEGER DEFAULT 0
+            );
+            INSERT OR IGNORE INTO _ReplicaSync (ID, SyncedFromNs, SyncCount) VALUES (1, NULL, 0);
+        """)
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Čerstvosť
+    # ------------------------------------------------------------------
+
+    def _synced_from_ns(self) -> Optional[int]:
+        row = self._reader().execute("SELECT SyncedFromNs FROM _ReplicaSync WHERE ID = 1").fetchone()
+        return row[0] if row else None
+
+    def _last_write_ns(self) -> int:
+        try:
+            marker_ns = os.stat(self.marker_path).st_mtime_ns
+        except FileNotFoundError:
+            marker_ns = 0
+        return max(self._local_write_ns, marker_ns)
+
+    def staleness_seconds(self) -> Optional[float]:
+        """Vek repliky - čas od začiatku poslednej úspešnej synchronizácie"""
+        synced_from = self._synced_from_ns()
+        if synced_from is None:
+            return None
+        return (time.time_ns() - synced_from) / 1e9
+
+    def is_fresh(self) -> bool:
+        """Replika obsahuje všetky zápisy a nie je staršia ako max_staleness"""
+        synced_from = self._synced_from_ns()
+        if synced_from is None:
+            return False
+        if self._last_write_ns() >= synced_from:
+            return False
+        return (time.time_ns() - synced_from) / 1e9 <= self.max_staleness
+
+    def mark_written(self, statements: List[Statement] = None):
+        """Write listener - čítania pôjdu na primárnu DB, kým sa replika nedobehne"""
+        self._local_write_ns = time.time_ns()
+        try:
+            with open(self.marker_path, 'a'):
+                pass
+            os.utime(self.marker_path, ns=(self._local_write_ns, self._local_write_ns))
+        except OSError as e:
+            print(f"⚠️  Replika: nepodarilo sa zapísať značku zápisu: {e}")
+        self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Čítania
+    # ------------------------------------------------------------------
+
+    def route(self, statements: List[Statement]) -> Optional[List[Dict[str, Any]]]:
+        """Read router pre turso_client - výsledky z repliky alebo None (=> primárna DB)"""
+        self._ensure_thread()
+        try:
+            if not self.is_fresh():
+                self.reads_primary += len(statements)
+                return None
+            results = [self._execute_local(statement) for statement in statements]
+        except sqlite3.Error:
+            # Tabuľka mimo repliky, prebiehajúca zmena schémy, ...
+            self.reads_primary += len(statements)
+            return None
+        self.reads_local += len(statements)
+        return results
+
+    def _execute_local(self, statement: Statement) -> Dict[str, Any]:
+        sql, args, named_args = split_statement(statement)
+        if named_args:
+            params = {name.lstrip(':@$'): value for name, value in named_args.items()}
+        else:
+            params = list(args or [])
+        cursor = self._reader().execute(sql, params)
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        return {"success": True, "data": ResultSet(columns, cursor.fetchall()), "affected_rows": 0}
+
+    # ------------------------------------------------------------------
+    # Synchronizácia
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self):
+        """Spustí sync vlákno (aj v procese po forku gunicorn workera)"""
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread_pid != pid or self._thread is None:
+                self._local = threading.local()
+                self._thread = threading.Thread(target=self._run, name='turso-replica', daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+
+    def start(self):
+        self._ensure_thread()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _needs_sync(self) -> bool:
+        """Zápis od poslednej synchronizácie alebo uplynul interval (aj keď synchronizoval iný proces)"""
+        synced_from = self._synced_from_ns()
+        if synced_from is None or self._last_write_ns() >= synced_from:
+            return True
+        return (time.time_ns() - synced_from) / 1e9 >= self.sync_interval * 0.9
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._needs_sync() and not self.sync():
+                    # Synchronizuje iný proces - skús čoskoro znova
+                    self._wake.wait(min(1.0, self.sync_interval))
+                    self._wake.clear()
+                    continue
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ Replika: synchronizácia zlyhala: {e}")
+            self._wake.wait(self.sync_interval)
+            self._wake.clear()
+
+    def sync(self, full: bool = False) -> bool:
+        """
+        Jedna synchronizácia z primárnej databázy
+
+        Returns:
+            False ak práve synchronizuje iný proces
+        """
+        lock_file = open(self.lock_path, 'a')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            self._sync_locked(full)
+            return True
+        finally:
+            lock_file.close()
+
+    def _fetch(self, sql: str, args: Optional[List[Any]] = None) -> ResultSet:
+        return _data(self.client.execute(sql, args))
+
+    def _sync_locked(self, full: bool):
+        start = time.perf_counter()
+        started_ns = time.time_ns()
+        conn = self._connect()
+        try:
+            sync_count = conn.execute("SELECT SyncCount FROM _ReplicaSync WHERE ID = 1").fetchone()[0]
+            full = full or sync_count % self.full_sync_every == 0
+            state = {
+                row[0]: row[1:]
+                for row in conn.execute("SELECT TableName, SchemaSQL, MaxRowID, MaxUpdatedAt FROM _ReplicaTables")
+            }
+
+            # Jedna pipeline: schéma, malé tabuľky celé a prvé stránky zmien
+            # inkrementálnych tabuliek podľa aktuálnych watermarkov
+            statements = {'schema': (SCHEMA_SQL, list(REPLICATED_TABLES))}
+            for table in FULL_TABLES:
+                statements[(table, 'all')] = f'SELECT * FROM "{table}"'
+            for table in INCREMENTAL_TABLES:
+                _, max_rowid, max_updated = state.get(table, (None, 0, ''))
+                statements.update(_incremental_statements(table, max_rowid, max_updated, full))
+            results = dict(zip(statements, self.client.execute_many(list(statements.values()))))
+
+            schema = _data(results['schema'])
+            applied = 0
+            for table in REPLICATED_TABLES:
+                table_sql = next((r['sql'] for r in schema if r['type'] == 'table' and r['name'] == table), None)
+                if table_sql is None:
+                    continue  # tabuľka na primárnej DB neexistuje
+                index_sqls = [r['sql'] for r in schema if r['type'] == 'index' and r['tbl_name'] == table]
+                schema_sql, max_rowid, max_updated = state.get(table, (None, 0, ''))
+                prefetched = {key[1]: result for key, result in results.items() if key[0] == table}
+                if schema_sql != table_sql:
+                    self._recreate_table(conn, table, table_sql, index_sqls)
+                    max_rowid, max_updated = 0, ''
+                    if table in INCREMENTAL_TABLES:
+                        prefetched = {}  # stránky boli podľa starých watermarkov
+                if table in INCREMENTAL_TABLES:
+                    applied += self._sync_incremental(conn, table, max_rowid, max_updated, full, prefetched)
+                else:
+                    applied += self._replace_table(conn, table, _data(prefetched['all']))
+
+            conn.execute(
+                "UPDATE _ReplicaSync SET SyncedFromNs = ?, SyncCount = SyncCount + 1 WHERE ID = 1",
+                (started_ns,)
+            )
+        finally:
+            conn.close()
+
+        first = self.syncs == 0
+        self.syncs += 1
+        self.rows_applied += applied
+        self.last_sync_ms = (time.perf_counter() - start) * 1000
+        self.last_error = None
+        if first or full:
+            print(f"🔁 Replika {'plná ' if full else ''}synchronizácia: {applied} riadkov "
+                  f"za {self.last_sync_ms:.0f} ms ({self.path})")
+
+    def _recreate_table(self, conn: sqlite3.Connection, table: str, table_sql: str, index_sqls: List[str]):
+        """Nová / zmenená schéma tabuľky na primárnej DB - tabuľka sa vytvorí nanovo"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(table_sql)
+            for index_sql in index_sqls:
+                conn.execute(index_sql)
+            conn.execute(
+                "INSERT OR REPLACE INTO _ReplicaTables (TableName, SchemaSQL, MaxRowID, MaxUpdatedAt) "
+                "VALUES (?, ?, 0, '')",
+                (table, table_sql)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _replace_table(self, conn: sqlite3.Connection, table: str, data: ResultSet) -> int:
+        """Malá tabuľka - obsah sa nahradí celý v jednej transakcii"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f'DELETE FROM "{table}"')
+            if data.rows:
+                conn.executemany(_insert_sql(table, data.columns), data.rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(data.rows)
+
+    def _sync_incremental(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        max_rowid: int,
+        max_updated: str,
+        full: bool,
+        prefetched: Dict[str, Dict[str, Any]]
+    ) -> int:
+        """
+        Nové riadky podľa rowid, zmenené podľa UpdatedAt; pri plnej
+        synchronizácii aj zmazané riadky a všetko znova
+
+        `prefetched` sú výsledky z úvodnej pipeline pre tieto watermarky;
+        čo chýba, sa dotiahne samostatne.
+        """
+        if not prefetched:
+            statements = _incremental_statements(table, max_rowid, max_updated, full)
+            results = self.client.execute_many(list(statements.values()))
+            prefetched = {key[1]: result for key, result in zip(statements, results)}
+        updated_col = INCREMENTAL_TABLES[table]
+        applied = 0
+
+        if full:
+            primary_rowids = set(_data(prefetched['rowids']).column('_replica_rowid'))
+            local_rowids = {r[0] for r in conn.execute(f'SELECT rowid FROM "{table}"')}
+            deleted = local_rowids - primary_rowids
+            if deleted:
+                conn.executemany(f'DELETE FROM "{table}" WHERE rowid = ?', [(r,) for r in deleted])
+                applied += len(deleted)
+            max_rowid, max_updated = 0, ''
+
+        # Zmenené existujúce riadky (>= - rovnaká sekunda môže mať ďalšie zmeny)
+        if 'changed' in prefetched:
+            changed = _data(prefetched['changed'])
+            applied += self._apply_rows(conn, table, changed)
+            max_updated = max([max_updated] + [v for v in changed.column(updated_col) if v])
+
+        # Nové riadky po stránkach (prvá stránka je už stiahnutá)
+        page = _data(prefetched['page'])
+        while page.rows:
+            applied += self._apply_rows(conn, table, page)
+            max_rowid = page.rows[-1][0]
+            max_updated = max([max_updated] + [v for v in page.column(updated_col) if v])
+            if len(page.rows) < PAGE_SIZE:
+                break
+            page = self._fetch(*_page_statement(table, max_rowid))
+
+        conn.execute(
+            "UPDATE _ReplicaTables SET MaxRowID = ?, MaxUpdatedAt = ? WHERE TableName = ?",
+            (max_rowid, max_updated, table)
+        )
+        return applied
+
+    def _apply_rows(self, conn: sqlite3.Connection, table: str, data: ResultSet) -> int:
+        """INSERT OR REPLACE riadkov (prvý stĺpec = rowid)"""
+        if not data.rows:
+            return 0
+        columns = ('rowid',) + data.columns[1:]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_insert_sql(table, columns), data.rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(data.rows)
+
+    # ------------------------------------------------------------------
+    # Metriky
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Stav repliky pre /health"""
+        try:
+            staleness = self.staleness_seconds()
+            fresh = self.is_fresh()
+        except sqlite3.Error:
+            staleness, fresh = None, False
+        return {
+            "path": self.path,
+            "fresh": fresh,
+            "staleness_seconds": round(staleness, 3) if staleness is not None else None,
+            "sync_interval": self.sync_interval,
+            "last_sync_ms": round(self.last_sync_ms, 1) if self.last_sync_ms is not None else None,
+            "syncs": self.syncs,
+            "rows_applied": self.rows_applied,
+            "reads_local": self.reads_local,
+            "reads_primary": self.reads_primary,
+            "last_error": self.last_error
+        }
+
+
+SCHEMA_SQL = (
+    "SELECT type, name, tbl_name, sql FROM sqlite_master "
+    f"WHERE tbl_name IN ({', '.join('?' * len(REPLICATED_TABLES))}) "
+    "AND type IN ('table', 'index') AND sql IS NOT NULL"
+)
+
+
+def _data(result: Dict[str, Any]) -> ResultSet:
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Query failed"))
+    return result["data"]
+
+
+def _page_statement(table: str, max_rowid: int):
+    return (
+        f'SELECT rowid AS _replica_rowid, * FROM "{table}" WHERE rowid > ? ORDER BY rowid LIMIT ?',
+        [max_rowid, PAGE_SIZE]
+    )
+
+
+def _incremental_statements(table: str, max_rowid: int, max_updated: str, full: bool) -> Dict[tuple, Statement]:
+    """Príkazy jednej inkrementálnej synchronizácie tabuľky, kľúč (tabuľka, druh)"""
+    updated_col = INCREMENTAL_TABLES[table]
+    statements = {}
+    if full:
+        statements[(table, 'rowids')] = f'SELECT rowid AS _replica_rowid FROM "{table}"'
+        max_rowid, max_updated = 0, ''
+    if max_rowid and max_updated:
+        statements[(table, 'changed')] = (
+            f'SELECT rowid AS _replica_rowid, * FROM "{table}" WHERE "{updated_col}" >= ? AND rowid <= ?',
+            [max_updated, max_rowid]
+        )
+    statements[(table, 'page')] = _page_statement(table, max_rowid)
+    return statements
+
+
+def _insert_sql(table: str, columns) -> str:
+    column_list = ', '.join(f'"{c}"' for c in columns)
+    placeholders = ', '.join('?' * len(columns))
+    return f'INSERT OR REPLACE INTO "{table}" ({column_list}) VALUES ({placeholders})'
+
+
+_replica = None
+
+
+def get_replica() -> Optional[LocalReplica]:
+    """Aktívna replika alebo None (TURSO_REPLICA_PATH nie je nastavená)"""
+    return _replica
+
+
+def install(path: Optional[str] = None) -> Optional[LocalReplica]:
+    """
+    Zapne repliku pre module-level `turso_query*` funkcie
+
+    Bez TURSO_REPLICA_PATH nerobí nič - všetky čítania idú na primárnu DB.
+    """
+    global _replica
+    path = path if path is not None else TURSO_REPLICA_PATH
+    if not path or _replica is not None:
+        return _replica
+    _replica = LocalReplica(path)
+    set_read_router(_replica.route)
+    add_write_listener(_replica.mark_written)
+    _replica.start()
+    print(f"📦 Lokálna read replika: {path} (sync každých {_replica.sync_interval:.0f} s)")
+    return _replica
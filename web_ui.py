@@ -3,21 +3,59 @@
 Flask Web UI - Dashboard pre správu financií (Railway compatible - HTTP API)
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
-import requests
 import json
 import re
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from smart_categorizer import SmartCategorizer
+from turso_client import ResultSet, Row, to_jsonable, turso_query, turso_query_concurrent, turso_query_many, turso_transaction
+import turso_replica
+import query_cache
+import migrate
+import raw_emails
+import export
+import fingerprints
+import bmail_parser
+import imap_fetch
+import imap_session
+from query_cache import cached_query, cached_query_many
+from query_filters import (
+    DAY_SINCE, EPOCH_SINCE, amount_cents, canonical_values, encode_cursor, epoch_range,
+    keyset_after, month_label
+)
+from fulltext import RANK_CONDITION, RANK_JOIN, match_query, search_filter
 
 load_dotenv()
 
+
+class JSONProvider(DefaultJSONProvider):
+    """jsonify serializuje aj ResultSet / Row z turso_client (len pôvodné názvy stĺpcov)"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (ResultSet, Row)):
+            return to_jsonable(o)
+        return DefaultJSONProvider.default(o)
+
+
 app = Flask(__name__)
+app.json = JSONProvider(app)
 CORS(app)
 
+# Voliteľná lokálna read replika (TURSO_REPLICA_PATH)
+turso_replica.install()
+# Cache výsledkov dashboard queries, invalidovaná každým zápisom (QUERY_CACHE_TTL)
+query_cache.install()
+# Je schéma na poslednej migrácii? (SCHEMA_AUTO_MIGRATE=1 čakajúce aplikuje)
+migrate.startup_check()
+# Počet transakcií pre stránkovanie sa cachuje dlhšie - zobrazuje sa ako približný
+# (QUERY_CACHE_TTL=0 vypne aj túto cache)
+TRANSACTION_COUNT_TTL = float(os.getenv('TRANSACTION_COUNT_TTL', '300')) if query_cache.QUERY_CACHE_TTL > 0 else 0
+
 # Povoľ všetky Content-Types pre webhooky
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 
@@ -31,95 +69,6 @@ def get_smart_categorizer():
         smart_categorizer = SmartCategorizer(turso_query)
     return smart_categorizer
 
-# Turso database connection via HTTP API
-TURSO_DATABASE_URL = os.getenv('TURSO_DATABASE_URL', '')
-TURSO_AUTH_TOKEN = os.getenv('TURSO_AUTH_TOKEN', '')
-
-# Convert libsql:// URL to https://
-if TURSO_DATABASE_URL.startswith('libsql://'):
-    TURSO_HTTP_URL = TURSO_DATABASE_URL.replace('libsql://', 'https://')
-else:
-    TURSO_HTTP_URL = TURSO_DATABASE_URL
-
-def turso_query(sql: str):
-    """Vykonanie SQL query v Turso databáze cez HTTP API"""
-    try:
-        response = requests.post(
-            f"{TURSO_HTTP_URL}/v2/pipeline",
-            headers={
-                "Authorization": f"Bearer {TURSO_AUTH_TOKEN}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "requests": [
-                    {"type": "execute", "stmt": {"sql": sql}}
-                ]
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            # Parse response
-            if result.get('results') and len(result['results']) > 0:
-                response_obj = result['results'][0]['response']
-                
-                # Check for errors
-                if response_obj.get('type') == 'error':
-                    error_msg = response_obj.get('error', {}).get('message', 'Unknown error')
-                    print(f"❌ Turso error: {error_msg}")
-                    return {"success": False, "error": error_msg, "data": []}
-                
-                query_result = response_obj.get('result', {})
-                
-                # Extract columns and rows
-                columns = [col['name'] for col in query_result.get('cols', [])]
-                rows = query_result.get('rows', [])
-                
-                # For UPDATE/INSERT/DELETE, check affected_row_count
-                affected_rows = query_result.get('affected_row_count', 0)
-                
-                # Convert to dict format
-                data = []
-                for row in rows:
-                    row_dict = {}
-                    for i, col_name in enumerate(columns):
-                        # Handle Turso's value format: {"type": "integer", "value": "123"}
-                        cell = row[i]
-                        if isinstance(cell, dict) and 'value' in cell:
-                            # Extract value from dict
-                            value = cell['value']
-                            # Convert string numbers to actual numbers
-                            if cell.get('type') == 'integer':
-                                row_dict[col_name] = int(value) if value is not None else None
-                            elif cell.get('type') == 'real':
-                                row_dict[col_name] = float(value) if value is not None else None
-                            else:
-                                row_dict[col_name] = value
-                        else:
-                            # Direct value
-                            row_dict[col_name] = cell
-                        
-                        # Also add lowercase version for compatibility
-                        row_dict[col_name.lower()] = row_dict[col_name]
-                    data.append(row_dict)
-                
-                return {
-                    "success": True, 
-                    "data": data,
-                    "affected_rows": affected_rows
-                }
-            else:
-                return {"success": True, "data": [], "affected_rows": 0}
-        else:
-            print(f"❌ Database error: {response.status_code} - {response.text}")
-            return {"success": False, "error": f"HTTP {response.status_code}", "data": []}
-        
-    except Exception as e:
-        print(f"❌ Database error: {e}")
-        return {"success": False, "error": str(e), "data": []}
-
 
 @app.route('/')
 def index():
@@ -163,7 +112,7 @@ def accounts_list():
     ORDER BY AccountName;
     """
     
-    result = turso_query(sql)
+    result = cached_query(sql)
     
     return jsonify({
         "accounts": result["data"] if result["success"] else []
@@ -175,9 +124,9 @@ def create_account():
     """Vytvorenie nového účtu"""
     data = request.json
     iban = data.get('iban', '').upper().replace(' ', '')
-    name = data.get('name', '').replace("'", "''")
-    bank = data.get('bank', 'Tatra banka').replace("'", "''")
-    acc_type = data.get('type', 'Osobný účet').replace("'", "''")
+    name = data.get('name', '')
+    bank = data.get('bank', 'Tatra banka')
+    acc_type = data.get('type', 'Osobný účet')
     
     if not iban or not name:
         return jsonify({"error": "IBAN a názov sú povinné"}), 400
@@ -186,15 +135,16 @@ def create_account():
     if not iban.startswith('SK') or len(iban) != 24:
         return jsonify({"error": "Neplatný slovenský IBAN (musí začínať SK a mať 24 znakov)"}), 400
     
-    sql = f"""
+    sql = """
     INSERT INTO Accounts (IBAN, AccountName, BankName, AccountType)
-    VALUES ('{iban}', '{name}', '{bank}', '{acc_type}');
+    VALUES (?, ?, ?, ?)
+    RETURNING AccountID;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [iban, name, bank, acc_type])
     
     if result["success"]:
-        return jsonify({"success": True, "message": "Účet vytvorený"})
+        return jsonify({"success": True, "message": "Účet vytvorený", "account_id": result["data"][0]["AccountID"]})
     else:
         return jsonify({"error": result.get("error", "Chyba pri vytváraní účtu")}), 500
 
@@ -203,29 +153,33 @@ def create_account():
 def update_account(account_id):
     """Aktualizácia účtu"""
     data = request.json
-    name = data.get('name', '').replace("'", "''")
-    bank = data.get('bank', '').replace("'", "''")
-    acc_type = data.get('type', '').replace("'", "''")
+    name = data.get('name', '')
+    bank = data.get('bank', '')
+    acc_type = data.get('type', '')
     
     if not name:
         return jsonify({"error": "Názov je povinný"}), 400
     
     # Zostavíme UPDATE query s viacerými poliami
-    updates = [f"AccountName = '{name}'"]
+    updates = ["AccountName = ?"]
+    args = [name]
     
     if bank:
-        updates.append(f"BankName = '{bank}'")
+        updates.append("BankName = ?")
+        args.append(bank)
     
     if acc_type:
-        updates.append(f"AccountType = '{acc_type}'")
+        updates.append("AccountType = ?")
+        args.append(acc_type)
     
+    args.append(account_id)
     sql = f"""
     UPDATE Accounts 
     SET {', '.join(updates)}
-    WHERE AccountID = {account_id};
+    WHERE AccountID = ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, args)
     
     if result["success"]:
         return jsonify({"success": True, "message": "Účet aktualizovaný"})
@@ -236,13 +190,13 @@ def update_account(account_id):
 @app.route('/api/accounts/delete/<int:account_id>', methods=['DELETE'])
 def delete_account(account_id):
     """Vymazanie účtu (soft delete)"""
-    sql = f"""
+    sql = """
     UPDATE Accounts 
     SET IsActive = 0
-    WHERE AccountID = {account_id};
+    WHERE AccountID = ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [account_id])
     
     if result["success"]:
         return jsonify({"success": True, "message": "Účet vymazaný"})
@@ -260,15 +214,15 @@ def categories_list():
         c.Icon,
         c.Color,
         c.ParentCategoryID,
-        COUNT(t.TransactionID) as transaction_count,
-        COALESCE(SUM(ABS(t.Amount)), 0) as total_amount
+        COALESCE(SUM(r.ExpenseCount), 0) as transaction_count,
+        COALESCE(SUM(r.ExpenseCents), 0) / 100.0 as total_amount
     FROM Categories c
-    LEFT JOIN Transactions t ON c.CategoryID = t.CategoryID AND t.Amount < 0
+    LEFT JOIN TransactionRollups r ON c.CategoryID = r.CategoryID AND r.ExpenseCount > 0
     GROUP BY c.CategoryID, c.Name, c.Icon, c.Color, c.ParentCategoryID
     ORDER BY c.Name;
     """
     
-    result = turso_query(sql)
+    result = cached_query(sql)
     
     return jsonify({
         "categories": result["data"] if result["success"] else []
@@ -279,22 +233,23 @@ def categories_list():
 def create_category():
     """Vytvorenie novej kategórie"""
     data = request.json
-    name = data.get('name', '').replace("'", "''")
+    name = data.get('name', '')
     icon = data.get('icon', '📦')
     color = data.get('color', '#667eea')
     
     if not name:
         return jsonify({"error": "Názov kategórie je povinný"}), 400
     
-    sql = f"""
+    sql = """
     INSERT INTO Categories (Name, Icon, Color, CreatedAt)
-    VALUES ('{name}', '{icon}', '{color}', datetime('now'));
+    VALUES (?, ?, ?, datetime('now'))
+    RETURNING CategoryID;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [name, icon, color])
     
     if result["success"]:
-        return jsonify({"success": True, "message": "Kategória vytvorená"})
+        return jsonify({"success": True, "message": "Kategória vytvorená", "category_id": result["data"][0]["CategoryID"]})
     else:
         return jsonify({"error": result["error"]}), 500
 
@@ -303,22 +258,22 @@ def create_category():
 def update_category(category_id):
     """Aktualizácia kategórie"""
     data = request.json
-    name = data.get('name', '').replace("'", "''")
+    name = data.get('name', '')
     icon = data.get('icon', '')
     color = data.get('color', '')
     
     if not name:
         return jsonify({"error": "Názov kategórie je povinný"}), 400
     
-    sql = f"""
+    sql = """
     UPDATE Categories 
-    SET Name = '{name}',
-        Icon = '{icon}',
-        Color = '{color}'
-    WHERE CategoryID = {category_id};
+    SET Name = ?,
+        Icon = ?,
+        Color = ?
+    WHERE CategoryID = ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [name, icon, color, category_id])
     
     if result["success"]:
         return jsonify({"success": True, "message": "Kategória aktualizovaná"})
@@ -330,21 +285,22 @@ def update_category(category_id):
 def delete_category(category_id):
     """Vymazanie kategórie"""
     # Najprv nastavíme CategoryID na NULL pre všetky transakcie s touto kategóriou
-    sql_update = f"""
+    sql_update = """
     UPDATE Transactions 
-    SET CategoryID = NULL 
-    WHERE CategoryID = {category_id};
+    SET CategoryID = NULL,
+        UpdatedAt = datetime('now')
+    WHERE CategoryID = ?;
     """
     
-    turso_query(sql_update)
+    turso_query(sql_update, [category_id])
     
     # Potom vymažeme kategóriu
-    sql_delete = f"""
+    sql_delete = """
     DELETE FROM Categories 
-    WHERE CategoryID = {category_id};
+    WHERE CategoryID = ?;
     """
     
-    result = turso_query(sql_delete)
+    result = turso_query(sql_delete, [category_id])
     
     if result["success"]:
         return jsonify({"success": True, "message": "Kategória vymazaná"})
@@ -358,24 +314,15 @@ def update_transaction_category(transaction_id):
     data = request.json
     category_id = data.get('category_id')
     
-    if category_id is None:
-        sql = f"""
-        UPDATE Transactions 
-        SET CategoryID = NULL,
-            CategorySource = 'Manual',
-            UpdatedAt = datetime('now')
-        WHERE TransactionID = {transaction_id};
-        """
-    else:
-        sql = f"""
-        UPDATE Transactions 
-        SET CategoryID = {category_id},
-            CategorySource = 'Manual',
-            UpdatedAt = datetime('now')
-        WHERE TransactionID = {transaction_id};
-        """
+    sql = """
+    UPDATE Transactions 
+    SET CategoryID = ?,
+        CategorySource = 'Manual',
+        UpdatedAt = datetime('now')
+    WHERE TransactionID = ?;
+    """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [category_id, transaction_id])
     
     if result["success"]:
         # Learn from manual assignment (if category was set, not removed)
@@ -396,86 +343,83 @@ def get_summary():
     """API endpoint pre zhrnutie štatistík"""
     
     # Celkové štatistiky - používame aliasy BEZ podčiarkovníkov
+    # (agregáty z rollup tabuľky - cena podľa počtu dní/kategórií, nie transakcií;
+    # sumy sú celé centy, na EUR sa delí až výsledok)
     summary_sql = """
     SELECT 
-        COUNT(*) as totaltransactions,
-        SUM(CASE WHEN Amount < 0 THEN ABS(Amount) ELSE 0 END) as totalexpenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as totalincome,
-        AVG(CASE WHEN Amount < 0 THEN ABS(Amount) ELSE NULL END) as avgexpense
-    FROM Transactions;
+        SUM(TxCount) as totaltransactions,
+        SUM(ExpenseCents) / 100.0 as totalexpenses,
+        SUM(IncomeCents) / 100.0 as totalincome,
+        SUM(ExpenseCents) / 100.0 / NULLIF(SUM(ExpenseCount), 0) as avgexpense
+    FROM TransactionRollups;
     """
     
-    summary_result = turso_query(summary_sql)
-    
-    # Normalize the result
-    summary = {}
-    if summary_result["success"] and summary_result["data"]:
-        raw = summary_result["data"][0]
-        summary = {
-            "total_transactions": raw.get('totaltransactions') or raw.get('TOTALTRANSACTIONS') or 0,
-            "total_expenses": raw.get('totalexpenses') or raw.get('TOTALEXPENSES') or 0,
-            "total_income": raw.get('totalincome') or raw.get('TOTALINCOME') or 0,
-            "avg_expense": raw.get('avgexpense') or raw.get('AVGEXPENSE') or 0
-        }
-    
-    # Top merchants
+    # Top merchants (čiastočný index idx_transactions_expenses, AmountCents < 0)
     merchants_sql = """
     SELECT 
         MerchantName,
         COUNT(*) as count,
-        SUM(ABS(Amount)) as total
+        -SUM(AmountCents) / 100.0 as total
     FROM Transactions
-    WHERE Amount < 0
+    WHERE AmountCents < 0
     GROUP BY MerchantName
     ORDER BY total DESC
     LIMIT 5;
     """
     
-    merchants_result = turso_query(merchants_sql)
-    
     # Výdavky podľa kategórií
     category_sql = """
     SELECT 
         c.Name as category,
-        SUM(ABS(t.Amount)) as total
-    FROM Transactions t
-    LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-    WHERE t.Amount < 0
+        SUM(r.ExpenseCents) / 100.0 as total
+    FROM TransactionRollups r
+    LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+    WHERE r.ExpenseCount > 0
     GROUP BY c.Name
     ORDER BY total DESC;
     """
     
-    category_result = turso_query(category_sql)
-    
     # Mesačné údaje (posledných 6 mesiacov)
-    monthly_sql = """
+    monthly_sql = f"""
     SELECT 
-        strftime('%Y-%m', TransactionDate) as month,
-        SUM(CASE WHEN Amount < 0 THEN ABS(Amount) ELSE 0 END) as expenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as income
-    FROM Transactions
-    WHERE TransactionDate >= date('now', '-6 months')
-    GROUP BY month
+        {month_label('Day')} as month,
+        SUM(ExpenseCents) / 100.0 as expenses,
+        SUM(IncomeCents) / 100.0 as income
+    FROM TransactionRollups
+    WHERE Day >= CAST(strftime('%Y%m%d', 'now', '-6 months') AS INTEGER)
+    GROUP BY Day / 100
     ORDER BY month;
     """
     
-    monthly_result = turso_query(monthly_sql)
-    
     # Kategórie pre pie chart
     category_pie_sql = """
     SELECT 
         COALESCE(c.Name, 'Nezaradené') as category,
         c.Icon as icon,
         c.Color as color,
-        SUM(ABS(t.Amount)) as amount
-    FROM Transactions t
-    LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-    WHERE t.Amount < 0
+        SUM(r.ExpenseCents) / 100.0 as amount
+    FROM TransactionRollups r
+    LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+    WHERE r.ExpenseCount > 0
     GROUP BY c.CategoryID, c.Name, c.Icon, c.Color
     ORDER BY amount DESC;
     """
     
-    category_pie_result = turso_query(category_pie_sql)
+    # 5 nezávislých queries súbežne - latencia ~ najpomalšia z nich (pri cache hit bez DB)
+    summary_result, merchants_result, category_result, monthly_result, category_pie_result = cached_query_many([
+        summary_sql, merchants_sql, category_sql, monthly_sql, category_pie_sql
+    ], fetch=turso_query_concurrent)
+    
+    # Normalize the result
+    summary = {}
+    if summary_result["success"] and summary_result["data"]:
+        raw = summary_result["data"][0]
+        summary = {
+            "total_transactions": raw.get('totaltransactions') or 0,
+            "total_expenses": raw.get('totalexpenses') or 0,
+            "total_income": raw.get('totalincome') or 0,
+            "avg_expense": raw.get('avgexpense') or 0
+        }
     
     return jsonify({
         "summary": summary,
@@ -486,51 +430,110 @@ def get_summary():
     })
 
 
-@app.route('/api/transactions/list', methods=['GET'])
-def transactions_list():
-    """Zoznam všetkých transakcií s filtráciou"""
-    limit = request.args.get('limit', 50)
-    offset = request.args.get('offset', 0)
-    search = request.args.get('search', '')
-    category = request.args.get('category', '')
-    date_from = request.args.get('date_from', '')
-    date_to = request.args.get('date_to', '')
-    trans_type = request.args.get('type', '')  # income, expense
+def transaction_filters(params):
+    """
+    WHERE podmienky zoznamu / exportu transakcií z query parametrov
+
+    Parametre: search, category, date_from, date_to, type (income, expense).
+    Podmienky sú nad aliasmi t (Transactions) a c (Categories).
+
+    Returns:
+        (podmienky, argumenty)
+
+    Raises:
+        ValueError: neplatný dátum
+    """
+    search = params.get('search', '')
+    category = params.get('category', '')
+    date_from = params.get('date_from', '')
+    date_to = params.get('date_to', '')
+    trans_type = params.get('type', '')  # income, expense
     
-    # Základný SQL
     where_conditions = []
+    args = []
     
     if search:
-        where_conditions.append(f"t.MerchantName LIKE '%{search}%'")
+        # Fulltext (obchodník, popis, info pre príjemcu, účel) - bez diakritiky, prefixy
+        search_conditions, search_args = search_filter("t.TransactionID", search)
+        where_conditions.extend(search_conditions)
+        args.extend(search_args)
     
     if category and category != 'Všetky kategórie':
-        # Escape single quotes
-        category_esc = category.replace("'", "''")
         # Špeciálny prípad pre "Nezaradené" - transakcie bez CategoryID
-        if category_esc == 'Nezaradené':
-            where_conditions.append(f"t.CategoryID IS NULL")
+        if category == 'Nezaradené':
+            where_conditions.append("t.CategoryID IS NULL")
         else:
-            where_conditions.append(f"c.Name = '{category_esc}'")
-    
-    if date_from:
-        where_conditions.append(f"DATE(t.TransactionDate) >= '{date_from}'")
+            where_conditions.append("c.Name = ?")
+            args.append(category)
     
-    if date_to:
-        where_conditions.append(f"DATE(t.TransactionDate) <= '{date_to}'")
+    # Polootvorený interval nad holým TxEpoch - použije index, porovnáva celé čísla
+    # (ValueError pri neplatnom dátume)
+    date_conditions, date_args = epoch_range("t.TxEpoch", date_from, date_to)
+    where_conditions.extend(date_conditions)
+    args.extend(date_args)
     
     if trans_type == 'income':
-        where_conditions.append(f"t.Amount > 0")
+        where_conditions.append(f"t.AmountCents > 0")
     elif trans_type == 'expense':
-        where_conditions.append(f"t.Amount < 0")
+        where_conditions.append(f"t.AmountCents < 0")
+    
+    return where_conditions, args
+
+
+@app.route('/api/transactions/list', methods=['GET'])
+def transactions_list():
+    """
+    Zoznam všetkých transakcií s filtráciou - keyset stránkovanie
+
+    Ďalšia stránka: `cursor` = `next_cursor` z predchádzajúcej odpovede
+    (latencia nezávisí od hĺbky stránky). `with_total=1` pridá približný
+    počet transakcií pre filter (z query cache, nie pri každej stránke).
+    `offset` zostáva len pre staršie klienty.
+    """
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    cursor = request.args.get('cursor', '')
+    offset = request.args.get('offset', 0, type=int) if not cursor else 0
+    with_total = request.args.get('with_total', '') in ('1', 'true')
+    
+    try:
+        where_conditions, args = transaction_filters(request.args)
+    except ValueError:
+        return jsonify({"error": "Neplatný dátum (očakávaný formát YYYY-MM-DD)"}), 400
+    
+    # Počet pre filter bez kurzora - TTL cache, stačí približný
+    total = None
+    if with_total:
+        count_where = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        count_result = cached_query(
+            f"""
+            SELECT COUNT(*) AS Total
+            FROM Transactions t
+            LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
+            {count_where};
+            """,
+            args,
+            ttl=TRANSACTION_COUNT_TTL
+        )
+        if count_result["success"] and count_result["data"]:
+            total = count_result["data"][0]["Total"]
+    
+    try:
+        cursor_conditions, cursor_args = keyset_after("t.TxEpoch", "t.TransactionID", cursor)
+    except ValueError:
+        return jsonify({"error": "Neplatný kurzor"}), 400
+    where_conditions.extend(cursor_conditions)
+    args.extend(cursor_args)
     
     where_clause = ""
     if where_conditions:
         where_clause = "WHERE " + " AND ".join(where_conditions)
     
+    # limit + 1 riadok navyše = vieme, či existuje ďalšia stránka
     sql = f"""
     SELECT 
         t.TransactionID,
         t.TransactionDate,
+        t.TxEpoch,
         t.Amount,
         t.Currency,
         t.MerchantName,
@@ -546,11 +549,14 @@ def transactions_list():
     LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
     LEFT JOIN Accounts a ON t.AccountID = a.AccountID
     {where_clause}
-    ORDER BY t.TransactionDate DESC
-    LIMIT {limit} OFFSET {offset};
+    ORDER BY t.TxEpoch DESC, t.TransactionID DESC
+    LIMIT ? OFFSET ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, args + [limit + 1, offset])
+    transactions = list(result["data"]) if result["success"] else []
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
     
     # Debug: log first transaction if any
     if result["success"] and result["data"]:
@@ -558,19 +564,70 @@ def transactions_list():
         if len(result["data"]) > 0:
             first = result["data"][0]
             print(f"   First transaction keys: {list(first.keys())[:5]}")
-            print(f"   TransactionID: {first.get('TransactionID')} / {first.get('transactionid')}")
-    
-    return jsonify({
-        "transactions": result["data"] if result["success"] else [],
-        "limit": int(limit),
-        "offset": int(offset)
-    })
+            print(f"   TransactionID: {first.get('TransactionID')}")
+    
+    response = {
+        "transactions": transactions,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(transactions[-1]) if has_more else None
+    }
+    if with_total:
+        response["total"] = total
+        response["total_approximate"] = TRANSACTION_COUNT_TTL > 0
+    return jsonify(response)
+
+
+@app.route('/api/transactions/export', methods=['GET'])
+def transactions_export():
+    """
+    Export všetkých transakcií pre filter - streamovaný NDJSON, CSV alebo Parquet
+
+    Rovnaké filtre ako /api/transactions/list. Riadky sa čítajú a odosielajú
+    po dávkach (keyset), pamäť nezávisí od veľkosti histórie. `include_raw=1`
+    pridá stĺpec RawEmail s pôvodným B-mailom (predvolene vynechaný).
+    """
+    fmt = request.args.get('format', 'ndjson').lower()
+    include_raw = request.args.get('include_raw', '') in ('1', 'true')
+    if fmt not in export.FORMATS:
+        return jsonify({"error": f"Neznámy formát (podporované: {', '.join(export.FORMATS)})"}), 400
+    if not export.format_available(fmt):
+        return jsonify({"error": "Export do Parquet vyžaduje balík pyarrow"}), 501
+
+    try:
+        where_conditions, args = transaction_filters(request.args)
+    except ValueError:
+        return jsonify({"error": "Neplatný dátum (očakávaný formát YYYY-MM-DD)"}), 400
+
+    mimetype, extension, _ = export.FORMATS[fmt]
+    filename = f"transakcie-{datetime.now().strftime('%Y%m%d')}.{extension}"
+    stream = export.export(fmt, where_conditions, args, include_raw=include_raw)
+    print(f"📤 Export {fmt} ({'s B-mailmi' if include_raw else 'bez B-mailov'})")
+    return Response(
+        stream_with_context(stream),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "finance-management"})
+    response = {"status": "healthy", "service": "finance-management"}
+    replica = turso_replica.get_replica()
+    if replica is not None:
+        response["replica"] = replica.stats()
+    cache = query_cache.get_cache()
+    if cache is not None:
+        response["query_cache"] = cache.stats()
+    session = imap_session.get_session(create=False)
+    if session is not None:
+        response["imap"] = session.health()
+    return jsonify(response)
 
 
 # ==============================================================================
@@ -636,23 +693,27 @@ def gpt_get_transactions_summary():
     if not verify_gpt_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    days = request.args.get('days', '30')
-    account_id = request.args.get('account_id', '')
+    days = request.args.get('days', 30, type=int)
+    account_id = request.args.get('account_id', type=int)
     
-    account_filter = f"AND AccountID = {account_id}" if account_id else ""
+    args = [f"-{days} days"]
+    account_filter = ""
+    if account_id:
+        account_filter = "AND AccountID = ?"
+        args.append(account_id)
     
     sql = f"""
     SELECT 
         COUNT(*) as totalcount,
-        SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END) as totalexpenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as totalincome,
-        AVG(CASE WHEN Amount < 0 THEN Amount ELSE NULL END) as avgexpense
+        SUM(CASE WHEN AmountCents < 0 THEN AmountCents ELSE 0 END) / 100.0 as totalexpenses,
+        SUM(CASE WHEN AmountCents > 0 THEN AmountCents ELSE 0 END) / 100.0 as totalincome,
+        AVG(CASE WHEN AmountCents < 0 THEN AmountCents ELSE NULL END) / 100.0 as avgexpense
     FROM Transactions
-    WHERE TransactionDate >= datetime('now', '-{days} days')
+    WHERE TxEpoch >= {EPOCH_SINCE}
     {account_filter};
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, args)
     
     if result["success"] and result["data"]:
         return jsonify({
@@ -670,9 +731,9 @@ def gpt_get_recent_transactions():
     if not verify_gpt_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    limit = request.args.get('limit', '10')
+    limit = request.args.get('limit', 10, type=int)
     
-    sql = f"""
+    sql = """
     SELECT 
         t.TransactionDate,
         t.Amount,
@@ -684,11 +745,11 @@ def gpt_get_recent_transactions():
     FROM Transactions t
     LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
     LEFT JOIN Accounts a ON t.AccountID = a.AccountID
-    ORDER BY t.TransactionDate DESC
-    LIMIT {limit};
+    ORDER BY t.TxEpoch DESC, t.TransactionID DESC
+    LIMIT ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [limit])
     
     if result["success"]:
         return jsonify({
@@ -732,24 +793,24 @@ def gpt_get_transactions_by_category():
     if not verify_gpt_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    days = request.args.get('days', '30')
+    days = request.args.get('days', 30, type=int)
     
     sql = f"""
     SELECT 
         c.Name as categoryname,
         c.Icon as categoryicon,
-        COUNT(t.TransactionID) as transactioncount,
-        SUM(t.Amount) as totalamount,
-        AVG(t.Amount) as avgamount
-    FROM Transactions t
-    LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-    WHERE t.TransactionDate >= datetime('now', '-{days} days')
-        AND t.Amount < 0
+        SUM(r.ExpenseCount) as transactioncount,
+        -SUM(r.ExpenseCents) / 100.0 as totalamount,
+        -SUM(r.ExpenseCents) / 100.0 / SUM(r.ExpenseCount) as avgamount
+    FROM TransactionRollups r
+    LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+    WHERE r.Day >= {DAY_SINCE}
+        AND r.ExpenseCount > 0
     GROUP BY c.CategoryID, c.Name, c.Icon
     ORDER BY totalamount ASC;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [f"-{days} days"])
     
     if result["success"]:
         return jsonify({
@@ -767,25 +828,25 @@ def gpt_get_top_merchants():
     if not verify_gpt_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    limit = request.args.get('limit', '10')
-    days = request.args.get('days', '30')
+    limit = request.args.get('limit', 10, type=int)
+    days = request.args.get('days', 30, type=int)
     
     sql = f"""
     SELECT 
         MerchantName as merchantname,
         COUNT(*) as transactioncount,
-        SUM(Amount) as totalspent,
-        AVG(Amount) as avgspent
+        SUM(AmountCents) / 100.0 as totalspent,
+        AVG(AmountCents) / 100.0 as avgspent
     FROM Transactions
-    WHERE TransactionDate >= datetime('now', '-{days} days')
-        AND Amount < 0
+    WHERE TxEpoch >= {EPOCH_SINCE}
+        AND AmountCents < 0
         AND MerchantName IS NOT NULL
     GROUP BY MerchantName
     ORDER BY totalspent ASC
-    LIMIT {limit};
+    LIMIT ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [f"-{days} days", limit])
     
     if result["success"]:
         return jsonify({
@@ -803,21 +864,21 @@ def gpt_get_monthly_stats():
     if not verify_gpt_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    months = request.args.get('months', '6')
+    months = request.args.get('months', 6, type=int)
     
     sql = f"""
     SELECT 
-        strftime('%Y-%m', TransactionDate) as month,
-        COUNT(*) as transactioncount,
-        SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END) as expenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as income
-    FROM Transactions
-    WHERE TransactionDate >= datetime('now', '-{months} months')
-    GROUP BY month
+        {month_label('Day')} as month,
+        SUM(TxCount) as transactioncount,
+        -SUM(ExpenseCents) / 100.0 as expenses,
+        SUM(IncomeCents) / 100.0 as income
+    FROM TransactionRollups
+    WHERE Day >= {DAY_SINCE}
+    GROUP BY Day / 100
     ORDER BY month DESC;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, [f"-{months} months"])
     
     if result["success"]:
         return jsonify({
@@ -836,27 +897,47 @@ def gpt_search_transactions():
         return jsonify({"error": "Unauthorized"}), 401
     
     merchant = request.args.get('merchant', '')
-    min_amount = request.args.get('min_amount', '')
-    max_amount = request.args.get('max_amount', '')
-    account_id = request.args.get('account_id', '')
+    min_amount = request.args.get('min_amount', type=float)
+    max_amount = request.args.get('max_amount', type=float)
+    account_id = request.args.get('account_id', type=int)
     category = request.args.get('category', '')
-    limit = request.args.get('limit', '50')  # Pridaný limit parameter
-    
-    conditions = []
-    if merchant:
-        conditions.append(f"t.MerchantName LIKE '%{merchant}%'")
-    if min_amount:
-        conditions.append(f"t.Amount >= {min_amount}")
-    if max_amount:
-        conditions.append(f"t.Amount <= {max_amount}")
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))  # Pridaný limit parameter
+    cursor = request.args.get('cursor', '')  # next_cursor z predchádzajúcej odpovede
+    # relevance = poradie podľa zhody textu (bm25), bez stránkovania kurzorom
+    by_relevance = request.args.get('sort', 'date') == 'relevance' and match_query(merchant) is not None
+    
+    join = ""
+    order_by = "t.TxEpoch DESC, t.TransactionID DESC"
+    if by_relevance:
+        join = RANK_JOIN
+        conditions, args = [RANK_CONDITION], [match_query(merchant)]
+        order_by = "f.rank, t.TxEpoch DESC"
+    else:
+        try:
+            conditions, args = keyset_after("t.TxEpoch", "t.TransactionID", cursor)
+        except ValueError:
+            return jsonify({"error": "Neplatný kurzor"}), 400
+        if merchant:
+            # Fulltext cez obchodníka, popis, info pre príjemcu a účel (aj bez diakritiky)
+            search_conditions, search_args = search_filter("t.TransactionID", merchant)
+            conditions.extend(search_conditions)
+            args.extend(search_args)
+    if min_amount is not None:
+        conditions.append("t.AmountCents >= ?")
+        args.append(amount_cents(min_amount))
+    if max_amount is not None:
+        conditions.append("t.AmountCents <= ?")
+        args.append(amount_cents(max_amount))
     if account_id:
-        conditions.append(f"t.AccountID = {account_id}")
+        conditions.append("t.AccountID = ?")
+        args.append(account_id)
     if category:
         # Handle "Nezaradené" (NULL CategoryID) specifically
         if 'nezaradene' in category.lower() or 'nezaradené' in category.lower():
             conditions.append("(t.CategoryID IS NULL OR COALESCE(c.Name, 'Nezaradené') = 'Nezaradené')")
         else:
-            conditions.append(f"c.Name LIKE '%{category}%'")
+            conditions.append("c.Name LIKE ?")
+            args.append(f"%{category}%")
     
     where_clause = " AND ".join(conditions) if conditions else "1=1"
     
@@ -864,6 +945,7 @@ def gpt_search_transactions():
     SELECT 
         t.TransactionID,
         t.TransactionDate,
+        t.TxEpoch,
         t.Amount,
         t.Currency,
         t.MerchantName,
@@ -874,39 +956,33 @@ def gpt_search_transactions():
         COALESCE(c.Icon, '📦') as CategoryIcon,
         COALESCE(a.AccountName, 'Nepriradený') as AccountName
     FROM Transactions t
+    {join}
     LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
     LEFT JOIN Accounts a ON t.AccountID = a.AccountID
     WHERE {where_clause}
-    ORDER BY t.TransactionDate DESC
-    LIMIT {limit};
+    ORDER BY {order_by}
+    LIMIT ?;
     """
     
-    result = turso_query(sql)
+    result = turso_query(sql, args + [limit + 1])
     
     if result["success"]:
+        rows = list(result["data"])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         # Debug: log search results
-        print(f"🔍 GPT Search: Found {len(result['data'])} transactions")
+        print(f"🔍 GPT Search: Found {len(rows)} transactions")
         
         # Format results to make TransactionID more explicit
         formatted_results = []
-        for i, tx in enumerate(result["data"]):
-            tx_id = tx.get('TransactionID') or tx.get('transactionid')
-            merchant = tx.get('MerchantName') or tx.get('merchantname')
+        for i, tx in enumerate(rows):
+            tx_id = tx['TransactionID']
+            merchant = tx['MerchantName']
             
             # Create clean object with explicit ID
             formatted_tx = {
                 "transaction_id": tx_id,  # Use snake_case to match bulk-categorize input!
-                "TransactionID": tx_id,   # Also keep original
-                "TransactionDate": tx.get('TransactionDate') or tx.get('transactiondate'),
-                "Amount": tx.get('Amount') or tx.get('amount'),
-                "Currency": tx.get('Currency') or tx.get('currency'),
-                "MerchantName": merchant,
-                "Description": tx.get('Description') or tx.get('description'),
-                "RecipientInfo": tx.get('RecipientInfo') or tx.get('recipientinfo'),
-                "CounterpartyPurpose": tx.get('CounterpartyPurpose') or tx.get('counterpartypurpose'),
-                "CategoryName": tx.get('CategoryName') or tx.get('categoryname'),
-                "CategoryIcon": tx.get('CategoryIcon') or tx.get('categoryicon'),
-                "AccountName": tx.get('AccountName') or tx.get('accountname')
+                **tx
             }
             formatted_results.append(formatted_tx)
             
@@ -915,7 +991,9 @@ def gpt_search_transactions():
         
         return jsonify({
             "results": formatted_results,
-            "count": len(formatted_results)
+            "count": len(formatted_results),
+            "has_more": has_more,
+            "next_cursor": encode_cursor(rows[-1]) if has_more and not by_relevance else None
         })
     else:
         return jsonify({"error": result.get("error", "Query failed")}), 500
@@ -928,10 +1006,11 @@ def gpt_get_account_summary(account_id):
     if not verify_gpt_api_key():
         return jsonify({"error": "Unauthorized"}), 401
     
-    days = request.args.get('days', '30')
+    days = request.args.get('days', 30, type=int)
+    since = f"-{days} days"
     
     # Info o účte
-    account_sql = f"""
+    account_sql = """
     SELECT 
         AccountID,
         IBAN,
@@ -940,52 +1019,67 @@ def gpt_get_account_summary(account_id):
         AccountType,
         Currency
     FROM Accounts
-    WHERE AccountID = {account_id};
+    WHERE AccountID = ?;
     """
     
-    account_result = turso_query(account_sql)
-    
-    if not account_result["success"] or not account_result["data"]:
-        return jsonify({"error": "Account not found"}), 404
-    
-    # Štatistiky transakcií
+    # Štatistiky transakcií (rollupy, po dňoch)
     stats_sql = f"""
     SELECT 
-        COUNT(*) as totalcount,
-        SUM(CASE WHEN Amount < 0 THEN Amount ELSE 0 END) as totalexpenses,
-        SUM(CASE WHEN Amount > 0 THEN Amount ELSE 0 END) as totalincome,
-        AVG(CASE WHEN Amount < 0 THEN Amount ELSE NULL END) as avgexpense,
+        COALESCE(SUM(TxCount), 0) as totalcount,
+        -SUM(ExpenseCents) / 100.0 as totalexpenses,
+        SUM(IncomeCents) / 100.0 as totalincome,
+        -SUM(ExpenseCents) / 100.0 / NULLIF(SUM(ExpenseCount), 0) as avgexpense
+    FROM TransactionRollups
+    WHERE AccountID = ?
+        AND Day >= {DAY_SINCE};
+    """
+    
+    # Presný čas prvej/poslednej transakcie - rollupy majú len deň
+    range_sql = f"""
+    SELECT 
         MIN(TransactionDate) as firsttransaction,
         MAX(TransactionDate) as lasttransaction
     FROM Transactions
-    WHERE AccountID = {account_id}
-        AND TransactionDate >= datetime('now', '-{days} days');
+    WHERE AccountID = ?
+        AND TxEpoch >= {EPOCH_SINCE};
     """
     
-    stats_result = turso_query(stats_sql)
-    
     # Top kategórie
     categories_sql = f"""
     SELECT 
         c.Name as categoryname,
         c.Icon as categoryicon,
-        COUNT(t.TransactionID) as transactioncount,
-        SUM(t.Amount) as totalamount
-    FROM Transactions t
-    LEFT JOIN Categories c ON t.CategoryID = c.CategoryID
-    WHERE t.AccountID = {account_id}
-        AND t.TransactionDate >= datetime('now', '-{days} days')
-        AND t.Amount < 0
+        SUM(r.ExpenseCount) as transactioncount,
+        -SUM(r.ExpenseCents) / 100.0 as totalamount
+    FROM TransactionRollups r
+    LEFT JOIN Categories c ON r.CategoryID = c.CategoryID
+    WHERE r.AccountID = ?
+        AND r.Day >= {DAY_SINCE}
+        AND r.ExpenseCount > 0
     GROUP BY c.CategoryID
     ORDER BY totalamount ASC
     LIMIT 5;
     """
     
-    categories_result = turso_query(categories_sql)
+    account_result, stats_result, range_result, categories_result = turso_query_concurrent([
+        (account_sql, [account_id]),
+        (stats_sql, [account_id, since]),
+        (range_sql, [account_id, since]),
+        (categories_sql, [account_id, since])
+    ])
+    
+    if not account_result["success"] or not account_result["data"]:
+        return jsonify({"error": "Account not found"}), 404
+    
+    statistics = {}
+    if stats_result["success"] and stats_result["data"]:
+        statistics.update(stats_result["data"][0].to_dict())
+    if range_result["success"] and range_result["data"]:
+        statistics.update(range_result["data"][0].to_dict())
     
     return jsonify({
         "account": account_result["data"][0] if account_result["data"] else {},
-        "statistics": stats_result["data"][0] if stats_result["success"] and stats_result["data"] else {},
+        "statistics": statistics,
         "top_categories": categories_result["data"] if categories_result["success"] else [],
         "period_days": int(days)
     })
@@ -1028,22 +1122,22 @@ def gpt_bulk_categorize():
         # Mapuj názvy kategórií na ID
         category_map = {}
         for row in categories_result['data']:
-            # turso_query vracia 'data' array s row_dict objektami
-            cat_id = row.get('CategoryID') or row.get('categoryid')
-            cat_name = (row.get('Name') or row.get('name', '')).lower()
+            # turso_query vracia 'data' ako ResultSet s Row pohľadmi
+            cat_id = row['CategoryID']
+            cat_name = (row['Name'] or '').lower()
             if cat_id and cat_name:
                 category_map[cat_name] = int(cat_id)
         
         updated_count = 0
         learned_rules = 0
         errors = []
+        pending = []
         
         for update in updates:
             transaction_id = update.get('transaction_id')
             category_name = update.get('category_name', '').lower().strip()
             
             # Odstráň emoji z názvu kategórie
-            import re
             category_name_clean = re.sub(r'[^\w\s\-áäčďéíĺľňóôŕšťúýžÁÄČĎÉÍĹĽŇÓÔŔŠŤÚÝŽ]', '', category_name).strip()
             
             if not transaction_id or not category_name_clean:
@@ -1061,18 +1155,24 @@ def gpt_bulk_categorize():
                 errors.append(f"Category not found: {category_name}")
                 continue
             
-            # Updatuj transakciu
-            update_query = f"""
+            pending.append((transaction_id, category_id))
+        
+        # Všetky UPDATE príkazy v jednej pipeline
+        update_sql = """
             UPDATE Transactions 
-            SET CategoryID = {category_id}, 
+            SET CategoryID = ?, 
                 CategorySource = 'GPT',
                 UpdatedAt = datetime('now')
-            WHERE TransactionID = {transaction_id};
+            WHERE TransactionID = ?;
             """
-            
-            result = turso_query(update_query)
-            
-            if result and result.get('success'):
+        update_queries = [
+            (update_sql, [category_id, transaction_id])
+            for transaction_id, category_id in pending
+        ]
+        update_results = turso_query_many(update_queries)
+        
+        for (transaction_id, category_id), result in zip(pending, update_results):
+            if result.get('success'):
                 affected = result.get('affected_rows', 0)
                 if affected > 0:
                     updated_count += 1
@@ -1140,138 +1240,120 @@ def sync_emails():
         }), 401
     
     try:
-        import imaplib
-        import email
-        from email.header import decode_header
         import re
         
-        EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
-        EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-        EMAIL_IMAP_SERVER = os.getenv("EMAIL_IMAP_SERVER", "imap.gmail.com")
-        
-        if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+        session = imap_session.get_session()
+        if session is None:
             return jsonify({
                 'error': 'Configuration error',
                 'message': 'EMAIL_ADDRESS or EMAIL_PASSWORD not set'
             }), 500
         
-        # Pripojenie na Gmail
-        mail = imaplib.IMAP4_SSL(EMAIL_IMAP_SERVER)
-        mail.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        mail.select("INBOX")
+        # Zdieľané prihlásené spojenie (imap_session) - bez nového LOGIN pri každom volaní,
+        # medzi volaniami ho udržiava NOOP keepalive
+        session.start_keepalive()
+        with session.connection() as mail:
+            mail.select("INBOX")
         
-        # Hľadanie B-mailov
-        status, messages = mail.search(None, '(FROM "b-mail@tatrabanka.sk")')
+            # Hľadanie B-mailov (UID - dávkový fetch ich potrebuje)
+            status, messages = mail.uid('SEARCH', None, '(FROM "b-mail@tatrabanka.sk")')
         
-        if status != "OK":
-            mail.logout()
-            return jsonify({
-                'error': 'Search failed',
-                'message': f'Gmail search status: {status}'
-            }), 500
+            if status != "OK":
+                return jsonify({
+                    'error': 'Search failed',
+                    'message': f'Gmail search status: {status}'
+                }), 500
         
-        email_ids = messages[0].split()
-        processed = 0
-        errors = 0
+            email_ids = messages[0].split()
+            processed = 0
+            duplicates = 0
+            errors = 0
+            index = fingerprints.get_index()
         
-        # Spracovanie emailov
-        for email_id in email_ids[-10:]:  # Posledných 10 B-mailov
-            try:
-                status, msg_data = mail.fetch(email_id, "(RFC822)")
-                if status != "OK":
-                    continue
+            # Posledných 10 B-mailov - hlavičky a text/plain časť dávkovo (imap_fetch)
+            uids = [int(uid) for uid in email_ids[-10:]]
+            emails = imap_fetch.fetch_batch(mail, uids)
+            for uid in uids:
+                try:
+                    email_data = emails.get(uid)
+                    if not email_data:
+                        continue  # správa medzičasom zmazaná
+                    body = email_data["body"]
                 
-                for response_part in msg_data:
-                    if isinstance(response_part, tuple):
-                        msg = email.message_from_bytes(response_part[1])
-                        
-                        # Získanie body
-                        body = ""
-                        if msg.is_multipart():
-                            for part in msg.walk():
-                                if part.get_content_type() == "text/plain":
-                                    try:
-                                        body = part.get_payload(decode=True).decode()
-                                    except:
-                                        pass
-                        else:
-                            try:
-                                body = msg.get_payload(decode=True).decode()
-                            except:
-                                pass
-                        
-                        # Parsovanie transakcie
-                        main_match = re.search(
-                            r'(\d{1,2}\.\d{1,2}\.\d{4})\s+(\d{1,2}:\d{2})\s+bol zostatok.*?'
-                            r'(SK\d+)\s+(znizeny|zvyseny)\s+o\s+([\d,]+)\s*EUR',
-                            body
-                        )
-                        
-                        if main_match:
-                            date_str = f"{main_match.group(1)} {main_match.group(2)}"
-                            trans_date = datetime.strptime(date_str, "%d.%m.%Y %H:%M")
-                            iban = main_match.group(3)
-                            amount_str = main_match.group(5).replace(',', '.')
-                            amount = float(amount_str)
-                            if main_match.group(4) == 'znizeny':
-                                amount = -amount
-                            
-                            # Popis
-                            desc_match = re.search(r'Popis transakcie:\s*(.+?)(?:\n|$)', body)
-                            description = desc_match.group(1).strip() if desc_match else ''
-                            
-                            # Merchant
-                            merchant = 'Unknown'
-                            if 'Platba kartou' in description:
-                                merchant_match = re.search(r',\s*([A-Z0-9\.\-]+)', description)
-                                if merchant_match:
-                                    merchant_raw = merchant_match.group(1).strip('.')
-                                    merchant = re.sub(r'\.?[A-Z]{3}\d+$', '', merchant_raw) or merchant_raw
-                            
-                            # Nájdenie AccountID
-                            account_query = f"SELECT AccountID FROM Accounts WHERE IBAN = '{iban}' AND IsActive = 1 LIMIT 1;"
-                            account_result = turso_query(account_query)
-                            account_id = None
-                            if account_result and 'rows' in account_result and len(account_result['rows']) > 0:
-                                account_id = int(account_result['rows'][0][0]['value'])
-                            
-                            account_id_sql = str(account_id) if account_id else 'NULL'
-                            
-                            # Insert transakcie
-                            insert_query = f"""
-                            INSERT INTO Transactions (
-                                TransactionDate, Amount, Currency, MerchantName, Description,
-                                IBAN, TransactionType, PaymentMethod, RawEmailData,
-                                CategorySource, AccountID, CreatedAt
-                            ) VALUES (
-                                '{trans_date.isoformat()}', {amount}, 'EUR',
-                                '{merchant.replace("'", "''")}', '{description.replace("'", "''")}',
-                                '{iban}', '{'Debit' if amount < 0 else 'Credit'}', 'Card',
-                                '{body.replace("'", "''")}', 'Email', {account_id_sql},
-                                '{datetime.now().isoformat()}'
-                            );
-                            """
-                            
-                            result = turso_query(insert_query)
-                            if result:
+                    # Parsovanie transakcie
+                    transaction = bmail_parser.parse_transaction(body)
+                
+                    if transaction:
+                        trans_date = transaction['date']
+                        iban = transaction['iban']
+                        amount = transaction['amount']
+                        description = transaction.get('description', '')
+                    
+                        # Už uložená (worker, webhook alebo predošlé volanie)
+                        fingerprint = fingerprints.fingerprint(iban, trans_date, amount, description)
+                        if index.is_known(fingerprint):
+                            duplicates += 1
+                            continue
+                    
+                        merchant = transaction.get('merchant', 'Unknown')
+                    
+                        # Nájdenie AccountID
+                        account_query = "SELECT AccountID FROM Accounts WHERE IBAN = ? AND IsActive = 1 LIMIT 1;"
+                        account_result = turso_query(account_query, [iban])
+                        account_id = None
+                        if account_result["success"] and account_result["data"]:
+                            account_id = account_result["data"][0]["AccountID"]
+                    
+                        # Insert transakcie + B-mail do RawEmails (atomicky)
+                        insert_query = """
+                        INSERT INTO Transactions (
+                            TransactionDate, Amount, Currency, MerchantName, Description,
+                            IBAN, TransactionType, PaymentMethod,
+                            CategorySource, AccountID, CreatedAt,
+                            AmountCents, TxEpoch, TxDay, Fingerprint
+                        ) VALUES (?, ?, 'EUR', ?, ?, ?, ?, ?, 'Email', ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (Fingerprint) DO NOTHING;
+                        """
+                    
+                        statements = [(insert_query, [
+                            trans_date.isoformat(), amount, merchant, description,
+                            iban, transaction['transaction_type'], transaction.get('payment_method', 'Other'),
+                            account_id, datetime.now().isoformat(),
+                            *canonical_values(amount, trans_date), fingerprint
+                        ])]
+                        raw_email = raw_emails.insert_after_transaction(body)
+                        if raw_email:
+                            statements.append(raw_email)
+                        result = turso_transaction(statements)[0]
+                        if result["success"]:
+                            index.add(fingerprint)
+                            if result.get("affected_rows"):
                                 processed += 1
                             else:
-                                errors += 1
-            
-            except Exception as e:
-                print(f"Error processing email: {e}")
-                errors += 1
-        
-        mail.logout()
+                                duplicates += 1
+                        else:
+                            errors += 1
+    
+                except imap_session.CONNECTION_ERRORS:
+                    raise  # spojenie zahodí session.connection()
+                except Exception as e:
+                    print(f"Error processing email: {e}")
+                    errors += 1
         
         return jsonify({
             'success': True,
             'message': 'Email sync completed',
             'checked': len(email_ids),
             'processed': processed,
+            'duplicates': duplicates,
             'errors': errors
         })
     
+    except ConnectionError as e:
+        return jsonify({
+            'error': 'IMAP unavailable',
+            'message': str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             'error': 'Sync failed',
@@ -1337,45 +1419,32 @@ def receive_email():
         print(f"   From: {data.get('envelope', {}).get('from', 'unknown')}")
         print(f"   Subject: {data.get('headers', {}).get('Subject', 'no subject')}")
         
-        # Parsovanie B-mail transakcie
-        main_match = re.search(
-            r'(\d{1,2}\.\d{1,2}\.\d{4})\s+(\d{1,2}:\d{2})\s+bol zostatok.*?'
-            r'(SK\d+)\s+(znizeny|zvyseny)\s+o\s+([\d\s,]+)\s*EUR',
-            email_body
-        )
+        # Parsovanie B-mail transakcie (všetky polia jedným prechodom - bmail_parser)
+        transaction = bmail_parser.parse_transaction(email_body)
         
-        if not main_match:
+        if not transaction:
             print("   ⚠️  Not a B-mail transaction (ignoring)")
             return jsonify({'status': 'ignored', 'message': 'Not a B-mail transaction'}), 200
         
-        # Extrahovanie údajov
-        date_str = f"{main_match.group(1)} {main_match.group(2)}"
-        trans_date = datetime.strptime(date_str, "%d.%m.%Y %H:%M")
-        iban = main_match.group(3)
-        amount_str = main_match.group(5).replace(',', '.').replace(' ', '')  # Odstráň medzery aj čiarky
-        amount = float(amount_str)
-        if main_match.group(4) == 'znizeny':
-            amount = -amount
-        
-        # Popis transakcie
-        desc_match = re.search(r'Popis transakcie:\s*(.+?)(?:\n|$)', email_body)
-        description = desc_match.group(1).strip() if desc_match else ''
-        
-        # Extrahovanie obchodníka z B-mailu (Tatra banka používa rôzne názvy polí)
-        counterparty_name = None
+        trans_date = transaction['date']
+        iban = transaction['iban']
+        amount = transaction['amount']
+        description = transaction.get('description', '')
         
-        # Variant 1: "Ucet protistrany:" (účet protistrany - názov obchodníka/prijemcu)
-        ucet_match = re.search(r'Ucet protistrany:\s*(.+?)(?:\n|$)', email_body, re.IGNORECASE)
-        if ucet_match:
-            counterparty_name = ucet_match.group(1).strip()
+        # Ten istý B-mail už prišiel (IMAP worker, sync alebo opakovaný webhook) -
+        # bez kategorizácie a zápisu
+        fingerprint = fingerprints.fingerprint(iban, trans_date, amount, description)
+        fingerprint_index = fingerprints.get_index()
+        if fingerprint_index.is_known(fingerprint):
+            print("   ⏭️  Duplicate B-mail (already saved)")
+            return jsonify({'status': 'duplicate', 'message': 'Transaction already saved'}), 200
         
-        # Variant 2: "Ucel protistrany:" (účel - dôvod platby)
-        ucel_match = re.search(r'Ucel protistrany:\s*(.+?)(?:\n|$)', email_body, re.IGNORECASE)
-        counterparty_purpose = ucel_match.group(1).strip() if ucel_match else ''
-        
-        # Variant 3: "Informacia pre prijemcu:" (dodatočné info)
-        info_match = re.search(r'Informacia pre prijemcu:\s*(.+?)(?:\n|$)', email_body, re.IGNORECASE)
-        recipient_info = info_match.group(1).strip() if info_match else ''
+        # Obchodník z B-mailu (Tatra banka používa rôzne názvy polí):
+        # "Ucet protistrany:" (názov obchodníka/prijemcu), "Ucel protistrany:"
+        # (dôvod platby), "Informacia pre prijemcu:" (dodatočné info)
+        counterparty_name = transaction['counterparty_name']
+        counterparty_purpose = transaction['counterparty_purpose']
+        recipient_info = transaction['recipient_info']
         
         # Obchodník - použiť presné údaje z B-mailu (priorita: názov účtu > účel > description)
         if counterparty_name:
@@ -1385,13 +1454,7 @@ def receive_email():
         else:
             merchant = description or 'Unknown'
         
-        # Payment method
-        if 'Platba kartou' in description:
-            payment_method = 'Card'
-        elif 'Prevod' in description or 'Prikaz' in description:
-            payment_method = 'Transfer'
-        else:
-            payment_method = 'Other'
+        payment_method = transaction.get('payment_method', 'Other')
         
         print(f"   💰 Amount: {amount} EUR")
         print(f"   🏪 Merchant: {merchant}")
@@ -1402,74 +1465,79 @@ def receive_email():
         if recipient_info:
             print(f"   📝 Recipient Info: {recipient_info}")
         
-        # Nájdenie AccountID
-        account_query = f"SELECT AccountID FROM Accounts WHERE IBAN = '{iban}' AND IsActive = 1 LIMIT 1;"
-        account_result = turso_query(account_query)
-        account_id = None
-        
-        if account_result and 'rows' in account_result and len(account_result['rows']) > 0:
-            account_id = int(account_result['rows'][0][0]['value'])
-            print(f"   🏦 Account: {account_id}")
-        else:
-            print(f"   ⚠️  Account with IBAN {iban} not found in Settings")
-        
-        account_id_sql = str(account_id) if account_id else 'NULL'
+        # 🧠 Smart Categorization with Learning + AI - pred INSERTom, aby sa
+        # kategória zapísala priamo; zápisy pravidiel idú v tom istom pipeline
+        category_id = None
+        rule_writes = []
+        try:
+            categorizer = get_smart_categorizer()
+            category_id = categorizer.categorize(
+                merchant=merchant, 
+                description=description, 
+                amount=amount,
+                counterparty_purpose=counterparty_purpose,
+                recipient_info=recipient_info,
+                deferred_writes=rule_writes
+            )
+        except Exception as e:
+            print(f"   ⚠️  Auto-categorization failed: {e}")
         
-        # Uloženie do databázy
-        insert_query = f"""
+        # Uloženie do databázy - jeden round trip, jedna transakcia: INSERT ...
+        # RETURNING (AccountID cez subquery podľa IBAN), komprimovaný B-mail do
+        # RawEmails a odložené zápisy pravidiel kategorizátora. Bez ON CONFLICT -
+        # duplicitný odtlačok zlyhá na UNIQUE indexe a ROLLBACK zahodí aj zápisy
+        # pravidiel (UsageCount sa nezaráta dvakrát)
+        insert_query = """
         INSERT INTO Transactions (
             TransactionDate, Amount, Currency, MerchantName, Description,
-            IBAN, TransactionType, PaymentMethod, RawEmailData,
-            CategorySource, AccountID, RecipientInfo, CounterpartyPurpose, CreatedAt
+            IBAN, TransactionType, PaymentMethod,
+            CategoryID, CategorySource, AccountID, RecipientInfo, CounterpartyPurpose, CreatedAt,
+            AmountCents, TxEpoch, TxDay, Fingerprint
         ) VALUES (
-            '{trans_date.isoformat()}', {amount}, 'EUR',
-            '{merchant.replace("'", "''")}', '{description.replace("'", "''")}',
-            '{iban}', '{'Debit' if amount < 0 else 'Credit'}', '{payment_method}',
-            '{email_body.replace("'", "''")}', 'Email', {account_id_sql},
-            '{recipient_info.replace("'", "''")}', '{counterparty_purpose.replace("'", "''")}',
-            '{datetime.now().isoformat()}'
-        );
+            ?, ?, 'EUR', ?, ?, ?, ?, ?, ?, ?,
+            (SELECT AccountID FROM Accounts WHERE IBAN = ? AND IsActive = 1 LIMIT 1),
+            ?, ?, ?, ?, ?, ?, ?
+        )
+        RETURNING TransactionID, AccountID;
         """
         
-        result = turso_query(insert_query)
+        statements = [(insert_query, [
+            trans_date.isoformat(), amount, merchant, description,
+            iban, 'Debit' if amount < 0 else 'Credit', payment_method,
+            category_id, 'Auto' if category_id else 'Email', iban,
+            recipient_info, counterparty_purpose, datetime.now().isoformat(),
+            *canonical_values(amount, trans_date), fingerprint
+        ])]
+        raw_email = raw_emails.insert_after_transaction(email_body)
+        if raw_email:
+            statements.append(raw_email)
+        results = turso_transaction(statements + rule_writes)
+        result = results[0]
+        duplicate = (not result["success"]
+                     and 'UNIQUE constraint failed: Transactions.Fingerprint' in (result.get("error") or ''))
+        if result["success"] or duplicate:
+            fingerprint_index.add(fingerprint)
         
-        if result:
-            print(f"   ✅ Transaction saved to database")            # 🧠 Smart Categorization with Learning + AI
-            try:
-                # Získaj ID novo vytvorenej transakcie
-                last_id_query = "SELECT TransactionID FROM Transactions ORDER BY TransactionID DESC LIMIT 1;"
-                last_id_result = turso_query(last_id_query)
-                
-                if last_id_result and 'rows' in last_id_result and len(last_id_result['rows']) > 0:
-                    transaction_id = int(last_id_result['rows'][0][0]['value'])
-                    
-                    # Použij Smart Categorizer s extra kontextom
-                    categorizer = get_smart_categorizer()
-                    category_id = categorizer.categorize(
-                        merchant=merchant, 
-                        description=description, 
-                        amount=amount,
-                        counterparty_purpose=counterparty_purpose,
-                        recipient_info=recipient_info
-                    )
-                    
-                    # Ak našiel kategóriu, priradíme ju
-                    if category_id:
-                        update_query = f"""
-                        UPDATE Transactions 
-                        SET CategoryID = {category_id}, CategorySource = 'Auto'
-                        WHERE TransactionID = {transaction_id};
-                        """
-                        turso_query(update_query)
-                        print(f"   ✅ Smart categorized: CategoryID={category_id}")
-            except Exception as e:
-                print(f"   ⚠️  Auto-categorization failed: {e}")
-
+        if duplicate:
+            print("   ⏭️  Duplicate B-mail (saved concurrently)")
+            return jsonify({'status': 'duplicate', 'message': 'Transaction already saved'}), 200
+        
+        if result["success"] and result["data"]:
+            transaction_id = result["data"][0]["TransactionID"]
+            account_id = result["data"][0]["AccountID"]
+            print(f"   ✅ Transaction saved to database (ID={transaction_id})")
+            if account_id:
+                print(f"   🏦 Account: {account_id}")
+            else:
+                print(f"   ⚠️  Account with IBAN {iban} not found in Settings")
+            if category_id:
+                print(f"   ✅ Smart categorized: CategoryID={category_id}")
             
             return jsonify({
                 'status': 'success',
                 'message': 'Transaction processed',
                 'transaction': {
+                    'id': transaction_id,
                     'merchant': merchant,
                     'amount': amount,
                     'date': trans_date.isoformat()
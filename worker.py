@@ -1,24 +1,28 @@
 #!/usr/bin/env python3
 """
 Railway Background Worker - Automatické spracovanie B-mail notifikácií
-Beží na Railway 24/7 a kontroluje Gmail každých 60 sekúnd
+Beží na Railway 24/7 na jednom otvorenom IMAP spojení - nové B-maily
+čaká cez IMAP IDLE, bez podpory IDLE kontroluje Gmail najviac každých 60 sekúnd
 """
 
 import time
-import imaplib
-import email
-from email.header import decode_header
-import re
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import os
-import requests
-import json
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+from turso_client import turso_query, turso_transaction
+from query_filters import canonical_values
+from imap_session import ImapSession
+import imap_sync
+import raw_emails
+import fingerprints
+import migrate
+from bmail_parser import BMailParser
+
 # Configuration
 TURSO_DATABASE_URL = os.getenv("TURSO_DATABASE_URL")
 TURSO_AUTH_TOKEN = os.getenv("TURSO_AUTH_TOKEN")
@@ -26,215 +30,79 @@ EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 EMAIL_IMAP_SERVER = os.getenv("EMAIL_IMAP_SERVER", "imap.gmail.com")
 CHECK_INTERVAL = int(os.getenv("EMAIL_CHECK_INTERVAL", "60"))  # default 60s
+# idle = IMAP IDLE, ak ho server podporuje (inak adaptívny polling), poll = vždy polling
+EMAIL_IMAP_MODE = os.getenv("EMAIL_IMAP_MODE", "idle").strip().lower()
+# IDLE sa obnoví skôr, ako ho server ukončí (RFC 2177: najskôr po 29 min, NAT často skôr)
+EMAIL_IDLE_TIMEOUT = int(os.getenv("EMAIL_IDLE_TIMEOUT", "600"))
+EMAIL_POLL_MIN_INTERVAL = int(os.getenv("EMAIL_POLL_MIN_INTERVAL", "10"))
 
 
 class EmailReceiver:
-    """Gmail IMAP receiver pre Railway"""
+    """Gmail IMAP receiver pre Railway nad perzistentnou session (imap_session)"""
     
-    def __init__(self, email_address: str, password: str, imap_server: str):
+    def __init__(self, email_address: str, password: str, imap_server: str,
+                 session: Optional[ImapSession] = None):
         self.email_address = email_address
         self.password = password
         self.imap_server = imap_server
-        self.mail = None
+        self.session = session or ImapSession(email_address, password, imap_server)
+    
+    @property
+    def mail(self):
+        return self.session.mail
     
     def connect(self):
-        """Pripojenie k Gmail"""
-        try:
-            self.mail = imaplib.IMAP4_SSL(self.imap_server)
-            self.mail.login(self.email_address, self.password)
-            print(f"✅ Pripojený k {self.email_address}")
-            return True
-        except Exception as e:
-            print(f"❌ Chyba pri pripojení: {e}")
-            return False
+        """Pripojenie k Gmail (počas backoffu po chybe vráti False)"""
+        return self.session.connect()
     
     def disconnect(self):
         """Odpojenie od Gmail"""
-        if self.mail:
-            try:
-                self.mail.close()
-                self.mail.logout()
-            except:
-                pass
+        self.session.close()
     
-    def get_bmails(self):
-        """Získanie B-mail notifikácií"""
-        if not self.mail:
-            if not self.connect():
-                return []
+    def get_bmails(self, folder: str = "INBOX"):
+        """
+        Nové B-mail notifikácie od poslednej kontroly (generátor)
         
+        Sťahujú sa len správy s UID vyšším ako posledný spracovaný
+        (imap_sync). UID sa potvrdí, keď si cyklus vypýta ďalší email -
+        pri `break` sa email pri ďalšej kontrole spracuje znova.
+        """
+        mailbox = imap_sync.mailbox_key(self.email_address, folder)
         try:
-            self.mail.select("INBOX")
-            status, messages = self.mail.search(None, '(FROM "b-mail@tatrabanka.sk")')
-            
-            if status != "OK":
-                return []
-            
-            email_ids = messages[0].split()
-            
-            emails = []
-            for email_id in email_ids:
-                try:
-                    status, msg_data = self.mail.fetch(email_id, "(RFC822)")
-                    if status != "OK":
-                        continue
-                    
-                    for response_part in msg_data:
-                        if isinstance(response_part, tuple):
-                            msg = email.message_from_bytes(response_part[1])
-                            emails.append(self._parse_email(msg))
-                except Exception as e:
-                    print(f"⚠️  Chyba pri spracovaní emailu: {e}")
-            
-            return emails
+            with self.session.connection() as mail:
+                for _, email_data in imap_sync.iter_new_messages(mail, mailbox, folder):
+                    yield email_data
         except Exception as e:
             print(f"❌ Chyba pri získavaní emailov: {e}")
-            return []
-    
-    def _parse_email(self, msg) -> Dict:
-        """Parsovanie email správy"""
-        subject = ""
-        if msg["Subject"]:
-            subject, encoding = decode_header(msg["Subject"])[0]
-            if isinstance(subject, bytes):
-                subject = subject.decode(encoding if encoding else "utf-8")
-        
-        date = msg["Date"]
-        
-        body = ""
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        body = part.get_payload(decode=True).decode()
-                    except:
-                        pass
-        else:
-            try:
-                body = msg.get_payload(decode=True).decode()
-            except:
-                pass
-        
-        return {
-            "subject": subject,
-            "date": date,
-            "body": body,
-            "from": msg["From"]
-        }
-
-
-class BMailParser:
-    """Parser pre B-mail z Tatra banky"""
-    
-    @staticmethod
-    def parse_transaction(email_body: str) -> Optional[Dict]:
-        """Parsovanie B-mail transakcie"""
-        transaction = {}
-        
-        try:
-            # Extrahovanie dátumu, IBAN a sumy
-            main_match = re.search(
-                r'(\d{1,2}\.\d{1,2}\.\d{4})\s+(\d{1,2}:\d{2})\s+bol zostatok.*?'
-                r'(SK\d+)\s+(znizeny|zvyseny)\s+o\s+([\d,]+)\s*EUR',
-                email_body
-            )
-            
-            if not main_match:
-                return None
-            
-            # Dátum a čas
-            date_str = f"{main_match.group(1)} {main_match.group(2)}"
-            transaction['date'] = datetime.strptime(date_str, "%d.%m.%Y %H:%M")
-            
-            # IBAN
-            transaction['iban'] = main_match.group(3)
-            
-            # Suma (znizeny = mínus, zvyseny = plus)
-            amount_str = main_match.group(5).replace(',', '.')
-            amount = float(amount_str)
-            if main_match.group(4) == 'znizeny':
-                amount = -amount
-            transaction['amount'] = amount
-            
-            # Popis transakcie
-            desc_match = re.search(r'Popis transakcie:\s*(.+?)(?:\n|$)', email_body)
-            if desc_match:
-                description = desc_match.group(1).strip()
-                transaction['description'] = description
-                
-                # Extrakcia obchodníka
-                if 'Platba kartou' in description:
-                    transaction['payment_method'] = 'Card'
-                    merchant_match = re.search(r',\s*([A-Z0-9\.\-]+)', description)
-                    if merchant_match:
-                        merchant_raw = merchant_match.group(1).strip('.')
-                        merchant = re.sub(r'\.?[A-Z]{3}\d+$', '', merchant_raw)
-                        transaction['merchant'] = merchant if merchant else merchant_raw
-                    else:
-                        transaction['merchant'] = 'Unknown'
-                elif 'Prevod' in description or 'Prikaz' in description:
-                    transaction['payment_method'] = 'Transfer'
-                    transaction['merchant'] = description
-                else:
-                    transaction['payment_method'] = 'Other'
-                    transaction['merchant'] = description
-            
-            transaction['transaction_type'] = 'Debit' if transaction['amount'] < 0 else 'Credit'
-            transaction['raw_email'] = email_body
-            
-            return transaction
-            
-        except Exception as e:
-            print(f"❌ Chyba pri parsovaní: {e}")
-            return None
-
-
-def turso_query(query: str):
-    """Vykonanie SQL query na Turso cez HTTP API"""
-    try:
-        response = requests.post(
-            f"{TURSO_DATABASE_URL}/v2/pipeline",
-            headers={
-                "Authorization": f"Bearer {TURSO_AUTH_TOKEN}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "requests": [
-                    {"type": "execute", "stmt": {"sql": query}},
-                    {"type": "close"}
-                ]
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if "results" in data and len(data["results"]) > 0:
-                return data["results"][0]["response"]
-        
-        return None
-    except Exception as e:
-        print(f"❌ Turso query error: {e}")
-        return None
 
 
 def get_account_id_by_iban(iban: str) -> Optional[int]:
     """Nájdenie AccountID podľa IBAN"""
-    query = f"SELECT AccountID FROM Accounts WHERE IBAN = '{iban}' AND IsActive = 1 LIMIT 1;"
-    result = turso_query(query)
+    query = "SELECT AccountID FROM Accounts WHERE IBAN = ? AND IsActive = 1 LIMIT 1;"
+    result = turso_query(query, [iban])
     
-    if result and "rows" in result and len(result["rows"]) > 0:
-        return int(result["rows"][0][0]["value"])
+    if result["success"] and result["data"]:
+        return int(result["data"][0]["AccountID"])
     
     return None
 
 
 def save_transaction(transaction: Dict) -> bool:
-    """Uloženie transakcie do Turso databázy"""
+    """
+    Uloženie transakcie do Turso databázy
+    
+    Transakcia, ktorej odtlačok (fingerprints) už v databáze je, sa
+    preskočí - aj to je úspech, UID B-mailu sa posunie.
+    """
     try:
+        fingerprint = fingerprints.transaction_fingerprint(transaction)
+        index = fingerprints.get_index()
+        if index.is_known(fingerprint):
+            print(f"⏭️  Transakcia už je uložená: {transaction.get('merchant')} - {transaction['amount']} EUR")
+            return True
+        
         # Nájdenie AccountID
         account_id = get_account_id_by_iban(transaction.get('iban', ''))
-        account_id_sql = str(account_id) if account_id else 'NULL'
         
         if account_id:
             print(f"  🏦 Účet: AccountID = {account_id}")
@@ -242,7 +110,7 @@ def save_transaction(transaction: Dict) -> bool:
             print(f"  ⚠️  Účet s IBAN {transaction.get('iban')} neexistuje v Settings")
         
         # SQL INSERT
-        query = f"""
+        query = """
         INSERT INTO Transactions (
             TransactionDate,
             Amount,
@@ -252,30 +120,45 @@ def save_transaction(transaction: Dict) -> bool:
             IBAN,
             TransactionType,
             PaymentMethod,
-            RawEmailData,
             CategorySource,
             AccountID,
-            CreatedAt
-        ) VALUES (
-            '{transaction['date'].isoformat()}',
-            {transaction['amount']},
-            'EUR',
-            '{transaction.get('merchant', 'Unknown').replace("'", "''")}',
-            '{transaction.get('description', '').replace("'", "''")}',
-            '{transaction.get('iban', '')}',
-            '{transaction.get('transaction_type', 'Debit')}',
-            '{transaction.get('payment_method', 'Other')}',
-            '{transaction.get('raw_email', '').replace("'", "''")}',
-            'Email',
-            {account_id_sql},
-            '{datetime.now().isoformat()}'
-        );
+            CreatedAt,
+            AmountCents,
+            TxEpoch,
+            TxDay,
+            Fingerprint
+        ) VALUES (?, ?, 'EUR', ?, ?, ?, ?, ?, 'Email', ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (Fingerprint) DO NOTHING
+        RETURNING TransactionID;
         """
         
-        result = turso_query(query)
+        # Transakcia + komprimovaný B-mail (RawEmails) atomicky v jednom round trip-e
+        statements = [(query, [
+            transaction['date'].isoformat(),
+            transaction['amount'],
+            transaction.get('merchant', 'Unknown'),
+            transaction.get('description', ''),
+            transaction.get('iban', ''),
+            transaction.get('transaction_type', 'Debit'),
+            transaction.get('payment_method', 'Other'),
+            account_id,
+            datetime.now().isoformat(),
+            *canonical_values(transaction['amount'], transaction['date']),
+            fingerprint
+        ])]
+        raw_email = raw_emails.insert_after_transaction(transaction.get('raw_email'))
+        if raw_email:
+            statements.append(raw_email)
+        result = turso_transaction(statements)[0]
         
-        if result:
-            print(f"✅ Transakcia uložená: {transaction['merchant']} - {transaction['amount']} EUR")
+        if result["success"]:
+            index.add(fingerprint)
+            if result["data"]:
+                print(f"✅ Transakcia uložená (ID={result['data'][0]['TransactionID']}): "
+                      f"{transaction['merchant']} - {transaction['amount']} EUR")
+            else:
+                print(f"⏭️  Transakcia už je uložená (iný zdroj): "
+                      f"{transaction['merchant']} - {transaction['amount']} EUR")
             return True
         else:
             print(f"❌ Chyba pri ukladaní transakcie")
@@ -286,30 +169,64 @@ def save_transaction(transaction: Dict) -> bool:
         return False
 
 
-def monitor_emails():
-    """Hlavná funkcia - kontinuálne monitorovanie"""
-    print("=" * 60)
-    print("🚀 Railway B-mail Worker STARTED")
-    print("=" * 60)
-    print(f"📧 Email: {EMAIL_ADDRESS}")
-    print(f"⏱️  Interval: {CHECK_INTERVAL}s")
-    print(f"🗄️  Database: {TURSO_DATABASE_URL[:50]}...")
-    print("=" * 60)
-    print()
-    
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        print("❌ EMAIL_ADDRESS alebo EMAIL_PASSWORD nie sú nastavené!")
-        return
+def process_bmails(receiver: EmailReceiver, parser: BMailParser) -> Tuple[int, int]:
+    """Spracovanie nových B-mailov od posledného UID - (nájdených, uložených)"""
+    found = 0
+    saved = 0
+    for email_data in receiver.get_bmails():
+        found += 1
+        if found == 1:
+            print("\n📨 New B-mails!")
+            print("-" * 60)
+        print(f"\n📧 Email #{found} (UID {email_data['uid']})")
+        print(f"   Subject: {email_data['subject']}")
+        
+        transaction = parser.parse_transaction(email_data['body'])
+        
+        if transaction:
+            print(f"   💰 Amount: {transaction['amount']} EUR")
+            print(f"   🏪 Merchant: {transaction.get('merchant', 'N/A')}")
+            
+            if not save_transaction(transaction):
+                # UID sa neposunie - email sa skúsi znova pri ďalšej kontrole
+                print("   🔁 Retry on next check")
+                break
+            saved += 1
+        else:
+            print("   ⚠️  Failed to parse transaction")
     
-    if not TURSO_DATABASE_URL or not TURSO_AUTH_TOKEN:
-        print("❌ TURSO_DATABASE_URL alebo TURSO_AUTH_TOKEN nie sú nastavené!")
-        return
+    return found, saved
+
+
+def wait_for_bmails(receiver: EmailReceiver, poll_interval: int) -> None:
+    """
+    Čakanie na ďalšiu kontrolu
     
-    receiver = EmailReceiver(EMAIL_ADDRESS, EMAIL_PASSWORD, EMAIL_IMAP_SERVER)
-    parser = BMailParser()
+    S IDLE (EMAIL_IMAP_MODE=idle a server ho podporuje) čaká na otvorenom
+    spojení, kým server neohlási novú správu, najviac EMAIL_IDLE_TIMEOUT -
+    potom sa IDLE obnoví ďalšou kontrolou. Inak spí poll_interval sekúnd.
+    """
+    session = receiver.session
+    if EMAIL_IMAP_MODE == "idle" and session.mail is not None and imap_sync.supports_idle(session.mail):
+        with session.connection() as mail:
+            imap_sync.idle_wait(mail, EMAIL_IDLE_TIMEOUT)
+    else:
+        # bez spojenia počká aspoň do konca reconnect backoffu
+        time.sleep(max(poll_interval, session.retry_in()))
+
+
+def run_worker(receiver: EmailReceiver, parser: BMailParser):
+    """
+    Nekonečná slučka kontrol jedného prijímača
     
+    Spojenie (receiver.session) ostáva otvorené medzi kontrolami; po chybe
+    socketu sa zahodí a nadviaže nanovo s backoffom. Adaptívny polling (bez IDLE): po
+    nájdení B-mailu sa kontroluje každých EMAIL_POLL_MIN_INTERVAL sekúnd,
+    bez nových správ sa interval zdvojnásobuje až po CHECK_INTERVAL.
+    """
     check_count = 0
     processed_count = 0
+    poll_interval = EMAIL_POLL_MIN_INTERVAL
     
     while True:
         try:
@@ -318,43 +235,53 @@ def monitor_emails():
             
             print(f"[{current_time}] 🔍 Check #{check_count}...", end=" ", flush=True)
             
-            # Kontrola emailov
-            emails = receiver.get_bmails()
+            # Kontrola emailov - len nové od posledného spracovaného UID
+            found, saved = process_bmails(receiver, parser)
+            processed_count += saved
             
-            if not emails:
+            if not found:
                 print("📭 No new B-mails")
+                poll_interval = min(poll_interval * 2, CHECK_INTERVAL)
             else:
-                print(f"\n📨 Found {len(emails)} B-mails!")
-                print("-" * 60)
-                
-                for i, email_data in enumerate(emails, 1):
-                    print(f"\n📧 Email {i}/{len(emails)}")
-                    print(f"   Subject: {email_data['subject']}")
-                    
-                    transaction = parser.parse_transaction(email_data['body'])
-                    
-                    if transaction:
-                        print(f"   💰 Amount: {transaction['amount']} EUR")
-                        print(f"   🏪 Merchant: {transaction.get('merchant', 'N/A')}")
-                        
-                        if save_transaction(transaction):
-                            processed_count += 1
-                    else:
-                        print("   ⚠️  Failed to parse transaction")
-                
+                health = receiver.session.health()
                 print("-" * 60)
-                print(f"✅ Total processed: {processed_count}\n")
+                print(f"✅ Total processed: {processed_count} "
+                      f"(IMAP connection age {health['connection_age_s']}s, reconnects {health['reconnects']})\n")
+                poll_interval = EMAIL_POLL_MIN_INTERVAL
             
-            # Odpojenie (nové spojenie pri každom checku)
-            receiver.disconnect()
+            wait_for_bmails(receiver, poll_interval)
             
         except Exception as e:
             print(f"❌ Error: {e}")
-        
-        # Počkaj pred ďalšou kontrolou
-        time.sleep(CHECK_INTERVAL)
+            # Nové spojenie pri ďalšej kontrole
+            receiver.disconnect()
+            time.sleep(max(EMAIL_POLL_MIN_INTERVAL, receiver.session.retry_in()))
+
+
+def monitor_emails():
+    """Hlavná funkcia - kontinuálne monitorovanie"""
+    print("=" * 60)
+    print("🚀 Railway B-mail Worker STARTED")
+    print("=" * 60)
+    print(f"📧 Email: {EMAIL_ADDRESS}")
+    print(f"⏱️  Mode: {EMAIL_IMAP_MODE} (IDLE renew {EMAIL_IDLE_TIMEOUT}s, "
+          f"poll {EMAIL_POLL_MIN_INTERVAL}-{CHECK_INTERVAL}s)")
+    print(f"🗄️  Database: {TURSO_DATABASE_URL[:50]}...")
+    print("=" * 60)
+    print()
+    
+    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+        print("❌ EMAIL_ADDRESS alebo EMAIL_PASSWORD nie sú nastavené!")
+        return
+    
+    if not TURSO_DATABASE_URL or not TURSO_AUTH_TOKEN:
+        print("❌ TURSO_DATABASE_URL alebo TURSO_AUTH_TOKEN nie sú nastavené!")
+        return
+    
+    migrate.startup_check()
+    
+    run_worker(EmailReceiver(EMAIL_ADDRESS, EMAIL_PASSWORD, EMAIL_IMAP_SERVER), BMailParser())
 
 
 if __name__ == "__main__":
     monitor_emails()
-